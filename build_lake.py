@@ -22,8 +22,18 @@ Fuentes:
   - data/extracted/Tabla-de-viajes-*/viajes/   → un cut por día
   - data/extracted/Tabla-de-etapas-*/etapas/   → todos los días concatenados, cut = rango
   - data/Subida_Paradero_Estacion_YYYY.MM.xlsb  → convertido a CSV, cut = YYYY-MM
+
+Cada _meta.json de viajes/etapas incluye `chunk_index`: offsets de bytes de
+límites de registro cada CHUNK_INDEX_MB, para que Silver procese el CSV por
+chunks en paralelo (transform_silver --chunked).
+
+Uso:
+    python build_lake.py                      # ingesta completa
+    python build_lake.py --reindex            # solo recalcula chunk_index en _meta.json existentes
+    python build_lake.py --reindex --chunk-mb 64
 """
 
+import argparse
 import gzip
 import json
 import re
@@ -31,6 +41,7 @@ import shutil
 import zipfile
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional
 
 import polars as pl
 
@@ -52,6 +63,13 @@ MAX_GZ_UNCOMPRESSED_BYTES  = 10 * 1024 ** 3   # ídem para .gz individuales
 MAX_ZIP_ENTRIES            = 10_000           # límite de entradas por ZIP
 ALLOWED_ZIP_EXTENSIONS     = {".csv", ".gz"}  # únicas extensiones permitidas dentro del ZIP
 
+# ---------------------------------------------------------------------------
+# Chunk index (procesamiento Silver por rangos de bytes)
+# ---------------------------------------------------------------------------
+CHUNK_INDEX_MB       = 256                  # tamaño objetivo de cada chunk
+CHUNK_INDEX_DATASETS = ("viajes", "etapas")  # CSVs grandes que Silver puede trocear
+_SCAN_BLOCK_BYTES    = 8 * 1024 ** 2        # lectura secuencial en bloques de 8 MB
+
 
 # ---------------------------------------------------------------------------
 # Utilitarios
@@ -86,6 +104,70 @@ def copy_csv(src: Path, dst: Path) -> None:
     print(f"    ✓ {dst.relative_to(ROOT)}  ({dst.stat().st_size / 1024:.1f} KB)")
 
 
+def build_chunk_index(csv_path: Path, chunk_mb: Optional[float] = None) -> dict:
+    """
+    Recorre el CSV en bloques y registra un límite de registro (byte siguiente
+    a un '\n') aproximadamente cada `chunk_mb` MB. El primer chunk empieza
+    después del encabezado, así que ningún chunk contiene header.
+
+    Supone que no hay saltos de línea dentro de campos (cierto para los CSV DTPM,
+    separados por '|' y sin comillas multilínea).
+
+    Devuelve:
+      {"chunk_bytes", "header_bytes", "chunks": [{"offset", "length", "rows"}, ...]}
+    """
+    chunk_bytes = max(1, int((chunk_mb or CHUNK_INDEX_MB) * 1024 ** 2))
+    size = csv_path.stat().st_size
+    offsets: list[int] = []
+    rows: list[int] = []
+
+    with open(csv_path, "rb") as fh:
+        header = fh.readline()
+        pos = fh.tell()
+        offsets.append(pos)
+        next_target = pos + chunk_bytes
+        rows_in_chunk = 0
+        last_byte = header[-1:]
+
+        while True:
+            block = fh.read(_SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            start = 0
+            while pos + len(block) > next_target:
+                cut_at = block.find(b"\n", max(next_target - pos, start))
+                if cut_at < 0:
+                    break  # el registro cruza el bloque: se busca en el siguiente
+                rows_in_chunk += block.count(b"\n", start, cut_at + 1)
+                boundary = pos + cut_at + 1
+                if boundary < size:
+                    rows.append(rows_in_chunk)
+                    offsets.append(boundary)
+                    rows_in_chunk = 0
+                start = cut_at + 1
+                next_target = boundary + chunk_bytes
+            rows_in_chunk += block.count(b"\n", start)
+            last_byte = block[-1:]
+            pos += len(block)
+
+    # Última línea sin '\n' final también es un registro
+    if pos > offsets[-1] and last_byte != b"\n":
+        rows_in_chunk += 1
+    rows.append(rows_in_chunk)
+
+    bounds = offsets + [size]
+    chunks = [
+        {"offset": bounds[i], "length": bounds[i + 1] - bounds[i], "rows": rows[i]}
+        for i in range(len(offsets))
+        if bounds[i + 1] > bounds[i]
+    ]
+    return {
+        "chunk_bytes" : chunk_bytes,
+        "header_bytes": len(header),
+        "chunks"      : chunks,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Extracción segura desde ZIP y GZ
 # ---------------------------------------------------------------------------
@@ -269,6 +351,7 @@ def build_viajes() -> None:
             "file_size_bytes": dst_csv.stat().st_size,
             "source_file"   : csv_file.name,
             "extracted_at"  : now_iso(),
+            "chunk_index"   : build_chunk_index(dst_csv),
         }
         write_meta(partition / "_meta.json", meta)
 
@@ -341,6 +424,7 @@ def build_etapas() -> None:
         "source_files"   : [f.name for f in csv_files],
         "date_range"     : {"from": dates[0], "to": dates[-1]},
         "extracted_at"   : now_iso(),
+        "chunk_index"    : build_chunk_index(dst_csv),
     }
     write_meta(partition / "_meta.json", meta)
 
@@ -444,6 +528,26 @@ def build_subidas_30m() -> None:
         write_meta(partition / "_meta.json", meta)
 
 
+# ---------------------------------------------------------------------------
+# Re-indexado de particiones existentes
+# ---------------------------------------------------------------------------
+
+def reindex_raw_lake(chunk_mb: Optional[float] = None) -> None:
+    """Recalcula chunk_index en los _meta.json ya presentes en lake/raw (sin re-ingestar)."""
+    chunk_mb = chunk_mb or CHUNK_INDEX_MB
+    print(f"\n[R] Recalculando chunk_index ({chunk_mb} MB por chunk)...")
+    for ds in CHUNK_INDEX_DATASETS:
+        for meta_path in sorted((LAKE_RAW / f"dataset={ds}").glob("year=*/month=*/cut=*/_meta.json")):
+            csv_path = meta_path.parent / f"{ds}.csv"
+            if not csv_path.exists():
+                print(f"    ⚠ Sin CSV en {meta_path.parent.relative_to(ROOT)}, omitiendo.")
+                continue
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["chunk_index"] = build_chunk_index(csv_path, chunk_mb)
+            write_meta(meta_path, meta)
+            print(f"      {len(meta['chunk_index']['chunks'])} chunks")
+
+
 # ---------------------------------------------------------------------------
 # Árbol final
 # ---------------------------------------------------------------------------
@@ -463,6 +567,19 @@ def _print_tree(path: Path, prefix: str = "") -> None:
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DTPM Data Lake Builder — raw layer")
+    parser.add_argument("--reindex", action="store_true",
+                        help="Solo recalcula chunk_index de los _meta.json existentes.")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_INDEX_MB,
+                        help=f"Tamaño objetivo de chunk en MB (default: {CHUNK_INDEX_MB}).")
+    args = parser.parse_args()
+
+    if args.reindex:
+        reindex_raw_lake(args.chunk_mb)
+        raise SystemExit(0)
+
+    CHUNK_INDEX_MB = args.chunk_mb
+
     print("=" * 60)
     print("  DTPM Data Lake Builder — raw layer")
     print("=" * 60)
@@ -0,0 +1,247 @@
+-- =============================================================================
+-- ddl_duckdb.sql  —  Capa Gold local DuckDB  (DTPM Movilidad Santiago)
+-- Motor: DuckDB 1.1+
+-- Notas:
+--   - Mismo star schema que ddl_sqlite.sql (nombres y columnas), cargado con
+--     SQL set-based por src/duckdb_gold/load_duckdb.py.
+--   - SKs vía SEQUENCE + DEFAULT nextval (equivalente a AUTOINCREMENT).
+--   - Fechas SCD2 y calendario como DATE nativo (SQLite: TEXT ISO8601).
+--   - Facts SIN PK/UNIQUE/FK: en DuckDB cada constraint es un índice ART que
+--     encarece el INSERT masivo.  El grain lo garantiza el loader
+--     (QUALIFY ROW_NUMBER() = 1 + anti-join contra lo ya cargado), con la misma
+--     semántica que INSERT OR IGNORE en SQLite (gana la primera fila leída).
+--   - Idempotente: CREATE ... IF NOT EXISTS / CREATE OR REPLACE MACRO.
+-- =============================================================================
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- 0. MACROS DE NORMALIZACIÓN (mismas reglas que load_sqlite.py)
+-- ─────────────────────────────────────────────────────────────────────────────
+
+-- str.strip() de Python: espacios y controles \t \n \v \f \r, más NBSP
+CREATE OR REPLACE MACRO clean_text(x) AS
+    trim(x, ' ' || chr(9) || chr(10) || chr(11) || chr(12) || chr(13) || chr(160));
+
+-- (x or "").strip().upper()
+CREATE OR REPLACE MACRO norm_code(x) AS upper(clean_text(x));
+
+-- (x or "UNKNOWN").strip().upper()  (operador / contrato)
+CREATE OR REPLACE MACRO norm_or_unknown(x) AS norm_code(coalesce(nullif(x, ''), 'UNKNOWN'));
+
+-- _sk_to_date(): YYYYMMDD → DATE; NULL si <= 0 o fecha inválida
+CREATE OR REPLACE MACRO sk_to_date(sk) AS
+    CASE WHEN sk > 0 THEN try(make_date(sk // 10000, (sk % 10000) // 100, sk % 100)) END;
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- 1. DIMENSIONES CONFORMADAS
+-- ─────────────────────────────────────────────────────────────────────────────
+
+CREATE SEQUENCE IF NOT EXISTS seq_dim_cut;
+CREATE SEQUENCE IF NOT EXISTS seq_dim_mode;
+CREATE SEQUENCE IF NOT EXISTS seq_dim_stop;
+CREATE SEQUENCE IF NOT EXISTS seq_dim_service;
+CREATE SEQUENCE IF NOT EXISTS seq_dim_fare_period;
+CREATE SEQUENCE IF NOT EXISTS seq_dim_purpose;
+CREATE SEQUENCE IF NOT EXISTS seq_dim_operator_contract;
+CREATE SEQUENCE IF NOT EXISTS seq_fct_trip;
+CREATE SEQUENCE IF NOT EXISTS seq_fct_trip_leg;
+CREATE SEQUENCE IF NOT EXISTS seq_fct_validation;
+CREATE SEQUENCE IF NOT EXISTS seq_fct_boardings_30m;
+CREATE SEQUENCE IF NOT EXISTS seq_etl_run_log;
+
+-- 1.1  dim_cut ─ una fila por (dataset, cut)
+CREATE TABLE IF NOT EXISTS dim_cut (
+    cut_sk       INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_cut'),
+    dataset      VARCHAR   NOT NULL,
+    cut          VARCHAR   NOT NULL,
+    year         INTEGER   NOT NULL,
+    month        INTEGER   NOT NULL,
+    extracted_at VARCHAR   NULL,                -- ISO8601 desde quality.json
+    loaded_at    TIMESTAMP NOT NULL,
+    UNIQUE(dataset, cut)
+);
+
+-- 1.2  dim_date ─ calendario (date_sk = YYYYMMDD integer)
+CREATE TABLE IF NOT EXISTS dim_date (
+    date_sk      INTEGER PRIMARY KEY,           -- YYYYMMDD
+    full_date    DATE     NOT NULL,
+    year         INTEGER  NOT NULL,
+    month        INTEGER  NOT NULL,
+    day          INTEGER  NOT NULL,
+    quarter      INTEGER  NOT NULL,
+    day_of_week  INTEGER  NOT NULL,             -- 0=Mon … 6=Sun (Python weekday())
+    day_name     VARCHAR  NOT NULL,             -- 'Lunes' … 'Domingo'
+    month_name   VARCHAR  NOT NULL,
+    is_weekend   BOOLEAN  NOT NULL DEFAULT FALSE
+);
+
+-- 1.3  dim_time_30m ─ 48 franjas horarias (time_30m_sk = 0..47)
+CREATE TABLE IF NOT EXISTS dim_time_30m (
+    time_30m_sk  INTEGER PRIMARY KEY,           -- 0..47
+    hour         INTEGER  NOT NULL,
+    minute       INTEGER  NOT NULL,
+    period_label VARCHAR  NOT NULL              -- '00:00-00:30', etc.
+);
+
+-- 1.4  dim_mode ─ estática (BUS / METRO / METROTREN / ZP / UNKNOWN)
+CREATE TABLE IF NOT EXISTS dim_mode (
+    mode_sk      INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_mode'),
+    mode_code    VARCHAR  NOT NULL UNIQUE,
+    mode_name    VARCHAR  NOT NULL
+);
+
+-- 1.5  dim_stop ─ SCD2 por paradero (versiones contiguas: valid_to = siguiente valid_from - 1)
+CREATE TABLE IF NOT EXISTS dim_stop (
+    stop_sk      INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_stop'),
+    stop_code    VARCHAR  NOT NULL,
+    comuna       VARCHAR  NULL,
+    zona         INTEGER  NULL,                 -- zona tarifaria
+    valid_from   DATE     NOT NULL,
+    valid_to     DATE     NULL,                 -- NULL = vigente
+    is_current   BOOLEAN  NOT NULL DEFAULT TRUE,
+    row_hash     VARCHAR  NOT NULL,             -- mismo SHA-256 que load_sqlite._row_hash
+    UNIQUE(stop_code, valid_from)
+);
+
+-- 1.6  dim_service ─ SCD2 por servicio
+CREATE TABLE IF NOT EXISTS dim_service (
+    service_sk   INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_service'),
+    service_code VARCHAR  NOT NULL,
+    mode_code    VARCHAR  NULL,
+    valid_from   DATE     NOT NULL,
+    valid_to     DATE     NULL,
+    is_current   BOOLEAN  NOT NULL DEFAULT TRUE,
+    row_hash     VARCHAR  NOT NULL,
+    UNIQUE(service_code, valid_from)
+);
+
+-- 1.7  dim_fare_period ─ períodos tarifarios
+CREATE TABLE IF NOT EXISTS dim_fare_period (
+    fare_period_sk   INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_fare_period'),
+    fare_period_code VARCHAR  NOT NULL UNIQUE
+);
+
+-- 1.8  dim_purpose ─ propósito de viaje
+CREATE TABLE IF NOT EXISTS dim_purpose (
+    purpose_sk   INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_purpose'),
+    purpose_code VARCHAR  NOT NULL UNIQUE
+);
+
+-- 1.9  dim_operator_contract ─ operador + contrato (grain natural compuesto)
+CREATE TABLE IF NOT EXISTS dim_operator_contract (
+    operator_contract_sk INTEGER PRIMARY KEY DEFAULT nextval('seq_dim_operator_contract'),
+    operator_code        VARCHAR  NOT NULL,
+    contract_code        VARCHAR  NOT NULL,
+    UNIQUE(operator_code, contract_code)
+);
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- 2. TABLAS DE HECHO  (grain documentado; ver nota de cabecera)
+-- ─────────────────────────────────────────────────────────────────────────────
+
+-- 2.1  fct_trip ─ grain (cut, id_viaje)
+CREATE TABLE IF NOT EXISTS fct_trip (
+    trip_sk              BIGINT   NOT NULL DEFAULT nextval('seq_fct_trip'),
+    cut_sk               INTEGER  NOT NULL,
+    date_start_sk        INTEGER  NULL,
+    time_start_30m_sk    INTEGER  NULL,
+    date_end_sk          INTEGER  NULL,
+    time_end_30m_sk      INTEGER  NULL,
+    origin_stop_sk       INTEGER  NULL,
+    dest_stop_sk         INTEGER  NULL,
+    purpose_sk           INTEGER  NULL,
+    operator_contract_sk INTEGER  NULL,
+    cut                  VARCHAR  NOT NULL,
+    id_viaje             VARCHAR  NOT NULL,
+    id_tarjeta           VARCHAR  NULL,
+    tipo_dia             VARCHAR  NULL,
+    factor_expansion     DOUBLE   NULL,
+    n_etapas             INTEGER  NULL,
+    distancia_eucl       DOUBLE   NULL,
+    distancia_ruta       DOUBLE   NULL,
+    tviaje_min           DOUBLE   NULL
+);
+
+-- 2.2  fct_trip_leg ─ grain (cut, id_viaje, leg_seq)
+CREATE TABLE IF NOT EXISTS fct_trip_leg (
+    leg_sk               BIGINT   NOT NULL DEFAULT nextval('seq_fct_trip_leg'),
+    cut_sk               INTEGER  NOT NULL,
+    date_board_sk        INTEGER  NULL,
+    time_board_30m_sk    INTEGER  NULL,
+    date_alight_sk       INTEGER  NULL,
+    time_alight_30m_sk   INTEGER  NULL,
+    mode_sk              INTEGER  NULL,
+    service_sk           INTEGER  NULL,
+    board_stop_sk        INTEGER  NULL,
+    alight_stop_sk       INTEGER  NULL,
+    fare_period_sk       INTEGER  NULL,
+    cut                  VARCHAR  NOT NULL,
+    id_viaje             VARCHAR  NOT NULL,
+    id_tarjeta           VARCHAR  NULL,
+    leg_seq              INTEGER  NOT NULL,
+    operator_code        VARCHAR  NULL,
+    zone_board           INTEGER  NULL,
+    zone_alight          INTEGER  NULL,
+    tv_leg_min           DOUBLE   NULL,
+    tc_transfer_min      DOUBLE   NULL,
+    te_wait_min          DOUBLE   NULL
+);
+
+-- 2.3  fct_validation ─ grain (cut, id_etapa)
+CREATE TABLE IF NOT EXISTS fct_validation (
+    validation_sk          BIGINT   NOT NULL DEFAULT nextval('seq_fct_validation'),
+    cut_sk                 INTEGER  NOT NULL,
+    date_board_sk          INTEGER  NULL,
+    time_board_30m_sk      INTEGER  NULL,
+    date_alight_sk         INTEGER  NULL,
+    time_alight_30m_sk     INTEGER  NULL,
+    board_stop_sk          INTEGER  NULL,
+    alight_stop_sk         INTEGER  NULL,
+    board_service_sk       INTEGER  NULL,
+    alight_service_sk      INTEGER  NULL,
+    fare_period_board_sk   INTEGER  NULL,
+    fare_period_alight_sk  INTEGER  NULL,
+    operator_contract_sk   INTEGER  NULL,
+    cut                    VARCHAR  NOT NULL,
+    id_etapa               VARCHAR  NOT NULL,
+    tipo_dia               VARCHAR  NULL,
+    tipo_transporte        VARCHAR  NULL,
+    factor_expansion       DOUBLE   NULL,    -- fExpansionServicioPeriodoTS en parquet
+    tiene_bajada           INTEGER  NULL,    -- BOOLEAN mapeado a 0/1 (igual que SQLite)
+    tiempo_etapa           INTEGER  NULL,
+    dist_ruta_paraderos    INTEGER  NULL,
+    dist_eucl_paraderos    INTEGER  NULL,
+    t_espera_media         DOUBLE   NULL     -- tEsperaMediaIntervalo en parquet
+);
+
+-- 2.4  fct_boardings_30m ─ grain (cut, month_date_sk, stop_code, mode_code, tipo_dia, time_30m_sk)
+--   Igual que SQLite: time_30m_sk NULL nunca colisiona con otra fila.
+CREATE TABLE IF NOT EXISTS fct_boardings_30m (
+    boarding_sk      BIGINT   NOT NULL DEFAULT nextval('seq_fct_boardings_30m'),
+    cut_sk           INTEGER  NOT NULL,
+    time_30m_sk      INTEGER  NULL,
+    stop_sk          INTEGER  NULL,
+    mode_sk          INTEGER  NULL,
+    cut              VARCHAR  NOT NULL,
+    month_date_sk    INTEGER  NOT NULL,         -- YYYYMM01
+    stop_code        VARCHAR  NOT NULL,
+    mode_code        VARCHAR  NOT NULL,
+    tipo_dia         VARCHAR  NOT NULL,
+    subidas_promedio DOUBLE   NULL
+);
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- 3. TABLA DE AUDIT (cargada por load_duckdb.py)
+-- ─────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS etl_run_log (
+    run_id         INTEGER   PRIMARY KEY DEFAULT nextval('seq_etl_run_log'),
+    started_at     TIMESTAMP NOT NULL DEFAULT current_timestamp,
+    finished_at    TIMESTAMP NULL,
+    dataset        VARCHAR   NOT NULL,
+    cut            VARCHAR   NOT NULL,
+    status         VARCHAR   NOT NULL DEFAULT 'RUNNING',   -- RUNNING / OK / FAILED
+    rows_read      BIGINT    NULL,
+    rows_inserted  BIGINT    NULL,
+    rows_ignored   BIGINT    NULL,
+    error_message  VARCHAR   NULL,
+    loader_version VARCHAR   NULL
+);
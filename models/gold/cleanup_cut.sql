@@ -4,11 +4,16 @@
 -- Uso:
 --   Reemplazar @dataset y @cut_id con los valores deseados antes de ejecutar.
 --   Este script NO borra dims (dim_stop, dim_service, dim_cut, etc.),
---   solo limpia las filas de fact tables para el corte indicado.
+--   solo limpia las filas de fact tables para el corte indicado, y las de
+--   los marts dw.agg_* del mismo cut (ddl_gold_aggregates.sql).
 --
 -- Ejemplo:
 --   DECLARE @dataset VARCHAR(30) = 'viajes';
 --   DECLARE @cut_id  VARCHAR(40) = '2025-04-21';
+--
+-- Con facts particionadas (ddl_gold_partitioning.sql) preferir
+--   python -m src.gold.load_gold --dataset <ds> --cut <cut> --replace-cut
+-- que vacía la partición del cut con TRUNCATE ... WITH (PARTITIONS (n)).
 -- ─────────────────────────────────────────────────────────────
 
 DECLARE @dataset VARCHAR(30) = 'viajes';       -- 'viajes', 'etapas', 'subidas_30m'
@@ -60,4 +65,15 @@ BEGIN
     PRINT CONCAT(N'  dw.fct_boardings_30m eliminadas: ', @b_del);
 END;
 
+-- 5. Marts agregados del cut (si ddl_gold_aggregates.sql está aplicado).
+--    Tras borrar subidas, las coberturas de esos meses quedan con la base
+--    anterior: python -m src.gold.aggregates --dataset etapas la recalcula.
+IF OBJECT_ID(N'dw.agg_od_comuna', N'U') IS NOT NULL
+BEGIN
+    DELETE dw.agg_od_comuna            WHERE cut_sk = @cut_sk;
+    DELETE dw.agg_coverage_bus_metro   WHERE cut_sk = @cut_sk;
+    DELETE dw.agg_demand_day_mode_30m  WHERE cut_sk = @cut_sk;
+    PRINT N'  dw.agg_* del cut eliminadas';
+END;
+
 PRINT N'Cleanup completado.';
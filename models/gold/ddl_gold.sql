@@ -2,6 +2,7 @@
 -- ddl_gold.sql  —  Capa Gold DTPM Movilidad Santiago
 -- Motor: SQL Server (Azure SQL / SQL Server 2019+)
 -- Schemas: staging (tablas de paso para bulk load), dw (DW Kimball)
+-- schema_version: 4   (subir al cambiar este archivo; ver dw.schema_version)
 --
 -- Convenciones:
 --   - Dims: PK identity + BK natural key con UQ constraint
@@ -9,8 +10,9 @@
 --   - Facts: PK identity (trip_sk, etc.) + UQ por grain natural + FKs
 --   - Staging: sin FKs, truncate+reload por cut antes de cada merge
 --   - Índices: clustered en PK, nonclustered en FKs de join frecuente
---   - Columnstore: sugerido como índice adicional en facts (comentado);
---     incompatible con FKs enforced → usar NONCLUSTERED COLUMNSTORE
+--   - Columnstore: perfil opcional en ddl_gold_columnstore.sql
+--     (load_gold --storage columnstore): facts con CLUSTERED COLUMNSTORE,
+--     PK NONCLUSTERED y FKs declaradas con NOCHECK
 -- =============================================================================
 
 -- ─────────────────────────────────────────────────────────────
@@ -25,7 +27,10 @@ IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = 'dw')
 
 -- ─────────────────────────────────────────────────────────────
 -- 1. STAGING — tablas de paso (DROP + CREATE para idempotencia total)
---    Truncadas antes de cada carga de cut.  Sin FK, sin constraints.
+--    Truncadas por el loader antes de cada carga de cut.  Sin FK, sin constraints.
+--    load_gold solo re-ejecuta este archivo si cambia su schema_version o
+--    checksum (o con --force-ddl): entre esos runs las tablas conservan las
+--    filas confirmadas para --resume, y un cambio de columnas llega a toda BD.
 --    Los tipos son los más amplios para absorber cualquier registro Silver.
 -- ─────────────────────────────────────────────────────────────
 
@@ -154,6 +159,22 @@ CREATE TABLE staging.stg_subidas_30m (
     stg_loaded_at     DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME()
 );
 
+-- 1.5  stg_cdc_keys  (claves del delta CDC: deleted ∪ updated; --delta)
+--      Tabla dispersa: cada dataset usa solo las columnas de su grain.
+IF OBJECT_ID(N'staging.stg_cdc_keys', N'U') IS NOT NULL
+    DROP TABLE staging.stg_cdc_keys;
+
+CREATE TABLE staging.stg_cdc_keys (
+    id_tarjeta        NVARCHAR(40) NULL,
+    id_viaje          NVARCHAR(80) NULL,
+    id_etapa          NVARCHAR(80) NULL,
+    tiempo_subida     DATETIME2(0) NULL,
+    stop_code         NVARCHAR(40) NULL,
+    mode_code         VARCHAR(15)  NULL,
+    tipo_dia          VARCHAR(10)  NULL,
+    time_30m_sk       TINYINT      NULL
+);
+
 -- ─────────────────────────────────────────────────────────────
 -- 2. DIMENSIONES CONFORMADAS
 -- ─────────────────────────────────────────────────────────────
@@ -418,10 +439,7 @@ BEGIN
     CREATE NONCLUSTERED INDEX IX_fct_trip_cut
         ON dw.fct_trip (cut_sk);
 
-    -- SUGERENCIA COLUMNSTORE (descomentar si no se usan FKs enforced):
-    -- CREATE NONCLUSTERED COLUMNSTORE INDEX CCI_fct_trip
-    --     ON dw.fct_trip (date_start_sk, origin_stop_sk, dest_stop_sk,
-    --                     n_etapas, tviaje_min, distancia_ruta_m, factor_expansion);
+    -- Perfil columnstore (CCI, FKs NOCHECK): ddl_gold_columnstore.sql
 END;
 
 -- 3.2  fct_trip_leg  —  Mart 'Trip Legs'  (grain: id_viaje + leg_seq + cut)
@@ -484,9 +502,7 @@ BEGIN
     CREATE NONCLUSTERED INDEX IX_fct_trip_leg_board_date
         ON dw.fct_trip_leg (date_board_sk, board_stop_sk);
 
-    -- SUGERENCIA COLUMNSTORE:
-    -- CREATE NONCLUSTERED COLUMNSTORE INDEX CCI_fct_trip_leg
-    --     ON dw.fct_trip_leg (date_board_sk, board_stop_sk, mode_sk, tv_leg_min, tc_transfer_min);
+    -- Perfil columnstore (CCI, FKs NOCHECK): ddl_gold_columnstore.sql
 END;
 
 -- 3.3  fct_validation  —  Mart 'Stages & Operations'  (grain: id_etapa + tiempo_boarding + cut)
@@ -569,10 +585,7 @@ BEGIN
     CREATE NONCLUSTERED INDEX IX_fct_val_cut
         ON dw.fct_validation (cut_sk);
 
-    -- SUGERENCIA COLUMNSTORE:
-    -- CREATE NONCLUSTERED COLUMNSTORE INDEX CCI_fct_validation
-    --     ON dw.fct_validation (date_board_sk, board_stop_sk, mode_sk,
-    --                           dist_ruta_m, t_espera_media_min, fexp_servicio);
+    -- Perfil columnstore (CCI, FKs NOCHECK): ddl_gold_columnstore.sql
 END;
 
 -- 3.4  fct_boardings_30m  —  Mart 'Network Demand'
@@ -612,10 +625,7 @@ BEGIN
     CREATE NONCLUSTERED INDEX IX_fct_boardings_stop_time
         ON dw.fct_boardings_30m (stop_sk, time_30m_sk, month_date_sk);
 
-    -- SUGERENCIA COLUMNSTORE (ideal para este mart: alta cardinalidad, pocas medidas):
-    -- CREATE NONCLUSTERED COLUMNSTORE INDEX CCI_fct_boardings
-    --     ON dw.fct_boardings_30m (month_date_sk, time_30m_sk, stop_sk, mode_sk,
-    --                              tipo_dia, subidas_promedio);
+    -- Perfil columnstore (CCI, FKs NOCHECK): ddl_gold_columnstore.sql
 END;
 
 -- ─────────────────────────────────────────────────────────────
@@ -634,7 +644,7 @@ BEGIN
         status          VARCHAR(10)   NOT NULL DEFAULT 'RUNNING',  -- 'OK','FAILED','RUNNING'
         rows_staged     BIGINT        NULL,       -- filas insertadas en staging
         rows_inserted   BIGINT        NULL,       -- filas insertadas en fact
-        rows_updated      BIGINT        NOT NULL DEFAULT 0,  -- siempre 0 (solo INSERT NOT MATCHED)
+        rows_updated      BIGINT        NOT NULL DEFAULT 0,  -- filas reemplazadas por --delta (0 en carga completa)
         ignored_cash_rows BIGINT        NULL,                -- viajes en efectivo excluidos de facts
         error_message     NVARCHAR(MAX) NULL,
         loader_version    VARCHAR(20)   NULL,       -- semver del loader Python
@@ -646,6 +656,88 @@ BEGIN
         ON dw.etl_run_log (dataset, cut, started_at DESC);
 END;
 
+-- ─────────────────────────────────────────────────────────────
+-- 4a. CHECKPOINTS — avance de un cut dentro del run (load_gold --resume)
+--     step: tabla staging (source = archivo / rango / día, rows_done =
+--           filas confirmadas, escritas en la misma transacción que el
+--           chunk) | 'staging' | 'dims' | 'clear' | 'f:<fact>' (source =
+--           'day=YYYYMMDD' en el MERGE por día de etapas).
+--     Se vacían al empezar un cut sin --resume y al terminar con status=OK.
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.etl_run_checkpoint', N'U') IS NULL
+BEGIN
+    CREATE TABLE dw.etl_run_checkpoint (
+        dataset           VARCHAR(30)   NOT NULL,
+        cut               VARCHAR(40)   NOT NULL,   -- etl_run_log.cut
+        step              VARCHAR(60)   NOT NULL,
+        source            NVARCHAR(200) NOT NULL DEFAULT N'',
+        rows_done         BIGINT        NOT NULL DEFAULT 0,
+        ignored_cash_rows BIGINT        NULL,
+        completed         BIT           NOT NULL DEFAULT 0,
+        run_id            INT           NULL,       -- último run que escribió el checkpoint
+        updated_at        DATETIME2(3)  NOT NULL DEFAULT SYSUTCDATETIME(),
+
+        CONSTRAINT PK_etl_run_checkpoint PRIMARY KEY CLUSTERED (dataset, cut, step, source)
+    );
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 4c. VERSIÓN DE SCHEMA — un registro por archivo DDL aplicado
+--     component: nombre del archivo sin extensión ('ddl_gold', …)
+--     version:   línea 'schema_version: N' del encabezado del archivo
+--     checksum:  SHA-256 del contenido del archivo
+--     load_gold.ensure_schema lee esta tabla en un SELECT y solo
+--     re-ejecuta los archivos cuya versión o checksum cambió.
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.schema_version', N'U') IS NULL
+BEGIN
+    CREATE TABLE dw.schema_version (
+        component   VARCHAR(60)   NOT NULL,
+        version     INT           NOT NULL,
+        checksum    CHAR(64)      NOT NULL,
+        applied_at  DATETIME2(3)  NOT NULL DEFAULT SYSUTCDATETIME(),
+
+        CONSTRAINT PK_schema_version PRIMARY KEY CLUSTERED (component)
+    );
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 4d. MÉTRICAS POR STEP — duración y throughput de cada paso de un run
+--     step:   'a:staging' | 'b:dim_cut' | 'c:dim_date' | 'd:dims' |
+--             'e:scd2' | 'f:facts' | 'g:aggregates'  (mismos pasos que el log [a]…[g])
+--     target: '' = total del step; si no, tabla staging / dim / fact
+--     source: archivo, día o rango del staging (label del chunk)
+--     bytes_read: tamaño en disco de los Parquet Silver leídos (staging)
+--     Las mismas filas quedan en docs/diagnostics/gold_metrics.{prom,json}.
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.etl_run_step', N'U') IS NULL
+BEGIN
+    CREATE TABLE dw.etl_run_step (
+        step_id     BIGINT        NOT NULL IDENTITY(1,1),
+        run_id      INT           NOT NULL,     -- dw.etl_run_log.run_id
+        step        VARCHAR(60)   NOT NULL,
+        target      VARCHAR(128)  NOT NULL DEFAULT '',
+        source      NVARCHAR(200) NOT NULL DEFAULT N'',
+        started_at  DATETIME2(3)  NOT NULL,
+        elapsed_s   DECIMAL(12,3) NOT NULL,
+        row_count   BIGINT        NULL,
+        bytes_read  BIGINT        NULL,
+        rows_per_s  DECIMAL(18,1) NULL,
+        status      VARCHAR(10)   NOT NULL DEFAULT 'OK',   -- 'OK','FAILED'
+
+        CONSTRAINT PK_etl_run_step PRIMARY KEY CLUSTERED (step_id),
+        CONSTRAINT FK_etl_run_step_run FOREIGN KEY (run_id) REFERENCES dw.etl_run_log (run_id)
+    );
+
+    CREATE NONCLUSTERED INDEX IX_etl_run_step_run
+        ON dw.etl_run_step (run_id);
+
+    -- Regresiones de un step entre runs: WHERE step = ? AND target = ? ORDER BY started_at DESC
+    CREATE NONCLUSTERED INDEX IX_etl_run_step_step
+        ON dw.etl_run_step (step, target, started_at DESC)
+        INCLUDE (run_id, elapsed_s, row_count, rows_per_s);
+END;
+
 -- ─────────────────────────────────────────────────────────────
 -- 4b. CORRECCIÓN DE GRAIN: fct_trip / fct_trip_leg
 --     El grain real es (cut_sk, id_tarjeta, id_viaje) porque id_viaje
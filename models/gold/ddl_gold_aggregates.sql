@@ -0,0 +1,116 @@
+-- =============================================================================
+-- ddl_gold_aggregates.sql  —  Marts agregados de las facts Gold (Power BI)
+-- Motor: SQL Server 2016+
+-- schema_version: 1   (subir al cambiar este archivo; ver dw.schema_version)
+-- Se ejecuta después de ddl_gold.sql (y de los perfiles opcionales) con
+-- `load_gold` salvo `--no-aggregates`.
+--
+-- Convenciones:
+--   - Un agg_* por página / visual de docs/powerbi: el reporte lee miles de
+--     filas en vez de sumar 14M+ filas de fct_* en cada refresh.
+--   - Grain siempre con cut_sk al inicio del índice clustered: el loader
+--     refresca solo el cut recién cargado (DELETE del cut + INSERT ... SELECT
+--     GROUP BY desde la fact, en una transacción; src/gold/aggregates.py).
+--   - Medidas aditivas (SUM/COUNT): promedios y coberturas se calculan en el
+--     reporte como SUM(numerador) / SUM(denominador), nunca promediando %.
+--   - Sin FKs: se alimentan solo desde facts ya validadas; las relaciones
+--     del modelo Power BI van a dim_date, dim_time_30m y dim_mode.
+--
+--   Idempotente: cada tabla se crea solo si no existe.
+-- =============================================================================
+
+-- ─────────────────────────────────────────────────────────────
+-- 1. agg_demand_day_mode_30m  —  curva de demanda por tipo de día y modo
+--    Fuente: fct_boardings_30m (dataset subidas_30m, cut mensual).
+--    Grain: cut_sk + month_date_sk + tipo_dia + mode_sk + time_30m_sk
+--    subidas_promedio = subidas de un día promedio del tipo_dia (suma de paraderos).
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.agg_demand_day_mode_30m', N'U') IS NULL
+BEGIN
+    CREATE TABLE dw.agg_demand_day_mode_30m (
+        cut_sk              INT          NOT NULL,
+        month_date_sk       INT          NOT NULL,   -- YYYYMM01
+        tipo_dia            VARCHAR(10)  NOT NULL,   -- 'LABORAL','SABADO','DOMINGO'
+        mode_sk             TINYINT      NOT NULL,
+        time_30m_sk         TINYINT      NOT NULL,
+
+        subidas_promedio    FLOAT        NOT NULL,
+        n_stops             INT          NOT NULL,   -- paraderos con subidas en la franja
+        refreshed_at        DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+        CONSTRAINT PK_agg_demand_day_mode_30m PRIMARY KEY CLUSTERED
+            (cut_sk, month_date_sk, tipo_dia, mode_sk, time_30m_sk)
+    );
+
+    -- Filtros del reporte por mes (y base de agg_coverage_bus_metro)
+    CREATE NONCLUSTERED INDEX IX_agg_demand_month
+        ON dw.agg_demand_day_mode_30m (month_date_sk, tipo_dia, mode_sk, time_30m_sk)
+        INCLUDE (subidas_promedio, n_stops);
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 2. agg_coverage_bus_metro  —  KPI Cobertura Recaudacion Comparable
+--    Fuente: fct_validation (dataset etapas, cut diario), solo modos BUS y
+--    METRO (universo comparable), + base de agg_demand_day_mode_30m.
+--    Grain: cut_sk + date_board_sk + time_30m_sk + mode_sk
+--    subidas_estimadas = subidas_promedio del mes / tipo_dia / modo / franja
+--    (último cut de subidas del mes); NULL si ese mes aún no tiene subidas.
+--    Cobertura = SUM(validaciones) / SUM(subidas_estimadas): la suma por día
+--    ya escala la base por los días de cada tipo_dia del período filtrado.
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.agg_coverage_bus_metro', N'U') IS NULL
+BEGIN
+    CREATE TABLE dw.agg_coverage_bus_metro (
+        cut_sk              INT          NOT NULL,
+        date_board_sk       INT          NOT NULL,
+        time_30m_sk         TINYINT      NOT NULL,
+        mode_sk             TINYINT      NOT NULL,
+        tipo_dia            VARCHAR(10)  NULL,       -- de fct_validation, o dim_date si falta
+
+        validaciones        INT          NOT NULL,
+        validaciones_exp    FLOAT        NULL,       -- SUM(fexp_servicio)
+        subidas_estimadas   FLOAT        NULL,
+        refreshed_at        DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+        CONSTRAINT PK_agg_coverage_bus_metro PRIMARY KEY CLUSTERED
+            (cut_sk, date_board_sk, time_30m_sk, mode_sk)
+    );
+
+    CREATE NONCLUSTERED INDEX IX_agg_coverage_date
+        ON dw.agg_coverage_bus_metro (date_board_sk, mode_sk, time_30m_sk)
+        INCLUDE (tipo_dia, validaciones, subidas_estimadas);
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 3. agg_od_comuna  —  matriz origen-destino por comuna
+--    Fuente: fct_trip (dataset viajes, cut diario) + dim_stop (versión SCD2
+--    del paradero de inicio/fin referenciada por el viaje).
+--    Grain: cut_sk + date_start_sk + tipo_dia + comuna_origen + comuna_destino
+--    comuna NULL = paradero sin comuna (o viaje sin paradero resuelto).
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.agg_od_comuna', N'U') IS NULL
+BEGIN
+    CREATE TABLE dw.agg_od_comuna (
+        cut_sk              INT           NOT NULL,
+        date_start_sk       INT           NOT NULL,
+        tipo_dia            VARCHAR(10)   NULL,
+        comuna_origen       NVARCHAR(80)  NULL,
+        comuna_destino      NVARCHAR(80)  NULL,
+
+        viajes              INT           NOT NULL,
+        viajes_exp          FLOAT         NULL,      -- SUM(factor_expansion)
+        etapas_sum          INT           NULL,      -- SUM(n_etapas)
+        tviaje_min_sum      FLOAT         NULL,
+        distancia_ruta_m_sum FLOAT        NULL,
+        n_medidos           INT           NOT NULL,  -- viajes con tviaje_min (denominador del promedio)
+        refreshed_at        DATETIME2(0)  NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+
+    -- Grain con columnas NULLables: índice UNIQUE clustered en vez de PK
+    CREATE UNIQUE CLUSTERED INDEX UX_agg_od_comuna_grain
+        ON dw.agg_od_comuna (cut_sk, date_start_sk, tipo_dia, comuna_origen, comuna_destino);
+
+    CREATE NONCLUSTERED INDEX IX_agg_od_comuna_date
+        ON dw.agg_od_comuna (date_start_sk, comuna_origen, comuna_destino)
+        INCLUDE (tipo_dia, viajes, viajes_exp, tviaje_min_sum, n_medidos);
+END;
@@ -0,0 +1,139 @@
+-- =============================================================================
+-- ddl_gold_columnstore.sql  —  Perfil columnstore de las facts Gold
+-- Motor: SQL Server 2016+ (CCI con índices B-tree adicionales)
+-- schema_version: 1   (subir al cambiar este archivo; ver dw.schema_version)
+-- Se ejecuta después de ddl_gold.sql (y de ddl_gold_partitioning.sql si se
+-- usa) con `load_gold --storage columnstore`.
+--
+-- Convenciones:
+--   - Cada fact pasa a CLUSTERED COLUMNSTORE (CCI_<fact>): los agregados tipo
+--     Power BI (SUM/COUNT por fecha, franja, paradero, modo) leen solo las
+--     columnas usadas, comprimidas, con eliminación de rowgroups por cut_sk.
+--   - PK pasa a NONCLUSTERED; el UNIQUE de grain se mantiene (idempotencia
+--     del MERGE). Los IX_* no únicos se eliminan: el CCI cubre esos scans.
+--   - FKs quedan declaradas (modelo / relaciones) pero con NOCHECK: la carga
+--     no las valida fila a fila; los SKs vienen de las dims del mismo run.
+--   - Facts particionadas por cut_sk: CCI y PK se crean alineados en
+--     ps_cut_sk y la PK incluye cut_sk.
+--
+--   Idempotente: cada fact se convierte solo si aún no tiene índice
+--   columnstore clustered (sys.indexes.type = 5).
+-- =============================================================================
+
+-- ─────────────────────────────────────────────────────────────
+-- 1. fct_trip  (FK_fct_trip_leg_trip referencia su PK → drop + re-add)
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_trip', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'dw.fct_trip') AND type = 5
+)
+BEGIN
+    DECLARE @trip_on NVARCHAR(100) = N'';
+    DECLARE @trip_pk NVARCHAR(100) = N'trip_sk';
+    DECLARE @leg_fk  BIT = 0;
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes i
+        JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+        WHERE i.object_id = OBJECT_ID(N'dw.fct_trip') AND i.index_id = 1
+    )
+        SELECT @trip_on = N' ON ps_cut_sk (cut_sk)', @trip_pk = N'trip_sk, cut_sk';
+    IF EXISTS (SELECT 1 FROM sys.foreign_keys WHERE name = N'FK_fct_trip_leg_trip')
+    BEGIN
+        ALTER TABLE dw.fct_trip_leg DROP CONSTRAINT FK_fct_trip_leg_trip;
+        SET @leg_fk = 1;
+    END;
+
+    DROP INDEX IF EXISTS IX_fct_trip_date_start  ON dw.fct_trip;
+    DROP INDEX IF EXISTS IX_fct_trip_origin_stop ON dw.fct_trip;
+    DROP INDEX IF EXISTS IX_fct_trip_cut         ON dw.fct_trip;
+    ALTER TABLE dw.fct_trip DROP CONSTRAINT PK_fct_trip;
+    EXEC (N'CREATE CLUSTERED COLUMNSTORE INDEX CCI_fct_trip ON dw.fct_trip' + @trip_on);
+    EXEC (N'ALTER TABLE dw.fct_trip ADD CONSTRAINT PK_fct_trip PRIMARY KEY NONCLUSTERED ('
+          + @trip_pk + N')' + @trip_on);
+    ALTER TABLE dw.fct_trip NOCHECK CONSTRAINT ALL;
+
+    IF @leg_fk = 1
+    BEGIN
+        ALTER TABLE dw.fct_trip_leg WITH NOCHECK ADD CONSTRAINT FK_fct_trip_leg_trip
+            FOREIGN KEY (trip_sk) REFERENCES dw.fct_trip (trip_sk);
+        ALTER TABLE dw.fct_trip_leg NOCHECK CONSTRAINT FK_fct_trip_leg_trip;
+    END;
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 2. fct_trip_leg
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_trip_leg', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'dw.fct_trip_leg') AND type = 5
+)
+BEGIN
+    DECLARE @leg_on NVARCHAR(100) = N'';
+    DECLARE @leg_pk NVARCHAR(100) = N'trip_leg_sk';
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes i
+        JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+        WHERE i.object_id = OBJECT_ID(N'dw.fct_trip_leg') AND i.index_id = 1
+    )
+        SELECT @leg_on = N' ON ps_cut_sk (cut_sk)', @leg_pk = N'trip_leg_sk, cut_sk';
+
+    DROP INDEX IF EXISTS IX_fct_trip_leg_viaje      ON dw.fct_trip_leg;
+    DROP INDEX IF EXISTS IX_fct_trip_leg_board_date ON dw.fct_trip_leg;
+    ALTER TABLE dw.fct_trip_leg DROP CONSTRAINT PK_fct_trip_leg;
+    EXEC (N'CREATE CLUSTERED COLUMNSTORE INDEX CCI_fct_trip_leg ON dw.fct_trip_leg' + @leg_on);
+    EXEC (N'ALTER TABLE dw.fct_trip_leg ADD CONSTRAINT PK_fct_trip_leg PRIMARY KEY NONCLUSTERED ('
+          + @leg_pk + N')' + @leg_on);
+    ALTER TABLE dw.fct_trip_leg NOCHECK CONSTRAINT ALL;
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 3. fct_validation
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_validation', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'dw.fct_validation') AND type = 5
+)
+BEGIN
+    DECLARE @val_on NVARCHAR(100) = N'';
+    DECLARE @val_pk NVARCHAR(100) = N'validation_sk';
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes i
+        JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+        WHERE i.object_id = OBJECT_ID(N'dw.fct_validation') AND i.index_id = 1
+    )
+        SELECT @val_on = N' ON ps_cut_sk (cut_sk)', @val_pk = N'validation_sk, cut_sk';
+
+    DROP INDEX IF EXISTS IX_fct_val_board_stop ON dw.fct_validation;
+    DROP INDEX IF EXISTS IX_fct_val_service    ON dw.fct_validation;
+    DROP INDEX IF EXISTS IX_fct_val_cut        ON dw.fct_validation;
+    ALTER TABLE dw.fct_validation DROP CONSTRAINT PK_fct_validation;
+    EXEC (N'CREATE CLUSTERED COLUMNSTORE INDEX CCI_fct_validation ON dw.fct_validation' + @val_on);
+    EXEC (N'ALTER TABLE dw.fct_validation ADD CONSTRAINT PK_fct_validation PRIMARY KEY NONCLUSTERED ('
+          + @val_pk + N')' + @val_on);
+    ALTER TABLE dw.fct_validation NOCHECK CONSTRAINT ALL;
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 4. fct_boardings_30m
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_boardings_30m', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(N'dw.fct_boardings_30m') AND type = 5
+)
+BEGIN
+    DECLARE @b_on NVARCHAR(100) = N'';
+    DECLARE @b_pk NVARCHAR(100) = N'boardings_30m_sk';
+    IF EXISTS (
+        SELECT 1 FROM sys.indexes i
+        JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+        WHERE i.object_id = OBJECT_ID(N'dw.fct_boardings_30m') AND i.index_id = 1
+    )
+        SELECT @b_on = N' ON ps_cut_sk (cut_sk)', @b_pk = N'boardings_30m_sk, cut_sk';
+
+    DROP INDEX IF EXISTS IX_fct_boardings_stop_time ON dw.fct_boardings_30m;
+    ALTER TABLE dw.fct_boardings_30m DROP CONSTRAINT PK_fct_boardings;
+    EXEC (N'CREATE CLUSTERED COLUMNSTORE INDEX CCI_fct_boardings ON dw.fct_boardings_30m' + @b_on);
+    EXEC (N'ALTER TABLE dw.fct_boardings_30m ADD CONSTRAINT PK_fct_boardings PRIMARY KEY NONCLUSTERED ('
+          + @b_pk + N')' + @b_on);
+    ALTER TABLE dw.fct_boardings_30m NOCHECK CONSTRAINT ALL;
+END;
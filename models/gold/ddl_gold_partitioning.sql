@@ -0,0 +1,161 @@
+-- =============================================================================
+-- ddl_gold_partitioning.sql  —  Particionado de facts Gold por cut_sk
+-- Motor: SQL Server 2016 SP1+ (particionado disponible en todas las ediciones)
+-- schema_version: 1   (subir al cambiar este archivo; ver dw.schema_version)
+-- Se ejecuta después de ddl_gold.sql con `load_gold --partition-facts`.
+--
+-- Convenciones:
+--   - pf_cut_sk RANGE RIGHT con fronteras (cut_sk, cut_sk + 1) por cut:
+--     cada cut ocupa exactamente una partición → SWITCH / TRUNCATE por cut.
+--   - ps_cut_sk: todas las particiones en [PRIMARY] (mismo filegroup que las
+--     tablas *_switch_<cut_sk> que crea el loader).
+--   - PK de cada fact pasa a (x_sk, cut_sk): un índice único alineado debe
+--     contener la columna de partición. Todos los índices quedan alineados.
+--   - FK_fct_trip_leg_trip se elimina: SWITCH y TRUNCATE no admiten tablas
+--     referenciadas por FK, y trip_sk ya no es clave única por sí sola.
+--     La relación leg → trip se conserva por el grain (cut_sk, id_tarjeta,
+--     id_viaje).
+--   - Los cuts nuevos agregan sus fronteras desde el loader (SPLIT sobre la
+--     última partición, vacía → solo metadata).
+--
+--   Idempotente: cada fact se convierte solo si su índice clustered aún no
+--   está sobre ps_cut_sk.
+-- =============================================================================
+
+-- ─────────────────────────────────────────────────────────────
+-- 1. FUNCIÓN Y ESQUEMA DE PARTICIÓN
+--    Fronteras iniciales desde dw.dim_cut (cut_sk y cut_sk + 1).
+-- ─────────────────────────────────────────────────────────────
+IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = N'pf_cut_sk')
+BEGIN
+    DECLARE @bounds NVARCHAR(MAX);
+    SELECT @bounds = STRING_AGG(CAST(b.v AS NVARCHAR(MAX)), N',') WITHIN GROUP (ORDER BY b.v)
+    FROM (
+        SELECT cut_sk AS v FROM dw.dim_cut
+        UNION
+        SELECT cut_sk + 1 FROM dw.dim_cut
+    ) b;
+    EXEC (N'CREATE PARTITION FUNCTION pf_cut_sk (INT) AS RANGE RIGHT FOR VALUES ('
+          + ISNULL(@bounds, N'') + N')');
+END;
+
+IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = N'ps_cut_sk')
+    CREATE PARTITION SCHEME ps_cut_sk AS PARTITION pf_cut_sk ALL TO ([PRIMARY]);
+
+-- ─────────────────────────────────────────────────────────────
+-- 2. fct_trip_leg → fct_trip: FK incompatible con SWITCH/TRUNCATE
+-- ─────────────────────────────────────────────────────────────
+IF EXISTS (
+    SELECT 1 FROM sys.foreign_keys
+    WHERE parent_object_id = OBJECT_ID(N'dw.fct_trip_leg')
+      AND name = N'FK_fct_trip_leg_trip'
+)
+    ALTER TABLE dw.fct_trip_leg DROP CONSTRAINT FK_fct_trip_leg_trip;
+
+-- ─────────────────────────────────────────────────────────────
+-- 3. fct_trip
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_trip', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes i
+    JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+    WHERE i.object_id = OBJECT_ID(N'dw.fct_trip') AND i.index_id = 1
+)
+BEGIN
+    ALTER TABLE dw.fct_trip DROP CONSTRAINT PK_fct_trip;
+    ALTER TABLE dw.fct_trip ADD CONSTRAINT PK_fct_trip
+        PRIMARY KEY CLUSTERED (trip_sk, cut_sk) ON ps_cut_sk (cut_sk);
+
+    CREATE NONCLUSTERED INDEX IX_fct_trip_date_start
+        ON dw.fct_trip (date_start_sk, cut_sk) INCLUDE (origin_stop_sk, dest_stop_sk, n_etapas)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE NONCLUSTERED INDEX IX_fct_trip_origin_stop
+        ON dw.fct_trip (origin_stop_sk, date_start_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE NONCLUSTERED INDEX IX_fct_trip_cut
+        ON dw.fct_trip (cut_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE UNIQUE NONCLUSTERED INDEX UX_fct_trip_grain
+        ON dw.fct_trip (cut_sk, id_tarjeta, id_viaje)
+        WHERE id_tarjeta IS NOT NULL
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 4. fct_trip_leg
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_trip_leg', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes i
+    JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+    WHERE i.object_id = OBJECT_ID(N'dw.fct_trip_leg') AND i.index_id = 1
+)
+BEGIN
+    ALTER TABLE dw.fct_trip_leg DROP CONSTRAINT PK_fct_trip_leg;
+    ALTER TABLE dw.fct_trip_leg ADD CONSTRAINT PK_fct_trip_leg
+        PRIMARY KEY CLUSTERED (trip_leg_sk, cut_sk) ON ps_cut_sk (cut_sk);
+
+    CREATE NONCLUSTERED INDEX IX_fct_trip_leg_viaje
+        ON dw.fct_trip_leg (id_viaje, leg_seq, cut_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE NONCLUSTERED INDEX IX_fct_trip_leg_board_date
+        ON dw.fct_trip_leg (date_board_sk, board_stop_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE UNIQUE NONCLUSTERED INDEX UX_fct_trip_leg_grain
+        ON dw.fct_trip_leg (cut_sk, id_tarjeta, id_viaje, leg_seq)
+        WHERE id_tarjeta IS NOT NULL
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 5. fct_validation
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_validation', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes i
+    JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+    WHERE i.object_id = OBJECT_ID(N'dw.fct_validation') AND i.index_id = 1
+)
+BEGIN
+    ALTER TABLE dw.fct_validation DROP CONSTRAINT PK_fct_validation;
+    ALTER TABLE dw.fct_validation ADD CONSTRAINT PK_fct_validation
+        PRIMARY KEY CLUSTERED (validation_sk, cut_sk) ON ps_cut_sk (cut_sk);
+
+    ALTER TABLE dw.fct_validation DROP CONSTRAINT UQ_fct_validation_grain;
+    ALTER TABLE dw.fct_validation ADD CONSTRAINT UQ_fct_validation_grain
+        UNIQUE NONCLUSTERED (id_etapa, cut_sk, tiempo_boarding) ON ps_cut_sk (cut_sk);
+
+    CREATE NONCLUSTERED INDEX IX_fct_val_board_stop
+        ON dw.fct_validation (board_stop_sk, date_board_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE NONCLUSTERED INDEX IX_fct_val_service
+        ON dw.fct_validation (service_board_sk, date_board_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+    CREATE NONCLUSTERED INDEX IX_fct_val_cut
+        ON dw.fct_validation (cut_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+END;
+
+-- ─────────────────────────────────────────────────────────────
+-- 6. fct_boardings_30m
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'dw.fct_boardings_30m', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.indexes i
+    JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+    WHERE i.object_id = OBJECT_ID(N'dw.fct_boardings_30m') AND i.index_id = 1
+)
+BEGIN
+    ALTER TABLE dw.fct_boardings_30m DROP CONSTRAINT PK_fct_boardings;
+    ALTER TABLE dw.fct_boardings_30m ADD CONSTRAINT PK_fct_boardings
+        PRIMARY KEY CLUSTERED (boardings_30m_sk, cut_sk) ON ps_cut_sk (cut_sk);
+
+    ALTER TABLE dw.fct_boardings_30m DROP CONSTRAINT UQ_fct_boardings_grain;
+    ALTER TABLE dw.fct_boardings_30m ADD CONSTRAINT UQ_fct_boardings_grain
+        UNIQUE NONCLUSTERED (month_date_sk, time_30m_sk, stop_sk, mode_sk, tipo_dia, cut_sk)
+        ON ps_cut_sk (cut_sk);
+
+    CREATE NONCLUSTERED INDEX IX_fct_boardings_stop_time
+        ON dw.fct_boardings_30m (stop_sk, time_30m_sk, month_date_sk)
+        WITH (DROP_EXISTING = ON) ON ps_cut_sk (cut_sk);
+END;
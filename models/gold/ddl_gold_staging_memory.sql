@@ -0,0 +1,208 @@
+-- =============================================================================
+-- ddl_gold_staging_memory.sql  —  Perfil in-memory del staging Gold
+-- Motor: SQL Server 2016 SP1+ (In-Memory OLTP en todas las ediciones)
+-- schema_version: 1   (subir al cambiar este archivo; ver dw.schema_version)
+-- Se ejecuta después de ddl_gold.sql con `load_gold --staging memory`, en
+-- autocommit (ALTER DATABASE y el DDL in-memory no admiten transacción).
+--
+-- Convenciones:
+--   - Las 4 tablas stg_* pasan a MEMORY_OPTIMIZED = ON, DURABILITY =
+--     SCHEMA_ONLY: sin log ni checkpoint de datos; tras un reinicio del
+--     servidor quedan vacías (el loader las recarga desde Silver).
+--   - Índice por el grain del MERGE de cada fact: NONCLUSTERED (range) para
+--     viajes/etapas (millones de filas por cut, cardinalidad variable) y
+--     HASH para subidas_30m (grain acotado: paraderos × franjas × modo × día).
+--   - MEMORY_OPTIMIZED_ELEVATE_TO_SNAPSHOT = ON: pyodbc abre transacciones
+--     implícitas y READ COMMITTED sobre tablas in-memory solo se admite en
+--     autocommit.
+--   - stg_cdc_keys y las tablas aparcadas (__c<cut_sk>) siguen en disco.
+--   - Volver a disco: load_gold --staging disk --force-ddl (ddl_gold.sql
+--     recrea las stg_*). Con --staging memory el loader re-aplica este
+--     archivo si encuentra alguna stg_* en disco.
+--
+--   Idempotente: cada tabla se recrea solo si aún no es memory-optimized
+--   (sys.tables.is_memory_optimized = 0); sus filas se descartan.
+-- =============================================================================
+
+-- ─────────────────────────────────────────────────────────────
+-- 0. BASE DE DATOS: filegroup MEMORY_OPTIMIZED_DATA + snapshot
+--    El contenedor va en la ruta de datos por defecto de la instancia.
+-- ─────────────────────────────────────────────────────────────
+IF NOT EXISTS (SELECT 1 FROM sys.filegroups WHERE type = 'FX')
+BEGIN
+    DECLARE @mod_fg  SYSNAME        = DB_NAME() + N'_mod';
+    DECLARE @mod_dir NVARCHAR(400)  = CAST(SERVERPROPERTY('InstanceDefaultDataPath') AS NVARCHAR(400));
+    EXEC (N'ALTER DATABASE ' + QUOTENAME(DB_NAME()) + N' ADD FILEGROUP ' + QUOTENAME(@mod_fg)
+          + N' CONTAINS MEMORY_OPTIMIZED_DATA');
+    EXEC (N'ALTER DATABASE ' + QUOTENAME(DB_NAME()) + N' ADD FILE (NAME = N''' + @mod_fg
+          + N''', FILENAME = N''' + @mod_dir + @mod_fg + N''') TO FILEGROUP ' + QUOTENAME(@mod_fg));
+END;
+
+IF EXISTS (
+    SELECT 1 FROM sys.databases
+    WHERE database_id = DB_ID() AND is_memory_optimized_elevate_to_snapshot_on = 0
+)
+    ALTER DATABASE CURRENT SET MEMORY_OPTIMIZED_ELEVATE_TO_SNAPSHOT = ON;
+
+-- ─────────────────────────────────────────────────────────────
+-- 1. stg_viajes_trip  (grain fct_trip: id_tarjeta, id_viaje)
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'staging.stg_viajes_trip', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.tables
+    WHERE object_id = OBJECT_ID(N'staging.stg_viajes_trip') AND is_memory_optimized = 1
+)
+    DROP TABLE staging.stg_viajes_trip;
+
+IF OBJECT_ID(N'staging.stg_viajes_trip', N'U') IS NULL
+CREATE TABLE staging.stg_viajes_trip (
+    cut                     DATE         NULL,
+    year                    SMALLINT     NULL,
+    month                   TINYINT      NULL,
+    id_viaje                NVARCHAR(80) NULL,
+    id_tarjeta              NVARCHAR(40) NULL,
+    tipo_dia                VARCHAR(10)  NULL,
+    proposito               NVARCHAR(60) NULL,
+    contrato                NVARCHAR(40) NULL,
+    factor_expansion        FLOAT        NULL,
+    n_etapas                TINYINT      NULL,
+    distancia_eucl          FLOAT        NULL,   -- metros
+    distancia_ruta          FLOAT        NULL,   -- metros
+    tiempo_inicio_viaje     DATETIME2(0) NULL,
+    tiempo_fin_viaje        DATETIME2(0) NULL,
+    date_start_sk           INT          NULL,   -- YYYYMMDD
+    time_start_30m_sk       TINYINT      NULL,   -- 0..47
+    date_end_sk             INT          NULL,
+    time_end_30m_sk         TINYINT      NULL,
+    paradero_inicio_viaje   NVARCHAR(40) NULL,   -- stop BK
+    paradero_fin_viaje      NVARCHAR(40) NULL,   -- stop BK
+    comuna_inicio_viaje     NVARCHAR(80) NULL,
+    comuna_fin_viaje        NVARCHAR(80) NULL,
+    zona_inicio_viaje       INT          NULL,
+    zona_fin_viaje          INT          NULL,
+    periodo_inicio_viaje    VARCHAR(40)  NULL,   -- fare period BK
+    periodo_fin_viaje       VARCHAR(40)  NULL,
+    tviaje_min              FLOAT        NULL,
+    stg_loaded_at           DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+    INDEX IX_stg_viajes_trip_grain NONCLUSTERED (id_tarjeta, id_viaje)
+) WITH (MEMORY_OPTIMIZED = ON, DURABILITY = SCHEMA_ONLY);
+
+-- ─────────────────────────────────────────────────────────────
+-- 2. stg_viajes_leg  (grain fct_trip_leg: id_tarjeta, id_viaje, leg_seq)
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'staging.stg_viajes_leg', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.tables
+    WHERE object_id = OBJECT_ID(N'staging.stg_viajes_leg') AND is_memory_optimized = 1
+)
+    DROP TABLE staging.stg_viajes_leg;
+
+IF OBJECT_ID(N'staging.stg_viajes_leg', N'U') IS NULL
+CREATE TABLE staging.stg_viajes_leg (
+    cut                     DATE         NULL,
+    year                    SMALLINT     NULL,
+    month                   TINYINT      NULL,
+    id_viaje                NVARCHAR(80) NULL,
+    id_tarjeta              NVARCHAR(40) NULL,
+    leg_seq                 TINYINT      NULL,   -- 1..4
+    mode_code               VARCHAR(15)  NULL,
+    service_code            NVARCHAR(40) NULL,
+    operator_code           NVARCHAR(40) NULL,
+    board_stop_code         NVARCHAR(40) NULL,
+    alight_stop_code        NVARCHAR(40) NULL,
+    ts_board                DATETIME2(0) NULL,
+    ts_alight               DATETIME2(0) NULL,
+    date_board_sk           INT          NULL,
+    time_board_30m_sk       TINYINT      NULL,
+    date_alight_sk          INT          NULL,
+    time_alight_30m_sk      TINYINT      NULL,
+    fare_period_alight_code VARCHAR(40)  NULL,
+    zone_board              INT          NULL,
+    zone_alight             INT          NULL,
+    tv_leg_min              FLOAT        NULL,
+    tc_transfer_min         FLOAT        NULL,
+    te_wait_min             FLOAT        NULL,
+    stg_loaded_at           DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+    INDEX IX_stg_viajes_leg_grain NONCLUSTERED (id_tarjeta, id_viaje, leg_seq)
+) WITH (MEMORY_OPTIMIZED = ON, DURABILITY = SCHEMA_ONLY);
+
+-- ─────────────────────────────────────────────────────────────
+-- 3. stg_etapas_validation  (grain fct_validation: id_etapa, tiempo_subida)
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'staging.stg_etapas_validation', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.tables
+    WHERE object_id = OBJECT_ID(N'staging.stg_etapas_validation') AND is_memory_optimized = 1
+)
+    DROP TABLE staging.stg_etapas_validation;
+
+IF OBJECT_ID(N'staging.stg_etapas_validation', N'U') IS NULL
+CREATE TABLE staging.stg_etapas_validation (
+    cut                         VARCHAR(40)  NULL,
+    year                        SMALLINT     NULL,
+    month                       TINYINT      NULL,
+    id_etapa                    NVARCHAR(80) NULL,
+    operador                    NVARCHAR(40) NULL,      -- operator BK
+    contrato                    NVARCHAR(40) NULL,      -- contract BK
+    tipo_dia                    VARCHAR(10)  NULL,
+    tipo_transporte             VARCHAR(15)  NULL,      -- mode BK
+    fExpansionServicioPeriodoTS FLOAT        NULL,
+    tiene_bajada                BIT          NULL,
+    tiempo_subida               DATETIME2(0) NULL,
+    tiempo_bajada               DATETIME2(0) NULL,
+    tiempo_etapa                INT          NULL,      -- segundos
+    date_board_sk               INT          NULL,
+    time_board_30m_sk           TINYINT      NULL,
+    date_alight_sk              INT          NULL,
+    time_alight_30m_sk          TINYINT      NULL,
+    x_subida                    INT          NULL,
+    y_subida                    INT          NULL,
+    x_bajada                    INT          NULL,
+    y_bajada                    INT          NULL,
+    dist_ruta_paraderos         INT          NULL,
+    dist_eucl_paraderos         INT          NULL,
+    servicio_subida             NVARCHAR(40) NULL,      -- service BK (board)
+    servicio_bajada             NVARCHAR(40) NULL,      -- service BK (alight)
+    parada_subida               NVARCHAR(40) NULL,      -- stop BK (board)
+    parada_bajada               NVARCHAR(40) NULL,      -- stop BK (alight)
+    comuna_subida               NVARCHAR(80) NULL,
+    comuna_bajada               NVARCHAR(80) NULL,
+    zona_subida                 INT          NULL,
+    zona_bajada                 INT          NULL,
+    tEsperaMediaIntervalo       FLOAT        NULL,
+    periodoSubida               VARCHAR(40)  NULL,      -- fare period BK
+    periodoBajada               VARCHAR(40)  NULL,
+    stg_loaded_at               DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+    INDEX IX_stg_etapas_validation_grain NONCLUSTERED (id_etapa, tiempo_subida)
+) WITH (MEMORY_OPTIMIZED = ON, DURABILITY = SCHEMA_ONLY);
+
+-- ─────────────────────────────────────────────────────────────
+-- 4. stg_subidas_30m  (grain fct_boardings_30m: stop, franja, modo, tipo_dia)
+--    ~2M combinaciones posibles por cut → BUCKET_COUNT 2^21.
+-- ─────────────────────────────────────────────────────────────
+IF OBJECT_ID(N'staging.stg_subidas_30m', N'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM sys.tables
+    WHERE object_id = OBJECT_ID(N'staging.stg_subidas_30m') AND is_memory_optimized = 1
+)
+    DROP TABLE staging.stg_subidas_30m;
+
+IF OBJECT_ID(N'staging.stg_subidas_30m', N'U') IS NULL
+CREATE TABLE staging.stg_subidas_30m (
+    cut               VARCHAR(40)  NULL,
+    year              SMALLINT     NULL,
+    month             TINYINT      NULL,
+    tipo_dia          VARCHAR(10)  NULL,
+    mode_code         VARCHAR(15)  NULL,
+    stop_code         NVARCHAR(40) NULL,
+    comuna            NVARCHAR(80) NULL,
+    time_30m_sk       TINYINT      NULL,
+    subidas_promedio  FLOAT        NULL,
+    stg_loaded_at     DATETIME2(0) NOT NULL DEFAULT SYSUTCDATETIME(),
+
+    INDEX IX_stg_subidas_30m_grain HASH (stop_code, time_30m_sk, mode_code, tipo_dia)
+        WITH (BUCKET_COUNT = 2097152)
+) WITH (MEMORY_OPTIMIZED = ON, DURABILITY = SCHEMA_ONLY);
@@ -1,3 +1,10 @@
+"""
+Puntos geo agregados de etapas_validation para el mapa web.
+
+Uso (desde la raíz del repo):
+    python -m scripts.build_map_points --limit 3000
+"""
+
 from __future__ import annotations
 
 import argparse
@@ -8,23 +15,28 @@ from pathlib import Path
 import duckdb
 from pyproj import Transformer
 
+from src.silver.manifest import current_output_dir, load_snapshot
+
 ROOT = Path(__file__).resolve().parents[1]
-ETAPAS_GLOB = (
-    ROOT
-    / "lake"
-    / "processed"
-    / "dtpm"
-    / "dataset=etapas"
-    / "year=*"
-    / "month=*"
-    / "cut=*"
-    / "etapas_validation.parquet"
-)
+ETAPAS_ROOT = ROOT / "lake" / "processed" / "dtpm" / "dataset=etapas"
 OUT_PATH = ROOT / "web" / "static" / "data" / "map_points.json"
 
 
+def _etapas_source() -> str:
+    """Archivos del último snapshot del manifest; sin manifest, la versión vigente de cada cut."""
+    snap = load_snapshot()
+    if snap is not None:
+        return snap.read_sql("etapas", "etapas_validation")
+    files = [
+        p.as_posix()
+        for cut_dir in sorted(ETAPAS_ROOT.glob("year=*/month=*/cut=*"))
+        if (out_dir := current_output_dir(cut_dir)) is not None
+        for p in sorted(out_dir.glob("**/etapas_validation.parquet"))
+    ]
+    return "read_parquet([" + ", ".join(f"'{f}'" for f in files) + "], hive_partitioning = false)"
+
+
 def build_points(limit: int = 3000) -> dict:
-    etapas_glob = str(ETAPAS_GLOB).replace("\\", "/")
     sql = f"""
     SELECT
       strftime(strptime(CAST(date_board_sk AS VARCHAR), '%Y%m%d'), '%Y-%m-%d') AS service_date,
@@ -37,7 +49,7 @@ def build_points(limit: int = 3000) -> dict:
       AVG(CAST(y_subida AS DOUBLE)) AS y_utm,
       ROUND(SUM(fExpansionServicioPeriodoTS), 2) AS etapas_estimadas,
       COUNT(*) AS etapas_observadas
-    FROM read_parquet('{etapas_glob}')
+    FROM {_etapas_source()}
     WHERE parada_subida IS NOT NULL
       AND TRIM(parada_subida) <> ''
       AND x_subida BETWEEN 200000 AND 500000
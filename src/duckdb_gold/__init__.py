@@ -0,0 +1 @@
+# src/duckdb_gold/__init__.py
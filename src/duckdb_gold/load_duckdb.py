@@ -0,0 +1,894 @@
+"""
+load_duckdb.py — Cargador set-based: Silver Parquet → Gold DuckDB (DTPM).
+Versión: 1.0.0
+
+Construye el mismo star schema que src/sqlite/load_sqlite.py en un archivo
+.duckdb, sin bucles por fila: cada dimensión y cada fact es un
+INSERT ... SELECT sobre read_parquet().
+  - SCD2 (dim_stop, dim_service): LAG/LEAD sobre la timeline de candidatos.
+  - AS-OF de stop/service: ASOF LEFT JOIN por (code, event_date >= valid_from).
+  - Grain de facts: QUALIFY ROW_NUMBER() = 1 en orden de archivo + anti-join
+    contra lo ya cargado (misma semántica que INSERT OR IGNORE en SQLite).
+
+CLI:
+  python -m src.duckdb_gold.load_duckdb --db gold.duckdb --dataset all --overwrite
+  python -m src.duckdb_gold.load_duckdb --db gold.duckdb --dataset viajes --cut 2025-04-21
+  python -m src.duckdb_gold.load_duckdb --db gold.duckdb --dataset etapas --day 20250423
+  python -m src.duckdb_gold.load_duckdb --db gold.duckdb --threads 4 --memory-limit 6GB
+  python -m src.duckdb_gold.load_duckdb --db gold.duckdb --dry-run
+
+Paridad contra SQLite: python -m src.duckdb_gold.parity (ver parity.py).
+
+Requisitos: duckdb.  Sin SQL Server ni pandas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from src.sqlite.load_sqlite import (
+    _DAY_NAMES,
+    _MODE_STATIC,
+    _MONTH_NAMES,
+    _group_by_cut,
+    _load_quality_json,
+    _materialize_compacted,
+    _scan_silver_partitions,
+)
+
+# ── Constantes de proyecto ────────────────────────────────────────────────────
+LOADER_VERSION = "1.0.0"
+_PROJECT_ROOT  = Path(__file__).resolve().parents[2]
+DOCS_DIR       = _PROJECT_ROOT / "docs" / "diagnostics"
+DDL_PATH       = _PROJECT_ROOT / "models" / "duckdb" / "ddl_duckdb.sql"
+
+log = logging.getLogger(__name__)
+
+# Grain de cada fact (equivale a los UNIQUE de ddl_sqlite.sql)
+FACT_GRAIN: dict[str, tuple[str, ...]] = {
+    "fct_trip":          ("cut", "id_viaje"),
+    "fct_trip_leg":      ("cut", "id_viaje", "leg_seq"),
+    "fct_validation":    ("cut", "id_etapa"),
+    "fct_boardings_30m": ("cut", "month_date_sk", "stop_code", "mode_code", "tipo_dia", "time_30m_sk"),
+}
+
+# Parquet Silver de cada fact, en el orden de carga de load_sqlite
+FACT_SOURCE: dict[str, str] = {
+    "fct_trip":          "viajes_trip",
+    "fct_trip_leg":      "viajes_leg",
+    "fct_validation":    "etapas_validation",
+    "fct_boardings_30m": "subidas_30m",
+}
+
+_DATE_SK_COLS: dict[str, list[str]] = {
+    "viajes_trip":       ["date_start_sk", "date_end_sk"],
+    "viajes_leg":        ["date_board_sk", "date_alight_sk"],
+    "etapas_validation": ["date_board_sk", "date_alight_sk"],
+}
+
+
+# =============================================================================
+# I.  CONEXIÓN Y DDL
+# =============================================================================
+
+def _sql_path(path: Any) -> str:
+    """Literal SQL de una ruta (posix, comillas escapadas)."""
+    return "'" + str(path).replace("\\", "/").replace("'", "''") + "'"
+
+
+def _open_db(
+    db_path: Path,
+    *,
+    overwrite: bool = False,
+    threads: Optional[int] = None,
+    memory_limit: Optional[str] = None,
+) -> Any:
+    """Abre (o crea) el archivo .duckdb y aplica el DDL."""
+    import duckdb
+
+    if overwrite:
+        for f in (db_path, db_path.with_name(db_path.name + ".wal")):
+            if f.exists():
+                log.warning("--overwrite: eliminando %s", f)
+                f.unlink()
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(db_path))
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    if memory_limit:
+        con.execute(f"SET memory_limit = '{memory_limit}'")
+
+    if not DDL_PATH.exists():
+        raise FileNotFoundError(f"DDL no encontrado: {DDL_PATH}")
+    con.execute(DDL_PATH.read_text(encoding="utf-8"))
+    log.info("DDL aplicado: %s", DDL_PATH.name)
+    return con
+
+
+def _register_parts(con: Any, parts: list[dict]) -> set[str]:
+    """
+    Registra las particiones a cargar:
+      _parts            una fila por archivo; part_id = orden de lectura de
+                        load_sqlite (decide qué atributo gana en empates SCD2)
+      _src_<tipo>       vista con todos los archivos de un parquet_type más
+                        _part_id/_year/_month de la partición
+    Devuelve los parquet_type presentes.
+    """
+    extracted: dict[tuple, Optional[str]] = {}
+    rows = []
+    for i, p in enumerate(parts):
+        key = (p["dataset"], p["cut"])
+        if key not in extracted:
+            q = _load_quality_json(*key)
+            extracted[key] = q.get("generated_at") if q else None
+        rows.append((
+            i, p["dataset"], p["cut"], p["year"], p["month"], p["parquet_type"],
+            str(p["path"]).replace("\\", "/"), p.get("day"), extracted[key],
+        ))
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE _parts (
+            part_id INTEGER, dataset VARCHAR, cut VARCHAR, year INTEGER, month INTEGER,
+            parquet_type VARCHAR, path VARCHAR, day INTEGER, extracted_at VARCHAR
+        )""")
+    con.executemany("INSERT INTO _parts VALUES (?,?,?,?,?,?,?,?,?)", rows)
+
+    types = sorted({p["parquet_type"] for p in parts})
+    for ptype in types:
+        files = ", ".join(_sql_path(r[6]) for r in rows if r[5] == ptype)
+        con.execute(f"""
+            CREATE OR REPLACE TEMP VIEW _src_{ptype} AS
+            SELECT p.part_id AS _part_id, p.year AS _year, p.month AS _month,
+                   t.* EXCLUDE (filename)
+            FROM read_parquet([{files}], filename = true, union_by_name = true,
+                              hive_partitioning = false) t
+            JOIN _parts p ON p.path = t.filename""")
+    return set(types)
+
+
+# =============================================================================
+# II.  DIMENSIONES
+# =============================================================================
+
+def _load_dim_cut(con: Any) -> int:
+    """Una fila por (dataset, cut) nuevo; year/month de su primera partición."""
+    con.execute(
+        """INSERT INTO dim_cut(dataset, cut, year, month, extracted_at, loaded_at)
+           SELECT n.dataset, n.cut, n.year, n.month, n.extracted_at, ?
+           FROM (
+               SELECT dataset, cut,
+                      arg_min(year, part_id) AS year, arg_min(month, part_id) AS month,
+                      any_value(extracted_at) AS extracted_at, min(part_id) AS ord
+               FROM _parts GROUP BY dataset, cut
+           ) n
+           ANTI JOIN dim_cut d ON d.dataset = n.dataset AND d.cut = n.cut
+           ORDER BY n.ord""",
+        [datetime.datetime.utcnow()],
+    )
+    n = con.execute("SELECT COUNT(*) FROM dim_cut").fetchone()[0]
+    log.info("dim_cut: %d filas", n)
+    return n
+
+
+def _load_dim_time_30m(con: Any) -> None:
+    """Las 48 franjas horarias 0..47."""
+    con.execute("""
+        INSERT INTO dim_time_30m
+        SELECT n.* FROM (
+            SELECT sk AS time_30m_sk, h AS hour, m AS minute,
+                   printf('%02d:%02d-%02d:%02d', h, m, h + CAST(m + 30 >= 60 AS INTEGER), (m + 30) % 60)
+                       AS period_label
+            FROM (SELECT range AS sk, range * 30 // 60 AS h, range * 30 % 60 AS m FROM range(48))
+        ) n
+        ANTI JOIN dim_time_30m d ON d.time_30m_sk = n.time_30m_sk""")
+
+
+def _load_dim_mode(con: Any) -> None:
+    """dim_mode estático (mismos códigos que load_sqlite)."""
+    values = ", ".join("(?, ?)" for _ in _MODE_STATIC)
+    con.execute(
+        f"""INSERT INTO dim_mode(mode_code, mode_name)
+            SELECT n.* FROM (VALUES {values}) n(mode_code, mode_name)
+            ANTI JOIN dim_mode d ON d.mode_code = n.mode_code""",
+        [v for pair in _MODE_STATIC for v in pair],
+    )
+
+
+def _load_dim_date(con: Any, sources: set[str]) -> None:
+    """
+    Calendario entre el menor y el mayor date_*_sk de los parquets (subidas_30m
+    aporta YYYYMM01), más 30 días de margen — mismo rango que load_sqlite.
+    """
+    bounds = [
+        f"SELECT MIN({c}) AS lo, MAX({c}) AS hi FROM _src_{ptype} WHERE {c} > 0"
+        for ptype, cols in _DATE_SK_COLS.items() if ptype in sources
+        for c in cols
+    ]
+    bounds.append(
+        "SELECT MIN(year * 10000 + month * 100 + 1), MAX(year * 10000 + month * 100 + 1)"
+        " FROM _parts WHERE parquet_type = 'subidas_30m'"
+    )
+    sk_min, sk_max = con.execute(
+        f"SELECT MIN(lo), MAX(hi) FROM ({' UNION ALL '.join(bounds)})"
+    ).fetchone()
+    if sk_min is None:
+        log.warning("dim_date: no se encontraron SKs válidos; cargando año 2025")
+        sk_min, sk_max = 20250101, 20251231
+
+    date_min = datetime.date(sk_min // 10000, (sk_min % 10000) // 100, max(sk_min % 100, 1))
+    date_max = datetime.date(sk_max // 10000, (sk_max % 10000) // 100, max(sk_max % 100, 1))
+    con.execute(
+        """INSERT INTO dim_date
+           SELECT n.* FROM (
+               SELECT year(d) * 10000 + month(d) * 100 + day(d) AS date_sk, d AS full_date,
+                      year(d) AS year, month(d) AS month, day(d) AS day, quarter(d) AS quarter,
+                      isodow(d) - 1 AS day_of_week,
+                      list_extract(?, isodow(d)) AS day_name,
+                      list_extract(?, month(d))  AS month_name,
+                      isodow(d) >= 6 AS is_weekend
+               FROM (SELECT CAST(generate_series AS DATE) AS d
+                     FROM generate_series(CAST(? AS DATE), CAST(? AS DATE) + 30, INTERVAL 1 DAY))
+           ) n
+           ANTI JOIN dim_date x ON x.date_sk = n.date_sk""",
+        [_DAY_NAMES, _MONTH_NAMES[1:], date_min, date_max],
+    )
+    log.info("dim_date: %s … %s (+30 días)", date_min, date_max)
+
+
+def _load_dim_simple(
+    con: Any,
+    sources: set[str],
+    table: str,
+    code_col: str,
+    extractions: list[tuple[str, str]],    # [(parquet_type, col_in_parquet)]
+) -> None:
+    """Dimensión de una columna de código: DISTINCT no nulos ni vacíos, tal cual vienen."""
+    selects = [
+        f"SELECT {col} AS code FROM _src_{ptype}"
+        for ptype, col in extractions if ptype in sources
+    ]
+    if not selects:
+        return
+    con.execute(f"""
+        INSERT INTO {table}({code_col})
+        SELECT n.code FROM (
+            SELECT DISTINCT code FROM ({' UNION ALL '.join(selects)})
+            WHERE code IS NOT NULL AND code <> ''
+        ) n
+        ANTI JOIN {table} d ON d.{code_col} = n.code
+        ORDER BY n.code""")
+    n = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    log.info("%s: %d códigos", table, n)
+
+
+def _load_dim_operator_contract(con: Any, sources: set[str]) -> None:
+    """
+    Pares (operator_code, contract_code) normalizados:
+      viajes_trip  → ('UNKNOWN', contrato)
+      viajes_leg   → (operator_code, 'UNKNOWN')
+      etapas       → (operador, contrato)
+    """
+    specs = [
+        ("viajes_trip",       "'UNKNOWN'",     "contrato"),
+        ("viajes_leg",        "operator_code", "'UNKNOWN'"),
+        ("etapas_validation", "operador",      "contrato"),
+    ]
+    selects = []
+    for ptype, op, ct in specs:
+        if ptype not in sources:
+            continue
+        where = " AND ".join(f"{c} IS NOT NULL" for c in (op, ct) if not c.startswith("'"))
+        selects.append(f"SELECT {op} AS op, {ct} AS ct FROM _src_{ptype} WHERE {where}")
+    if not selects:
+        return
+    con.execute(f"""
+        INSERT INTO dim_operator_contract(operator_code, contract_code)
+        SELECT n.* FROM (
+            SELECT DISTINCT norm_or_unknown(op) AS operator_code, norm_or_unknown(ct) AS contract_code
+            FROM ({' UNION ALL '.join(selects)})
+        ) n
+        ANTI JOIN dim_operator_contract d
+            ON d.operator_code = n.operator_code AND d.contract_code = n.contract_code
+        ORDER BY n.operator_code, n.contract_code""")
+    n = con.execute("SELECT COUNT(*) FROM dim_operator_contract").fetchone()[0]
+    log.info("dim_operator_contract: %d pares", n)
+
+
+# =============================================================================
+# III.  DIMS SCD2 (dim_stop y dim_service)
+# =============================================================================
+
+# (parquet_type, stop_col, comuna_col, zona_col, date_sk_col) — igual que
+# _collect_stop_candidates; date_sk_col None = YYYY-MM-01 de la partición
+_STOP_SPECS = [
+    ("viajes_trip",       "paradero_inicio_viaje", "comuna_inicio_viaje", "zona_inicio_viaje", "date_start_sk"),
+    ("viajes_trip",       "paradero_fin_viaje",    "comuna_fin_viaje",    "zona_fin_viaje",    "date_start_sk"),
+    ("viajes_leg",        "board_stop_code",       None,                  "zone_board",        "date_board_sk"),
+    ("viajes_leg",        "alight_stop_code",      None,                  "zone_alight",       "date_board_sk"),
+    ("etapas_validation", "parada_subida",         "comuna_subida",       "zona_subida",       "date_board_sk"),
+    ("etapas_validation", "parada_bajada",         "comuna_bajada",       "zona_bajada",       "date_board_sk"),
+    ("subidas_30m",       "stop_code",             "comuna",              None,                None),
+]
+
+# (parquet_type, service_col, mode_col, date_sk_col) — igual que _collect_service_candidates
+_SERVICE_SPECS = [
+    ("viajes_leg",        "service_code",    "mode_code",       "date_board_sk"),
+    ("etapas_validation", "servicio_subida", "tipo_transporte", "date_board_sk"),
+    ("etapas_validation", "servicio_bajada", None,              "date_board_sk"),
+]
+
+
+def _stop_candidates(con: Any, sources: set[str]) -> int:
+    """
+    _scd2_cand para dim_stop: una fila por (stop_code, event_date).  Gana el
+    primer comuna no vacío / zona no nula en el orden de lectura de
+    _collect_stop_candidates — (partición, spec) y dentro de cada fuente
+    ORDER BY ALL sobre los valores crudos —, como _prefer_nonempty/_prefer_notnone.
+    """
+    selects = []
+    for i, (ptype, s_col, c_col, z_col, d_col) in enumerate(_STOP_SPECS):
+        if ptype not in sources:
+            continue
+        event_date = f"sk_to_date({d_col})" if d_col else "make_date(_year, _month, 1)"
+        selects.append(
+            f"SELECT norm_code({s_col}) AS bk, {event_date} AS event_date,"
+            f" {f'clean_text({c_col})' if c_col else 'NULL'} AS comuna,"
+            f" {f'CAST({z_col} AS INTEGER)' if z_col else 'NULL'} AS zona,"
+            f" _part_id * 10 + {i} AS prio, {s_col} AS s_raw,"
+            f" {c_col or 'NULL'} AS c_raw, {z_col or 'NULL'} AS z_raw"
+            f" FROM _src_{ptype} WHERE {s_col} IS NOT NULL"
+            + (f" AND {d_col} > 0" if d_col else "")
+        )
+    if not selects:
+        return 0
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _scd2_cand AS
+        SELECT bk, event_date, comuna, zona,
+               sha256(concat_ws('|', bk, upper(coalesce(comuna, '')),
+                                coalesce(CAST(zona AS VARCHAR), ''))) AS row_hash
+        FROM (
+            SELECT bk, event_date,
+                   first(comuna ORDER BY prio, s_raw, c_raw, z_raw) FILTER (WHERE comuna <> '') AS comuna,
+                   first(zona ORDER BY prio, s_raw, c_raw, z_raw) FILTER (WHERE zona IS NOT NULL) AS zona
+            FROM ({' UNION ALL '.join(selects)})
+            WHERE bk <> '' AND event_date IS NOT NULL
+            GROUP BY bk, event_date
+        )""")
+    n = con.execute("SELECT COUNT(DISTINCT bk) FROM _scd2_cand").fetchone()[0]
+    log.info("dim_stop SCD2 candidates: %d stop_codes únicos", n)
+    return n
+
+
+def _service_candidates(con: Any, sources: set[str]) -> int:
+    """_scd2_cand para dim_service: una fila por (service_code, event_date)."""
+    selects = []
+    for i, (ptype, s_col, m_col, d_col) in enumerate(_SERVICE_SPECS):
+        if ptype not in sources:
+            continue
+        selects.append(
+            f"SELECT norm_code({s_col}) AS bk, sk_to_date({d_col}) AS event_date,"
+            f" {f'norm_code({m_col})' if m_col else 'NULL'} AS mode_code,"
+            f" _part_id * 10 + {i} AS prio, {s_col} AS s_raw, {m_col or 'NULL'} AS m_raw"
+            f" FROM _src_{ptype} WHERE {s_col} IS NOT NULL AND {d_col} > 0"
+        )
+    if not selects:
+        return 0
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _scd2_cand AS
+        SELECT bk, event_date, mode_code,
+               sha256(concat_ws('|', bk, coalesce(mode_code, ''))) AS row_hash
+        FROM (
+            SELECT bk, event_date,
+                   first(mode_code ORDER BY prio, s_raw, m_raw) FILTER (WHERE mode_code <> '') AS mode_code
+            FROM ({' UNION ALL '.join(selects)})
+            WHERE bk <> '' AND event_date IS NOT NULL
+            GROUP BY bk, event_date
+        )""")
+    n = con.execute("SELECT COUNT(DISTINCT bk) FROM _scd2_cand").fetchone()[0]
+    log.info("dim_service SCD2 candidates: %d service_codes únicos", n)
+    return n
+
+
+def _apply_scd2(con: Any, table: str, bk_col: str, attr_cols: list[str]) -> tuple[int, int]:
+    """
+    Aplica _scd2_cand (bk, event_date, attrs…, row_hash) sobre `table`.
+
+    La fila vigente de cada BK entra como semilla de su timeline junto con los
+    candidatos posteriores a su valid_from; cada fecha cuyo hash difiere del
+    anterior (LAG) abre versión, valid_to = siguiente apertura - 1 día (LEAD).
+    Misma regla que _apply_scd2 de load_sqlite, evaluada de una vez.
+    Devuelve (versiones insertadas, vigentes cerradas).
+    """
+    attrs   = ", ".join(attr_cols)
+    c_attrs = ", ".join(f"c.{a}" for a in attr_cols)
+    nulls   = ", ".join("NULL" for _ in attr_cols)
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _scd2_versions AS
+        WITH cur AS (
+            SELECT {bk_col} AS bk, valid_from, row_hash FROM {table} WHERE is_current
+        ),
+        timeline AS (
+            SELECT c.bk, c.event_date, {c_attrs}, c.row_hash, FALSE AS is_seed
+            FROM _scd2_cand c LEFT JOIN cur ON cur.bk = c.bk
+            WHERE cur.bk IS NULL OR c.event_date > cur.valid_from
+            UNION ALL
+            SELECT cur.bk, cur.valid_from, {nulls}, cur.row_hash, TRUE
+            FROM cur SEMI JOIN _scd2_cand c ON c.bk = cur.bk
+        ),
+        changes AS (
+            SELECT *, row_hash IS DISTINCT FROM lag(row_hash) OVER w AS opens
+            FROM timeline
+            WINDOW w AS (PARTITION BY bk ORDER BY event_date)
+        )
+        SELECT *, lead(event_date) OVER (PARTITION BY bk ORDER BY event_date) AS next_from
+        FROM changes WHERE opens""")
+
+    con.begin()
+    try:
+        closed = con.execute(f"""
+            UPDATE {table} t SET valid_to = v.next_from - 1, is_current = FALSE
+            FROM _scd2_versions v
+            WHERE v.is_seed AND v.next_from IS NOT NULL
+              AND t.{bk_col} = v.bk AND t.is_current""").fetchone()[0]
+        inserted = con.execute(f"""
+            INSERT INTO {table}({bk_col}, {attrs}, valid_from, valid_to, is_current, row_hash)
+            SELECT bk, {attrs}, event_date, next_from - 1, next_from IS NULL, row_hash
+            FROM _scd2_versions WHERE NOT is_seed
+            ORDER BY bk, event_date""").fetchone()[0]
+        con.commit()
+    except Exception:
+        con.rollback()
+        raise
+    return inserted, closed
+
+
+# =============================================================================
+# IV.  HECHOS  (un INSERT ... SELECT por archivo Silver)
+# =============================================================================
+
+# SK de franja: caches.time.get(t) en load_sqlite (0..47, 0 incluido)
+def _time_sk(col: str) -> str:
+    return f"CASE WHEN {col} BETWEEN 0 AND 47 THEN {col} END"
+
+
+# Lado derecho del ASOF sin columnas NULL: con pocas filas DuckDB planifica el
+# ASOF como nested loop + arg_max por columna, y arg_max salta NULLs (valid_to
+# de la versión vigente) → devolvía el valid_to de la versión anterior.
+_ASOF_STOP = ("(SELECT stop_sk, stop_code, valid_from,"
+              " coalesce(valid_to, DATE '9999-12-31') AS valid_until FROM dim_stop)")
+_ASOF_SERVICE = ("(SELECT service_sk, service_code, valid_from,"
+                 " coalesce(valid_to, DATE '9999-12-31') AS valid_until FROM dim_service)")
+
+
+# SK as-of: la versión con mayor valid_from <= event_date, si sigue vigente ese día
+def _asof_sk(alias: str, sk_col: str) -> str:
+    return f"CASE WHEN {alias}.valid_until >= t.event_date THEN {alias}.{sk_col} END"
+
+
+def _fct_trip_select() -> str:
+    return f"""
+        SELECT ? AS cut_sk,
+               ds.date_sk AS date_start_sk, {_time_sk('t.time_start_30m_sk')} AS time_start_30m_sk,
+               de.date_sk AS date_end_sk,   {_time_sk('t.time_end_30m_sk')}   AS time_end_30m_sk,
+               {_asof_sk('so', 'stop_sk')} AS origin_stop_sk,
+               {_asof_sk('sd', 'stop_sk')} AS dest_stop_sk,
+               pu.purpose_sk,
+               coalesce(oc1.operator_contract_sk, oc2.operator_contract_sk) AS operator_contract_sk,
+               t.cut_str AS cut, t.id_viaje, t.id_tarjeta, t.tipo_dia, t.factor_expansion,
+               t.n_etapas, t.distancia_eucl, t.distancia_ruta, t.tviaje_min, t._rn
+        FROM (
+            SELECT *, coalesce(nullif(CAST(cut AS VARCHAR), ''), ?) AS cut_str,
+                   sk_to_date(date_start_sk) AS event_date,
+                   norm_code(paradero_inicio_viaje) AS origin_code,
+                   norm_code(paradero_fin_viaje)    AS dest_code,
+                   norm_or_unknown(contrato)        AS ct,
+                   file_row_number AS _rn
+            FROM read_parquet(?, file_row_number = true)
+        ) t
+        LEFT JOIN dim_date ds ON ds.date_sk = t.date_start_sk
+        LEFT JOIN dim_date de ON de.date_sk = t.date_end_sk
+        ASOF LEFT JOIN {_ASOF_STOP} so ON so.stop_code = t.origin_code AND t.event_date >= so.valid_from
+        ASOF LEFT JOIN {_ASOF_STOP} sd ON sd.stop_code = t.dest_code   AND t.event_date >= sd.valid_from
+        LEFT JOIN dim_purpose pu ON pu.purpose_code = norm_code(t.proposito)
+        LEFT JOIN dim_operator_contract oc1
+            ON oc1.operator_code = 'UNKNOWN' AND oc1.contract_code = t.ct
+        LEFT JOIN dim_operator_contract oc2
+            ON oc2.operator_code = t.ct AND oc2.contract_code = t.ct"""
+
+
+def _fct_trip_leg_select() -> str:
+    return f"""
+        SELECT ? AS cut_sk,
+               db.date_sk AS date_board_sk,  {_time_sk('t.time_board_30m_sk')}  AS time_board_30m_sk,
+               da.date_sk AS date_alight_sk, {_time_sk('t.time_alight_30m_sk')} AS time_alight_30m_sk,
+               m.mode_sk,
+               {_asof_sk('sv', 'service_sk')} AS service_sk,
+               {_asof_sk('sb', 'stop_sk')} AS board_stop_sk,
+               {_asof_sk('sa', 'stop_sk')} AS alight_stop_sk,
+               fp.fare_period_sk,
+               t.cut_str AS cut, t.id_viaje, t.id_tarjeta, t.leg_seq, t.operator_code,
+               t.zone_board, t.zone_alight, t.tv_leg_min, t.tc_transfer_min, t.te_wait_min, t._rn
+        FROM (
+            SELECT *, coalesce(nullif(CAST(cut AS VARCHAR), ''), ?) AS cut_str,
+                   sk_to_date(date_board_sk) AS event_date,
+                   norm_code(service_code)     AS svc,
+                   norm_code(board_stop_code)  AS board_code,
+                   norm_code(alight_stop_code) AS alight_code,
+                   file_row_number AS _rn
+            FROM read_parquet(?, file_row_number = true)
+        ) t
+        LEFT JOIN dim_date db ON db.date_sk = t.date_board_sk
+        LEFT JOIN dim_date da ON da.date_sk = t.date_alight_sk
+        LEFT JOIN dim_mode m  ON m.mode_code = norm_code(t.mode_code)
+        ASOF LEFT JOIN {_ASOF_SERVICE} sv ON sv.service_code = t.svc     AND t.event_date >= sv.valid_from
+        ASOF LEFT JOIN {_ASOF_STOP} sb    ON sb.stop_code = t.board_code  AND t.event_date >= sb.valid_from
+        ASOF LEFT JOIN {_ASOF_STOP} sa    ON sa.stop_code = t.alight_code AND t.event_date >= sa.valid_from
+        LEFT JOIN dim_fare_period fp  ON fp.fare_period_code = norm_code(t.fare_period_alight_code)"""
+
+
+def _fct_validation_select() -> str:
+    return f"""
+        SELECT ? AS cut_sk,
+               db.date_sk AS date_board_sk,  {_time_sk('t.time_board_30m_sk')}  AS time_board_30m_sk,
+               da.date_sk AS date_alight_sk, {_time_sk('t.time_alight_30m_sk')} AS time_alight_30m_sk,
+               {_asof_sk('sb', 'stop_sk')}    AS board_stop_sk,
+               {_asof_sk('sa', 'stop_sk')}    AS alight_stop_sk,
+               {_asof_sk('vb', 'service_sk')} AS board_service_sk,
+               {_asof_sk('va', 'service_sk')} AS alight_service_sk,
+               fb.fare_period_sk AS fare_period_board_sk,
+               fa.fare_period_sk AS fare_period_alight_sk,
+               oc.operator_contract_sk,
+               t.cut_str AS cut, t.id_etapa, t.tipo_dia, t.tipo_transporte,
+               t.fExpansionServicioPeriodoTS AS factor_expansion,
+               CASE WHEN t.tiene_bajada THEN 1 ELSE 0 END AS tiene_bajada,
+               t.tiempo_etapa, t.dist_ruta_paraderos, t.dist_eucl_paraderos,
+               t.tEsperaMediaIntervalo AS t_espera_media, t._rn
+        FROM (
+            SELECT *, coalesce(nullif(CAST(cut AS VARCHAR), ''), ?) AS cut_str,
+                   sk_to_date(date_board_sk) AS event_date,
+                   norm_code(parada_subida)   AS board_code,
+                   norm_code(parada_bajada)   AS alight_code,
+                   norm_code(servicio_subida) AS board_svc,
+                   norm_code(servicio_bajada) AS alight_svc,
+                   file_row_number AS _rn
+            FROM read_parquet(?, file_row_number = true)
+        ) t
+        LEFT JOIN dim_date db ON db.date_sk = t.date_board_sk
+        LEFT JOIN dim_date da ON da.date_sk = t.date_alight_sk
+        ASOF LEFT JOIN {_ASOF_STOP} sb    ON sb.stop_code = t.board_code     AND t.event_date >= sb.valid_from
+        ASOF LEFT JOIN {_ASOF_STOP} sa    ON sa.stop_code = t.alight_code    AND t.event_date >= sa.valid_from
+        ASOF LEFT JOIN {_ASOF_SERVICE} vb ON vb.service_code = t.board_svc  AND t.event_date >= vb.valid_from
+        ASOF LEFT JOIN {_ASOF_SERVICE} va ON va.service_code = t.alight_svc AND t.event_date >= va.valid_from
+        LEFT JOIN dim_fare_period fb ON fb.fare_period_code = norm_code(t.periodoSubida)
+        LEFT JOIN dim_fare_period fa ON fa.fare_period_code = norm_code(t.periodoBajada)
+        LEFT JOIN dim_operator_contract oc
+            ON oc.operator_code = norm_or_unknown(t.operador)
+           AND oc.contract_code = norm_or_unknown(t.contrato)"""
+
+
+def _fct_boardings_30m_select() -> str:
+    # event_date y month_date_sk salen de la partición (YYYY-MM-01), no de la fila
+    return f"""
+        SELECT ? AS cut_sk,
+               {_time_sk('t.time_30m_sk')} AS time_30m_sk,
+               {_asof_sk('s', 'stop_sk')} AS stop_sk,
+               m.mode_sk,
+               t.cut_str AS cut, t.month_date_sk, t.sc AS stop_code, t.mc AS mode_code,
+               coalesce(t.tipo_dia, '') AS tipo_dia, t.subidas_promedio, t._rn
+        FROM (
+            SELECT *, coalesce(nullif(CAST(cut AS VARCHAR), ''), ?) AS cut_str,
+                   make_date(p_year, p_month, 1) AS event_date,
+                   p_year * 10000 + p_month * 100 + 1 AS month_date_sk,
+                   norm_code(coalesce(stop_code, '')) AS sc,
+                   norm_code(coalesce(mode_code, '')) AS mc,
+                   file_row_number AS _rn
+            FROM read_parquet(?, file_row_number = true), (SELECT ? AS p_year, ? AS p_month)
+        ) t
+        ASOF LEFT JOIN {_ASOF_STOP} s ON s.stop_code = t.sc AND t.event_date >= s.valid_from
+        LEFT JOIN dim_mode m ON m.mode_code = t.mc"""
+
+
+_FACT_SELECT = {
+    "fct_trip":          _fct_trip_select,
+    "fct_trip_leg":      _fct_trip_leg_select,
+    "fct_validation":    _fct_validation_select,
+    "fct_boardings_30m": _fct_boardings_30m_select,
+}
+
+
+def _insert_fact(con: Any, table: str, part: dict, cut_sk: int) -> tuple[int, int]:
+    """
+    Carga un archivo Silver en `table`.  Dentro del archivo gana la primera
+    fila de cada grain (file_row_number); contra lo ya cargado, anti-join.
+    time_30m_sk NULL en fct_boardings_30m nunca colisiona (como el UNIQUE de SQLite).
+    Devuelve (inserted, ignored).
+    """
+    grain = FACT_GRAIN[table]
+    keys  = ", ".join(grain)
+    on    = " AND ".join(f"f.{c} = n.{c}" for c in grain)
+    keep  = f"ROW_NUMBER() OVER (PARTITION BY {keys} ORDER BY _rn) = 1"
+    if table == "fct_boardings_30m":
+        keep += " OR time_30m_sk IS NULL"
+
+    path = str(part["path"]).replace("\\", "/")
+    params: list = [cut_sk, part["cut"], path]
+    if table == "fct_boardings_30m":
+        params += [part["year"], part["month"]]
+
+    rows_read = con.execute("SELECT COUNT(*) FROM read_parquet(?)", [path]).fetchone()[0]
+    inserted = con.execute(
+        f"""INSERT INTO {table} BY NAME
+            WITH n AS MATERIALIZED (
+                SELECT * FROM ({_FACT_SELECT[table]()}) QUALIFY {keep}
+            )
+            SELECT n.* EXCLUDE (_rn) FROM n
+            ANTI JOIN (
+                SELECT {keys} FROM {table} WHERE cut IN (SELECT DISTINCT cut FROM n)
+            ) f ON {on}""",
+        params,
+    ).fetchone()[0]
+    return inserted, rows_read - inserted
+
+
+# =============================================================================
+# V.  DIAGNÓSTICO
+# =============================================================================
+
+def _write_report(records: list[dict], table_counts: dict[str, int]) -> None:
+    """Escribe duckdb_load_report.json en docs/diagnostics/."""
+    DOCS_DIR.mkdir(parents=True, exist_ok=True)
+    path = DOCS_DIR / "duckdb_load_report.json"
+    path.write_text(
+        json.dumps({"generated_at":   datetime.datetime.utcnow().isoformat() + "Z",
+                    "loader_version": LOADER_VERSION,
+                    "tables":         table_counts,
+                    "partitions":     records}, indent=2, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    log.info("Diagnóstico escrito → %s", path)
+
+
+# =============================================================================
+# VI.  ORQUESTADOR PRINCIPAL
+# =============================================================================
+
+class DuckdbLoader:
+    """Orquesta la carga completa Silver → DuckDB Gold."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        dataset: str,
+        cut: Optional[str],
+        overwrite: bool,
+        dry_run: bool,
+        days: Optional[list[int]] = None,
+        snapshot_version: Optional[int] = None,
+        threads: Optional[int] = None,
+        memory_limit: Optional[str] = None,
+    ):
+        self.db_path      = db_path
+        self.dataset      = dataset
+        self.cut          = cut
+        self.overwrite    = overwrite
+        self.dry_run      = dry_run
+        self.days         = days
+        self.snapshot_version = snapshot_version
+        self.threads      = threads
+        self.memory_limit = memory_limit
+
+    # ── Paso 1: Descubrir particiones ─────────────────────────────────────────
+    def _discover(self) -> list[dict]:
+        parts = _scan_silver_partitions(self.dataset, self.cut, self.days, self.snapshot_version)
+        if not parts:
+            log.warning("No se encontraron particiones para dataset=%s cut=%s days=%s",
+                        self.dataset, self.cut, self.days)
+        return parts
+
+    # ── Paso 2: Dry-run ──────────────────────────────────────────────────────
+    def _print_dry_run(self, parts: list[dict]) -> None:
+        groups = _group_by_cut(parts)
+        print(f"\n{'='*60}")
+        print(f"  DRY-RUN: {len(groups)} partición(es) a cargar → {self.db_path}")
+        print(f"{'='*60}")
+        for (ds, cut), ps in sorted(groups.items()):
+            print(f"  ├─ dataset={ds}  cut={cut}")
+            for p in ps:
+                name = p["parquet_type"] + (f" day={p['day']}" if p.get("day") else "")
+                print(f"  │    {name:25s}  {p['path'].stat().st_size // 1024:>8d} KB")
+            print(f"  │")
+        print(f"\n  Un INSERT ... SELECT por archivo; SCD2 con LAG/LEAD; AS-OF con ASOF JOIN.")
+        print()
+
+    def run(self) -> int:
+        """Ejecuta la carga completa.  Devuelve exit code (0=OK, 1=error)."""
+        t0 = time.perf_counter()
+        parts = self._discover()
+
+        if self.dry_run:
+            self._print_dry_run(parts)
+            return 0
+
+        if not parts:
+            log.error("Sin particiones: abortando.")
+            return 1
+
+        con = _open_db(self.db_path, overwrite=self.overwrite,
+                       threads=self.threads, memory_limit=self.memory_limit)
+        records: list[dict] = []
+        table_counts: dict[str, int] = {}
+        work_tmp = (
+            Path(tempfile.mkdtemp(prefix="duckdb_load_"))
+            if any(p.get("compacted") for p in parts) else None
+        )
+
+        try:
+            # ── [0] Compactados → un parquet temporal por cut ───────────────
+            if work_tmp is not None:
+                parts = _materialize_compacted(con, parts, work_tmp)
+            sources = _register_parts(con, parts)
+
+            # ── [A] Dims globales ────────────────────────────────────────────
+            log.info("=== [A] Cargando dimensiones globales ===")
+            _load_dim_cut(con)
+            _load_dim_time_30m(con)
+            _load_dim_mode(con)
+            _load_dim_date(con, sources)
+            _load_dim_simple(
+                con, sources, "dim_fare_period", "fare_period_code",
+                [("viajes_trip", "periodo_inicio_viaje"),
+                 ("viajes_trip", "periodo_fin_viaje"),
+                 ("viajes_leg",  "fare_period_alight_code"),
+                 ("etapas_validation", "periodoSubida"),
+                 ("etapas_validation", "periodoBajada")],
+            )
+            _load_dim_simple(
+                con, sources, "dim_purpose", "purpose_code",
+                [("viajes_trip", "proposito")],
+            )
+            _load_dim_operator_contract(con, sources)
+
+            # ── [B] SCD2 dims ────────────────────────────────────────────────
+            log.info("=== [B] Cargando dim_stop / dim_service SCD2 ===")
+            if _stop_candidates(con, sources):
+                ins, closed = _apply_scd2(con, "dim_stop", "stop_code", ["comuna", "zona"])
+                log.info("dim_stop: +%d versiones, %d cerradas", ins, closed)
+            if _service_candidates(con, sources):
+                ins, closed = _apply_scd2(con, "dim_service", "service_code", ["mode_code"])
+                log.info("dim_service: +%d versiones, %d cerradas", ins, closed)
+
+            cut_sks = {
+                (ds, cut): sk
+                for sk, ds, cut in con.execute("SELECT cut_sk, dataset, cut FROM dim_cut").fetchall()
+            }
+
+            # ── [C] Facts por (dataset, cut), una transacción por cut ───────
+            log.info("=== [C] Cargando facts por cut ===")
+            for (ds, cut), cut_parts in sorted(_group_by_cut(parts).items()):
+                t_cut = time.perf_counter()
+                rec: dict = {
+                    "dataset": ds, "cut": cut, "status": "OK",
+                    "facts": {f: {"inserted": 0, "ignored": 0} for f in FACT_SOURCE},
+                }
+                run_id = con.execute(
+                    "INSERT INTO etl_run_log(dataset, cut, loader_version) VALUES (?, ?, ?)"
+                    " RETURNING run_id",
+                    [ds, cut, LOADER_VERSION],
+                ).fetchone()[0]
+                con.begin()
+                try:
+                    for table, ptype in FACT_SOURCE.items():
+                        for p in (p for p in cut_parts if p["parquet_type"] == ptype):
+                            ins, ign = _insert_fact(con, table, p, cut_sks[(ds, cut)])
+                            rec["facts"][table]["inserted"] += ins
+                            rec["facts"][table]["ignored"]  += ign
+                    con.commit()
+                except Exception as exc:
+                    con.rollback()
+                    rec["status"] = "FAILED"
+                    rec["error"]  = str(exc)
+                    log.exception("  ERROR en cut %s/%s: %s", ds, cut, exc)
+
+                rec["elapsed_s"] = round(time.perf_counter() - t_cut, 2)
+                total_ins = sum(f["inserted"] for f in rec["facts"].values())
+                total_ign = sum(f["ignored"]  for f in rec["facts"].values())
+                con.execute(
+                    """UPDATE etl_run_log
+                       SET finished_at = current_timestamp, status = ?, rows_read = ?,
+                           rows_inserted = ?, rows_ignored = ?, error_message = ?
+                       WHERE run_id = ?""",
+                    [rec["status"], total_ins + total_ign, total_ins, total_ign,
+                     rec.get("error"), run_id],
+                )
+                log.info("  ✓ %s/%s → inserted=%d ignored=%d elapsed=%.1fs",
+                         ds, cut, total_ins, total_ign, rec["elapsed_s"])
+                records.append(rec)
+
+            for table in ("dim_stop", "dim_service", *FACT_SOURCE):
+                table_counts[table] = con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                log.info("%-18s %12s filas", table, f"{table_counts[table]:,}")
+
+        finally:
+            # ── [D] Diagnóstico ───────────────────────────────────────────────
+            _write_report(records, table_counts)
+            con.close()
+            if work_tmp is not None:
+                shutil.rmtree(work_tmp, ignore_errors=True)
+
+        elapsed = round(time.perf_counter() - t0, 1)
+        any_fail = any(r["status"] == "FAILED" for r in records)
+        log.info("=== Carga completa en %.1fs — %s ===", elapsed,
+                 "FAILED (ver reporte)" if any_fail else "OK")
+        return 1 if any_fail else 0
+
+
+# =============================================================================
+# VII.  CLI
+# =============================================================================
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.duckdb_gold.load_duckdb",
+        description="Carga Silver Parquet → Gold DuckDB con SQL set-based.",
+    )
+    p.add_argument("--db",      default="gold.duckdb",
+                   help="Ruta al archivo DuckDB destino (default: gold.duckdb)")
+    p.add_argument("--dataset", default="all",
+                   choices=["all", "viajes", "etapas", "subidas_30m"],
+                   help="Dataset a cargar (default: all)")
+    p.add_argument("--cut",     default=None,
+                   help="Filtro de cut (ej: 2025-04-21). Omitir para todos.")
+    p.add_argument("--overwrite", action="store_true",
+                   help="Eliminar DB existente antes de cargar (reset total).")
+    p.add_argument("--day", dest="days", action="append", type=int, default=None,
+                   metavar="YYYYMMDD",
+                   help="Solo estos días de cuts con sub-particiones diarias (repetible).")
+    p.add_argument("--snapshot", dest="snapshot_version", type=int, default=None, metavar="N",
+                   help="Fijar la lectura Silver al snapshot N del manifest (default: el último).")
+    p.add_argument("--threads", type=int, default=None,
+                   help="Hilos de DuckDB (default: todos los núcleos).")
+    p.add_argument("--memory-limit", default=None, metavar="SIZE",
+                   help="Límite de memoria de DuckDB, ej. 4GB (default: 80%% de la RAM).")
+    p.add_argument("--dry-run", action="store_true",
+                   help="Solo imprime el plan; no carga datos.")
+    p.add_argument("--log-level", default="INFO",
+                   choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Nivel de logging (default: INFO)")
+    return p
+
+
+def main() -> None:
+    args = _build_parser().parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    db_path = _PROJECT_ROOT / args.db if not Path(args.db).is_absolute() else Path(args.db)
+    loader  = DuckdbLoader(
+        db_path   = db_path,
+        dataset   = args.dataset,
+        cut       = args.cut,
+        overwrite = args.overwrite,
+        dry_run   = args.dry_run,
+        days      = args.days,
+        snapshot_version = args.snapshot_version,
+        threads   = args.threads,
+        memory_limit = args.memory_limit,
+    )
+    sys.exit(loader.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+parity.py  —  Paridad Gold DuckDB vs Gold SQLite.
+
+Compara tabla por tabla las salidas de load_duckdb y load_sqlite sobre el
+mismo Silver.  Los SKs son propios de cada motor, así que cada tabla se
+proyecta a claves naturales (stop_code + valid_from en vez de stop_sk, etc.)
+con una query canónica válida en ambos motores; luego se compara con
+EXCEPT ALL en DuckDB (multiconjunto: también detecta duplicados).
+
+  - Textos vacíos vs NULL en atributos SCD2 se igualan (load_sqlite puede
+    guardar '' según el orden de lectura; load_duckdb guarda NULL).
+  - Fechas y booleanos se comparan como texto ISO / 0-1.
+
+Ejecución:
+    python -m src.duckdb_gold.parity --sqlite gold_sqlite.db --duckdb gold.duckdb
+    python -m src.duckdb_gold.parity --sqlite gold_sqlite.db --duckdb gold.duckdb --table fct_trip
+
+Salida: resumen en el log y docs/diagnostics/duckdb_parity.json.
+Exit code 1 si alguna tabla difiere.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REPORT_PATH   = _PROJECT_ROOT / "docs" / "diagnostics" / "duckdb_parity.json"
+
+FETCH_ROWS = 50_000   # filas por lote al copiar la proyección SQLite a DuckDB
+
+# ─────────────────────────────────────────────────────────────
+# Proyecciones canónicas (SQL común a SQLite y DuckDB)
+# ─────────────────────────────────────────────────────────────
+
+def _stop(alias: str, sk: str) -> str:
+    return (f"(SELECT stop_code || '@' || CAST(valid_from AS VARCHAR) FROM dim_stop {alias}"
+            f" WHERE {alias}.stop_sk = f.{sk})")
+
+
+def _service(alias: str, sk: str) -> str:
+    return (f"(SELECT service_code || '@' || CAST(valid_from AS VARCHAR) FROM dim_service {alias}"
+            f" WHERE {alias}.service_sk = f.{sk})")
+
+
+def _code(table: str, sk_col: str, code_expr: str, sk: str) -> str:
+    return f"(SELECT {code_expr} FROM {table} x WHERE x.{sk_col} = f.{sk})"
+
+
+_CUT = "(SELECT dataset || '/' || cut FROM dim_cut c WHERE c.cut_sk = f.cut_sk) AS cut_key"
+_OPCT = _code("dim_operator_contract", "operator_contract_sk",
+              "operator_code || '/' || contract_code", "operator_contract_sk")
+
+CANONICAL_SQL: dict[str, str] = {
+    "dim_cut":         "SELECT dataset, cut, year, month FROM dim_cut",
+    "dim_date":        """SELECT date_sk, CAST(full_date AS VARCHAR), year, month, day, quarter,
+                                 day_of_week, day_name, month_name, CAST(is_weekend AS INTEGER)
+                          FROM dim_date""",
+    "dim_time_30m":    "SELECT time_30m_sk, hour, minute, period_label FROM dim_time_30m",
+    "dim_mode":        "SELECT mode_code, mode_name FROM dim_mode",
+    "dim_fare_period": "SELECT fare_period_code FROM dim_fare_period",
+    "dim_purpose":     "SELECT purpose_code FROM dim_purpose",
+    "dim_operator_contract": "SELECT operator_code, contract_code FROM dim_operator_contract",
+    "dim_stop":        """SELECT stop_code, NULLIF(comuna, ''), zona, CAST(valid_from AS VARCHAR),
+                                 CAST(valid_to AS VARCHAR), CAST(is_current AS INTEGER), row_hash
+                          FROM dim_stop""",
+    "dim_service":     """SELECT service_code, NULLIF(mode_code, ''), CAST(valid_from AS VARCHAR),
+                                 CAST(valid_to AS VARCHAR), CAST(is_current AS INTEGER), row_hash
+                          FROM dim_service""",
+    "fct_trip": f"""
+        SELECT {_CUT}, date_start_sk, time_start_30m_sk, date_end_sk, time_end_30m_sk,
+               {_stop('so', 'origin_stop_sk')} AS origin_stop, {_stop('sd', 'dest_stop_sk')} AS dest_stop,
+               {_code('dim_purpose', 'purpose_sk', 'purpose_code', 'purpose_sk')} AS purpose,
+               {_OPCT} AS operator_contract,
+               cut, id_viaje, id_tarjeta, tipo_dia, factor_expansion, n_etapas,
+               distancia_eucl, distancia_ruta, tviaje_min
+        FROM fct_trip f""",
+    "fct_trip_leg": f"""
+        SELECT {_CUT}, date_board_sk, time_board_30m_sk, date_alight_sk, time_alight_30m_sk,
+               {_code('dim_mode', 'mode_sk', 'mode_code', 'mode_sk')} AS mode,
+               {_service('sv', 'service_sk')} AS service,
+               {_stop('sb', 'board_stop_sk')} AS board_stop, {_stop('sa', 'alight_stop_sk')} AS alight_stop,
+               {_code('dim_fare_period', 'fare_period_sk', 'fare_period_code', 'fare_period_sk')} AS fare_period,
+               cut, id_viaje, id_tarjeta, leg_seq, operator_code, zone_board, zone_alight,
+               tv_leg_min, tc_transfer_min, te_wait_min
+        FROM fct_trip_leg f""",
+    "fct_validation": f"""
+        SELECT {_CUT}, date_board_sk, time_board_30m_sk, date_alight_sk, time_alight_30m_sk,
+               {_stop('sb', 'board_stop_sk')} AS board_stop, {_stop('sa', 'alight_stop_sk')} AS alight_stop,
+               {_service('vb', 'board_service_sk')} AS board_service,
+               {_service('va', 'alight_service_sk')} AS alight_service,
+               {_code('dim_fare_period', 'fare_period_sk', 'fare_period_code', 'fare_period_board_sk')} AS fare_board,
+               {_code('dim_fare_period', 'fare_period_sk', 'fare_period_code', 'fare_period_alight_sk')} AS fare_alight,
+               {_OPCT} AS operator_contract,
+               cut, id_etapa, tipo_dia, tipo_transporte, factor_expansion, tiene_bajada,
+               tiempo_etapa, dist_ruta_paraderos, dist_eucl_paraderos, t_espera_media
+        FROM fct_validation f""",
+    "fct_boardings_30m": f"""
+        SELECT {_CUT}, time_30m_sk, {_stop('s', 'stop_sk')} AS stop,
+               {_code('dim_mode', 'mode_sk', 'mode_code', 'mode_sk')} AS mode,
+               cut, month_date_sk, stop_code, mode_code, tipo_dia, subidas_promedio
+        FROM fct_boardings_30m f""",
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# Comparación
+# ─────────────────────────────────────────────────────────────
+
+def _copy_sqlite_projection(sqlite_conn: sqlite3.Connection, duck: Any, table: str) -> None:
+    """Materializa la proyección canónica de SQLite como _sqlite_<table> en DuckDB."""
+    import pyarrow as pa
+
+    cur = sqlite_conn.execute(CANONICAL_SQL[table])
+    names = [f"c{i}" for i in range(len(cur.description))]
+    ref = duck.execute(f"SELECT * FROM ({CANONICAL_SQL[table]}) LIMIT 0").arrow().schema
+    schema = pa.schema([pa.field(n, f.type) for n, f in zip(names, ref)])
+
+    duck.execute(f"DROP TABLE IF EXISTS _sqlite_{table}")
+    duck.execute(f"CREATE TEMP TABLE _sqlite_{table} AS SELECT * FROM ({CANONICAL_SQL[table]}) LIMIT 0")
+    while True:
+        rows = cur.fetchmany(FETCH_ROWS)
+        if not rows:
+            break
+        batch = pa.Table.from_pylist([dict(zip(names, r)) for r in rows], schema=schema)
+        duck.register("_batch", batch)
+        duck.execute(f"INSERT INTO _sqlite_{table} SELECT * FROM _batch")
+        duck.unregister("_batch")
+
+
+def compare_table(sqlite_conn: sqlite3.Connection, duck: Any, table: str, sample: int = 5) -> dict:
+    """Diferencias (multiconjunto) entre la proyección canónica de ambos motores."""
+    _copy_sqlite_projection(sqlite_conn, duck, table)
+    ddb = f"({CANONICAL_SQL[table]})"
+    sql = f"_sqlite_{table}"
+    only_sqlite = duck.execute(f"SELECT * FROM {sql} EXCEPT ALL SELECT * FROM {ddb}").fetchall()
+    only_duckdb = duck.execute(f"SELECT * FROM {ddb} EXCEPT ALL SELECT * FROM {sql}").fetchall()
+    result = {
+        "table":       table,
+        "sqlite_rows": duck.execute(f"SELECT COUNT(*) FROM {sql}").fetchone()[0],
+        "duckdb_rows": duck.execute(f"SELECT COUNT(*) FROM {ddb}").fetchone()[0],
+        "only_sqlite": len(only_sqlite),
+        "only_duckdb": len(only_duckdb),
+        "sample_only_sqlite": [[str(v) for v in r] for r in only_sqlite[:sample]],
+        "sample_only_duckdb": [[str(v) for v in r] for r in only_duckdb[:sample]],
+    }
+    result["match"] = result["only_sqlite"] == 0 and result["only_duckdb"] == 0
+    duck.execute(f"DROP TABLE {sql}")
+    return result
+
+
+def compare(sqlite_path: Path, duckdb_path: Path, tables: list[str] | None = None) -> list[dict]:
+    """Compara `tables` (default: todas) entre dos DBs Gold ya cargadas."""
+    import duckdb
+
+    sqlite_conn = sqlite3.connect(f"file:{Path(sqlite_path).as_posix()}?mode=ro", uri=True)
+    duck = duckdb.connect(str(duckdb_path), read_only=True)
+    try:
+        results = []
+        for table in tables or list(CANONICAL_SQL):
+            r = compare_table(sqlite_conn, duck, table)
+            log.info(
+                "%-22s sqlite=%9s duckdb=%9s  solo_sqlite=%6d solo_duckdb=%6d  %s",
+                table, f"{r['sqlite_rows']:,}", f"{r['duckdb_rows']:,}",
+                r["only_sqlite"], r["only_duckdb"], "OK" if r["match"] else "DIFF",
+            )
+            results.append(r)
+        return results
+    finally:
+        duck.close()
+        sqlite_conn.close()
+
+
+# ─────────────────────────────────────────────────────────────
+# CLI entry point
+# ─────────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.duckdb_gold.parity",
+        description="Compara Gold DuckDB vs Gold SQLite por claves naturales.",
+    )
+    p.add_argument("--sqlite", type=Path, default=Path("gold_sqlite.db"),
+                   help="DB SQLite cargada con load_sqlite (default: gold_sqlite.db)")
+    p.add_argument("--duckdb", type=Path, default=Path("gold.duckdb"),
+                   help="DB DuckDB cargada con load_duckdb (default: gold.duckdb)")
+    p.add_argument("--table", dest="tables", action="append", default=None,
+                   choices=list(CANONICAL_SQL),
+                   help="Tabla a comparar. Repetible. (default: todas)")
+    p.add_argument("--output", type=Path, default=REPORT_PATH,
+                   help=f"Reporte JSON. (default: {REPORT_PATH.relative_to(_PROJECT_ROOT)})")
+    p.add_argument("--log-level", default="INFO",
+                   choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                   help="Nivel de logging. (default: INFO)")
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    sqlite_path = args.sqlite if args.sqlite.is_absolute() else _PROJECT_ROOT / args.sqlite
+    duckdb_path = args.duckdb if args.duckdb.is_absolute() else _PROJECT_ROOT / args.duckdb
+
+    results = compare(sqlite_path, duckdb_path, args.tables)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "sqlite":       str(sqlite_path),
+        "duckdb":       str(duckdb_path),
+        "match":        all(r["match"] for r in results),
+        "tables":       results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    log.info("Paridad %s → %s", "OK" if report["match"] else "CON DIFERENCIAS", args.output)
+    return 0 if report["match"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
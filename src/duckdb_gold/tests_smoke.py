@@ -0,0 +1,293 @@
+"""
+tests_smoke.py — Smoke tests de la capa Gold DuckDB (paridad con SQLite).
+
+Ejecutar:
+    python -m src.duckdb_gold.tests_smoke
+
+No requiere pytest ni datos reales: arma un Silver sintético mínimo en un
+directorio temporal (con los casos borde conocidos: franja 0, duplicados de
+grain, códigos con espacios/minúsculas, cambios SCD2 de ida y vuelta),
+lo carga con load_sqlite y con load_duckdb, y compara con parity.compare.
+Falla con exit code 1 si algún test falla.
+"""
+
+from __future__ import annotations
+
+import datetime
+import sys
+import tempfile
+import traceback
+from pathlib import Path
+from typing import Any
+
+# ─────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────
+
+_PASSED: list[str] = []
+_FAILED: list[tuple[str, str]] = []
+
+
+def _run(name: str, fn: Any) -> None:
+    try:
+        fn()
+        _PASSED.append(name)
+        print(f"  PASS  {name}")
+    except Exception as exc:  # noqa: BLE001
+        _FAILED.append((name, traceback.format_exc()))
+        print(f"  FAIL  {name}: {exc}")
+
+
+# ─────────────────────────────────────────────────────────────
+# Imports under test
+# ─────────────────────────────────────────────────────────────
+
+import duckdb  # noqa: E402
+import pyarrow as pa  # noqa: E402
+import pyarrow.parquet as pq  # noqa: E402
+
+from src.duckdb_gold import load_duckdb  # noqa: E402
+from src.duckdb_gold.load_duckdb import DuckdbLoader  # noqa: E402
+from src.duckdb_gold.parity import compare  # noqa: E402
+from src.sqlite import load_sqlite  # noqa: E402
+from src.sqlite.load_sqlite import SqliteLoader  # noqa: E402
+
+# ─────────────────────────────────────────────────────────────
+# Silver sintético
+# ─────────────────────────────────────────────────────────────
+
+_TMP = Path(tempfile.mkdtemp(prefix="duckdb_gold_smoke_"))
+load_sqlite.DOCS_DIR = _TMP / "diagnostics"
+load_duckdb.DOCS_DIR = _TMP / "diagnostics"
+
+CUT_1 = "2031-03-03"
+CUT_2 = "2031-03-10"
+
+
+def _trip(id_viaje: str, d: int, t: int | None, o: str | None, o_comuna: str | None,
+          dest: str | None, tviaje: float, proposito: str | None = "TRABAJO",
+          contrato: str | None = "c1") -> dict:
+    return {
+        "id_viaje": id_viaje, "id_tarjeta": "T" + id_viaje, "tipo_dia": "LABORAL",
+        "proposito": proposito, "contrato": contrato, "factor_expansion": 1.5,
+        "n_etapas": 1, "distancia_eucl": 100.0, "distancia_ruta": 120.0, "tviaje_min": tviaje,
+        "date_start_sk": d, "time_start_30m_sk": t, "date_end_sk": d, "time_end_30m_sk": t,
+        "paradero_inicio_viaje": o, "paradero_fin_viaje": dest,
+        "comuna_inicio_viaje": o_comuna, "comuna_fin_viaje": None,
+        "zona_inicio_viaje": 1, "zona_fin_viaje": 2,
+        "periodo_inicio_viaje": "Punta", "periodo_fin_viaje": "Valle",
+    }
+
+
+def _leg(id_viaje: str, seq: int, d: int, service: str, mode: str, tv: float) -> dict:
+    return {
+        "id_viaje": id_viaje, "id_tarjeta": "T" + id_viaje, "leg_seq": seq,
+        "mode_code": mode, "service_code": service, "operator_code": "op1",
+        "board_stop_code": "PA1", "alight_stop_code": "pa2",
+        "date_board_sk": d, "time_board_30m_sk": 0, "date_alight_sk": d, "time_alight_30m_sk": 1,
+        "fare_period_alight_code": "punta", "zone_board": 1, "zone_alight": 2,
+        "tv_leg_min": tv, "tc_transfer_min": None, "te_wait_min": 2.0,
+    }
+
+
+def _etapa(id_etapa: str, d: int, operador: str | None, contrato: str | None,
+           tiene_bajada: bool | None) -> dict:
+    return {
+        "id_etapa": id_etapa, "operador": operador, "contrato": contrato,
+        "tipo_dia": "LABORAL", "tipo_transporte": "BUS", "fExpansionServicioPeriodoTS": 2.0,
+        "tiene_bajada": tiene_bajada, "tiempo_etapa": 600,
+        "date_board_sk": d, "time_board_30m_sk": 0, "date_alight_sk": d, "time_alight_30m_sk": 47,
+        "dist_ruta_paraderos": 900, "dist_eucl_paraderos": 700, "tEsperaMediaIntervalo": 3.5,
+        "parada_subida": "pa4", "parada_bajada": "PA3", "servicio_subida": "B01",
+        "servicio_bajada": "b02", "periodoSubida": "Punta", "periodoBajada": None,
+        "comuna_subida": "Centro", "comuna_bajada": "Sur", "zona_subida": 1, "zona_bajada": 3,
+    }
+
+
+def _write(path: Path, rows: list[dict], cut: Any) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(pa.Table.from_pylist([{"cut": cut, **r} for r in rows]), path)
+    return path
+
+
+def _part(dataset: str, cut: str, ptype: str, path: Path, day: int | None = None) -> dict:
+    return {"dataset": dataset, "cut": cut, "year": 2031, "month": 3,
+            "parquet_type": ptype, "path": path, "day": day, "compacted": False}
+
+
+def _silver() -> tuple[list[dict], list[dict]]:
+    """(partes del primer lote, partes del cut incremental CUT_2)."""
+    root = _TMP / "silver"
+    et_cut = "2031-03-03_2031-03-09"
+    first = [
+        _part("etapas", et_cut, "etapas_validation", _write(
+            root / "e1.parquet",
+            [_etapa("E1", 20310303, "op1", "c1", True), _etapa("E2", 20310303, None, "", None)],
+            et_cut), day=20310303),
+        _part("etapas", et_cut, "etapas_validation", _write(
+            root / "e2.parquet",
+            [_etapa("E1", 20310304, "op1", "c1", False), _etapa("E3", 20310304, "OP1 ", "C1", True)],
+            et_cut), day=20310304),
+        _part("subidas_30m", "2031-03", "subidas_30m", _write(
+            root / "s.parquet",
+            [{"tipo_dia": "LABORAL", "mode_code": "bus", "stop_code": " pa4", "comuna": "Centro",
+              "time_30m_sk": 0, "subidas_promedio": 10.0},
+             {"tipo_dia": "LABORAL", "mode_code": "BUS", "stop_code": "PA4", "comuna": None,
+              "time_30m_sk": 0, "subidas_promedio": 99.0},
+             {"tipo_dia": "LABORAL", "mode_code": "BUS", "stop_code": "PA4", "comuna": None,
+              "time_30m_sk": None, "subidas_promedio": 1.0},
+             {"tipo_dia": None, "mode_code": "METRO", "stop_code": None, "comuna": None,
+              "time_30m_sk": None, "subidas_promedio": 2.0}],
+            "2031-03")),
+        _part("viajes", CUT_1, "viajes_leg", _write(
+            root / "l1.parquet",
+            [_leg("V1", 1, 20310303, "b01", "bus", 5.0), _leg("V2", 1, 20310304, "B01", "METRO", 6.0),
+             _leg("V2", 1, 20310304, "B01", "METRO", 7.0), _leg("V3", 1, 20310303, "B01 ", "ZP", 8.0)],
+            datetime.date(2031, 3, 3))),
+        _part("viajes", CUT_1, "viajes_trip", _write(
+            root / "t1.parquet",
+            [_trip("V1", 20310303, 0, " pa1 ", "Centro", "PA2", 10.0),
+             _trip("V1", 20310303, 0, "PA1", "Centro", "PA2", 99.0),
+             _trip("V2", 20310304, 16, "PA1", "Norte", "pa2", 20.0, proposito=None, contrato=None),
+             _trip("V3", 20310305, 47, "PA1", "Centro", None, 30.0, proposito="trabajo ")],
+            datetime.date(2031, 3, 3))),
+    ]
+    second = [
+        _part("viajes", CUT_2, "viajes_trip", _write(
+            root / "t2.parquet",
+            [_trip("V9", 20310310, 20, "PA1", "Este", "PA2", 15.0)],
+            datetime.date(2031, 3, 10))),
+    ]
+    return first, second
+
+
+_FIRST, _SECOND = _silver()
+_SQLITE = _TMP / "gold.db"
+_DUCKDB = _TMP / "gold.duckdb"
+
+
+class _SqliteFixed(SqliteLoader):
+    parts: list[dict] = []
+
+    def _discover(self) -> list[dict]:
+        return self.parts
+
+
+class _DuckdbFixed(DuckdbLoader):
+    parts: list[dict] = []
+
+    def _discover(self) -> list[dict]:
+        return self.parts
+
+
+def _load(parts: list[dict], overwrite: bool) -> None:
+    _SqliteFixed.parts = parts
+    rc = _SqliteFixed(db_path=_SQLITE, dataset="all", cut=None, overwrite=overwrite,
+                      dry_run=False).run()
+    assert rc == 0, f"SqliteLoader rc={rc}"
+    _DuckdbFixed.parts = parts
+    rc = _DuckdbFixed(db_path=_DUCKDB, dataset="all", cut=None, overwrite=overwrite,
+                      dry_run=False).run()
+    assert rc == 0, f"DuckdbLoader rc={rc}"
+
+
+def _duck(sql: str) -> list[tuple]:
+    con = duckdb.connect(str(_DUCKDB), read_only=True)
+    try:
+        return con.execute(sql).fetchall()
+    finally:
+        con.close()
+
+
+def _assert_parity() -> None:
+    diffs = [r for r in compare(_SQLITE, _DUCKDB) if not r["match"]]
+    assert not diffs, [(r["table"], r["sample_only_sqlite"], r["sample_only_duckdb"]) for r in diffs]
+
+
+# ─────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────
+
+def test_parity_full_build() -> None:
+    """Carga completa: todas las tablas coinciden por claves naturales."""
+    _load(_FIRST, overwrite=True)
+    _assert_parity()
+
+
+def test_scd2_versions_contiguous() -> None:
+    """PA1: Centro → Norte → Centro abre 3 versiones contiguas, solo la última vigente."""
+    rows = _duck("""SELECT comuna, CAST(valid_from AS VARCHAR), CAST(valid_to AS VARCHAR), is_current
+                    FROM dim_stop WHERE stop_code = 'PA1' ORDER BY valid_from""")
+    assert [r[0] for r in rows] == ["Centro", "Norte", "Centro"], rows
+    assert [r[3] for r in rows] == [False, False, True], rows
+    for (_, _, valid_to, _), (_, valid_from, _, _) in zip(rows, rows[1:]):
+        nxt = datetime.date.fromisoformat(valid_from) - datetime.timedelta(days=1)
+        assert valid_to == nxt.isoformat(), rows
+
+
+def test_asof_resolves_version_of_event_day() -> None:
+    """fct_trip resuelve el stop vigente el día del viaje; franja 0 no se pierde."""
+    rows = _duck("""SELECT f.id_viaje, f.time_start_30m_sk, s.comuna, CAST(s.valid_from AS VARCHAR)
+                    FROM fct_trip f JOIN dim_stop s ON s.stop_sk = f.origin_stop_sk
+                    WHERE f.cut = '2031-03-03' ORDER BY f.id_viaje""")
+    assert rows == [("V1", 0, "Centro", "2031-03-03"),
+                    ("V2", 16, "Norte", "2031-03-04"),
+                    ("V3", 47, "Centro", "2031-03-05")], rows
+
+
+def test_grain_first_row_wins_and_rerun_is_noop() -> None:
+    """Duplicado de grain: gana la primera fila; re-cargar no inserta nada."""
+    assert _duck("SELECT tviaje_min FROM fct_trip WHERE id_viaje = 'V1'") == [(10.0,)]
+    assert _duck("SELECT tv_leg_min FROM fct_trip_leg WHERE id_viaje = 'V2'") == [(6.0,)]
+    # time_30m_sk NULL nunca colisiona (como el UNIQUE de SQLite)
+    assert _duck("SELECT COUNT(*) FROM fct_boardings_30m") == [(3,)]
+    before = _duck("SELECT COUNT(*) FROM fct_validation")
+    _load(_FIRST, overwrite=False)
+    assert _duck("SELECT COUNT(*) FROM fct_validation") == before
+    _assert_parity()
+
+
+def test_parity_incremental_cut() -> None:
+    """Un cut posterior cierra la versión vigente igual que load_sqlite."""
+    _load(_SECOND, overwrite=False)
+    _assert_parity()
+    rows = _duck("""SELECT comuna, CAST(valid_to AS VARCHAR), is_current FROM dim_stop
+                    WHERE stop_code = 'PA1' ORDER BY valid_from DESC LIMIT 2""")
+    assert rows == [("Este", None, True), ("Centro", "2031-03-09", False)], rows
+
+
+# ─────────────────────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────────────────────
+
+_ALL_TESTS = [
+    ("parity: full build matches SQLite",            test_parity_full_build),
+    ("scd2: contiguous versions, one current",       test_scd2_versions_contiguous),
+    ("asof: version of the event day + franja 0",    test_asof_resolves_version_of_event_day),
+    ("grain: first row wins, rerun is a no-op",      test_grain_first_row_wins_and_rerun_is_noop),
+    ("parity: incremental cut closes versions",      test_parity_incremental_cut),
+]
+
+
+def main() -> None:
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")  # type: ignore[attr-defined]
+    print("\n" + "=" * 50)
+    print("  Gold DuckDB -- Smoke Tests")
+    print("=" * 50 + "\n")
+
+    for name, fn in _ALL_TESTS:
+        _run(name, fn)
+
+    print(f"\n-- Results: {len(_PASSED)} passed, {len(_FAILED)} failed --")
+    if _FAILED:
+        print("\n-- Failures --")
+        for name, tb in _FAILED:
+            print(f"\nFAIL: {name}")
+            print(tb)
+        sys.exit(1)
+    else:
+        print("\nAll smoke tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+aggregates.py  —  Marts agregados de las facts Gold para Power BI.
+
+Las páginas de docs/powerbi agregan fct_trip / fct_validation /
+fct_boardings_30m en cada refresh. Estas tablas (ddl_gold_aggregates.sql)
+guardan esos agregados ya calculados, con cut_sk en el grain:
+
+    subidas_30m → dw.agg_demand_day_mode_30m   demanda por mes, tipo_dia, modo y franja
+    etapas      → dw.agg_coverage_bus_metro    validaciones BUS/METRO por día, franja y modo
+                                               + base subidas_estimadas (cobertura)
+    viajes      → dw.agg_od_comuna             matriz OD por comuna, día y tipo_dia
+
+GoldLoader llama refresh_cut() después de las facts de cada cut (step
+g:aggregates): DELETE del cut + INSERT ... SELECT GROUP BY desde la fact,
+todo en una transacción. Es idempotente, así que un cut re-cargado (--delta,
+--day, --replace-cut) recalcula su agregado completo. Al refrescar subidas
+también se recalcula subidas_estimadas de las coberturas de esos meses.
+
+Ejecución (backfill de cuts ya cargados, p.ej. al desplegar las tablas):
+    python -m src.gold.aggregates                        # todos los cuts de dim_cut
+    python -m src.gold.aggregates --dataset etapas
+    python -m src.gold.aggregates --dataset viajes --cut 2025-04-21
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+
+import pyodbc
+
+from src.gold.metrics import StepMetric, timed_step
+from src.gold.sql_helpers import execute_sql, fetch_df, get_connection, setup_logging
+
+log = logging.getLogger(__name__)
+
+# Universo comparable del KPI de cobertura (docs/powerbi/SOLUCION_PROBLEMA_COBERTURA_RECAUDACION.md)
+COMPARABLE_MODES = ("BUS", "METRO")
+
+# Orden de refresco en un backfill: la cobertura (etapas) lee la base de subidas
+DATASET_ORDER = ("subidas_30m", "etapas", "viajes")
+
+
+# ─────────────────────────────────────────────────────────────
+# SQL por agregado  (? = cut_sk)
+# ─────────────────────────────────────────────────────────────
+
+_DEMAND_SQL = """
+INSERT INTO dw.agg_demand_day_mode_30m
+    (cut_sk, month_date_sk, tipo_dia, mode_sk, time_30m_sk, subidas_promedio, n_stops)
+SELECT f.cut_sk, f.month_date_sk, f.tipo_dia, f.mode_sk, f.time_30m_sk,
+       SUM(f.subidas_promedio), COUNT(*)
+FROM dw.fct_boardings_30m f
+WHERE f.cut_sk = ?
+GROUP BY f.cut_sk, f.month_date_sk, f.tipo_dia, f.mode_sk, f.time_30m_sk
+"""
+
+_COMPARABLE_IN = ", ".join(f"'{c}'" for c in COMPARABLE_MODES)
+
+_COVERAGE_SQL = f"""
+INSERT INTO dw.agg_coverage_bus_metro
+    (cut_sk, date_board_sk, time_30m_sk, mode_sk, tipo_dia, validaciones, validaciones_exp)
+SELECT v.cut_sk, v.date_board_sk, v.time_board_30m_sk, v.mode_sk,
+       MAX(COALESCE(v.tipo_dia, d.tipo_dia)), COUNT(*), SUM(v.fexp_servicio)
+FROM dw.fct_validation v
+JOIN dw.dim_mode m
+  ON m.mode_sk = v.mode_sk
+ AND m.mode_code IN ({_COMPARABLE_IN})
+LEFT JOIN dw.dim_date d ON d.date_sk = v.date_board_sk
+WHERE v.cut_sk = ?
+  AND v.date_board_sk IS NOT NULL
+  AND v.time_board_30m_sk IS NOT NULL
+GROUP BY v.cut_sk, v.date_board_sk, v.time_board_30m_sk, v.mode_sk
+"""
+
+_OD_COMUNA_SQL = """
+INSERT INTO dw.agg_od_comuna
+    (cut_sk, date_start_sk, tipo_dia, comuna_origen, comuna_destino,
+     viajes, viajes_exp, etapas_sum, tviaje_min_sum, distancia_ruta_m_sum, n_medidos)
+SELECT t.cut_sk, t.date_start_sk, COALESCE(t.tipo_dia, d.tipo_dia), so.comuna, sd.comuna,
+       COUNT(*), SUM(t.factor_expansion), SUM(CAST(t.n_etapas AS INT)),
+       SUM(t.tviaje_min), SUM(t.distancia_ruta_m), COUNT(t.tviaje_min)
+FROM dw.fct_trip t
+LEFT JOIN dw.dim_date d  ON d.date_sk  = t.date_start_sk
+LEFT JOIN dw.dim_stop so ON so.stop_sk = t.origin_stop_sk
+LEFT JOIN dw.dim_stop sd ON sd.stop_sk = t.dest_stop_sk
+WHERE t.cut_sk = ?
+GROUP BY t.cut_sk, t.date_start_sk, COALESCE(t.tipo_dia, d.tipo_dia), so.comuna, sd.comuna
+"""
+
+# {dataset: [(agg, INSERT ... SELECT del cut)]}
+AGGREGATES: dict[str, list[tuple[str, str]]] = {
+    "subidas_30m": [("dw.agg_demand_day_mode_30m", _DEMAND_SQL)],
+    "etapas":      [("dw.agg_coverage_bus_metro",  _COVERAGE_SQL)],
+    "viajes":      [("dw.agg_od_comuna",           _OD_COMUNA_SQL)],
+}
+
+# Base de la cobertura: subidas_promedio del último cut de subidas de cada mes
+# (un cut re-publicado reemplaza al anterior). Sin subidas para el mes → NULL.
+_COVERAGE_BASE_SQL = """
+WITH base AS (
+    SELECT a.month_date_sk, a.tipo_dia, a.mode_sk, a.time_30m_sk, a.subidas_promedio,
+           a.cut_sk, MAX(a.cut_sk) OVER (PARTITION BY a.month_date_sk) AS last_cut_sk
+    FROM dw.agg_demand_day_mode_30m a
+)
+UPDATE c
+SET subidas_estimadas = b.subidas_promedio,
+    refreshed_at      = SYSUTCDATETIME()
+FROM dw.agg_coverage_bus_metro c
+LEFT JOIN base b
+  ON b.cut_sk        = b.last_cut_sk
+ AND b.month_date_sk = c.date_board_sk / 100 * 100 + 1
+ AND b.tipo_dia      = c.tipo_dia
+ AND b.mode_sk       = c.mode_sk
+ AND b.time_30m_sk   = c.time_30m_sk
+WHERE {where}
+"""
+
+# Coberturas a recalcular al refrescar un cut de cada dataset
+_COVERAGE_BASE_SCOPE: dict[str, str] = {
+    "etapas":      "c.cut_sk = ?",
+    "subidas_30m": (
+        "c.date_board_sk / 100 * 100 + 1 IN "
+        "(SELECT month_date_sk FROM dw.agg_demand_day_mode_30m WHERE cut_sk = ?)"
+    ),
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# Refresco por cut
+# ─────────────────────────────────────────────────────────────
+
+def refresh_cut(
+    conn: pyodbc.Connection,
+    dataset: str,
+    cut_sk: int,
+    steps: list[StepMetric] | None = None,
+) -> dict[str, int]:
+    """
+    Recalcula los agg_* de `dataset` para `cut_sk` en una transacción.
+    Devuelve {agg: filas insertadas}; cada agg queda como detalle del step
+    g:aggregates en `steps`. Ante error hace rollback y re-lanza.
+    """
+    counts: dict[str, int] = {}
+    try:
+        for table, insert_sql in AGGREGATES.get(dataset, []):
+            with timed_step(steps, "g:aggregates", table) as m:
+                execute_sql(conn, f"DELETE FROM {table} WHERE cut_sk = ?", (cut_sk,), commit=False).close()
+                cursor = execute_sql(conn, insert_sql, (cut_sk,), commit=False)
+                m.rows = counts[table] = max(cursor.rowcount, 0)
+                cursor.close()
+        scope = _COVERAGE_BASE_SCOPE.get(dataset)
+        if scope is not None:
+            with timed_step(steps, "g:aggregates", "dw.agg_coverage_bus_metro", "subidas_estimadas") as m:
+                cursor = execute_sql(
+                    conn, _COVERAGE_BASE_SQL.format(where=scope), (cut_sk,), commit=False,
+                )
+                m.rows = max(cursor.rowcount, 0)
+                cursor.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counts
+
+
+def rebuild(
+    conn: pyodbc.Connection,
+    datasets: list[str] | None = None,
+    cut_id: str | None = None,
+) -> int:
+    """Backfill: refresh_cut() de cada cut de dw.dim_cut (subidas primero). Devuelve cuts refrescados."""
+    cuts = fetch_df(conn, "SELECT cut_sk, dataset_name, cut_id FROM dw.dim_cut")
+    order = {ds: i for i, ds in enumerate(DATASET_ORDER)}
+    cuts = cuts[cuts["dataset_name"].isin(datasets or DATASET_ORDER)]
+    if cut_id is not None:
+        cuts = cuts[cuts["cut_id"] == cut_id]
+    cuts = cuts.assign(_order=cuts["dataset_name"].map(order)).sort_values(["_order", "cut_sk"])
+
+    for row in cuts.itertuples(index=False):
+        t0 = time.monotonic()
+        counts = refresh_cut(conn, row.dataset_name, int(row.cut_sk))
+        log.info(
+            "agregados %s/%s (cut_sk=%d): %s en %.1fs",
+            row.dataset_name, row.cut_id, row.cut_sk,
+            ", ".join(f"{t}={n}" for t, n in counts.items()), time.monotonic() - t0,
+        )
+    return len(cuts)
+
+
+# ─────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.gold.aggregates",
+        description="Recalcula los marts agregados dw.agg_* desde las facts Gold (backfill por cut).",
+    )
+    p.add_argument(
+        "--dataset",
+        choices=list(DATASET_ORDER) + ["all"],
+        default="all",
+        help="Dataset cuyos cuts se refrescan. (default: all)",
+    )
+    p.add_argument(
+        "--cut",
+        default=None,
+        help="Solo este cut_id (ej. 2025-04-21). (default: todos)",
+    )
+    p.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Nivel de logging. (default: INFO)",
+    )
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    setup_logging(args.log_level)
+    datasets = None if args.dataset == "all" else [args.dataset]
+
+    conn = get_connection()
+    try:
+        n = rebuild(conn, datasets, args.cut)
+    finally:
+        conn.close()
+    if n == 0:
+        log.warning("Ningún cut en dw.dim_cut para dataset=%s cut=%s", args.dataset, args.cut)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
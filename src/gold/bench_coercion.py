@@ -0,0 +1,202 @@
+"""
+bench_coercion.py  —  Micro-benchmark de la coerción y el row_hash SCD2.
+
+Compara, sobre candidatos sintéticos con la forma de _stop_candidates /
+_service_candidates (columnas object, nulos como None, coords float):
+  per_value   _row_hash por fila + _sanitize_val por celda (camino anterior)
+  columnar    _row_hashes + _coerce_columns (una pasada por columna)
+y verifica que ambos entreguen exactamente los mismos hashes y valores.
+
+Por dimensión y tamaño: mediana de `--repeat` ejecuciones (tras un warm-up),
+en ms, y filas/s. No requiere SQL Server.
+
+Ejecución:
+    python -m src.gold.bench_coercion
+    python -m src.gold.bench_coercion --rows 1000 --rows 100000 --repeat 5
+
+Salida: tabla en el log y docs/diagnostics/coercion_benchmark.json.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from src.gold.load_gold import (
+    _SCD2_SCHEMA,
+    SCD2_DIMS,
+    _coerce_columns,
+    _row_hash,
+    _row_hashes,
+    _sanitize_val,
+)
+from src.gold.sql_helpers import setup_logging
+
+log = logging.getLogger(__name__)
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REPORT_PATH   = _PROJECT_ROOT / "docs" / "diagnostics" / "coercion_benchmark.json"
+
+DEFAULT_ROWS = (1_000, 10_000, 100_000)
+
+_COMUNAS = ("SANTIAGO", "PROVIDENCIA", "MAIPU", "LA FLORIDA", "PUENTE ALTO", "ÑUÑOA", None)
+_MODES   = ("BUS", "METRO", "METROTREN", " bus ", None)
+
+
+# ─────────────────────────────────────────────────────────────
+# Candidatos sintéticos
+# ─────────────────────────────────────────────────────────────
+
+def make_candidates(dim_table: str, rows: int, seed: int = 42) -> pd.DataFrame:
+    """Candidatos SCD2 de `dim_table` (BK + atributos) con nulos y valores sucios."""
+    rnd = random.Random(seed)
+    if dim_table == "dw.dim_stop":
+        df = pd.DataFrame({
+            "stop_code": [f"PA{i}" for i in range(rows)],
+            "stop_name": [None] * rows,
+            "stop_type": [None] * rows,
+            "comuna":    [rnd.choice(_COMUNAS) for _ in range(rows)],
+            "zone_code": [rnd.choice((None, str(rnd.randint(1, 40)), f" {rnd.randint(1, 40)} ")) for _ in range(rows)],
+            "x_utm":     [rnd.choice((None, float(rnd.randint(330_000, 365_000)), rnd.uniform(330_000, 365_000))) for _ in range(rows)],
+            "y_utm":     [rnd.choice((None, float(rnd.randint(6_270_000, 6_310_000)), str(rnd.randint(6_270_000, 6_310_000)))) for _ in range(rows)],
+        })
+    else:
+        df = pd.DataFrame({
+            "service_code": [f"{rnd.choice('BCDEFGHIJ')}{i:03d}" for i in range(rows)],
+            "service_name": [None] * rows,
+            "mode_code":    [rnd.choice(_MODES) for _ in range(rows)],
+        })
+    return df.astype(object).where(pd.notna(df), None)
+
+
+# ─────────────────────────────────────────────────────────────
+# Caminos a comparar
+# ─────────────────────────────────────────────────────────────
+
+def per_value(df: pd.DataFrame, dim_table: str, attr_cols: list[str]) -> tuple[list[str], list[list[Any]]]:
+    schema = _SCD2_SCHEMA.get(dim_table, {})
+    hashes = [_row_hash(r, attr_cols) for r in df.to_dict("records")]
+    clean = [[_sanitize_val(v, schema.get(c, "str")) for v in df[c].tolist()] for c in attr_cols]
+    return hashes, clean
+
+
+def columnar(df: pd.DataFrame, dim_table: str, attr_cols: list[str]) -> tuple[list[str], list[list[Any]]]:
+    coerced = _coerce_columns(df, dim_table, attr_cols)
+    return _row_hashes(df, attr_cols), [coerced[c] for c in attr_cols]
+
+
+PATHS: dict[str, Callable[[pd.DataFrame, str, list[str]], tuple[list[str], list[list[Any]]]]] = {
+    "per_value": per_value,
+    "columnar":  columnar,
+}
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> list[float]:
+    fn()                                           # warm-up
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings
+
+
+def run_benchmark(sizes: list[int], repeat: int) -> list[dict]:
+    results = []
+    for dim_table, (_, attr_cols) in SCD2_DIMS.items():
+        for rows in sizes:
+            df = make_candidates(dim_table, rows)
+            expected = per_value(df, dim_table, attr_cols)
+            if columnar(df, dim_table, attr_cols) != expected:
+                raise AssertionError(f"{dim_table} ({rows} filas): columnar difiere de per_value")
+            entry: dict = {"dim_table": dim_table, "rows": rows}
+            for name, path in PATHS.items():
+                timings = _time(lambda: path(df, dim_table, attr_cols), repeat)
+                median = statistics.median(timings)
+                entry[name] = {
+                    "median_ms":   round(median, 2),
+                    "min_ms":      round(min(timings), 2),
+                    "rows_per_s":  round(rows / (median / 1000)) if median else None,
+                }
+            pv, col = entry["per_value"]["median_ms"], entry["columnar"]["median_ms"]
+            entry["speedup"] = round(pv / col, 2) if pv and col else None
+            log.info(
+                "%-15s %9s filas  per_value=%9.2f ms  columnar=%8.2f ms  speedup=%sx",
+                dim_table, f"{rows:,}", pv, col, entry["speedup"],
+            )
+            results.append(entry)
+    return results
+
+
+# ─────────────────────────────────────────────────────────────
+# CLI entry point
+# ─────────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.gold.bench_coercion",
+        description="Compara coerción + row_hash SCD2 por valor vs columnar (mismos resultados).",
+    )
+    p.add_argument(
+        "--rows",
+        dest="sizes",
+        type=int,
+        action="append",
+        default=None,
+        help=f"Candidatos por dimensión. Repetible. (default: {', '.join(map(str, DEFAULT_ROWS))})",
+    )
+    p.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Ejecuciones medidas por camino y tamaño, tras un warm-up. (default: 5)",
+    )
+    p.add_argument(
+        "--output",
+        type=Path,
+        default=REPORT_PATH,
+        help=f"Reporte JSON. (default: {REPORT_PATH.relative_to(_PROJECT_ROOT)})",
+    )
+    p.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Nivel de logging. (default: INFO)",
+    )
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    setup_logging(args.log_level)
+    # Los valores sucios del set sintético disparan los warnings de cast en cada repetición
+    logging.getLogger("src.gold.load_gold").setLevel(logging.ERROR)
+
+    sizes = args.sizes or list(DEFAULT_ROWS)
+    results = run_benchmark(sizes, max(1, args.repeat))
+
+    speedups = [r["speedup"] for r in results if r["speedup"]]
+    report = {
+        "generated_at":   datetime.now(timezone.utc).isoformat(),
+        "repeat":         args.repeat,
+        "median_speedup": round(statistics.median(speedups), 2) if speedups else None,
+        "results":        results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    log.info("Benchmark listo | speedup mediano=%sx → %s", report["median_speedup"], args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
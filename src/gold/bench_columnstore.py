@@ -0,0 +1,327 @@
+"""
+bench_columnstore.py  —  Benchmark rowstore vs columnstore de las facts Gold.
+
+Copia las facts dw.fct_* a dos esquemas con el mismo contenido:
+  bench_rowstore      PK clustered + índices nonclustered de ddl_gold.sql
+  bench_columnstore   CLUSTERED COLUMNSTORE (perfil ddl_gold_columnstore.sql)
+y ejecuta sobre ambos las consultas de docs/queries/*.sql (agregados tipo
+Power BI: SUM/COUNT por franja, paradero, OD, modo, comuna), reemplazando
+dw.fct_* por el esquema de cada layout. Las dims se leen siempre de dw.
+
+Por consulta: mediana de `--repeat` ejecuciones (tras un warm-up), en ms,
+fetch completo del resultado. Con --cold se vacía el buffer pool antes de
+cada ejecución (requiere sysadmin).
+
+Ejecución:
+    python -m src.gold.bench_columnstore
+    python -m src.gold.bench_columnstore --max-rows 2000000 --repeat 5
+    python -m src.gold.bench_columnstore --no-copy --keep   # reutiliza las copias
+
+Salida: tabla en el log y docs/diagnostics/columnstore_benchmark.json.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import re
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pyodbc
+
+from src.gold.sql_helpers import (
+    _split_sql_statements,
+    execute_sql,
+    execute_sql_scalar,
+    fetch_df,
+    get_connection,
+    setup_logging,
+)
+
+log = logging.getLogger(__name__)
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+QUERIES_DIR   = _PROJECT_ROOT / "docs" / "queries"
+REPORT_PATH   = _PROJECT_ROOT / "docs" / "diagnostics" / "columnstore_benchmark.json"
+
+FACTS = ("fct_trip", "fct_trip_leg", "fct_validation", "fct_boardings_30m")
+
+# Índices de cada layout ({t} = tabla copiada). Rowstore replica ddl_gold.sql
+# (PK clustered + IX_*); columnstore replica ddl_gold_columnstore.sql (CCI,
+# el UNIQUE de grain no participa en las consultas de lectura).
+LAYOUTS: dict[str, dict[str, list[str]]] = {
+    "bench_rowstore": {
+        "fct_trip": [
+            "ALTER TABLE {t} ADD PRIMARY KEY CLUSTERED (trip_sk)",
+            "CREATE NONCLUSTERED INDEX IX_date_start ON {t} (date_start_sk, cut_sk)"
+            " INCLUDE (origin_stop_sk, dest_stop_sk, n_etapas)",
+            "CREATE NONCLUSTERED INDEX IX_origin_stop ON {t} (origin_stop_sk, date_start_sk)",
+            "CREATE NONCLUSTERED INDEX IX_cut ON {t} (cut_sk)",
+        ],
+        "fct_trip_leg": [
+            "ALTER TABLE {t} ADD PRIMARY KEY CLUSTERED (trip_leg_sk)",
+            "CREATE NONCLUSTERED INDEX IX_viaje ON {t} (id_viaje, leg_seq, cut_sk)",
+            "CREATE NONCLUSTERED INDEX IX_board_date ON {t} (date_board_sk, board_stop_sk)",
+        ],
+        "fct_validation": [
+            "ALTER TABLE {t} ADD PRIMARY KEY CLUSTERED (validation_sk)",
+            "CREATE NONCLUSTERED INDEX IX_board_stop ON {t} (board_stop_sk, date_board_sk)",
+            "CREATE NONCLUSTERED INDEX IX_service ON {t} (service_board_sk, date_board_sk)",
+            "CREATE NONCLUSTERED INDEX IX_cut ON {t} (cut_sk)",
+        ],
+        "fct_boardings_30m": [
+            "ALTER TABLE {t} ADD PRIMARY KEY CLUSTERED (boardings_30m_sk)",
+            "CREATE NONCLUSTERED INDEX IX_stop_time ON {t} (stop_sk, time_30m_sk, month_date_sk)",
+        ],
+    },
+    "bench_columnstore": {
+        fact: ["CREATE CLUSTERED COLUMNSTORE INDEX CCI ON {t}"] for fact in FACTS
+    },
+}
+
+_FACT_REF = re.compile(r"\bdw\.(fct_\w+)", re.IGNORECASE)
+_QUERY_ID = re.compile(r"--\s*(Q\d+)\s*:\s*(.*)")
+
+
+# ─────────────────────────────────────────────────────────────
+# Copias por layout
+# ─────────────────────────────────────────────────────────────
+
+def build_layouts(conn: pyodbc.Connection, max_rows: int | None) -> None:
+    """(Re)crea bench_rowstore.* y bench_columnstore.* desde dw.fct_*."""
+    top = f"TOP ({int(max_rows)}) " if max_rows else ""
+    for schema, indexes in LAYOUTS.items():
+        execute_sql(
+            conn,
+            f"IF NOT EXISTS (SELECT 1 FROM sys.schemas WHERE name = '{schema}')"
+            f" EXEC sp_executesql N'CREATE SCHEMA {schema}'",
+        ).close()
+        for fact in FACTS:
+            table = f"{schema}.{fact}"
+            t0 = time.monotonic()
+            execute_sql(conn, f"DROP TABLE IF EXISTS {table}").close()
+            # Mismo subconjunto en ambos layouts: TOP ordenado por la PK de la fact
+            order = "ORDER BY 1" if max_rows else ""
+            execute_sql(conn, f"SELECT {top}* INTO {table} FROM dw.{fact} {order}").close()
+            for ddl in indexes[fact]:
+                execute_sql(conn, ddl.format(t=table)).close()
+            rows = execute_sql_scalar(conn, f"SELECT COUNT_BIG(*) FROM {table}") or 0
+            log.info("%s: %s filas en %.1fs", table, f"{rows:,}", time.monotonic() - t0)
+
+
+def drop_layouts(conn: pyodbc.Connection) -> None:
+    for schema in LAYOUTS:
+        for fact in FACTS:
+            execute_sql(conn, f"DROP TABLE IF EXISTS {schema}.{fact}").close()
+        execute_sql(
+            conn,
+            f"IF EXISTS (SELECT 1 FROM sys.schemas WHERE name = '{schema}')"
+            f" EXEC sp_executesql N'DROP SCHEMA {schema}'",
+        ).close()
+
+
+def layout_sizes(conn: pyodbc.Connection) -> dict[str, dict[str, float]]:
+    """MB reservados por tabla copiada (todas las particiones e índices)."""
+    df = fetch_df(
+        conn,
+        """
+        SELECT OBJECT_SCHEMA_NAME(object_id) AS schema_name, OBJECT_NAME(object_id) AS table_name,
+               SUM(reserved_page_count) * 8 / 1024.0 AS reserved_mb
+        FROM sys.dm_db_partition_stats
+        WHERE OBJECT_SCHEMA_NAME(object_id) IN ('bench_rowstore', 'bench_columnstore')
+        GROUP BY object_id
+        """,
+    )
+    sizes: dict[str, dict[str, float]] = {schema: {} for schema in LAYOUTS}
+    for r in df.itertuples(index=False):
+        sizes[r.schema_name][r.table_name] = round(float(r.reserved_mb), 1)
+    return sizes
+
+
+# ─────────────────────────────────────────────────────────────
+# Consultas
+# ─────────────────────────────────────────────────────────────
+
+def load_queries(queries_dir: Path = QUERIES_DIR) -> list[dict[str, str]]:
+    """Statements de docs/queries/*.sql que leen alguna fact, con su id (Q1..)."""
+    queries: list[dict[str, str]] = []
+    for path in sorted(queries_dir.glob("*.sql")):
+        for stmt in _split_sql_statements(path.read_text(encoding="utf-8")):
+            if not _FACT_REF.search(stmt):
+                continue
+            m = _QUERY_ID.search(stmt)
+            if m:
+                qid, title = m.group(1), m.group(2).strip()
+            else:  # consulta auxiliar sin "-- Qn:" → primer comentario como título
+                comment = next((l.strip("- ") for l in stmt.splitlines() if l.startswith("--")), "")
+                qid, title = f"{path.stem}#{len(queries) + 1}", comment
+            queries.append({"id": qid, "title": title, "file": path.name, "sql": stmt})
+    return queries
+
+
+def _run_once(conn: pyodbc.Connection, sql: str, cold: bool) -> tuple[float, int]:
+    if cold:
+        execute_sql(conn, "CHECKPOINT; DBCC DROPCLEANBUFFERS WITH NO_INFOMSGS;").close()
+    cursor = conn.cursor()
+    t0 = time.perf_counter()
+    cursor.execute(sql)
+    rows = 0
+    while True:
+        if cursor.description is not None:
+            rows += len(cursor.fetchall())
+        if not cursor.nextset():
+            break
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    cursor.close()
+    conn.commit()
+    return elapsed_ms, rows
+
+
+def run_benchmark(
+    conn: pyodbc.Connection,
+    queries: list[dict[str, str]],
+    repeat: int,
+    cold: bool,
+) -> list[dict]:
+    results = []
+    for q in queries:
+        entry: dict = {"id": q["id"], "title": q["title"], "file": q["file"]}
+        for schema in LAYOUTS:
+            sql = _FACT_REF.sub(lambda m: f"{schema}.{m.group(1)}", q["sql"])
+            try:
+                _run_once(conn, sql, cold)                     # warm-up / plan cache
+                timings, rows = [], 0
+                for _ in range(repeat):
+                    ms, rows = _run_once(conn, sql, cold)
+                    timings.append(ms)
+                entry[schema] = {
+                    "median_ms": round(statistics.median(timings), 1),
+                    "min_ms":    round(min(timings), 1),
+                    "rows":      rows,
+                }
+            except pyodbc.Error as exc:
+                conn.rollback()
+                log.warning("%s [%s] falló: %s", q["id"], schema, exc.args[-1] if exc.args else exc)
+                entry[schema] = {"error": str(exc)[:500]}
+        rs = entry["bench_rowstore"].get("median_ms")
+        cs = entry["bench_columnstore"].get("median_ms")
+        entry["speedup"] = round(rs / cs, 2) if rs and cs else None
+        log.info(
+            "%-5s rowstore=%8s ms  columnstore=%8s ms  speedup=%sx  %s",
+            q["id"], rs, cs, entry["speedup"], q["title"][:60],
+        )
+        results.append(entry)
+    return results
+
+
+# ─────────────────────────────────────────────────────────────
+# CLI entry point
+# ─────────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.gold.bench_columnstore",
+        description="Compara consultas agregadas (docs/queries) sobre facts rowstore vs columnstore.",
+    )
+    p.add_argument(
+        "--max-rows",
+        dest="max_rows",
+        type=int,
+        default=None,
+        help="Copiar como máximo N filas por fact (default: todas).",
+    )
+    p.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Ejecuciones medidas por consulta y layout, tras un warm-up. (default: 3)",
+    )
+    p.add_argument(
+        "--query",
+        dest="query_ids",
+        action="append",
+        default=None,
+        metavar="QN",
+        help="Solo las consultas indicadas (ej. Q1). Repetible.",
+    )
+    p.add_argument(
+        "--cold",
+        action="store_true",
+        help="DBCC DROPCLEANBUFFERS antes de cada ejecución (lectura desde disco; requiere sysadmin).",
+    )
+    p.add_argument(
+        "--copy",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="(Re)crear las copias bench_* desde dw (default: sí). --no-copy reutiliza las existentes.",
+    )
+    p.add_argument(
+        "--keep",
+        action="store_true",
+        help="No eliminar los esquemas bench_* al terminar.",
+    )
+    p.add_argument(
+        "--output",
+        type=Path,
+        default=REPORT_PATH,
+        help=f"Reporte JSON. (default: {REPORT_PATH.relative_to(_PROJECT_ROOT)})",
+    )
+    p.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Nivel de logging. (default: INFO)",
+    )
+    return p
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    setup_logging(args.log_level)
+
+    queries = load_queries()
+    if args.query_ids:
+        wanted = {q.upper() for q in args.query_ids}
+        queries = [q for q in queries if q["id"].upper() in wanted]
+    if not queries:
+        log.warning("No hay consultas sobre dw.fct_* en %s", QUERIES_DIR)
+        return 0
+    log.info("Consultas a medir: %d | repeat=%d | cold=%s", len(queries), args.repeat, args.cold)
+
+    conn = get_connection()
+    try:
+        if args.copy:
+            build_layouts(conn, args.max_rows)
+        sizes = layout_sizes(conn)
+        results = run_benchmark(conn, queries, max(1, args.repeat), args.cold)
+        if not args.keep:
+            drop_layouts(conn)
+    finally:
+        conn.close()
+
+    speedups = [r["speedup"] for r in results if r["speedup"]]
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "max_rows":     args.max_rows,
+        "repeat":       args.repeat,
+        "cold":         args.cold,
+        "sizes_mb":     sizes,
+        "median_speedup": round(statistics.median(speedups), 2) if speedups else None,
+        "queries":      results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    log.info(
+        "Benchmark listo | consultas=%d  speedup mediano=%sx | tamaños MB=%s → %s",
+        len(results), report["median_speedup"], sizes, args.output,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
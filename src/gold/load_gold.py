@@ -10,48 +10,91 @@ Flujo por partición:
      c. Upsert dims simples: dim_fare_period, dim_purpose, dim_operator_contract.
      d. SCD2 upsert: dim_stop, dim_service.
      e. MERGE facts desde staging JOIN dims (set-based, idempotente por grain).
+     f. Refrescar los marts agregados dw.agg_* del cut (Power BI).
 
 Ejecución:
     python -m src.gold.load_gold --cut 2025-04-21
     python -m src.gold.load_gold --dataset etapas
     python -m src.gold.load_gold --dataset all
     python -m src.gold.load_gold --dataset all --dry-run
+    python -m src.gold.load_gold --dataset etapas --day 20250423   # re-run de un día
+    python -m src.gold.load_gold --cut 2025-04-21 --delta           # solo delta CDC
+    python -m src.gold.load_gold --dataset etapas --fact-workers 3  # facts de 3 cuts en paralelo
+    python -m src.gold.load_gold --dataset viajes --resume          # retomar un cut fallido
+    python -m src.gold.load_gold --dataset all --staging memory     # staging in-memory (SCHEMA_ONLY)
+    python -m src.gold.load_gold --dataset viajes --multi-cut       # dims de la semana en un lote
+    python -m src.gold.load_gold --dataset all --force-ddl          # re-aplicar DDL sin mirar la versión
+    python -m src.gold.load_gold --dataset all --no-aggregates      # sin refrescar los marts dw.agg_*
+    python -m src.gold.load_gold --dataset all --metrics-dir /var/lib/node_exporter/textfile  # métricas por step
 """
 
 from __future__ import annotations
 
 import argparse
 import hashlib
+import itertools
 import json
 import logging
 import math
+import os
+import shutil
 import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
 import duckdb
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyodbc
 
 from src.gold.sql_helpers import (
+    ConnectionPool,
+    DDL_AGGREGATES_PATH,
+    DDL_COLUMNSTORE_PATH,
+    DDL_PARTITIONING_PATH,
     DDL_PATH,
+    DDL_STAGING_MEMORY_PATH,
+    bcp_file,
     begin_tx,
     build_lookup_dict,
+    bulk_dirs,
     bulk_insert,
+    bulk_insert_arrow,
+    bulk_insert_file,
     commit_tx,
+    ddl_version,
     exec_scalar,
     execute_sql,
     execute_sql_file,
     execute_sql_scalar,
     fetch_df,
-    get_connection,
+    fetch_schema_versions,
+    record_schema_version,
     rollback_tx,
+    run_pipeline,
+    server_path,
     setup_logging,
     upsert_lookup_dim,
 )
+from src.gold.aggregates import refresh_cut as refresh_cut_aggregates
+from src.gold.metrics import (
+    METRICS_DIR,
+    CutMetrics,
+    StepMetric,
+    parquet_bytes,
+    timed_step,
+    write_snapshots,
+)
+from src.silver.cdc import CDC_SPECS
+from src.silver.manifest import Snapshot, current_output_dir, load_snapshot
 
 log = logging.getLogger(__name__)
 
@@ -61,6 +104,145 @@ LOADER_VERSION  = "2.0.0"  # bump al cambiar lógica de carga
 
 SUPPORTED_DATASETS = ("viajes", "etapas", "subidas_30m")
 
+# Largo de etl_run_log.cut / etl_run_checkpoint.cut (VARCHAR(40))
+RUN_LABEL_MAX = 40
+
+# Filas por RecordBatch Arrow en el streaming Silver → staging (memoria acotada)
+STAGING_BATCH_ROWS = 500_000
+# Ítems listos en cola entre el lector (DuckDB) y el escritor (SQL Server) del staging
+STAGING_PIPELINE_DEPTH = 2
+# Tamaño mínimo de un rango del staging paralelo (--stage-workers)
+STAGING_MIN_RANGE_ROWS = 250_000
+# Staging: fast_executemany (Arrow → ODBC) o archivos de texto vía BULK INSERT / bcp
+STAGE_METHODS = ("executemany", "bulk", "bcp")
+# Filas por archivo con --stage-method bulk|bcp (un batch, un checkpoint por archivo)
+STAGING_FILE_ROWS = 1_000_000
+# Estrategias SCD2 para dim_stop/dim_service: batch en el servidor o fila a fila
+SCD2_MODES = ("set", "row")
+# Resolución de SKs de facts: MERGE en SQL Server o DuckDB (--keys local)
+KEY_RESOLUTIONS = ("server", "local")
+LOCAL_KEY_DATASETS = ("viajes", "etapas")
+# Particionado de facts por cut_sk (ddl_gold_partitioning.sql)
+PARTITION_FUNCTION = "pf_cut_sk"
+PARTITION_SCHEME   = "ps_cut_sk"
+# Perfil de almacenamiento de facts; con columnstore los inserts van en lotes de
+# al menos un rowgroup comprimible (102.400 filas)
+STORAGE_PROFILES = ("rowstore", "columnstore")
+COLUMNSTORE_MIN_ROWGROUP_ROWS = 102_400
+# Perfil de las tablas stg_*: heaps en disco o memory-optimized SCHEMA_ONLY
+# (ddl_gold_staging_memory.sql)
+STAGING_PROFILES = ("disk", "memory")
+
+# staging.stg_viajes_*.cut es DATE (en el Parquet es VARCHAR 'YYYY-MM-DD')
+_STG_VIAJES_CASTS = {"cut": "DATE"}
+
+STAGING_TABLES: dict[str, list[str]] = {
+    "viajes":      ["staging.stg_viajes_trip", "staging.stg_viajes_leg"],
+    "etapas":      ["staging.stg_etapas_validation"],
+    "subidas_30m": ["staging.stg_subidas_30m"],
+}
+
+# Facts por dataset en orden de carga (legs resuelven trip_sk contra dw.fct_trip)
+FACT_TABLES: dict[str, list[str]] = {
+    "viajes":      ["dw.fct_trip", "dw.fct_trip_leg"],
+    "etapas":      ["dw.fct_validation"],
+    "subidas_30m": ["dw.fct_boardings_30m"],
+}
+
+# Staging del que lee cada fact (reserva de IDENTITY con --fact-workers)
+FACT_STAGING: dict[str, str] = {
+    "dw.fct_trip":         "staging.stg_viajes_trip",
+    "dw.fct_trip_leg":     "staging.stg_viajes_leg",
+    "dw.fct_validation":   "staging.stg_etapas_validation",
+    "dw.fct_boardings_30m": "staging.stg_subidas_30m",
+}
+
+# Columnas de cada tabla staging (proyección Parquet → staging)
+STAGING_COLUMNS: dict[str, list[str]] = {
+    "staging.stg_viajes_trip": [
+        "cut","year","month","id_viaje","id_tarjeta","tipo_dia","proposito","contrato",
+        "factor_expansion","n_etapas","distancia_eucl","distancia_ruta",
+        "tiempo_inicio_viaje","tiempo_fin_viaje",
+        "date_start_sk","time_start_30m_sk","date_end_sk","time_end_30m_sk",
+        "paradero_inicio_viaje","paradero_fin_viaje",
+        "comuna_inicio_viaje","comuna_fin_viaje",
+        "zona_inicio_viaje","zona_fin_viaje",
+        "periodo_inicio_viaje","periodo_fin_viaje","tviaje_min",
+    ],
+    "staging.stg_viajes_leg": [
+        "cut","year","month","id_viaje","id_tarjeta","leg_seq","mode_code",
+        "service_code","operator_code","board_stop_code","alight_stop_code",
+        "ts_board","ts_alight",
+        "date_board_sk","time_board_30m_sk","date_alight_sk","time_alight_30m_sk",
+        "fare_period_alight_code","zone_board","zone_alight",
+        "tv_leg_min","tc_transfer_min","te_wait_min",
+    ],
+    "staging.stg_etapas_validation": [
+        "cut","year","month","id_etapa","operador","contrato","tipo_dia","tipo_transporte",
+        "fExpansionServicioPeriodoTS","tiene_bajada","tiempo_subida","tiempo_bajada","tiempo_etapa",
+        "date_board_sk","time_board_30m_sk","date_alight_sk","time_alight_30m_sk",
+        "x_subida","y_subida","x_bajada","y_bajada",
+        "dist_ruta_paraderos","dist_eucl_paraderos",
+        "servicio_subida","servicio_bajada","parada_subida","parada_bajada",
+        "comuna_subida","comuna_bajada","zona_subida","zona_bajada",
+        "tEsperaMediaIntervalo","periodoSubida","periodoBajada",
+    ],
+    "staging.stg_subidas_30m": [
+        "cut","year","month","tipo_dia","mode_code","stop_code","comuna","time_30m_sk","subidas_promedio",
+    ],
+}
+
+# Prefiltro DuckDB antes del staging de las facts que el MERGE deduplica por
+# grain: {tabla: (fact, efectivo, filtro de filas, grain, orden del dedup)}.
+# A SQL Server solo viaja la fila que el MERGE insertaría (rn = 1, sin efectivo);
+# efectivo y distinct_grain se cuentan sobre el Parquet completo (preflight).
+STAGING_PREFILTER: dict[str, tuple[str, str | None, str | None, str, str | None]] = {
+    "staging.stg_viajes_trip": (
+        "fct_trip", "id_tarjeta IS NULL", "id_tarjeta IS NOT NULL",
+        "id_tarjeta, id_viaje", "tiempo_inicio_viaje DESC NULLS LAST",
+    ),
+    "staging.stg_viajes_leg": (
+        "fct_trip_leg", "id_tarjeta IS NULL",
+        # slots vacíos: leg_seq 2/3/4 con todo NULL en viajes con menos etapas
+        "id_tarjeta IS NOT NULL"
+        " AND (ts_board IS NOT NULL OR board_stop_code IS NOT NULL OR mode_code IS NOT NULL)",
+        "id_tarjeta, id_viaje, leg_seq", "ts_board DESC NULLS LAST",
+    ),
+    "staging.stg_subidas_30m": (
+        "fct_boardings_30m", None, None,
+        "stop_code, time_30m_sk, mode_code, tipo_dia", None,
+    ),
+}
+
+# Datasets cuyas dims (c.–e.) se pueden resolver en lote con --multi-cut.
+# subidas_30m queda fuera: su MERGE resuelve dim_stop con is_current = 1.
+MULTI_CUT_DATASETS = ("viajes", "etapas")
+
+# Columnas de staging que leen dim_date, dims simples y SCD2 (pase DuckDB de
+# --multi-cut: solo se proyectan estas)
+DIM_SOURCE_COLUMNS: dict[str, list[str]] = {
+    "staging.stg_viajes_trip": [
+        "date_start_sk","date_end_sk","periodo_inicio_viaje","periodo_fin_viaje",
+        "proposito","contrato",
+    ],
+    "staging.stg_viajes_leg": [
+        "date_board_sk","date_alight_sk","board_stop_code","alight_stop_code",
+        "zone_board","zone_alight","service_code","mode_code",
+    ],
+    "staging.stg_etapas_validation": [
+        "date_board_sk","date_alight_sk","periodoSubida","periodoBajada","operador","contrato",
+        "tipo_transporte","servicio_subida","servicio_bajada","parada_subida","parada_bajada",
+        "comuna_subida","comuna_bajada","zona_subida","zona_bajada",
+        "x_subida","y_subida","x_bajada","y_bajada",
+    ],
+}
+
+# Dims SCD2: {dimensión: (BK, atributos que forman row_hash)}
+SCD2_DIMS: dict[str, tuple[str, list[str]]] = {
+    "dw.dim_stop":    ("stop_code", ["stop_name", "stop_type", "comuna", "zone_code", "x_utm", "y_utm"]),
+    "dw.dim_service": ("service_code", ["service_name", "mode_code"]),
+}
+
 # ─────────────────────────────────────────────────────────────
 # Descubrimiento de particiones Silver
 # ─────────────────────────────────────────────────────────────
@@ -71,8 +253,59 @@ class SilverPartition:
     cut:     str            # e.g. '2025-04-21', '2025-04'
     year:    int
     month:   int
-    parquet_files: dict[str, Path] = field(default_factory=dict)  # {type: path}
+    parquet_files: dict[str, Path | list[Path]] = field(default_factory=dict)  # {type: path(s)}
     quality: dict[str, Any]        = field(default_factory=dict)
+    day_files: dict[int, Path]     = field(default_factory=dict)  # {date_sk: path} (etapas day=*)
+    days_subset: bool              = False  # True si --day filtró parte de los días del cut
+    cdc: dict[str, Any]            = field(default_factory=dict)  # cdc.json (--delta)
+    cdc_dir: Path | None           = None
+    compacted: bool                = False  # parquet_files son compactados multi-cut
+
+    @property
+    def row_cut(self) -> str | None:
+        """Cut por el que filtrar las filas (solo archivos compactados)."""
+        return self.cut if self.compacted else None
+
+    @property
+    def event_date(self) -> date:
+        """Fecha de evento SCD2 del cut (primer día del mes si el cut es mensual)."""
+        try:
+            return date.fromisoformat(self.cut[:10])
+        except ValueError:
+            return date(self.year, self.month, 1)
+
+    @property
+    def run_label(self) -> str:
+        """Valor de etl_run_log.cut; un re-run parcial por día no pisa el estado del cut."""
+        if self.cdc:
+            # Cada delta se aplica una sola vez
+            return f"{self.cut}/cdc={self.cdc['cdc_id']}"
+        if not self.days_subset:
+            return self.cut
+        days = sorted(self.day_files)
+        if len(days) == 1:
+            return f"{self.cut}/day={days[0]}"
+        # Los días concretos van en la etiqueta (dos subconjuntos del mismo
+        # tamaño no comparten estado); si no caben en VARCHAR(40), un hash de ellos
+        label = f"{self.cut}/days={','.join(map(str, days))}"
+        if len(label) <= RUN_LABEL_MAX:
+            return label
+        digest = hashlib.sha1(",".join(map(str, days)).encode()).hexdigest()[:10]
+        return f"{self.cut}/days={len(days)}:{digest}"
+
+
+@dataclass
+class _CutRun:
+    """Estado de una partición dentro de GoldLoader.run() (contadores de etl_run_log)."""
+    part:   SilverPartition
+    run_id: int | None        = None
+    rows_staged:       int    = 0
+    rows_inserted:     int    = 0
+    rows_updated:      int    = 0
+    ignored_cash_rows: int    = 0
+    stg_tables: dict[str, str] = field(default_factory=dict)  # staging aparcado (fase 2)
+    steps: list[StepMetric]   = field(default_factory=list)   # dw.etl_run_step
+    started: float            = field(default_factory=time.monotonic)
 
 
 def _find_quality_json(base_dir: Path) -> dict[str, Any]:
@@ -83,23 +316,193 @@ def _find_quality_json(base_dir: Path) -> dict[str, Any]:
     return {}
 
 
-def discover_partitions(
-    cut_filter: str | None = None,
-    dataset_filter: str | None = None,
-) -> list[SilverPartition]:
+def _use_cdc_delta(part: SilverPartition) -> SilverPartition:
     """
-    Escanea lake/processed/dtpm/ y devuelve todas las SilverPartitions disponibles.
-    Filtra por dataset y/o cut si se proporcionan.
+    Reduce la partición a su delta CDC (lake/processed/_cdc/, transform_silver --cdc):
+    parquet_files apunta a <tabla>/inserted.parquet + <tabla>/updated.parquet.
+    Sin cdc.json la partición se devuelve intacta (carga completa).
     """
-    dtpm_root = _LAKE_ROOT / "dtpm"
-    partitions: list[SilverPartition] = []
-
-    datasets = (
-        [dataset_filter]
-        if dataset_filter and dataset_filter != "all"
-        else list(SUPPORTED_DATASETS)
+    cdc_dir = (
+        _LAKE_ROOT / "_cdc"
+        / f"dataset={part.dataset}"
+        / f"year={part.year}"
+        / f"month={part.month:02d}"
+        / f"cut={part.cut}"
     )
+    cdc_json = cdc_dir / "cdc.json"
+    if not cdc_json.exists():
+        log.warning("--delta: sin cdc.json para %s/%s — carga completa.", part.dataset, part.cut)
+        return part
+    with open(cdc_json, encoding="utf-8") as f:
+        cdc = json.load(f)
+    # Un delta generado con otra clave (p.ej. etapas antes de id_etapa +
+    # tiempo_subida) no se puede aplicar sobre el grain de la fact
+    if cdc.get("key_columns") != list(CDC_SPECS[part.dataset].key_columns):
+        log.warning(
+            "--delta: cdc.json de %s/%s con clave %s (esperada %s) — carga completa.",
+            part.dataset, part.cut, cdc.get("key_columns"),
+            list(CDC_SPECS[part.dataset].key_columns),
+        )
+        return part
+    part.cdc = cdc
+    part.cdc_dir = cdc_dir
+    part.compacted = False
+    part.day_files = {}
+    part.parquet_files = {
+        tbl_dir.name: [tbl_dir / "inserted.parquet", tbl_dir / "updated.parquet"]
+        for tbl_dir in sorted(cdc_dir.iterdir()) if tbl_dir.is_dir()
+    }
+    return part
+
+
+def _parquet_source(
+    path: Path | list[Path],
+    cut: str | None = None,
+    rows: tuple[int, int] | None = None,
+    numbered: bool = False,
+) -> str:
+    """
+    read_parquet(...) sobre un archivo o una lista de archivos (delta CDC).
+    Con `cut` (archivo compactado) solo las filas de ese cut; con `rows`
+    (lo, hi) solo file_row_number en [lo, hi) (staging paralelo, un archivo).
+    `numbered` agrega filename y file_row_number (orden estable del archivo).
 
+    hive_partitioning=false: cut/year/month salen del archivo (VARCHAR/INTEGER)
+    y no del path (cut=/month= inferidos como DATE/VARCHAR según el directorio).
+    """
+    paths = path if isinstance(path, list) else [path]
+    quoted = ", ".join("'" + str(p).replace("\\", "/") + "'" for p in paths)
+    where = [f"cut = '{cut}'"] if cut is not None else []
+    if rows is not None:
+        where.append(f"file_row_number >= {rows[0]} AND file_row_number < {rows[1]}")
+    if numbered:
+        src = f"read_parquet([{quoted}], hive_partitioning = false, filename = true, file_row_number = true)"
+    elif rows is not None:
+        src = f"read_parquet([{quoted}], hive_partitioning = false, file_row_number = true)"
+    else:
+        src = f"read_parquet([{quoted}], hive_partitioning = false)"
+    return f"(SELECT * FROM {src} WHERE {' AND '.join(where)})" if where else src
+
+
+def _partition_bytes(part: SilverPartition) -> int:
+    """Bytes en disco de los Parquet Silver de la partición (step a:staging)."""
+    files: list[Path] = list(part.day_files.values())
+    for p in part.parquet_files.values():
+        files += p if isinstance(p, list) else [p]
+    return parquet_bytes(files)
+
+
+def _staging_projection(
+    duck: duckdb.DuckDBPyConnection,
+    part: SilverPartition,
+    path: Path | list[Path],
+    stg_cols: list[str],
+    inject_partition: bool = False,
+    casts: dict[str, str] | None = None,
+) -> tuple[str, str]:
+    """
+    (fuente read_parquet, lista SELECT) con las columnas de staging presentes
+    en el archivo. Ver GoldLoader._stage_parquet para `inject_partition`/`casts`.
+    """
+    src = _parquet_source(path, part.row_cut)
+    parquet_cols = {r[0] for r in duck.execute(f"DESCRIBE SELECT * FROM {src}").fetchall()}
+
+    injected = {"cut": f"'{part.cut}'", "year": str(part.year), "month": str(part.month)}
+    select_parts = []
+    for col in stg_cols:
+        if inject_partition and col in injected:
+            select_parts.append(f"{injected[col]} AS {col}")
+        elif col in parquet_cols and casts and col in casts:
+            select_parts.append(f'CAST("{col}" AS {casts[col]}) AS "{col}"')
+        elif col in parquet_cols:
+            select_parts.append(f'"{col}"')
+    return src, ", ".join(select_parts)
+
+
+def _prefilter_sql(table: str, src: str, select_list: str) -> str:
+    """
+    SELECT de las filas de `table` que el MERGE insertaría (STAGING_PREFILTER:
+    filtro de efectivo + rn = 1 por grain), en el orden del archivo. `src`
+    debe exponer filename y file_row_number (_parquet_source numbered=True).
+    """
+    _, _, keep, grain, order = STAGING_PREFILTER[table]
+    return f"""
+        SELECT {select_list} FROM {src}
+        {f"WHERE {keep}" if keep else ""}
+        QUALIFY ROW_NUMBER() OVER (
+            PARTITION BY {grain} ORDER BY {f"{order}, " if order else ""}filename, file_row_number
+        ) = 1
+        ORDER BY filename, file_row_number
+    """
+
+
+def _split_row_ranges(
+    duck: duckdb.DuckDBPyConnection,
+    path: Path | list[Path],
+    parts: int,
+) -> list[tuple[Path, int, int]]:
+    """
+    Divide los archivos en ~`parts` rangos (archivo, lo, hi) de file_row_number
+    para el staging paralelo. Rangos de al menos STAGING_MIN_RANGE_ROWS filas.
+    """
+    paths = path if isinstance(path, list) else [path]
+    counts = [
+        (p, duck.execute(
+            "SELECT COALESCE(SUM(num_rows), 0) FROM parquet_file_metadata(?)",
+            [str(p).replace("\\", "/")],
+        ).fetchone()[0])  # type: ignore[index]
+        for p in paths
+    ]
+    total = sum(n for _, n in counts)
+    size = max(math.ceil(total / max(parts, 1)), STAGING_MIN_RANGE_ROWS)
+    return [
+        (p, lo, min(lo + size, n))
+        for p, n in counts
+        for lo in range(0, n, size)
+    ]
+
+
+def _bulk_column_sql(field: pa.Field) -> str:
+    """
+    Columna del archivo de --stage-method bulk|bcp: BOOLEAN como 0/1 y
+    TIMESTAMP sin fracción ni zona (DATETIME2(0) de staging); el resto con el
+    formato de texto de DuckDB.
+    """
+    col = f'"{field.name}"'
+    if pa.types.is_boolean(field.type):
+        return f"CAST({col} AS TINYINT) AS {col}"
+    if pa.types.is_timestamp(field.type):
+        return f"strftime({col}, '%Y-%m-%d %H:%M:%S') AS {col}"
+    return col
+
+
+def _iter_silver_cuts(
+    datasets: list[str], snapshot: Snapshot | None
+) -> Iterator[tuple[str, int, int, str, dict[str, Path], dict[int, Path], bool]]:
+    """
+    (dataset, year, month, cut, {type: path}, {date_sk: path}, compacted) por cut Silver.
+    Con manifest los archivos salen del snapshot; sin él, del filesystem.
+    `compacted`: los paths son archivos multi-cut (filtrar por la columna cut).
+    """
+    if snapshot is not None:
+        by_cut: dict[tuple, tuple[dict[str, Path], dict[int, Path]]] = {}
+        compacted: set[tuple] = set()
+        for f in snapshot.logical_files():
+            if f.dataset not in datasets:
+                continue
+            key = (f.dataset, f.year, f.month, f.cut)
+            pq_files, day_files = by_cut.setdefault(key, ({}, {}))
+            if f.is_compacted:
+                compacted.add(key)
+            if f.day is None:
+                pq_files[f.type] = f.abs_path
+            else:
+                day_files[f.day] = f.abs_path
+        for key, (pq_files, day_files) in sorted(by_cut.items()):
+            yield (*key, pq_files, dict(sorted(day_files.items())), key in compacted)
+        return
+
+    dtpm_root = _LAKE_ROOT / "dtpm"
     for ds in datasets:
         ds_dir = dtpm_root / f"dataset={ds}"
         if not ds_dir.exists():
@@ -111,41 +514,105 @@ def discover_partitions(
             for month_dir in sorted(year_dir.glob("month=*")):
                 month = int(month_dir.name.split("=")[1])
                 for cut_dir in sorted(month_dir.glob("cut=*")):
-                    cut_id = cut_dir.name.split("=")[1]
-
-                    # Filtro por cut
-                    if cut_filter and cut_filter != "all" and cut_filter not in cut_id:
+                    # Versión de salida vigente del cut (cut=.../v=<id>/)
+                    out_dir = current_output_dir(cut_dir)
+                    if out_dir is None:
                         continue
-
                     # Recopilar parquets disponibles
                     pq_files: dict[str, Path] = {}
-                    for pq in cut_dir.glob("*.parquet"):
-                        pq_files[pq.stem] = pq  # stem = nombre sin .parquet
+                    for pq in out_dir.glob("*.parquet"):
+                        if not pq.name.startswith("._tmp_"):
+                            pq_files[pq.stem] = pq  # stem = nombre sin .parquet
 
-                    if not pq_files:
-                        log.warning("Sin parquets en %s — skip.", cut_dir)
-                        continue
+                    # Sub-particiones diarias (day=YYYYMMDD/), un parquet por día
+                    day_files: dict[int, Path] = {}
+                    for day_dir in sorted(out_dir.glob("day=*")):
+                        day_sk = int(day_dir.name.split("=")[1])
+                        for pq in day_dir.glob("*.parquet"):
+                            if not pq.name.startswith("._tmp_"):
+                                day_files[day_sk] = pq
 
-                    # Quality JSON (desde _quality/)
-                    quality_dir = (
-                        _LAKE_ROOT / "_quality"
-                        / f"dataset={ds}"
-                        / f"year={year}"
-                        / f"month={month:02d}"
-                        / f"cut={cut_id}"
-                    )
-                    quality = _find_quality_json(quality_dir)
-
-                    partitions.append(
-                        SilverPartition(
-                            dataset=ds,
-                            cut=cut_id,
-                            year=year,
-                            month=month,
-                            parquet_files=pq_files,
-                            quality=quality,
-                        )
-                    )
+                    yield ds, year, month, cut_dir.name.split("=")[1], pq_files, day_files, False
+
+
+def discover_partitions(
+    cut_filter: str | None = None,
+    dataset_filter: str | None = None,
+    day_filter: list[int] | None = None,
+    delta: bool = False,
+    snapshot_version: int | None = None,
+) -> list[SilverPartition]:
+    """
+    Devuelve las SilverPartitions disponibles, filtradas por dataset y/o cut.
+
+    Los archivos salen del manifest de snapshots (lake/processed/_manifest/):
+    el último o `snapshot_version` si se fija. Sin manifest se escanea
+    lake/processed/dtpm/ como antes.
+
+    Los cuts con sub-particiones diarias (cut=.../day=YYYYMMDD/*.parquet) exponen
+    sus archivos en `day_files`; `day_filter` restringe a esos días (re-run parcial).
+    Con `delta` cada cut con cdc.json se reduce a su delta (ver _use_cdc_delta).
+    """
+    partitions: list[SilverPartition] = []
+
+    datasets = (
+        [dataset_filter]
+        if dataset_filter and dataset_filter != "all"
+        else list(SUPPORTED_DATASETS)
+    )
+
+    snapshot = load_snapshot(snapshot_version)
+    if snapshot is not None:
+        log.info("Manifest: snapshot v%d (%s)", snapshot.version, snapshot.committed_at)
+    else:
+        log.info("Manifest: no existe — escaneando %s", _LAKE_ROOT / "dtpm")
+
+    for ds, year, month, cut_id, pq_files, day_files, compacted in _iter_silver_cuts(
+        datasets, snapshot
+    ):
+        # Filtro por cut
+        if cut_filter and cut_filter != "all" and cut_filter not in cut_id:
+            continue
+
+        days_subset = False
+        if day_filter:
+            selected = {d: p for d, p in day_files.items() if d in day_filter}
+            if not selected:
+                continue
+            days_subset = len(selected) < len(day_files)
+            day_files = selected
+
+        if not pq_files and not day_files:
+            log.warning("Sin parquets en %s/%s — skip.", ds, cut_id)
+            continue
+
+        # Quality JSON (desde _quality/)
+        quality_dir = (
+            _LAKE_ROOT / "_quality"
+            / f"dataset={ds}"
+            / f"year={year}"
+            / f"month={month:02d}"
+            / f"cut={cut_id}"
+        )
+        quality = _find_quality_json(quality_dir)
+
+        part = SilverPartition(
+            dataset=ds,
+            cut=cut_id,
+            year=year,
+            month=month,
+            parquet_files=pq_files,
+            quality=quality,
+            day_files=day_files,
+            days_subset=days_subset,
+            compacted=compacted,
+        )
+        partitions.append(_use_cdc_delta(part) if delta else part)
+
+    if snapshot is not None and snapshot_version is not None:
+        # Lectura fijada: los archivos no deben haber sido reescritos desde el commit
+        selected = {(p.dataset, p.cut) for p in partitions}
+        snapshot.verify(f for f in snapshot.logical_files() if (f.dataset, f.cut) in selected)
 
     log.info("Particiones Silver descubiertas: %d", len(partitions))
     return partitions
@@ -194,6 +661,9 @@ def _sanitize_val(value: Any, hint: str) -> Any:
       "date" → date or None
       "hash" → str (passthrough — already a valid sha256 hex string)
       "float"→ float or None (NaN/Inf → None)
+
+    Scalar reference for `_coerce_column` (see bench_coercion); the SCD2
+    upserts use the columnar path.
     """
     # ── null-like ─────────────────────────────────────────────
     if value is None:
@@ -260,24 +730,141 @@ def _sanitize_val(value: Any, hint: str) -> Any:
     return value
 
 
-def _sanitize_row(
-    row_dict: dict[str, Any],
+# Valores de texto que `_sanitize_val` lee como bit = 1
+_BIT_TRUE = ("1", "true", "yes", "t")
+# Texto que pyarrow.compute normaliza igual que str.strip/upper de Python
+_PRINTABLE_ASCII = r"^[\x20-\x7e]*$"
+
+
+def _coerce_column(values: pd.Series, hint: str) -> list[Any]:
+    """
+    Versión columnar de `_sanitize_val`: convierte la columna completa con
+    operaciones pandas y devuelve una lista de valores Python listos para
+    pyodbc (None en vez de NaN/NaT/NA, int y no numpy.int64). Mismas reglas
+    por hint; los casts fallidos se loguean una vez por columna con su conteo.
+    """
+    if values.empty:
+        return []
+    null = values.isna()
+    if pd.api.types.is_float_dtype(values):
+        null |= np.isinf(values)
+
+    if hint in ("int", "float"):
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            num = values.astype("float64")
+        else:
+            # Parser C de pandas (acepta espacios); "12.7" → 12.7 → trunc 12, como _sanitize_val
+            num = pd.to_numeric(values.where(~null), errors="coerce").astype("float64")
+        num = num.where(~np.isinf(num))
+        failed = int((num.isna() & ~null).sum())
+        if failed:
+            log.warning("_coerce_column: %d valores no convertibles a %s — usando None", failed, hint)
+        if hint == "float":
+            return num.astype(object).where(num.notna(), None).tolist()
+        fraction = int((num.notna() & (num != np.trunc(num))).sum())
+        if fraction:
+            log.warning("_coerce_column: %d floats con fracción en columna int — truncando", fraction)
+        ints = np.trunc(num).astype("Int64")
+        return ints.astype(object).where(ints.notna(), None).tolist()
+
+    if hint == "str":
+        out = np.full(len(values), None, dtype=object)
+        keep = ~null.to_numpy()
+        if keep.any():
+            text = _strip_text(values[keep])
+            out[keep] = np.where(text == "", None, text)
+        return out.tolist()
+
+    if hint == "bit":
+        if pd.api.types.is_numeric_dtype(values):
+            bits = (values.fillna(0) != 0).astype(int)
+        else:
+            is_num = values.map(lambda v: isinstance(v, (bool, int, float)))
+            text = values.astype(str).str.strip().str.lower()
+            num = pd.to_numeric(values.where(is_num & ~null), errors="coerce").fillna(0)
+            bits = (text.isin(_BIT_TRUE) & ~is_num | (is_num & (num != 0))).astype(int)
+        return bits.astype(object).where(~null, None).tolist()
+
+    if hint == "date":
+        parsed = pd.to_datetime(values.where(~null), errors="coerce")
+        return [None if pd.isna(v) else v.date() for v in parsed]
+
+    # "hash" o desconocido — passthrough con nulos → None
+    return values.astype(object).where(~null, None).tolist()
+
+
+def _coerce_columns(
+    data: pd.DataFrame | pa.Table,
     dim_table: str,
     cols: list[str],
-) -> list[Any]:
+) -> dict[str, list[Any]]:
     """
-    Returns a list of sanitized values for `cols` using the schema map.
-    Falls back to passthrough for columns not in the schema.
+    {columna: valores coercionados} para `cols` según _SCD2_SCHEMA[dim_table]
+    (hint "str" para columnas fuera del schema; columnas ausentes → None).
+    Acepta DataFrame o tabla Arrow.
     """
+    if isinstance(data, pa.Table):
+        data = data.select([c for c in cols if c in data.column_names]).to_pandas()
     schema = _SCD2_SCHEMA.get(dim_table, {})
-    result = []
-    for col in cols:
-        raw = row_dict.get(col)
-        hint = schema.get(col, "str")   # default to str for unknown cols
-        result.append(_sanitize_val(raw, hint))
+    return {
+        c: _coerce_column(data[c], schema.get(c, "str")) if c in data.columns else [None] * len(data)
+        for c in cols
+    }
+
+
+def _strip_text(values: pd.Series, upper: bool = False) -> np.ndarray:
+    """
+    str(v).strip() — y .upper() con `upper` — de toda la columna (array object).
+    Los valores ASCII imprimibles van por pyarrow.compute; el resto (acentos,
+    ñ, controles) con str.strip/upper de Python, para el mismo resultado exacto.
+    """
+    raw = values.astype(str).to_numpy(dtype=object)
+    text = pa.array(raw, type=pa.string())
+    out = pc.utf8_trim(text, " ")
+    if upper:
+        out = pc.ascii_upper(out)
+    result = out.to_numpy(zero_copy_only=False)
+    simple = pc.match_substring_regex(text, _PRINTABLE_ASCII).to_numpy(zero_copy_only=False)
+    if not simple.all():
+        idx = np.flatnonzero(~simple)
+        result[idx] = [v.strip().upper() if upper else v.strip() for v in raw[idx]]
     return result
 
 
+def _hash_part(values: pd.Series) -> np.ndarray:
+    """
+    Normalización de `_row_hash` por columna: str(v or "").strip().upper().
+    Falsy (None, 0, 0.0, False, "") → ""; NaN (truthy en Python) → "NAN".
+    """
+    if values.dtype == object:
+        falsy = values.isin([None]) | (values == 0) | (values == "")
+    else:
+        falsy = values == 0
+    out = np.full(len(values), "", dtype=object)
+    keep = ~falsy.to_numpy()
+    if keep.any():
+        out[keep] = _strip_text(values[keep], upper=True)
+    return out
+
+
+def _row_hashes(data: pd.DataFrame, attr_cols: list[str]) -> list[str]:
+    """
+    `_row_hash` de todas las filas: normalización y concatenación '||' en
+    bloque (pyarrow.compute); queda un sha256 (C) por fila. Mismo hex que
+    `_row_hash`.
+    """
+    if not attr_cols:
+        return [hashlib.sha256(b"").hexdigest()] * len(data)
+    parts = [
+        pa.array(_hash_part(data[c]), type=pa.string()) if c in data.columns
+        else pa.array([""] * len(data), type=pa.string())
+        for c in attr_cols
+    ]
+    joined = pc.binary_join_element_wise(*parts, "||") if len(parts) > 1 else parts[0]
+    sha256 = hashlib.sha256
+    return [sha256(k.encode("utf-8")).hexdigest() for k in joined.to_pylist()]
+
+
 def _row_hash(row: dict[str, Any], attr_cols: list[str]) -> str:
     """
     SHA-256 hex (64 chars) de los atributos SCD2 normalizados.
@@ -344,27 +931,23 @@ def scd2_upsert(
         f"WHERE [{bk_col}] = ? AND is_current = 1"
     )
 
+    # Hash y coerción columnares (una pasada por columna, no por celda)
+    bks     = [str(v).strip() if v and str(v).strip() else None for v in new_df[bk_col].tolist()]
+    hashes  = _row_hashes(new_df, attr_cols)
+    clean   = _coerce_columns(new_df, dim_table, attr_cols)
+    attrs_at = list(zip(*(clean[c] for c in attr_cols))) if attr_cols else [()] * len(new_df)
+
     # Collect batches
     insert_params: list[tuple] = []
     expire_params: list[tuple] = []
 
-    for _, row in new_df.iterrows():
-        bk_val = row.get(bk_col)
-        if not bk_val or str(bk_val).strip() == "":
+    for bk_val, new_hash, attrs in zip(bks, hashes, attrs_at):
+        if bk_val is None:
             continue
-        bk_val = str(bk_val).strip()
-
-        row_dict = row.to_dict()
-        new_hash = _row_hash(row_dict, attr_cols)
 
         if bk_val not in current_dict:
             # New BK → queue INSERT
-            vals = _sanitize_row(
-                {**row_dict, "row_hash": new_hash, "valid_from": event_date,
-                 "valid_to": None, "is_current": 1},
-                dim_table, all_cols,
-            )
-            insert_params.append(tuple(vals))
+            insert_params.append((bk_val, *attrs, new_hash, event_date, None, 1))
             counts["inserted"] += 1
 
         else:
@@ -393,13 +976,9 @@ def scd2_upsert(
                     f"UPDATE {dim_table} SET {update_parts} "
                     f"WHERE [{bk_col}] = ? AND is_current = 1"
                 )
-                vals = _sanitize_row(
-                    {**row.to_dict(), "row_hash": new_hash},
-                    dim_table, attr_cols + ["row_hash"],
-                )
                 try:
                     cur = conn.cursor()
-                    cur.execute(update_sql, vals + [bk_val])
+                    cur.execute(update_sql, [*attrs, new_hash, bk_val])
                     cur.close()
                 except Exception as exc:
                     log.warning("SCD2 same-date UPDATE fallo para BK=%s: %s", bk_val, exc)
@@ -408,12 +987,7 @@ def scd2_upsert(
 
             # Changed attribute → queue EXPIRE + INSERT
             expire_params.append((expire_date, bk_val))
-            vals = _sanitize_row(
-                {**row_dict, "row_hash": new_hash, "valid_from": event_date,
-                 "valid_to": None, "is_current": 1},
-                dim_table, all_cols,
-            )
-            insert_params.append(tuple(vals))
+            insert_params.append((bk_val, *attrs, new_hash, event_date, None, 1))
             counts["inserted"] += 1
             counts["expired"] += 1
 
@@ -438,11 +1012,385 @@ def scd2_upsert(
     )
     return counts
 
+def _scd2_source_rows(
+    new_df: pd.DataFrame,
+    dim_table: str,
+    bk_col: str,
+    attr_cols: list[str],
+) -> list[tuple]:
+    """
+    Filas (bk, *attr_cols, row_hash) listas para el bulk load de #scd2_src.
+
+    Columna a columna (_row_hashes, _coerce_columns): BK en blanco se descarta,
+    BK repetido conserva la primera fila y el hash es idéntico a `_row_hash`.
+    """
+    bks = [
+        str(v).strip() if v and str(v).strip() else None
+        for v in new_df[bk_col].tolist()
+    ]
+    hashes = _row_hashes(new_df, attr_cols)
+    coerced = _coerce_columns(new_df, dim_table, attr_cols)
+    clean = [coerced[c] for c in attr_cols]
+
+    rows: list[tuple] = []
+    seen: set[str] = set()
+    for i, (bk, row_hash) in enumerate(zip(bks, hashes)):
+        if bk is None or bk in seen:
+            continue
+        seen.add(bk)
+        rows.append((bk, *(col[i] for col in clean), row_hash))
+    return rows
+
+
+def scd2_upsert_set(
+    conn: pyodbc.Connection,
+    dim_table: str,
+    bk_col: str,
+    attr_cols: list[str],
+    new_df: pd.DataFrame,
+    event_date: date,
+) -> dict[str, int]:
+    """
+    SCD2 set-based: misma semántica y counts que `scd2_upsert`, resuelto en el servidor.
+
+      1. Candidatos (BK + atributos + row_hash calculado en bloque) → #scd2_src
+         con un executemany (fast_executemany).
+      2. Un único batch T-SQL clasifica cada BK contra la versión vigente y
+         aplica, en orden: enriquecimiento mismo día (UPDATE in-place),
+         expiración (valid_to = event_date-1) e INSERT de BKs nuevos/cambiados.
+         Los event_date anteriores al valid_from vigente se omiten (unchanged).
+
+    No trae la dimensión a Python: el costo es O(candidatos), no O(dimensión),
+    y el enriquecimiento mismo día es un UPDATE ... FROM en vez de uno por BK.
+
+    Devuelve counts {'inserted': n, 'expired': n, 'unchanged': n}.
+    """
+    if new_df.empty:
+        return {"inserted": 0, "expired": 0, "unchanged": 0}
+
+    rows = _scd2_source_rows(new_df, dim_table, bk_col, attr_cols)
+    if not rows:
+        return {"inserted": 0, "expired": 0, "unchanged": 0}
+
+    src_cols  = [bk_col] + attr_cols + ["row_hash"]
+    col_str   = ", ".join(f"[{c}]" for c in src_cols)
+    src_str   = ", ".join(f"s.[{c}]" for c in src_cols)
+    set_str   = ", ".join(f"[{c}] = s.[{c}]" for c in attr_cols + ["row_hash"])
+
+    # ── 1. Candidatos → #scd2_src (tipos copiados de la dimensión) ──
+    cursor = conn.cursor()
+    cursor.execute(
+        "IF OBJECT_ID('tempdb..#scd2_src') IS NOT NULL DROP TABLE #scd2_src; "
+        f"SELECT TOP 0 {col_str} INTO #scd2_src FROM {dim_table};"
+    )
+    cursor.fast_executemany = True
+    cursor.executemany(
+        f"INSERT INTO #scd2_src ({col_str}) VALUES ({', '.join('?' * len(src_cols))})",
+        rows,
+    )
+
+    # ── 2. Clasificación + UPDATE/INSERT en un solo batch ─────
+    # Acciones: N=nuevo, U=mismo hash, B=event_date < valid_from,
+    #           S=mismo día (in-place), C=cambio (expira + inserta)
+    batch_sql = f"""
+    SET NOCOUNT ON;
+    DECLARE @event_date DATE = ?, @expire_date DATE = ?;
+
+    IF OBJECT_ID('tempdb..#scd2_act') IS NOT NULL DROP TABLE #scd2_act;
+    SELECT
+        s.[{bk_col}] AS bk,
+        CASE
+            WHEN d.[{bk_col}] IS NULL          THEN 'N'
+            WHEN d.row_hash = s.row_hash       THEN 'U'
+            WHEN @event_date < d.valid_from    THEN 'B'
+            WHEN @event_date = d.valid_from    THEN 'S'
+            ELSE 'C'
+        END AS action
+    INTO #scd2_act
+    FROM #scd2_src s
+    LEFT JOIN {dim_table} d
+        ON d.[{bk_col}] = s.[{bk_col}] AND d.is_current = 1;
+
+    UPDATE d SET {set_str}
+    FROM {dim_table} d
+    JOIN #scd2_act a ON a.bk = d.[{bk_col}] AND a.action = 'S'
+    JOIN #scd2_src s ON s.[{bk_col}] = a.bk
+    WHERE d.is_current = 1;
+
+    UPDATE d SET is_current = 0, valid_to = @expire_date
+    FROM {dim_table} d
+    JOIN #scd2_act a ON a.bk = d.[{bk_col}] AND a.action = 'C'
+    WHERE d.is_current = 1;
+
+    INSERT INTO {dim_table} ({col_str}, [valid_from], [valid_to], [is_current])
+    SELECT {src_str}, @event_date, NULL, 1
+    FROM #scd2_src s
+    JOIN #scd2_act a ON a.bk = s.[{bk_col}] AND a.action IN ('N', 'C');
+
+    SELECT
+        SUM(CASE WHEN action IN ('N', 'C') THEN 1 ELSE 0 END)      AS inserted,
+        SUM(CASE WHEN action = 'C' THEN 1 ELSE 0 END)              AS expired,
+        SUM(CASE WHEN action IN ('U', 'B', 'S') THEN 1 ELSE 0 END) AS unchanged,
+        SUM(CASE WHEN action = 'B' THEN 1 ELSE 0 END)              AS backdated
+    FROM #scd2_act;
+
+    DROP TABLE #scd2_act;
+    DROP TABLE #scd2_src;
+    -- NOCOUNT es de sesión: sin esto cursor.rowcount queda en -1 para las
+    -- sentencias siguientes de la conexión (merge_fct_*, agregados, ...)
+    SET NOCOUNT OFF;
+    """
+    cursor.fast_executemany = False
+    cursor.execute(batch_sql, (event_date, event_date - timedelta(days=1)))
+    while cursor.description is None and cursor.nextset():
+        pass
+    inserted, expired, unchanged, backdated = (int(v or 0) for v in cursor.fetchone())
+    while cursor.nextset():   # DROP + SET NOCOUNT OFF
+        pass
+    cursor.close()
+    conn.commit()
+
+    if backdated:
+        log.warning(
+            "SCD2 %s: %d BKs con event_date=%s < valid_from vigente — skip.",
+            dim_table, backdated, event_date,
+        )
+    counts = {"inserted": inserted, "expired": expired, "unchanged": unchanged}
+    log.info(
+        "SCD2 %s | inserted=%d expired=%d unchanged=%d (set-based, %d candidatos)",
+        dim_table, inserted, expired, unchanged, len(rows),
+    )
+    return counts
+
+
+def scd2_upsert_timeline(
+    conn: pyodbc.Connection,
+    dim_table: str,
+    bk_col: str,
+    attr_cols: list[str],
+    events: list[tuple[date, pd.DataFrame]],
+) -> dict[str, int]:
+    """
+    SCD2 de varios cuts en un solo lote (--multi-cut): deja la misma línea de
+    tiempo que `scd2_upsert_set` aplicado evento a evento en el orden de `events`.
+
+      1. Estado vigente (BK, row_hash, valid_from) en un SELECT.
+      2. Cada BK recorre los eventos en Python con las reglas de scd2_upsert_set
+         (N=nuevo, U=mismo hash, B=event_date < valid_from, S=mismo día in-place,
+         C=expira + inserta). Las versiones creadas y expiradas dentro del lote
+         salen con su valid_to / is_current final.
+      3. Un batch T-SQL aplica el resultado: enriquecimiento y expiración de las
+         versiones vigentes previas (#scd2_enr, #scd2_exp) e INSERT de las
+         versiones nuevas (#scd2_new) en orden de valid_from.
+
+    Devuelve counts acumulados {'inserted': n, 'expired': n, 'unchanged': n}.
+    """
+    counts = {"inserted": 0, "expired": 0, "unchanged": 0}
+    event_rows = [
+        (event_date, _scd2_source_rows(new_df, dim_table, bk_col, attr_cols))
+        for event_date, new_df in events if not new_df.empty
+    ]
+    if not any(rows for _, rows in event_rows):
+        return counts
+
+    # ── 1. Estado vigente: BK → [row_hash, valid_from, índice en new_rows | None] ──
+    current = fetch_df(
+        conn,
+        f"SELECT [{bk_col}], row_hash, valid_from FROM {dim_table} WHERE is_current = 1",
+    )
+    state: dict[str, list[Any]] = {
+        str(bk): [str(row_hash), pd.Timestamp(valid_from).date(), None]
+        for bk, row_hash, valid_from in zip(
+            current[bk_col].tolist(), current["row_hash"].tolist(), current["valid_from"].tolist(),
+        )
+    }
+
+    # ── 2. Línea de tiempo por BK ─────────────────────────────
+    n_attr = len(attr_cols)
+    enrich: dict[str, tuple] = {}   # versión vigente previa → (*attrs, row_hash)
+    expire: dict[str, date] = {}    # versión vigente previa → valid_to
+    new_rows: list[list[Any]] = []  # [bk, *attrs, row_hash, valid_from, valid_to, is_current]
+    backdated = 0
+    for event_date, rows in event_rows:
+        for bk, *attrs, row_hash in rows:
+            st = state.get(bk)
+            if st is not None and st[0] == row_hash:
+                counts["unchanged"] += 1
+                continue
+            if st is not None and event_date < st[1]:
+                backdated += 1
+                counts["unchanged"] += 1
+                continue
+            if st is not None and event_date == st[1]:
+                if st[2] is None:
+                    enrich[bk] = (*attrs, row_hash)
+                else:
+                    new_rows[st[2]][1:n_attr + 2] = [*attrs, row_hash]
+                st[0] = row_hash
+                counts["unchanged"] += 1
+                continue
+            if st is not None:
+                valid_to = event_date - timedelta(days=1)
+                if st[2] is None:
+                    expire[bk] = valid_to
+                else:
+                    new_rows[st[2]][-2:] = [valid_to, 0]
+                counts["expired"] += 1
+            state[bk] = [row_hash, event_date, len(new_rows)]
+            new_rows.append([bk, *attrs, row_hash, event_date, None, 1])
+            counts["inserted"] += 1
+
+    # ── 3. Aplicar en un batch ────────────────────────────────
+    src_cols = [bk_col] + attr_cols + ["row_hash"]
+    new_cols = src_cols + ["valid_from", "valid_to", "is_current"]
+    src_str  = ", ".join(f"[{c}]" for c in src_cols)
+    new_str  = ", ".join(f"[{c}]" for c in new_cols)
+    set_str  = ", ".join(f"[{c}] = s.[{c}]" for c in attr_cols + ["row_hash"])
+
+    cursor = conn.cursor()
+    cursor.execute(
+        "IF OBJECT_ID('tempdb..#scd2_enr') IS NOT NULL DROP TABLE #scd2_enr; "
+        "IF OBJECT_ID('tempdb..#scd2_exp') IS NOT NULL DROP TABLE #scd2_exp; "
+        "IF OBJECT_ID('tempdb..#scd2_new') IS NOT NULL DROP TABLE #scd2_new; "
+        f"SELECT TOP 0 {src_str} INTO #scd2_enr FROM {dim_table}; "
+        f"SELECT TOP 0 [{bk_col}], [valid_to] INTO #scd2_exp FROM {dim_table}; "
+        f"SELECT TOP 0 {new_str} INTO #scd2_new FROM {dim_table};"
+    )
+    cursor.fast_executemany = True
+    for tmp, cols, params in (
+        ("#scd2_enr", src_cols, [(bk, *vals) for bk, vals in enrich.items()]),
+        ("#scd2_exp", [bk_col, "valid_to"], list(expire.items())),
+        ("#scd2_new", new_cols, [tuple(r) for r in new_rows]),
+    ):
+        if params:
+            cursor.executemany(
+                f"INSERT INTO {tmp} ({', '.join(f'[{c}]' for c in cols)}) "
+                f"VALUES ({', '.join('?' * len(cols))})",
+                params,
+            )
+    cursor.fast_executemany = False
+    cursor.execute(
+        f"""
+        SET NOCOUNT ON;
+
+        UPDATE d SET {set_str}
+        FROM {dim_table} d
+        JOIN #scd2_enr s ON s.[{bk_col}] = d.[{bk_col}]
+        WHERE d.is_current = 1;
+
+        UPDATE d SET is_current = 0, valid_to = x.valid_to
+        FROM {dim_table} d
+        JOIN #scd2_exp x ON x.[{bk_col}] = d.[{bk_col}]
+        WHERE d.is_current = 1;
+
+        INSERT INTO {dim_table} ({new_str})
+        SELECT {new_str} FROM #scd2_new
+        ORDER BY [valid_from], [{bk_col}];
+
+        DROP TABLE #scd2_enr;
+        DROP TABLE #scd2_exp;
+        DROP TABLE #scd2_new;
+        SET NOCOUNT OFF;   -- NOCOUNT es de sesión (ver scd2_upsert_set)
+        """
+    )
+    while cursor.nextset():
+        pass
+    cursor.close()
+    conn.commit()
+
+    if backdated:
+        log.warning(
+            "SCD2 %s: %d candidatos con event_date < valid_from vigente — skip.",
+            dim_table, backdated,
+        )
+    log.info(
+        "SCD2 %s | inserted=%d expired=%d unchanged=%d (multi-cut, %d eventos, %d candidatos)",
+        dim_table, counts["inserted"], counts["expired"], counts["unchanged"],
+        len(event_rows), sum(len(rows) for _, rows in event_rows),
+    )
+    return counts
+
+
+
+# ─────────────────────────────────────────────────────────────
+# Helpers SK locales (--keys local, SQL DuckDB)
+# ─────────────────────────────────────────────────────────────
+
+def _event_dt_sql(date_sk_col: str) -> str:
+    """date_sk YYYYMMDD (INT) → DATE; NULL-safe (equivale al DATEFROMPARTS del MERGE)."""
+    c = date_sk_col
+    return f"make_date({c} // 10000, ({c} % 10000) // 100, {c} % 100)"
+
+
+def _asof_join(dim_table: str, alias: str, src_expr: str) -> str:
+    """ASOF LEFT JOIN a la versión SCD2 con mayor valid_from <= event_dt."""
+    return (
+        f"ASOF LEFT JOIN {dim_table} {alias}"
+        f" ON {alias}._k = upper(rtrim({src_expr})) AND s.event_dt >= {alias}.valid_from"
+    )
+
+
+def _asof_sk(alias: str, sk_col: str) -> str:
+    """SK del ASOF solo si la versión sigue vigente en event_dt (valid_to)."""
+    return f"CASE WHEN s.event_dt <= {alias}.valid_to THEN {alias}.{sk_col} END"
+
+
+def _lookup_join(dim_table: str, alias: str, src_expr: str) -> str:
+    """Hash join a una dimensión simple por BK normalizado."""
+    return f"LEFT JOIN {dim_table} {alias} ON {alias}._k = upper(rtrim({src_expr}))"
+
+
+# ─────────────────────────────────────────────────────────────
+# Helpers tablas de switch (facts particionadas por cut_sk)
+# ─────────────────────────────────────────────────────────────
+
+def _switch_index_ddl(switch: str, idx: pd.DataFrame, suffix: str = "_switch") -> str:
+    """
+    DDL que replica en `switch` un índice de la fact (filas de sys.indexes ×
+    sys.index_columns de un index_id). Las columnas con key_ordinal = 0 y no
+    incluidas son la columna de partición que SQL Server agrega sola a los
+    índices alineados: se omiten. PK/UQ se recrean como constraint con
+    `suffix` (los nombres de constraint son únicos por esquema).
+    """
+    first = idx.iloc[0]
+    name, kind = first["name"], first["type_desc"]
+    if "COLUMNSTORE" in kind:
+        if kind.startswith("CLUSTERED"):
+            return f"CREATE CLUSTERED COLUMNSTORE INDEX {name} ON {switch}"
+        return f"CREATE NONCLUSTERED COLUMNSTORE INDEX {name} ON {switch} ({', '.join(idx['col'].dropna())})"
+
+    keys = idx[idx["key_ordinal"] > 0].sort_values("key_ordinal")
+    key_list = ", ".join(
+        f"{r.col} DESC" if r.is_descending_key else r.col for r in keys.itertuples(index=False)
+    )
+    included = list(idx.loc[idx["is_included_column"].astype(bool), "col"])
+    if first["is_primary_key"] or first["is_unique_constraint"]:
+        constraint = "PRIMARY KEY" if first["is_primary_key"] else "UNIQUE"
+        return f"ALTER TABLE {switch} ADD CONSTRAINT {name}{suffix} {constraint} {kind} ({key_list})"
+
+    sql = (
+        f"CREATE {'UNIQUE ' if first['is_unique'] else ''}{kind} INDEX {name}"
+        f" ON {switch} ({key_list})"
+    )
+    if included:
+        sql += f" INCLUDE ({', '.join(included)})"
+    if isinstance(first["filter_definition"], str) and first["filter_definition"]:
+        sql += f" WHERE {first['filter_definition']}"
+    return sql
+
 
 # ─────────────────────────────────────────────────────────────
 # Loader principal
 # ─────────────────────────────────────────────────────────────
 
+def _pool_size(fact_workers: int, day_workers: int, stage_workers: int) -> int:
+    """
+    Conexiones que puede pedir un run a la vez: la principal, más una por
+    worker de facts y las de sus MERGE por día / rangos de staging.
+    """
+    return 1 + max(1, fact_workers) * (1 + max(day_workers, stage_workers, 1))
+
+
 class GoldLoader:
     """
     Orquesta la carga completa de la capa Gold para una o más particiones Silver.
@@ -454,11 +1402,63 @@ class GoldLoader:
         dry_run: bool = False,
         overwrite_staging: bool = True,
         force: bool = False,
+        day_workers: int = 4,
+        stage_workers: int = 1,
+        scd2_mode: str = "set",
+        key_resolution: str = "server",
+        partition_facts: bool = False,
+        replace_cut: bool = False,
+        storage: str = "rowstore",
+        fact_workers: int = 1,
+        resume: bool = False,
+        stage_method: str = "executemany",
+        staging: str = "disk",
+        multi_cut: bool = False,
+        force_ddl: bool = False,
+        metrics_dir: Path | None = None,
+        aggregates: bool = True,
+        pool: ConnectionPool | None = None,
     ) -> None:
         self.conn              = conn
         self.dry_run           = dry_run
         self.overwrite_staging = overwrite_staging  # si False: no truncar staging (re-run dims/facts)
         self.force             = force              # si True: ignora etl_run_log status=OK
+        self.day_workers       = max(1, day_workers)  # conexiones paralelas para cuts con day=*
+        self.stage_workers     = max(1, stage_workers)  # conexiones por archivo en staging
+        self.scd2_mode         = scd2_mode          # "set" (#temp + batch T-SQL) | "row"
+        self.key_resolution    = key_resolution     # "server" (staging + MERGE) | "local" (DuckDB)
+        self.partition_facts   = partition_facts    # aplicar ddl_gold_partitioning.sql
+        self.replace_cut       = replace_cut        # vaciar las facts del cut antes de cargarlo
+        self.storage           = storage            # "rowstore" | "columnstore" (ddl_gold_columnstore.sql)
+        self.fact_workers      = max(1, fact_workers)  # cuts con facts en paralelo (fase 2 de run)
+        self.resume            = resume             # retomar desde dw.etl_run_checkpoint
+        self.stage_method      = stage_method       # "executemany" | "bulk" | "bcp"
+        self.staging           = staging            # "disk" | "memory" (ddl_gold_staging_memory.sql)
+        self.multi_cut         = multi_cut          # dims c.–e. de todos los cuts en un lote
+        self.force_ddl         = force_ddl          # re-ejecutar DDL aunque dw.schema_version coincida
+        self.metrics_dir       = metrics_dir        # gold_metrics.{prom,json} al terminar run (None: no)
+        self.aggregates        = aggregates         # refrescar dw.agg_* del cut tras las facts (paso g.)
+        # conexiones de los workers (staging/MERGE por rango o día, facts por cut)
+        self.pool              = pool if pool is not None else ConnectionPool(
+            size=_pool_size(self.fact_workers, self.day_workers, self.stage_workers),
+        )
+        self._dims_batched: set[tuple[str, str]] = set()  # (dataset, run_label) con dims del lote
+        self._stg_local        = False              # partición actual con staging en DuckDB
+        self._stg_tables: dict[str, str] = {}       # staging lógico → tabla aparcada del cut
+        self._concurrent_facts = False              # worker de fase 2: reservar rangos de IDENTITY
+        self._sk_lock          = threading.Lock()   # compartido entre workers (IDENT_CURRENT + RESEED)
+        self._ckpt: tuple[str, str] | None = None   # (dataset, etl_run_log.cut) de los checkpoints
+        self._ckpt_run_id: int | None = None
+        self._checkpoints: dict[tuple[str, str], tuple[int, int | None, bool]] = {}
+        self._file_stage: bool | None = None        # bulk/bcp disponibles (se verifica una vez)
+        self._bulk_views: dict[str, tuple[str, ...]] = {}
+        self._bulk_lock = threading.Lock()
+        self._partitioned_tables: dict[str, bool] = {}
+        self._columnstore_tables: dict[str, str | None] = {}
+        self._memory_tables: dict[str, bool] = {}
+        self._steps: list[StepMetric] | None = None  # steps del cut actual (_CutRun.steps)
+        self._cut_metrics: list[CutMetrics] = []     # cuts terminados del run (compartida con workers)
+        self._metrics_lock = threading.Lock()
         self._duckdb = duckdb.connect(":memory:")
         self._duckdb.execute(f"SET memory_limit='4GB'")
         self._duckdb.execute(f"SET threads TO {__import__('os').cpu_count() or 4}")
@@ -466,12 +1466,78 @@ class GoldLoader:
     # ── 1. DDL ────────────────────────────────────────────────
 
     def ensure_schema(self) -> None:
-        """Ejecuta ddl_gold.sql (idempotente)."""
-        log.info("Ejecutando DDL: %s", DDL_PATH)
+        """
+        Aplica ddl_gold.sql (idempotente), más ddl_gold_partitioning.sql con
+        --partition-facts, ddl_gold_columnstore.sql con --storage columnstore,
+        ddl_gold_staging_memory.sql con --staging memory y
+        ddl_gold_aggregates.sql salvo --no-aggregates.
+
+        Cada archivo se ejecuta solo si su versión (`-- schema_version: N`) o
+        su checksum difieren de dw.schema_version (o con --force-ddl): con el
+        schema al día, el costo es un SELECT. ddl_gold.sql recrea las stg_* en
+        disco, así que con --staging memory el perfil se re-aplica mientras
+        alguna stg_* no sea memory-optimized.
+        """
         if self.dry_run:
             log.info("[DRY-RUN] skip DDL")
             return
-        execute_sql_file(self.conn, DDL_PATH)
+        t0 = time.monotonic()
+        deployed = {} if self.force_ddl else fetch_schema_versions(self.conn)
+        applied = []
+        for path, enabled in (
+            (DDL_PATH,                True),
+            (DDL_PARTITIONING_PATH,   self.partition_facts),
+            (DDL_COLUMNSTORE_PATH,    self.storage == "columnstore"),
+            (DDL_STAGING_MEMORY_PATH, self.staging == "memory"),
+            (DDL_AGGREGATES_PATH,     self.aggregates),
+        ):
+            if not enabled:
+                continue
+            version, checksum = ddl_version(path)
+            current = deployed.get(path.stem)
+            if current == (version, checksum):
+                disk = self._disk_staging() if path == DDL_STAGING_MEMORY_PATH else []
+                if not disk:
+                    continue
+                reason = f"{', '.join(disk)} en disco"
+            elif current is None:
+                reason = "sin registro" if not self.force_ddl else "--force-ddl"
+            elif current[0] != version:
+                reason = f"versión {current[0]} → {version}"
+            else:
+                reason = f"checksum cambió (versión {version})"
+            log.info("Ejecutando DDL: %s (%s)", path, reason)
+            self._apply_ddl(path)
+            record_schema_version(self.conn, path.stem, version, checksum)
+            applied.append(path.stem)
+        if applied:
+            log.info("DDL aplicado: %s en %.1fs", ", ".join(applied), time.monotonic() - t0)
+        else:
+            log.info("Schema al día (dw.schema_version) — DDL skip (%.2fs)", time.monotonic() - t0)
+
+    def _apply_ddl(self, path: Path) -> None:
+        """Ejecuta un archivo DDL e invalida las cachés de catálogo que toca."""
+        if path == DDL_STAGING_MEMORY_PATH:
+            self.conn.autocommit = True   # ALTER DATABASE / DDL in-memory: fuera de transacción
+            try:
+                execute_sql_file(self.conn, path)
+            finally:
+                self.conn.autocommit = False
+            self._memory_tables.clear()
+            disk = self._disk_staging()
+            if disk:
+                log.warning(
+                    "--staging memory: %s siguen en disco (¿In-Memory OLTP no disponible?)",
+                    ", ".join(disk),
+                )
+            return
+        execute_sql_file(self.conn, path)
+        if path == DDL_PATH:
+            self._memory_tables.clear()   # stg_* recreadas en disco
+        elif path == DDL_PARTITIONING_PATH:
+            self._partitioned_tables.clear()
+        elif path == DDL_COLUMNSTORE_PATH:
+            self._columnstore_tables.clear()
 
     # ── 2. Dimensiones estáticas (cargadas una sola vez) ──────
 
@@ -509,18 +1575,10 @@ class GoldLoader:
             ("ZP",        "Zona Paga / Estación"),
             ("UNKNOWN",   "Modo desconocido"),
         ]
-        for code, desc in modes:
-            execute_sql(
-                self.conn,
-                """
-                IF NOT EXISTS (SELECT 1 FROM dw.dim_mode WHERE mode_code = ?)
-                    INSERT INTO dw.dim_mode (mode_code, mode_desc) VALUES (?, ?)
-                """,
-                (code, code, desc),
-                commit=False,
-            )
-        self.conn.commit()
-        log.info("dim_mode: upsert de %d modos.", len(modes))
+        inserted = upsert_lookup_dim(
+            self.conn, "dw.dim_mode", "mode_code", modes, attr_cols=["mode_desc"],
+        )
+        log.info("dim_mode: upsert de %d modos (%d nuevos).", len(modes), inserted)
 
     def _ensure_dim_date(self, date_sks: list[int]) -> None:
         """
@@ -611,6 +1669,10 @@ class GoldLoader:
                 "--no-overwrite-staging: staging no truncado; asumiendo datos previos para %s/%s.",
                 partition.dataset, partition.cut,
             )
+        elif partition.cdc:
+            # Un delta puede venir vacío y bulk_insert no trunca con df vacío
+            for tbl in STAGING_TABLES.get(partition.dataset, []):
+                self._truncate_staging(tbl)
 
         if partition.dataset == "viajes":
             return self._load_stg_viajes(partition)
@@ -622,155 +1684,629 @@ class GoldLoader:
             log.warning("Dataset desconocido: %s — skip staging.", partition.dataset)
             return 0
 
-    def _read_parquet(self, path: Path) -> pd.DataFrame:
-        """Lee un Parquet con DuckDB y devuelve DataFrame (NaN→None ya hecho)."""
-        p = str(path).replace("\\", "/")
-        df = self._duckdb.execute(f"SELECT * FROM read_parquet('{p}')").fetchdf()
-        return df.astype(object).where(pd.notna(df), None)
-
-    def _load_stg_viajes(self, part: SilverPartition) -> int:
-        total = 0
-        # viajes_trip
-        if "viajes_trip" in part.parquet_files:
-            df = self._read_parquet(part.parquet_files["viajes_trip"])
-            # Normalizar tipos: cut→DATE, y month/year a int
-            df = self._normalize_trip_df(df)
-            stg_cols = [
-                "cut","year","month","id_viaje","id_tarjeta","tipo_dia","proposito","contrato",
-                "factor_expansion","n_etapas","distancia_eucl","distancia_ruta",
-                "tiempo_inicio_viaje","tiempo_fin_viaje",
-                "date_start_sk","time_start_30m_sk","date_end_sk","time_end_30m_sk",
-                "paradero_inicio_viaje","paradero_fin_viaje",
-                "comuna_inicio_viaje","comuna_fin_viaje",
-                "zona_inicio_viaje","zona_fin_viaje",
-                "periodo_inicio_viaje","periodo_fin_viaje","tviaje_min",
-            ]
-            df = df[[c for c in stg_cols if c in df.columns]]
-            total += bulk_insert(self.conn, "staging.stg_viajes_trip", df,
-                                 truncate_first=self.overwrite_staging)
-
-        # viajes_leg
-        if "viajes_leg" in part.parquet_files:
-            df = self._read_parquet(part.parquet_files["viajes_leg"])
-            df = self._normalize_trip_df(df)
-            stg_cols = [
-                "cut","year","month","id_viaje","id_tarjeta","leg_seq","mode_code",
-                "service_code","operator_code","board_stop_code","alight_stop_code",
-                "ts_board","ts_alight",
-                "date_board_sk","time_board_30m_sk","date_alight_sk","time_alight_30m_sk",
-                "fare_period_alight_code","zone_board","zone_alight",
-                "tv_leg_min","tc_transfer_min","te_wait_min",
-            ]
-            df = df[[c for c in stg_cols if c in df.columns]]
-            total += bulk_insert(self.conn, "staging.stg_viajes_leg", df,
-                                 truncate_first=self.overwrite_staging)
-        return total
+    def stage_local(self, partition: SilverPartition) -> int:
+        """
+        --keys local: en vez de subir el staging a SQL Server, registra vistas
+        DuckDB staging.* sobre el Parquet con la misma proyección. Dims y facts
+        del cut se leen de ahí (ver _stg_fetch / insert_facts_local).
 
-    def _load_stg_etapas(self, part: SilverPartition) -> int:
-        pq_key = [k for k in part.parquet_files if "etapas" in k or "validation" in k]
-        if not pq_key:
-            log.warning("No se encontró parquet de etapas en %s/%s", part.dataset, part.cut)
+        Returns:
+            Filas del cut en las vistas (0 para dry-run).
+        """
+        if self.dry_run:
+            log.info("[DRY-RUN] staging local (DuckDB) para %s/%s", partition.dataset, partition.cut)
             return 0
 
-        p = str(part.parquet_files[pq_key[0]]).replace("\\", "/")
-
-        # Columnas disponibles en el parquet
-        schema_df = self._duckdb.execute(f"SELECT * FROM read_parquet('{p}') LIMIT 0").df()
-        parquet_cols = set(schema_df.columns)
-
-        # Construir SELECT en DuckDB: renombra year/month para evitar colisión,
-        # inyecta year/month/cut desde la partición como literales.
-        stg_cols = [
-            "cut","year","month","id_etapa","operador","contrato","tipo_dia","tipo_transporte",
-            "fExpansionServicioPeriodoTS","tiene_bajada","tiempo_subida","tiempo_bajada","tiempo_etapa",
-            "date_board_sk","time_board_30m_sk","date_alight_sk","time_alight_30m_sk",
-            "x_subida","y_subida","x_bajada","y_bajada",
-            "dist_ruta_paraderos","dist_eucl_paraderos",
-            "servicio_subida","servicio_bajada","parada_subida","parada_bajada",
-            "comuna_subida","comuna_bajada","zona_subida","zona_bajada",
-            "tEsperaMediaIntervalo","periodoSubida","periodoBajada",
-        ]
-        # Columnas que vienen del parquet (excluyendo year/month/cut que se inyectan)
-        injected = {"cut", "year", "month"}
-        select_parts = [
-            f"'{part.cut}' AS cut",
-            f"{part.year}  AS year",
-            f"{part.month} AS month",
-        ]
-        final_cols = ["cut", "year", "month"]
-        for col in stg_cols:
-            if col in injected:
-                continue
-            if col in parquet_cols:
-                select_parts.append(f'"{col}"')
-                final_cols.append(col)
-
-        sql = f"SELECT {', '.join(select_parts)} FROM read_parquet('{p}')"
-
-        # ── Streaming: DuckDB cursor → batches de 500K filas ──────────────
-        BATCH = 500_000
-        if self.overwrite_staging:
-            from src.gold.sql_helpers import execute_sql as _exec_sql
-            _exec_sql(self.conn, "TRUNCATE TABLE staging.stg_etapas_validation")
-            log.info("TRUNCATE TABLE staging.stg_etapas_validation")
-
-        cursor_ddb = self._duckdb.execute(sql)
-        col_names  = [desc[0] for desc in cursor_ddb.description]
-
+        sources, inject = self._local_sources(partition)
+        duck = self._duckdb
+        duck.execute("CREATE SCHEMA IF NOT EXISTS staging")
         total = 0
-        batch_num = 0
-        t0 = __import__("time").monotonic()
-        while True:
-            rows = cursor_ddb.fetchmany(BATCH)
-            if not rows:
-                break
-            batch_num += 1
-            df = pd.DataFrame(rows, columns=col_names)
-            df = df.astype(object).where(pd.notna(df), None)
-
-            # TINYINT-safe para time_sk (0-47)
-            for tcol in ["time_board_30m_sk", "time_alight_30m_sk"]:
-                if tcol in df.columns:
-                    df[tcol] = pd.to_numeric(df[tcol], errors="coerce").astype(object).where(pd.notna(df[tcol]), None)
-
-            n = bulk_insert(
-                self.conn, "staging.stg_etapas_validation", df,
-                truncate_first=False,   # ya truncamos arriba (o no se trunca)
-                chunk_size=50_000,
+        for table, path in sources:
+            src, select_list = _staging_projection(
+                duck, partition, path, STAGING_COLUMNS[table], inject_partition=inject,
             )
+            duck.execute(f"CREATE OR REPLACE VIEW {table} AS SELECT {select_list} FROM {src}")
+            n = duck.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # type: ignore[index]
+            log.info("%s (DuckDB): %s filas", table, f"{n:,}")
             total += n
-            elapsed = __import__("time").monotonic() - t0
-            log.info(
-                "stg_etapas batch %d | +%s filas | acum=%s | %.1fs",
-                batch_num, f"{n:,}", f"{total:,}", elapsed,
-            )
-
         return total
 
+    def _local_sources(
+        self, partition: SilverPartition,
+    ) -> tuple[list[tuple[str, Path | list[Path]]], bool]:
+        """
+        ([(tabla staging, parquet)], inject_partition) de un cut viajes/etapas
+        para las tablas/vistas DuckDB staging.* (stage_local, _stage_dims_local).
+        """
+        if partition.dataset == "viajes":
+            sources = [
+                ("staging.stg_viajes_trip", partition.parquet_files.get("viajes_trip")),
+                ("staging.stg_viajes_leg",  partition.parquet_files.get("viajes_leg")),
+            ]
+            inject = False
+        else:
+            if partition.day_files:
+                path = [partition.day_files[d] for d in sorted(partition.day_files)]
+            else:
+                pq_key = [k for k in partition.parquet_files if "etapas" in k or "validation" in k]
+                path = partition.parquet_files[pq_key[0]] if pq_key else None
+            sources = [("staging.stg_etapas_validation", path)]
+            inject = True
+        for table, path in sources:
+            if path is None:
+                raise FileNotFoundError(f"{partition.dataset}/{partition.cut}: falta el parquet de {table}")
+        return sources, inject  # type: ignore[return-value]
+
+    def _stage_dims_local(self, partition: SilverPartition) -> int:
+        """
+        --multi-cut: materializa en DuckDB staging.* del cut con solo
+        DIM_SOURCE_COLUMNS y las mismas filas que llegarían a SQL Server
+        (prefiltro de STAGING_PREFILTER) → las consultas de c.–e. corren locales
+        con self._stg_local. Devuelve las filas materializadas.
+        """
+        sources, inject = self._local_sources(partition)
+        duck = self._duckdb
+        duck.execute("CREATE SCHEMA IF NOT EXISTS staging")
+        total = 0
+        for table, path in sources:
+            src, select_list = _staging_projection(
+                duck, partition, path, DIM_SOURCE_COLUMNS[table], inject_partition=inject,
+            )
+            if table in STAGING_PREFILTER:
+                sql = _prefilter_sql(
+                    table, _parquet_source(path, partition.row_cut, numbered=True), select_list,
+                )
+            else:
+                sql = f"SELECT {select_list} FROM {src}"
+            duck.execute(f"CREATE OR REPLACE TABLE {table} AS {sql}")
+            total += duck.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # type: ignore[index]
+        return total
+
+    def _stg_fetch(self, sql: str) -> pd.DataFrame:
+        """SELECT sobre staging.*: SQL Server, o las vistas DuckDB con --keys local."""
+        if not self._stg_local:
+            return fetch_df(self.conn, sql)
+        cur = self._duckdb.execute(sql)
+        cols = [d[0] for d in cur.description]
+        return pd.DataFrame([list(r) for r in cur.fetchall()], columns=cols)
+
+    def _stg(self, table: str) -> str:
+        """Tabla física del staging `table`: la copia aparcada del cut en la fase 2 de run()."""
+        return self._stg_tables.get(table, table)
+
+    def _stg_scalar(self, sql: str) -> Any:
+        if not self._stg_local:
+            return execute_sql_scalar(self.conn, sql)
+        row = self._duckdb.execute(sql).fetchone()
+        return row[0] if row else None
+
+    def _stage_parquet(
+        self,
+        conn: pyodbc.Connection,
+        duck: duckdb.DuckDBPyConnection,
+        part: SilverPartition,
+        path: Path | list[Path],
+        table: str,
+        stg_cols: list[str],
+        inject_partition: bool = False,
+        casts: dict[str, str] | None = None,
+        label: str | None = None,
+        workers: int = 1,
+    ) -> int:
+        """
+        Streaming Parquet → staging (no trunca): DuckDB proyecta las columnas de
+        staging presentes en el archivo y entrega RecordBatches Arrow de
+        STAGING_BATCH_ROWS filas a bulk_insert_arrow. Memoria acotada por batch.
+
+        `inject_partition`: cut/year/month como literales de la partición en vez
+        de las columnas del archivo. `casts`: {columna: tipo DuckDB} al proyectar.
+        `workers` > 1: rangos de filas en paralelo (ver _stage_ranges).
+        Tablas de STAGING_PREFILTER: se cargan las filas de _prefilter_staging.
+        Cada llamada queda como detalle (tabla, label) del step a:staging.
+        """
+        with timed_step(self._steps, "a:staging", table, label or table, parquet_bytes(path)) as m:
+            m.rows = self._stage_parquet_once(
+                conn, duck, part, path, table, stg_cols, inject_partition, casts, label, workers,
+            )
+        return m.rows
+
+    def _stage_parquet_once(
+        self,
+        conn: pyodbc.Connection,
+        duck: duckdb.DuckDBPyConnection,
+        part: SilverPartition,
+        path: Path | list[Path],
+        table: str,
+        stg_cols: list[str],
+        inject_partition: bool,
+        casts: dict[str, str] | None,
+        label: str | None,
+        workers: int,
+    ) -> int:
+        src, select_list = _staging_projection(duck, part, path, stg_cols, inject_partition, casts)
+        label = label or table
+        if table in STAGING_PREFILTER and self.overwrite_staging:
+            pre = self._prefilter_staging(duck, part, path, table, select_list)
+            try:
+                n = duck.execute(f"SELECT COUNT(*) FROM {pre}").fetchone()[0]  # type: ignore[index]
+                size = max(math.ceil(n / workers), STAGING_MIN_RANGE_ROWS)
+                if workers > 1 and n > size:
+                    ranges = [
+                        (f"{label} [prefiltro:{lo}-{min(lo + size, n)}]",
+                         f"SELECT * FROM {pre} WHERE rowid >= {lo} AND rowid < {lo + size}")
+                        for lo in range(0, n, size)
+                    ]
+                    return self._stage_ranges(ranges, table, label, workers, n)
+                return self._stream_stage(conn, duck, table, f"SELECT * FROM {pre}", label)
+            finally:
+                duck.execute(f"DROP TABLE IF EXISTS {pre}")
+
+        if workers > 1:
+            ranges = [
+                (f"{label} [{p.name}:{lo}-{hi}]",
+                 f"SELECT {select_list} FROM {_parquet_source(p, part.row_cut, rows=(lo, hi))}")
+                for p, lo, hi in _split_row_ranges(duck, path, workers)
+            ]
+            if len(ranges) > 1:
+                expected = duck.execute(f"SELECT COUNT(*) FROM {src}").fetchone()[0]  # type: ignore[index]
+                return self._stage_ranges(ranges, table, label, workers, expected)
+
+        return self._stream_stage(conn, duck, table, f"SELECT {select_list} FROM {src}", label)
+
+    def _prefilter_staging(
+        self,
+        duck: duckdb.DuckDBPyConnection,
+        part: SilverPartition,
+        path: Path | list[Path],
+        table: str,
+        select_list: str,
+    ) -> str:
+        """
+        Preflight + dedup + filtro de efectivo de `table` en DuckDB
+        (STAGING_PREFILTER): cuenta total / efectivo / distinct_grain sobre el
+        Parquet y materializa en _pre_<tabla> solo las filas que el MERGE
+        insertaría, en el orden del archivo (OFFSET de --resume estable).
+        Los conteos quedan en el checkpoint preflight:<tabla>, que le indica
+        al MERGE que el staging ya viene deduplicado (_prefiltered).
+        """
+        fact, cash, _, grain, _ = STAGING_PREFILTER[table]
+        src = _parquet_source(path, part.row_cut, numbered=True)
+        pre = f"_pre_{table.split('.', 1)[1]}"
+        total, cash_rows, dist_grain = duck.execute(
+            f"""
+            SELECT
+                COUNT(*),
+                {f"COUNT(*) FILTER (WHERE {cash})" if cash else "0"},
+                (SELECT COUNT(*) FROM (
+                    SELECT DISTINCT {grain} FROM {src}{f" WHERE NOT ({cash})" if cash else ""}
+                ) g)
+            FROM {src}
+            """
+        ).fetchone()  # type: ignore[misc]
+        duck.execute(f"CREATE OR REPLACE TABLE {pre} AS {_prefilter_sql(table, src, select_list)}")
+        staged = duck.execute(f"SELECT COUNT(*) FROM {pre}").fetchone()[0]  # type: ignore[index]
+        log.info(
+            "preflight %s (DuckDB) | total=%d  con_tarjeta=%d  efectivo(excluidos)=%d"
+            "  distinct_grain(%s)=%d  a_staging=%d%s",
+            fact, total, total - cash_rows, cash_rows, grain.replace(" ", ""), dist_grain, staged,
+            "  [DEDUP rn=1 activo]" if total - cash_rows > dist_grain else "",
+        )
+        self._checkpoint(f"preflight:{table}", rows=total, ignored_cash_rows=cash_rows, completed=True)
+        return pre
+
+    def _prefiltered(self, table: str) -> tuple[int, int, bool] | None:
+        """
+        (total, efectivo, deduplicado) del preflight DuckDB si el staging de
+        `table` llegó sin efectivo (_prefilter_staging); None → el MERGE cuenta
+        y filtra en SQL Server. `deduplicado` es False con bcp: un corte entre
+        bcp y su checkpoint puede repetir un archivo, y el MERGE deduplica igual.
+        """
+        ck = self._checkpoints.get((f"preflight:{table}", ""))
+        if not ck:
+            return None
+        return ck[0], ck[1] or 0, self.stage_method != "bcp"
+
+    def _stream_stage(
+        self,
+        conn: pyodbc.Connection,
+        duck: duckdb.DuckDBPyConnection,
+        table: str,
+        select_sql: str,
+        source: str,
+    ) -> int:
+        """
+        `select_sql` (DuckDB) → bulk_insert_arrow sobre `table`, con checkpoint
+        (table, source) en la transacción de cada chunk. Con --resume retoma
+        desde las filas ya confirmadas de `source` (OFFSET sobre el mismo scan:
+        read_parquet conserva el orden del archivo). Devuelve filas de `source`
+        en staging, incluidas las de intentos anteriores.
+        """
+        done = self._checkpoints.get((table, source))
+        offset = done[0] if done else 0
+        if done and done[2]:
+            log.info("↻ RESUME %s: completo (%s filas) — skip", source, f"{offset:,}")
+            return offset
+        if offset:
+            log.info("↻ RESUME %s: desde la fila %s", source, f"{offset:,}")
+            select_sql += f" OFFSET {offset}"
+        if self._file_stage_ready(conn):
+            n = self._stage_files(conn, duck, table, select_sql, source, offset)
+        else:
+            reader = duck.execute(select_sql).fetch_record_batch(STAGING_BATCH_ROWS)
+            n = bulk_insert_arrow(
+                conn, table, reader, label=source, queue_depth=STAGING_PIPELINE_DEPTH,
+                on_commit=lambda rows: self._checkpoint(table, source, offset + rows, conn=conn, commit=False),
+            )
+        self._checkpoint(table, source, offset + n, completed=True, conn=conn)
+        return offset + n
+
+    def _file_stage_ready(self, conn: pyodbc.Connection) -> bool:
+        """
+        True si el staging va por archivo (--stage-method bulk|bcp). Se verifica
+        una vez por loader: `bcp` en el PATH, o que SQL Server lea
+        GOLD_BULK_SERVER_DIR. Si no, fallback a fast_executemany.
+        """
+        if self.stage_method == "executemany":
+            return False
+        with self._bulk_lock:
+            if self._file_stage is None:
+                self._file_stage = self._probe_file_stage(conn)
+        return self._file_stage
+
+    def _probe_file_stage(self, conn: pyodbc.Connection) -> bool:
+        if self.stage_method == "bcp":
+            if shutil.which("bcp"):
+                return True
+            log.warning("--stage-method bcp: 'bcp' no está en el PATH → staging con fast_executemany")
+            return False
+
+        # bulk: SQL Server debe leer el archivo que escribe el loader (OPENROWSET, mismo permiso que BULK INSERT)
+        local_dir, server_dir = bulk_dirs()
+        token = uuid.uuid4().hex
+        name = f"_probe_{token}.txt"
+        try:
+            local_dir.mkdir(parents=True, exist_ok=True)
+            (local_dir / name).write_text(token, encoding="utf-8")
+            seen = execute_sql_scalar(
+                conn,
+                f"SELECT BulkColumn FROM OPENROWSET(BULK N'{server_path(server_dir, name)}', SINGLE_CLOB) AS f",
+            )
+        except Exception as exc:  # noqa: BLE001
+            conn.rollback()
+            log.warning(
+                "--stage-method bulk: SQL Server no lee %s (%s) → staging con fast_executemany",
+                server_dir, exc,
+            )
+            return False
+        finally:
+            (local_dir / name).unlink(missing_ok=True)
+        if (seen or "").strip() != token:
+            log.warning("--stage-method bulk: %s no es %s visto desde SQL Server → fast_executemany", server_dir, local_dir)
+            return False
+        log.info("--stage-method bulk: archivos en %s (servidor: %s)", local_dir, server_dir)
+        return True
+
+    def _bulk_view(self, conn: pyodbc.Connection, table: str, cols: list[str]) -> str:
+        """
+        Vista staging.bulk_<tabla> con las columnas del archivo: BULK INSERT y
+        bcp cargan por posición todas las columnas del destino, y la tabla tiene
+        además stg_loaded_at (DEFAULT) y columnas ausentes en algunos Parquet.
+        """
+        view = f"staging.bulk_{table.split('.', 1)[1]}"
+        with self._bulk_lock:
+            if self._bulk_views.get(view) != tuple(cols):
+                execute_sql(
+                    conn,
+                    f"CREATE OR ALTER VIEW {view} AS SELECT {', '.join(f'[{c}]' for c in cols)} FROM {table}",
+                ).close()
+                self._bulk_views[view] = tuple(cols)
+        return view
+
+    def _stage_files(
+        self,
+        conn: pyodbc.Connection,
+        duck: duckdb.DuckDBPyConnection,
+        table: str,
+        select_sql: str,
+        source: str,
+        offset: int,
+    ) -> int:
+        """
+        --stage-method bulk|bcp: DuckDB escribe `select_sql` en archivos de
+        STAGING_FILE_ROWS filas (campos 0x1F, sin quoting) que entran con
+        BULK INSERT ... WITH (TABLOCK) o bcp sobre staging.bulk_<tabla> (sin
+        TABLOCK si la tabla es memory-optimized). Con
+        BULK INSERT cada archivo y su checkpoint se confirman en la misma
+        transacción; bcp confirma en su propia conexión y el checkpoint va
+        justo después. Devuelve filas insertadas.
+        """
+        local_dir, server_dir = bulk_dirs()
+        local_dir.mkdir(parents=True, exist_ok=True)
+        reader = duck.execute(select_sql).fetch_record_batch(STAGING_BATCH_ROWS)
+        view = self._bulk_view(conn, table, reader.schema.names)
+        tablock = not self._memory_optimized(table)
+        file_cols = ", ".join(_bulk_column_sql(f) for f in reader.schema)
+        arrow_name = f"_bulk_{threading.get_ident()}"
+        writer = self._duckdb.cursor()  # `duck` sigue entregando batches del reader
+        files: list[Path] = []          # escritos por el lector; se borran al final aunque falle
+        total = 0
+
+        def _files() -> Iterator[tuple[str, Path, int]]:
+            """Lector: agrupa batches hasta STAGING_FILE_ROWS y escribe cada archivo."""
+            pending: list[pa.RecordBatch] = []
+            written = 0
+            for batch in itertools.chain(reader, [None]):
+                if batch is not None:
+                    pending.append(batch)
+                    if sum(b.num_rows for b in pending) < STAGING_FILE_ROWS:
+                        continue
+                if not any(b.num_rows for b in pending):
+                    continue
+                chunk = pa.Table.from_batches(pending, schema=reader.schema)
+                pending = []
+                name = f"{table}.{os.getpid()}.{threading.get_ident()}.{written}.txt"
+                path = local_dir / name
+                files.append(path)
+                writer.register(arrow_name, chunk)
+                try:
+                    writer.execute(
+                        f"COPY (SELECT {file_cols} FROM {arrow_name}) TO '{path.as_posix()}' "
+                        f"(FORMAT CSV, HEADER false, DELIMITER '\x1f', QUOTE '', ESCAPE '', NULLSTR '')"
+                    )
+                finally:
+                    writer.unregister(arrow_name)
+                written += chunk.num_rows
+                yield name, path, chunk.num_rows
+
+        def _load(item: tuple[str, Path, int]) -> None:
+            """Escritor: BULK INSERT / bcp del archivo + checkpoint, en orden."""
+            nonlocal total
+            name, path, rows = item
+            tb = time.monotonic()
+            try:
+                if self.stage_method == "bcp":
+                    n = bcp_file(view, path, rows, tablock=tablock)
+                    self._checkpoint(table, source, offset + total + n, conn=conn)
+                else:
+                    n = bulk_insert_file(
+                        conn, view, server_path(server_dir, name), rows, tablock=tablock,
+                    )
+                    if n != rows:
+                        conn.rollback()
+                        raise RuntimeError(
+                            f"{source}: BULK INSERT cargó {n:,} de {rows:,} filas de {name}"
+                        )
+                    self._checkpoint(table, source, offset + total + n, conn=conn, commit=False)
+                    conn.commit()
+            finally:
+                path.unlink(missing_ok=True)
+            if n != rows:
+                raise RuntimeError(f"{source}: bcp copió {n:,} de {rows:,} filas de {name}")
+            total += n
+            elapsed = time.monotonic() - tb
+            log.info(
+                "%s %s | +%s filas | acum=%s | %.0f filas/s",
+                source, self.stage_method, f"{n:,}", f"{total:,}", n / elapsed if elapsed else 0,
+            )
+
+        try:
+            stats = run_pipeline(_files(), [_load], depth=STAGING_PIPELINE_DEPTH, label=source)
+        finally:
+            writer.close()
+            for path in files:
+                path.unlink(missing_ok=True)
+
+        log.info(
+            "%s %s: %s filas en %.1fs (%.0f filas/s)",
+            self.stage_method, table, f"{total:,}", stats.elapsed,
+            total / stats.elapsed if stats.elapsed else 0,
+        )
+        stats.log()
+        return total
+
+    def _stage_ranges(
+        self,
+        ranges: list[tuple[str, str]],
+        table: str,
+        label: str,
+        workers: int,
+        expected: int,
+    ) -> int:
+        """
+        Staging paralelo: cada rango (source, SELECT DuckDB) — filas [lo, hi)
+        de un archivo o de la tabla prefiltrada — en su propia conexión SQL
+        Server + cursor DuckDB, insertando concurrente en el heap de staging
+        (sin índices; sin TABLOCK, que serializaría los INSERT parametrizados).
+        Al final se reconcilian las filas insertadas con el COUNT(*) de DuckDB.
+        """
+        sources = [source for source, _ in ranges]
+        stale = [
+            src for tbl, src in self._checkpoints
+            if tbl == table and src.startswith(f"{label} [") and src not in sources
+        ]
+        if stale:
+            raise RuntimeError(
+                f"{label}: checkpoints de rangos distintos a los actuales ({stale[:3]}); "
+                "re-ejecutar con el mismo --stage-workers o sin --resume"
+            )
+
+        def _stage_range(item: tuple[str, str]) -> int:
+            source, select_sql = item
+            duck = self._duckdb.cursor()
+            try:
+                return self.pool.run(
+                    lambda conn: self._stream_stage(conn, duck, table, select_sql, source),
+                    label=source,
+                    on_retry=lambda conn: self._refresh_checkpoint(table, source, conn),
+                )
+            finally:
+                duck.close()
+
+        t0 = time.monotonic()
+        workers = min(workers, len(ranges))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stg_range") as pool:
+            counts = list(pool.map(_stage_range, ranges))
+        total = sum(counts)
+        if total != expected:
+            raise RuntimeError(
+                f"{label}: staging paralelo insertó {total:,} filas, se esperaban {expected:,} "
+                f"(rangos={counts})"
+            )
+        elapsed = time.monotonic() - t0
+        log.info(
+            "%s: %d rangos | %d conexiones | %s filas reconciliadas | %.0f filas/s",
+            label, len(ranges), workers, f"{total:,}", total / elapsed if elapsed else 0,
+        )
+        return total
+
+    def _load_stg_viajes(self, part: SilverPartition) -> int:
+        total = 0
+        # viajes_trip
+        if "viajes_trip" in part.parquet_files:
+            self._truncate_staging("staging.stg_viajes_trip")
+            total += self._stage_parquet(
+                self.conn, self._duckdb, part, part.parquet_files["viajes_trip"],
+                "staging.stg_viajes_trip", STAGING_COLUMNS["staging.stg_viajes_trip"],
+                casts=_STG_VIAJES_CASTS,
+                label="stg_viajes_trip", workers=self.stage_workers,
+            )
+
+        # viajes_leg
+        if "viajes_leg" in part.parquet_files:
+            self._truncate_staging("staging.stg_viajes_leg")
+            total += self._stage_parquet(
+                self.conn, self._duckdb, part, part.parquet_files["viajes_leg"],
+                "staging.stg_viajes_leg", STAGING_COLUMNS["staging.stg_viajes_leg"],
+                casts=_STG_VIAJES_CASTS,
+                label="stg_viajes_leg", workers=self.stage_workers,
+            )
+        return total
+
+    def _load_stg_etapas(self, part: SilverPartition) -> int:
+        if part.day_files:
+            return self._load_stg_etapas_days(part)
+
+        pq_key = [k for k in part.parquet_files if "etapas" in k or "validation" in k]
+        if not pq_key:
+            log.warning("No se encontró parquet de etapas en %s/%s", part.dataset, part.cut)
+            return 0
+
+        self._truncate_staging("staging.stg_etapas_validation")
+
+        return self._stream_stg_etapas(
+            self.conn, self._duckdb, part, part.parquet_files[pq_key[0]], label="stg_etapas",
+            workers=self.stage_workers,
+        )
+
+    def _load_stg_etapas_days(self, part: SilverPartition) -> int:
+        """
+        Staging de un cut con sub-particiones diarias: cada día se carga en su
+        propio worker (conexión SQL Server + cursor DuckDB propios) sobre el heap
+        staging.stg_etapas_validation.
+        """
+        self._truncate_staging("staging.stg_etapas_validation")
+
+        days = sorted(part.day_files)
+        workers = min(self.day_workers, len(days))
+        log.info("stg_etapas: %d días | workers=%d", len(days), workers)
+
+        if workers == 1:
+            return sum(
+                self._stream_stg_etapas(
+                    self.conn, self._duckdb, part, part.day_files[d], label=f"stg_etapas day={d}",
+                )
+                for d in days
+            )
+
+        def _stage_day(day_sk: int) -> int:
+            label = f"stg_etapas day={day_sk}"
+            duck = self._duckdb.cursor()
+            try:
+                return self.pool.run(
+                    lambda conn: self._stream_stg_etapas(conn, duck, part, part.day_files[day_sk], label=label),
+                    label=label,
+                    on_retry=lambda conn: self._refresh_checkpoint("staging.stg_etapas_validation", label, conn),
+                )
+            finally:
+                duck.close()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stg_day") as pool:
+            return sum(pool.map(_stage_day, days))
+
+    def _stream_stg_etapas(
+        self,
+        conn: pyodbc.Connection,
+        duck: duckdb.DuckDBPyConnection,
+        part: SilverPartition,
+        path: Path | list[Path],
+        label: str,
+        workers: int = 1,
+    ) -> int:
+        """Streaming de un parquet de etapas → staging.stg_etapas_validation (no trunca)."""
+        # year/month/cut se inyectan desde la partición (evita colisión con el archivo)
+        return self._stage_parquet(
+            conn, duck, part, path, "staging.stg_etapas_validation",
+            STAGING_COLUMNS["staging.stg_etapas_validation"], inject_partition=True, label=label, workers=workers,
+        )
+
     def _load_stg_subidas(self, part: SilverPartition) -> int:
         if "subidas_30m" not in part.parquet_files:
             return 0
-        df = self._read_parquet(part.parquet_files["subidas_30m"])
-        df["cut"]   = part.cut
-        df["year"]  = part.year
-        df["month"] = part.month
-        stg_cols = ["cut","year","month","tipo_dia","mode_code","stop_code","comuna","time_30m_sk","subidas_promedio"]
-        df = df[[c for c in stg_cols if c in df.columns]]
-        return bulk_insert(self.conn, "staging.stg_subidas_30m", df,
-                           truncate_first=self.overwrite_staging)
-
-    @staticmethod
-    def _normalize_trip_df(df: pd.DataFrame) -> pd.DataFrame:
-        """Normaliza types comunes en viajes_trip / viajes_leg para staging."""
-        if "year" in df.columns:
-            df["year"] = pd.to_numeric(df["year"], errors="coerce")
-        if "month" in df.columns:
-            df["month"] = pd.to_numeric(df["month"], errors="coerce")
-        # time_30m_sk columns: BIGINT en parquet → TINYINT en staging (0-47)
-        for col in df.columns:
-            if "30m_sk" in col and col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce").astype(object).where(pd.notna(df[col]), None)
-        return df
+        self._truncate_staging("staging.stg_subidas_30m")
+        return self._stage_parquet(
+            self.conn, self._duckdb, part, part.parquet_files["subidas_30m"],
+            "staging.stg_subidas_30m", STAGING_COLUMNS["staging.stg_subidas_30m"],
+            inject_partition=True, label="stg_subidas",
+        )
+
+    def _truncate_staging(self, table: str) -> None:
+        """
+        TRUNCATE de `table` antes de cargarla (con overwrite_staging; DELETE si
+        es memory-optimized, que no admite TRUNCATE). Con --resume y la tabla
+        tal como la dejó el intento anterior (COUNT(*) = filas de sus
+        checkpoints) se conservan las filas confirmadas y cada archivo retoma
+        desde su checkpoint (_stream_stage).
+        """
+        if not self.overwrite_staging:
+            return
+        if self._staging_intact(table):
+            log.info("↻ RESUME %s: sin TRUNCATE, filas confirmadas conservadas", table)
+            return
+        if self._memory_optimized(table):
+            execute_sql(self.conn, f"DELETE FROM {table}").close()
+            log.info("DELETE FROM %s (memory-optimized)", table)
+        else:
+            execute_sql(self.conn, f"TRUNCATE TABLE {table}")
+            log.info("TRUNCATE TABLE %s", table)
+        self._forget_checkpoints(table)
+
+    def _memory_optimized(self, table: str) -> bool:
+        """True si `table` es memory-optimized (perfil --staging memory)."""
+        if table not in self._memory_tables:
+            self._memory_tables[table] = bool(execute_sql_scalar(
+                self.conn,
+                "SELECT is_memory_optimized FROM sys.tables WHERE object_id = OBJECT_ID(?)",
+                (table,),
+            ))
+        return self._memory_tables[table]
+
+    def _disk_staging(self) -> list[str]:
+        """Tablas stg_* de STAGING_TABLES que no son memory-optimized."""
+        return [t for ts in STAGING_TABLES.values() for t in ts if not self._memory_optimized(t)]
+
+    def _staging_intact(self, table: str) -> bool:
+        """True si `table` tiene checkpoints y exactamente las filas que registran."""
+        if not any(step == table for step, _ in self._checkpoints):
+            return False
+        done = sum(ck[0] for (step, _), ck in self._checkpoints.items() if step == table)
+        rows = execute_sql_scalar(self.conn, f"SELECT COUNT_BIG(*) FROM {table}") or 0
+        if rows != done:
+            log.warning(
+                "↻ RESUME %s: %s filas en staging, checkpoints=%s → recarga completa",
+                table, f"{rows:,}", f"{done:,}",
+            )
+            return False
+        return True
 
     # ── 4. Upsert dim_cut ─────────────────────────────────────
 
@@ -789,9 +2325,13 @@ class GoldLoader:
         total_bytes: int | None = None
         source_file: str | None = None
         try:
-            total_bytes = sum(p.stat().st_size for p in partition.parquet_files.values())
+            files = [
+                p for v in partition.parquet_files.values()
+                for p in (v if isinstance(v, list) else [v])
+            ]
+            total_bytes = sum(p.stat().st_size for p in files)
             # Usar el parquet principal (el de mayor tamaño) como source_file representativo
-            main_pq = max(partition.parquet_files.values(), key=lambda p: p.stat().st_size)
+            main_pq = max(files, key=lambda p: p.stat().st_size)
             source_file = str(main_pq.relative_to(_PROJECT_ROOT)).replace("\\", "/")
         except Exception:
             pass
@@ -819,77 +2359,99 @@ class GoldLoader:
 
     # ── 5. Dims simples (sin SCD2) ────────────────────────────
 
-    def upsert_simple_dims(self, dataset: str) -> None:
-        """Upserta dim_fare_period, dim_purpose y dim_operator_contract desde staging."""
+    def upsert_simple_dims(
+        self,
+        dataset: str,
+        candidates: dict[str, tuple[str, list[Any], list[str] | None]] | None = None,
+    ) -> dict[str, int]:
+        """
+        Upserta dim_fare_period, dim_purpose y dim_operator_contract desde staging
+        (o desde `candidates`, ver _simple_dim_candidates). Un batch set-based por
+        dimensión; devuelve {dim_table: filas insertadas}.
+        """
         if self.dry_run:
-            return
+            return {}
+        if candidates is None:
+            candidates = self._simple_dim_candidates(dataset)
+        return {
+            dim_table: upsert_lookup_dim(self.conn, dim_table, bk_col, values, attr_cols=attr_cols)
+            for dim_table, (bk_col, values, attr_cols) in candidates.items()
+        }
+
+    def _simple_dim_candidates(
+        self, dataset: str,
+    ) -> dict[str, tuple[str, list[Any], list[str] | None]]:
+        """{dim_table: (bk_col, valores, attr_cols)} de las dims simples en el staging de `dataset`."""
+        candidates: dict[str, tuple[str, list[Any], list[str] | None]] = {}
 
         if dataset in ("viajes", "etapas"):
             # Fare periods
             fare_periods: list[str] = []
             if dataset == "viajes":
                 for col in ("periodo_inicio_viaje", "periodo_fin_viaje"):
-                    r = fetch_df(self.conn, f"SELECT DISTINCT [{col}] FROM staging.stg_viajes_trip WHERE [{col}] IS NOT NULL")
+                    r = self._stg_fetch(f"SELECT DISTINCT {col} FROM staging.stg_viajes_trip WHERE {col} IS NOT NULL")
                     fare_periods += r.iloc[:, 0].tolist()
             elif dataset == "etapas":
                 for col in ("periodoSubida", "periodoBajada"):
-                    r = fetch_df(self.conn, f"SELECT DISTINCT [{col}] FROM staging.stg_etapas_validation WHERE [{col}] IS NOT NULL")
+                    r = self._stg_fetch(f"SELECT DISTINCT {col} FROM staging.stg_etapas_validation WHERE {col} IS NOT NULL")
                     fare_periods += r.iloc[:, 0].tolist()
-            upsert_lookup_dim(self.conn, "dw.dim_fare_period", "fare_period_name", fare_periods)
+            candidates["dw.dim_fare_period"] = ("fare_period_name", fare_periods, None)
 
         if dataset == "viajes":
             # Propósitos
-            r = fetch_df(self.conn, "SELECT DISTINCT proposito FROM staging.stg_viajes_trip WHERE proposito IS NOT NULL")
-            upsert_lookup_dim(self.conn, "dw.dim_purpose", "purpose_name", r["proposito"].tolist())
+            r = self._stg_fetch("SELECT DISTINCT proposito FROM staging.stg_viajes_trip WHERE proposito IS NOT NULL")
+            candidates["dw.dim_purpose"] = ("purpose_name", r["proposito"].tolist(), None)
 
             # Operadores/contratos
-            r = fetch_df(self.conn, "SELECT DISTINCT contrato FROM staging.stg_viajes_trip WHERE contrato IS NOT NULL")
-            for _, row in r.iterrows():
-                code = str(row["contrato"]).strip()
-                if code:
-                    execute_sql(
-                        self.conn,
-                        """
-                        IF NOT EXISTS (SELECT 1 FROM dw.dim_operator_contract WHERE contract_code = ?)
-                            INSERT INTO dw.dim_operator_contract (contract_code) VALUES (?)
-                        """,
-                        (code, code),
-                        commit=False,
-                    )
-            self.conn.commit()
+            r = self._stg_fetch("SELECT DISTINCT contrato FROM staging.stg_viajes_trip WHERE contrato IS NOT NULL")
+            candidates["dw.dim_operator_contract"] = (
+                "contract_code", [str(v).strip() for v in r["contrato"].tolist()], None,
+            )
 
         if dataset == "etapas":
             # Operadores desde etapas (columna operador)
-            r = fetch_df(self.conn, "SELECT DISTINCT operador, contrato FROM staging.stg_etapas_validation WHERE operador IS NOT NULL OR contrato IS NOT NULL")
-            for _, row in r.iterrows():
-                op  = str(row.get("operador") or "").strip() or None
-                con = str(row.get("contrato") or "").strip() or None
-                bk  = con or op
-                if bk:
-                    execute_sql(
-                        self.conn,
-                        """
-                        IF NOT EXISTS (SELECT 1 FROM dw.dim_operator_contract WHERE contract_code = ?)
-                            INSERT INTO dw.dim_operator_contract (contract_code, operator_code) VALUES (?, ?)
-                        """,
-                        (bk, bk, op),
-                        commit=False,
-                    )
-            self.conn.commit()
+            r = self._stg_fetch("SELECT DISTINCT operador, contrato FROM staging.stg_etapas_validation WHERE operador IS NOT NULL OR contrato IS NOT NULL")
+            pairs = []
+            for op, con in zip(r["operador"].tolist(), r["contrato"].tolist()):
+                op  = str(op or "").strip() or None
+                con = str(con or "").strip() or None
+                pairs.append((con or op, op))
+            candidates["dw.dim_operator_contract"] = ("contract_code", pairs, ["operator_code"])
+
+        return candidates
 
     # ── 6. SCD2 dims (dim_stop, dim_service) ─────────────────
 
-    def upsert_dim_stop(self, dataset: str, event_date: date) -> None:
+    def _scd2_upsert(self, *args: Any, **kwargs: Any) -> dict[str, int]:
+        """Despacha al upsert SCD2 según --scd2-mode."""
+        fn = scd2_upsert_set if self.scd2_mode == "set" else scd2_upsert
+        return fn(*args, **kwargs)
+
+    def upsert_dim_stop(self, dataset: str, event_date: date) -> dict[str, int]:
+        """Agrega stops nuevos/cambiados en dim_stop via SCD2 (candidatos: _stop_candidates)."""
+        if self.dry_run:
+            return {}
+        all_stops = self._stop_candidates(dataset)
+        if all_stops is None:
+            return {}
+        bk_col, attr_cols = SCD2_DIMS["dw.dim_stop"]
+        return self._scd2_upsert(
+            self.conn,
+            dim_table="dw.dim_stop",
+            bk_col=bk_col,
+            attr_cols=attr_cols,
+            new_df=all_stops,
+            event_date=event_date,
+        )
+
+    def _stop_candidates(self, dataset: str) -> pd.DataFrame | None:
         """
-        Agrega stops nuevos/cambiados en dim_stop via SCD2.
+        Candidatos de dim_stop (uno por stop_code) desde staging.
         Fuentes:
           - viajes: board_stop_code/alight_stop_code de stg_viajes_leg
           - etapas: parada_subida/parada_bajada de stg_etapas_validation (con coords)
           - subidas_30m: stop_code de stg_subidas_30m
         """
-        if self.dry_run:
-            return
-
         stops_dfs: list[pd.DataFrame] = []
 
         if dataset == "viajes":
@@ -897,17 +2459,16 @@ class GoldLoader:
                 ("board_stop_code",  None, "zone_board"),
                 ("alight_stop_code", None, "zone_alight"),
             ]:
-                r = fetch_df(
-                    self.conn,
+                r = self._stg_fetch(
                     f"""
                     SELECT DISTINCT
-                        [{col}] AS stop_code,
+                        {col} AS stop_code,
                         NULL AS comuna,
-                        CAST([{zone_col}] AS VARCHAR(20)) AS zone_code,
+                        CAST({zone_col} AS VARCHAR(20)) AS zone_code,
                         NULL AS x_utm,
                         NULL AS y_utm
                     FROM staging.stg_viajes_leg
-                    WHERE [{col}] IS NOT NULL
+                    WHERE {col} IS NOT NULL
                     """,
                 )
                 stops_dfs.append(r)
@@ -917,24 +2478,22 @@ class GoldLoader:
                 ("parada_subida", "comuna_subida", "zona_subida", "x_subida", "y_subida"),
                 ("parada_bajada", "comuna_bajada", "zona_bajada", "x_bajada", "y_bajada"),
             ]:
-                r = fetch_df(
-                    self.conn,
+                r = self._stg_fetch(
                     f"""
                     SELECT DISTINCT
-                        [{stop_col}] AS stop_code,
-                        [{com_col}] AS comuna,
-                        CAST([{zone_col}] AS VARCHAR(20)) AS zone_code,
-                        [{x_col}] AS x_utm,
-                        [{y_col}] AS y_utm
+                        {stop_col} AS stop_code,
+                        {com_col} AS comuna,
+                        CAST({zone_col} AS VARCHAR(20)) AS zone_code,
+                        {x_col} AS x_utm,
+                        {y_col} AS y_utm
                     FROM staging.stg_etapas_validation
-                    WHERE [{stop_col}] IS NOT NULL
+                    WHERE {stop_col} IS NOT NULL
                     """,
                 )
                 stops_dfs.append(r)
 
         elif dataset == "subidas_30m":
-            r = fetch_df(
-                self.conn,
+            r = self._stg_fetch(
                 """
                 SELECT DISTINCT
                     stop_code,
@@ -950,7 +2509,7 @@ class GoldLoader:
             stops_dfs.append(r)
 
         if not stops_dfs:
-            return
+            return None
 
         all_stops = pd.concat(stops_dfs, ignore_index=True)
         # Agregar: para un mismo stop_code, tomar atributos más completos
@@ -959,25 +2518,29 @@ class GoldLoader:
             .groupby("stop_code", as_index=False)
             .agg({"comuna": "first", "zone_code": "first", "x_utm": "first", "y_utm": "first"})
         )
-        all_stops = all_stops.astype(object).where(pd.notna(all_stops), None)
+        return all_stops.astype(object).where(pd.notna(all_stops), None)
 
-        scd2_upsert(
+    def upsert_dim_service(self, dataset: str, event_date: date) -> dict[str, int]:
+        """SCD2 upsert para dim_service (candidatos: _service_candidates)."""
+        if self.dry_run:
+            return {}
+        svc_df = self._service_candidates(dataset)
+        if svc_df is None:
+            return {}
+        bk_col, attr_cols = SCD2_DIMS["dw.dim_service"]
+        return self._scd2_upsert(
             self.conn,
-            dim_table="dw.dim_stop",
-            bk_col="stop_code",
-            attr_cols=["stop_name", "stop_type", "comuna", "zone_code", "x_utm", "y_utm"],
-            new_df=all_stops,
+            dim_table="dw.dim_service",
+            bk_col=bk_col,
+            attr_cols=attr_cols,
+            new_df=svc_df,
             event_date=event_date,
         )
 
-    def upsert_dim_service(self, dataset: str, event_date: date) -> None:
-        """SCD2 upsert para dim_service."""
-        if self.dry_run:
-            return
-
+    def _service_candidates(self, dataset: str) -> pd.DataFrame | None:
+        """Candidatos de dim_service (uno por service_code) desde staging."""
         if dataset == "viajes":
-            r = fetch_df(
-                self.conn,
+            r = self._stg_fetch(
                 """
                 SELECT DISTINCT service_code, mode_code
                 FROM staging.stg_viajes_leg
@@ -985,8 +2548,7 @@ class GoldLoader:
                 """,
             )
         elif dataset == "etapas":
-            r = fetch_df(
-                self.conn,
+            r = self._stg_fetch(
                 """
                 SELECT s AS service_code, t AS mode_code FROM (
                     SELECT DISTINCT servicio_subida AS s, tipo_transporte AS t FROM staging.stg_etapas_validation WHERE servicio_subida IS NOT NULL
@@ -996,10 +2558,10 @@ class GoldLoader:
                 """,
             )
         else:
-            return  # subidas_30m no tiene service_code
+            return None  # subidas_30m no tiene service_code
 
         if r.empty:
-            return
+            return None
 
         svc_df = (
             r.groupby("service_code", as_index=False)
@@ -1007,16 +2569,7 @@ class GoldLoader:
         )
         # stop_name no disponible en Silver → NULL
         svc_df["service_name"] = None
-        svc_df = svc_df.astype(object).where(pd.notna(svc_df), None)
-
-        scd2_upsert(
-            self.conn,
-            dim_table="dw.dim_service",
-            bk_col="service_code",
-            attr_cols=["service_name", "mode_code"],
-            new_df=svc_df,
-            event_date=event_date,
-        )
+        return svc_df.astype(object).where(pd.notna(svc_df), None)
 
     # ── 7. Merge Facts ────────────────────────────────────────
 
@@ -1027,13 +2580,14 @@ class GoldLoader:
             (dataset, cut_id),
         )
 
-    def merge_fct_trip(self, partition: SilverPartition) -> int:
+    def merge_fct_trip(self, partition: SilverPartition, target: str = "dw.fct_trip") -> int:
         """
         MERGE set-based staging.stg_viajes_trip → dw.fct_trip.
         Grain real: (cut_sk, id_tarjeta, id_viaje).
         id_viaje es un contador por tarjeta/día (1..27), NO un ID global.
         Filtra efectivo (id_tarjeta IS NULL) — sin BK único, se excluyen de facts.
         Idempotente vía UX_fct_trip_grain (filtrado WHERE id_tarjeta IS NOT NULL).
+        `target` es dw.fct_trip o su tabla de switch (ver _load_fact).
         Devuelve (filas_insertadas, filas_efectivo_excluidas).
         """
         if self.dry_run:
@@ -1049,39 +2603,50 @@ class GoldLoader:
         if cut_sk is None:
             log.error("No se encontró cut_sk para %s/%s — abortar merge_fct_trip", partition.dataset, partition.cut)
             return 0, 0
+        stg = self._stg("staging.stg_viajes_trip")
 
-        # ── Preflight: diagnostico de grain antes del MERGE ────────────────
-        total_rows   = execute_sql_scalar(self.conn, "SELECT COUNT(*) FROM staging.stg_viajes_trip") or 0
-        cash_rows    = execute_sql_scalar(
-            self.conn, "SELECT COUNT(*) FROM staging.stg_viajes_trip WHERE id_tarjeta IS NULL",
-        ) or 0
-        tarjeta_rows = total_rows - cash_rows
-        dist_grain   = execute_sql_scalar(
-            self.conn,
-            "SELECT COUNT(*) FROM (SELECT DISTINCT id_tarjeta, id_viaje"
-            " FROM staging.stg_viajes_trip WHERE id_tarjeta IS NOT NULL) g",
-        ) or 0
-        log.info(
-            "preflight fct_trip | total=%d  con_tarjeta=%d  efectivo(excluidos)=%d"
-            "  distinct_grain(id_tarjeta,id_viaje)=%d%s",
-            total_rows, tarjeta_rows, cash_rows, dist_grain,
-            "  [DEDUP rn=1 activo]" if tarjeta_rows > dist_grain else "",
-        )
-
-        sql = f"""
-        -- Grain real: (cut_sk, id_tarjeta, id_viaje).
-        -- id_viaje es contador por tarjeta/día (1..27), NO es un ID global.
-        -- Viajes en efectivo (id_tarjeta IS NULL) se excluyen: no tienen BK único.
-        -- Si Silver produce duplicados sobre el grain, conservamos el más reciente.
-        WITH src_dedup AS (
+        pre = self._prefiltered("staging.stg_viajes_trip")
+        if pre is not None and pre[2]:
+            # Preflight, dedup y efectivo resueltos en DuckDB (_prefilter_staging)
+            cash_rows = pre[1]
+            src_dedup = f"SELECT *, 1 AS _rn FROM {stg}"
+        else:
+            # ── Preflight: diagnostico de grain antes del MERGE ────────────
+            if pre is not None:
+                cash_rows = pre[1]   # bcp: efectivo ya filtrado en DuckDB, dedup en SQL Server
+            else:
+                total_rows   = execute_sql_scalar(self.conn, f"SELECT COUNT(*) FROM {stg}") or 0
+                cash_rows    = execute_sql_scalar(
+                    self.conn, f"SELECT COUNT(*) FROM {stg} WHERE id_tarjeta IS NULL",
+                ) or 0
+                tarjeta_rows = total_rows - cash_rows
+                dist_grain   = execute_sql_scalar(
+                    self.conn,
+                    "SELECT COUNT(*) FROM (SELECT DISTINCT id_tarjeta, id_viaje"
+                    f" FROM {stg} WHERE id_tarjeta IS NOT NULL) g",
+                ) or 0
+                log.info(
+                    "preflight fct_trip | total=%d  con_tarjeta=%d  efectivo(excluidos)=%d"
+                    "  distinct_grain(id_tarjeta,id_viaje)=%d%s",
+                    total_rows, tarjeta_rows, cash_rows, dist_grain,
+                    "  [DEDUP rn=1 activo]" if tarjeta_rows > dist_grain else "",
+                )
+            src_dedup = f"""
             SELECT *,
                 ROW_NUMBER() OVER (
                     PARTITION BY id_tarjeta, id_viaje
                     ORDER BY tiempo_inicio_viaje DESC
                 ) AS _rn
-            FROM staging.stg_viajes_trip
+            FROM {stg}
             WHERE id_tarjeta IS NOT NULL         -- excluir efectivo
-        ),
+            """
+
+        sql = f"""
+        -- Grain real: (cut_sk, id_tarjeta, id_viaje).
+        -- id_viaje es contador por tarjeta/día (1..27), NO es un ID global.
+        -- Viajes en efectivo (id_tarjeta IS NULL) se excluyen: no tienen BK único.
+        -- Si Silver produce duplicados sobre el grain, conservamos el más reciente.
+        WITH src_dedup AS ({src_dedup}),
         -- CTE 2: precomputa event_dt (DATE) desde date_start_sk (YYYYMMDD INT).
         -- DATEFROMPARTS evita conversión varchar; null-safe con CASE.
         src_prep AS (
@@ -1116,7 +2681,7 @@ class GoldLoader:
             FROM src_dedup s
             WHERE s._rn = 1
         )
-        MERGE dw.fct_trip AS tgt
+        MERGE {target} AS tgt
         USING (
             SELECT
                 s.date_start_sk,
@@ -1188,7 +2753,7 @@ class GoldLoader:
         )
         return n, cash_rows
 
-    def merge_fct_trip_leg(self, partition: SilverPartition) -> int:
+    def merge_fct_trip_leg(self, partition: SilverPartition, target: str = "dw.fct_trip_leg") -> int:
         """
         MERGE staging.stg_viajes_leg → dw.fct_trip_leg.
         Grain real: (cut_sk, id_tarjeta, id_viaje, leg_seq).
@@ -1207,41 +2772,52 @@ class GoldLoader:
         cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
         if cut_sk is None:
             return 0, 0
+        stg = self._stg("staging.stg_viajes_leg")
 
-        # ── Preflight: diagnostico de grain antes del MERGE ────────────────
-        total_leg  = execute_sql_scalar(self.conn, "SELECT COUNT(*) FROM staging.stg_viajes_leg") or 0
-        cash_leg   = execute_sql_scalar(
-            self.conn, "SELECT COUNT(*) FROM staging.stg_viajes_leg WHERE id_tarjeta IS NULL",
-        ) or 0
-        tarjeta_leg = total_leg - cash_leg
-        dist_leg   = execute_sql_scalar(
-            self.conn,
-            "SELECT COUNT(*) FROM (SELECT DISTINCT id_tarjeta, id_viaje, leg_seq"
-            " FROM staging.stg_viajes_leg WHERE id_tarjeta IS NOT NULL) g",
-        ) or 0
-        log.info(
-            "preflight fct_trip_leg | total=%d  con_tarjeta=%d  efectivo(excluidos)=%d"
-            "  distinct_grain(id_tarjeta,id_viaje,leg_seq)=%d%s",
-            total_leg, tarjeta_leg, cash_leg, dist_leg,
-            "  [DEDUP rn=1 activo]" if tarjeta_leg > dist_leg else "",
-        )
-
-        sql = f"""
-        -- Grain real: (cut_sk, id_tarjeta, id_viaje, leg_seq).
-        -- Efectivo (id_tarjeta IS NULL) excluido — sin BK único.
-        -- Slots vacíos excluidos: el DTPM genera leg_seq 2/3/4 con todo NULL
-        -- para viajes con menos etapas que el máximo del schema.
-        -- Si Silver produce duplicados reales, conservamos el embarque más reciente.
-        WITH src_dedup AS (
+        pre = self._prefiltered("staging.stg_viajes_leg")
+        if pre is not None and pre[2]:
+            # Preflight, dedup, efectivo y slots vacíos resueltos en DuckDB (_prefilter_staging)
+            cash_leg = pre[1]
+            src_dedup = f"SELECT *, 1 AS _rn FROM {stg}"
+        else:
+            # ── Preflight: diagnostico de grain antes del MERGE ────────────
+            if pre is not None:
+                cash_leg = pre[1]    # bcp: efectivo ya filtrado en DuckDB, dedup en SQL Server
+            else:
+                total_leg  = execute_sql_scalar(self.conn, f"SELECT COUNT(*) FROM {stg}") or 0
+                cash_leg   = execute_sql_scalar(
+                    self.conn, f"SELECT COUNT(*) FROM {stg} WHERE id_tarjeta IS NULL",
+                ) or 0
+                tarjeta_leg = total_leg - cash_leg
+                dist_leg   = execute_sql_scalar(
+                    self.conn,
+                    "SELECT COUNT(*) FROM (SELECT DISTINCT id_tarjeta, id_viaje, leg_seq"
+                    f" FROM {stg} WHERE id_tarjeta IS NOT NULL) g",
+                ) or 0
+                log.info(
+                    "preflight fct_trip_leg | total=%d  con_tarjeta=%d  efectivo(excluidos)=%d"
+                    "  distinct_grain(id_tarjeta,id_viaje,leg_seq)=%d%s",
+                    total_leg, tarjeta_leg, cash_leg, dist_leg,
+                    "  [DEDUP rn=1 activo]" if tarjeta_leg > dist_leg else "",
+                )
+            src_dedup = f"""
             SELECT *,
                 ROW_NUMBER() OVER (
                     PARTITION BY id_tarjeta, id_viaje, leg_seq
                     ORDER BY ts_board DESC
                 ) AS _rn
-            FROM staging.stg_viajes_leg
+            FROM {stg}
             WHERE id_tarjeta IS NOT NULL         -- excluir efectivo
               AND (ts_board IS NOT NULL OR board_stop_code IS NOT NULL OR mode_code IS NOT NULL)  -- excluir slots vacíos
-        ),
+            """
+
+        sql = f"""
+        -- Grain real: (cut_sk, id_tarjeta, id_viaje, leg_seq).
+        -- Efectivo (id_tarjeta IS NULL) excluido — sin BK único.
+        -- Slots vacíos excluidos: el DTPM genera leg_seq 2/3/4 con todo NULL
+        -- para viajes con menos etapas que el máximo del schema.
+        -- Si Silver produce duplicados reales, conservamos el embarque más reciente.
+        WITH src_dedup AS ({src_dedup}),
         -- CTE 2: date_board_sk → event_dt DATE para as-of joins SCD2
         src_prep AS (
             SELECT
@@ -1275,7 +2851,7 @@ class GoldLoader:
             FROM src_dedup s
             WHERE s._rn = 1
         )
-        MERGE dw.fct_trip_leg AS tgt
+        MERGE {target} AS tgt
         USING (
             SELECT
                 ft.trip_sk,
@@ -1356,9 +2932,17 @@ class GoldLoader:
         )
         return n, cash_leg
 
-    def merge_fct_validation(self, partition: SilverPartition) -> int:
+    def merge_fct_validation(
+        self,
+        partition: SilverPartition,
+        day_sk: int | None = None,
+        conn: pyodbc.Connection | None = None,
+        target: str = "dw.fct_validation",
+    ) -> int:
         """
         MERGE staging.stg_etapas_validation → dw.fct_validation.
+        Con `day_sk` solo se mergean las filas de ese date_board_sk (los días de
+        un cut son disjuntos en el grain → se pueden mergear en paralelo).
         Grain: (id_etapa, tiempo_subida, cut_sk).
         id_etapa NO es único: para ZP/Metro es código de estación/zona que se repite
         para cada pasajero. La combinación (id_etapa, tiempo_subida) sí es única.
@@ -1381,6 +2965,7 @@ class GoldLoader:
         cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
         if cut_sk is None:
             return 0
+        day_where = f"WHERE date_board_sk = {int(day_sk)}" if day_sk is not None else ""
 
         sql = f"""
         -- CTE 1: dedup por grain real (id_etapa, tiempo_subida) antes de cualquier join.
@@ -1390,7 +2975,8 @@ class GoldLoader:
         WITH src_dedup AS (
             SELECT *,
                 ROW_NUMBER() OVER (PARTITION BY id_etapa, tiempo_subida ORDER BY (SELECT NULL)) AS _rn
-            FROM staging.stg_etapas_validation
+            FROM {self._stg("staging.stg_etapas_validation")}
+            {day_where}
         ),
         -- CTE 2: date_board_sk → event_dt DATE para as-of join SCD2
         src_prep AS (
@@ -1429,7 +3015,7 @@ class GoldLoader:
             FROM src_dedup s
             WHERE s._rn = 1
         )
-        MERGE dw.fct_validation AS tgt
+        MERGE {target} AS tgt
         USING (
             SELECT
                 s.id_etapa,
@@ -1509,13 +3095,50 @@ class GoldLoader:
             src.x_subida, src.y_subida, src.x_bajada, src.y_bajada, src.fexp_servicio
         );
         """
-        cursor = execute_sql(self.conn, sql, commit=True)
+        cursor = execute_sql(conn or self.conn, sql, commit=True)
         n = cursor.rowcount
         cursor.close()
-        log.info("merge_fct_validation: %d filas insertadas (cut_sk=%d)", n, cut_sk)
+        log.info(
+            "merge_fct_validation: %d filas insertadas (cut_sk=%d%s)",
+            n, cut_sk, f", day={day_sk}" if day_sk is not None else "",
+        )
         return n
 
-    def merge_fct_boardings_30m(self, partition: SilverPartition) -> int:
+    def merge_fct_validation_days(
+        self, partition: SilverPartition, target: str = "dw.fct_validation",
+    ) -> int:
+        """
+        MERGE por día para cuts con sub-particiones diarias: un MERGE acotado a
+        cada date_board_sk, en paralelo sobre `day_workers` conexiones.
+        """
+        days = sorted(partition.day_files)
+        workers = min(self.day_workers, len(days))
+
+        def _merge_day(day_sk: int, conn: pyodbc.Connection | None = None) -> int:
+            # checkpoint por día: con --resume solo se repiten los días pendientes
+            done = self._checkpoint_done("f:dw.fct_validation", f"day={day_sk}")
+            if done is not None:
+                log.info("↻ RESUME fct_validation day=%d: completo (%d filas) — skip", day_sk, done[0])
+                return done[0]
+            n = self.merge_fct_validation(partition, day_sk=day_sk, conn=conn, target=target)
+            self._checkpoint("f:dw.fct_validation", f"day={day_sk}", n, completed=True, conn=conn)
+            return n
+
+        if self.dry_run or workers <= 1:
+            return sum(_merge_day(d) for d in days)
+
+        def _merge_day_conn(day_sk: int) -> int:
+            # MERGE insert-only por grain: reintentar un día es idempotente
+            return self.pool.run(
+                lambda conn: _merge_day(day_sk, conn), label=f"fct_validation day={day_sk}",
+            )
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="merge_day") as pool:
+            return sum(pool.map(_merge_day_conn, days))
+
+    def merge_fct_boardings_30m(
+        self, partition: SilverPartition, target: str = "dw.fct_boardings_30m",
+    ) -> int:
         """
         MERGE staging.stg_subidas_30m → dw.fct_boardings_30m.
         Grain: (month_date_sk, time_30m_sk, stop_sk, mode_sk, tipo_dia, cut_sk).
@@ -1545,26 +3168,34 @@ class GoldLoader:
         # event_dt = DATE del primer día del mes
         event_dt = f"DATEFROMPARTS({partition.year}, {partition.month}, 1)"
 
-        sql = f"""
-        MERGE dw.fct_boardings_30m AS tgt
-        USING (
-            SELECT
-                {month_date_sk}                                 AS month_date_sk,
-                CAST(s.time_30m_sk AS TINYINT)                  AS time_30m_sk,
+        stg = self._stg("staging.stg_subidas_30m")
+        pre = self._prefiltered("staging.stg_subidas_30m")
+        if pre is not None and pre[2]:
+            # staging ya deduplicado por grain en DuckDB (_prefilter_staging)
+            src_dedup = f"SELECT *, 1 AS _rn FROM {stg}"
+        else:
+            # dedup por grain natural de subidas_30m (stop_code, time_30m_sk, mode_code, tipo_dia)
+            src_dedup = f"""
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY stop_code, time_30m_sk, mode_code, tipo_dia
+                    ORDER BY (SELECT NULL)
+                ) AS _rn
+                FROM {stg}
+            """
+
+        sql = f"""
+        MERGE {target} AS tgt
+        USING (
+            SELECT
+                {month_date_sk}                                 AS month_date_sk,
+                CAST(s.time_30m_sk AS TINYINT)                  AS time_30m_sk,
                 ds.stop_sk,
                 dm.mode_sk,
                 {cut_sk}                                        AS cut_sk,
                 s.tipo_dia,
                 s.comuna                                        AS comuna_txt,
                 s.subidas_promedio
-            FROM (
-                -- dedup por grain natural de subidas_30m (stop_code, time_30m_sk, mode_code, tipo_dia)
-                SELECT *, ROW_NUMBER() OVER (
-                    PARTITION BY stop_code, time_30m_sk, mode_code, tipo_dia
-                    ORDER BY (SELECT NULL)
-                ) AS _rn
-                FROM staging.stg_subidas_30m
-            ) s
+            FROM ({src_dedup}) s
             -- Para subidas_30m (agregado mensual) usamos is_current=1.
             -- Un join AS-OF por fecha del mes (YYYY-MM-01) fallaría porque
             -- dim_stop se popula con valid_from del período de datos (~Apr 21),
@@ -1598,6 +3229,723 @@ class GoldLoader:
         log.info("merge_fct_boardings_30m: %d filas insertadas (cut_sk=%d)", n, cut_sk)
         return n
 
+    # ── 7b. Delta CDC: borrar claves reemplazadas ─────────────
+
+    def apply_cdc_deletes(self, partition: SilverPartition) -> int:
+        """
+        Borra de las facts del cut las claves del delta que el MERGE
+        (solo WHEN NOT MATCHED) no puede corregir: deleted ∪ updated.
+        Las updated se re-insertan después vía staging + MERGE.
+        Devuelve filas de fact borradas.
+        """
+        if self.dry_run or not partition.cdc:
+            return 0
+        cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
+        if cut_sk is None:
+            return 0
+
+        keys = partition.cdc["key_columns"]
+        cols = ", ".join(keys)
+        files = [partition.cdc_dir / "deleted.parquet"] + sorted(
+            partition.cdc_dir.glob("*/updated.parquet")
+        )
+        paths = ", ".join("'" + str(p).replace("\\", "/") + "'" for p in files)
+        df = self._duckdb.execute(
+            f"SELECT DISTINCT {cols} FROM read_parquet([{paths}], "
+            f"union_by_name = true, hive_partitioning = false)"
+        ).fetchdf()
+        if df.empty:
+            return 0
+
+        execute_sql(self.conn, "TRUNCATE TABLE staging.stg_cdc_keys")
+        bulk_insert(self.conn, "staging.stg_cdc_keys", df)
+
+        if partition.dataset == "viajes":
+            statements = [
+                # legs primero: FK_fct_trip_leg_trip
+                """
+                DELETE l FROM dw.fct_trip_leg l
+                JOIN staging.stg_cdc_keys k
+                  ON k.id_tarjeta = l.id_tarjeta AND k.id_viaje = l.id_viaje
+                WHERE l.cut_sk = ?
+                """,
+                """
+                DELETE t FROM dw.fct_trip t
+                JOIN staging.stg_cdc_keys k
+                  ON k.id_tarjeta = t.id_tarjeta AND k.id_viaje = t.id_viaje
+                WHERE t.cut_sk = ?
+                """,
+            ]
+        elif partition.dataset == "etapas":
+            statements = [
+                """
+                DELETE v FROM dw.fct_validation v
+                JOIN staging.stg_cdc_keys k
+                  ON k.id_etapa = v.id_etapa AND k.tiempo_subida = v.tiempo_boarding
+                WHERE v.cut_sk = ?
+                """,
+            ]
+        else:  # subidas_30m: el grain de la fact usa SKs → resolver por código
+            statements = [
+                """
+                DELETE b FROM dw.fct_boardings_30m b
+                JOIN dw.dim_stop ds ON ds.stop_sk = b.stop_sk
+                JOIN dw.dim_mode dm ON dm.mode_sk = b.mode_sk
+                JOIN staging.stg_cdc_keys k
+                  ON  k.stop_code   = ds.stop_code
+                  AND k.mode_code   = dm.mode_code
+                  AND k.tipo_dia    = b.tipo_dia
+                  AND k.time_30m_sk = b.time_30m_sk
+                WHERE b.cut_sk = ?
+                """,
+            ]
+
+        deleted = 0
+        for sql in statements:
+            cursor = execute_sql(self.conn, sql, (cut_sk,), commit=True)
+            deleted += max(cursor.rowcount, 0)
+            cursor.close()
+        log.info(
+            "apply_cdc_deletes %s/%s: %d claves → %d filas borradas (cut_sk=%d)",
+            partition.dataset, partition.cut, len(df), deleted, cut_sk,
+        )
+        return deleted
+
+    # ── 7c. Facts con SKs resueltos en DuckDB (--keys local) ──
+
+    def _snapshot_dims(self) -> None:
+        """
+        Copia las dims (ya upsertadas para el cut) a DuckDB, esquema `dw`:
+        BK normalizado `_k` = UPPER(RTRIM(bk)), como compara la collation CI
+        del DW. Las SCD2 conservan todas sus versiones para el ASOF join, con
+        valid_to abierto = 9999-12-31 (el ASOF de DuckDB no preserva NULLs
+        en las columnas del lado derecho).
+        """
+        specs = [
+            ("dw.dim_stop",              "stop_code",        "stop_sk",        True),
+            ("dw.dim_service",           "service_code",     "service_sk",     True),
+            ("dw.dim_mode",              "mode_code",        "mode_sk",        False),
+            ("dw.dim_fare_period",       "fare_period_name", "fare_period_sk", False),
+            ("dw.dim_operator_contract", "contract_code",    "operator_sk",    False),
+            ("dw.dim_purpose",           "purpose_name",     "purpose_sk",     False),
+        ]
+        duck = self._duckdb
+        duck.execute("CREATE SCHEMA IF NOT EXISTS dw")
+        for table, bk, sk, scd2 in specs:
+            cols = f"[{bk}], [{sk}]" + (", valid_from, valid_to" if scd2 else "")
+            df = fetch_df(self.conn, f"SELECT {cols} FROM {table}")
+            duck.register("_dim_src", df)
+            if scd2:
+                duck.execute(
+                    f"""
+                    CREATE OR REPLACE TABLE {table} AS
+                    SELECT upper(rtrim(CAST({bk} AS VARCHAR))) AS _k,
+                           CAST({sk} AS BIGINT)                AS {sk},
+                           CAST(valid_from AS DATE)            AS valid_from,
+                           COALESCE(CAST(valid_to AS DATE), DATE '9999-12-31') AS valid_to
+                    FROM _dim_src
+                    """
+                )
+            else:
+                duck.execute(
+                    f"""
+                    CREATE OR REPLACE TABLE {table} AS
+                    SELECT upper(rtrim(CAST({bk} AS VARCHAR))) AS _k,
+                           CAST({sk} AS BIGINT)                AS {sk}
+                    FROM _dim_src
+                    QUALIFY ROW_NUMBER() OVER (PARTITION BY _k ORDER BY {sk}) = 1
+                    """
+                )
+            duck.unregister("_dim_src")
+            log.debug("snapshot %s → DuckDB: %d filas", table, len(df))
+
+    def _insert_fact_local(
+        self,
+        table: str,
+        select_sql: str,
+        grain: list[str],
+        cut_sk: int,
+    ) -> int:
+        """
+        Inserta en `table` las filas ya keyed de `select_sql` (DuckDB) vía
+        bulk_insert_arrow, sin staging ni MERGE. Equivale al MERGE insert-only:
+        si el cut ya tiene filas en la fact, se excluyen las claves de grain
+        existentes (anti-join local contra las claves del cut).
+        """
+        existing = execute_sql_scalar(
+            self.conn, f"SELECT COUNT(*) FROM {table} WHERE cut_sk = ?", (cut_sk,),
+        ) or 0
+        if existing:
+            keys = fetch_df(
+                self.conn,
+                f"SELECT DISTINCT {', '.join(grain)} FROM {table} WHERE cut_sk = ?",
+                (cut_sk,),
+            )
+            self._duckdb.register("_existing_grain", keys)
+            on = " AND ".join(f"f.{c} = e.{c}" for c in grain)
+            select_sql = f"SELECT f.* FROM ({select_sql}) f ANTI JOIN _existing_grain e ON {on}"
+            log.info("%s: cut_sk=%d ya tiene %d filas → anti-join por grain", table, cut_sk, existing)
+
+        try:
+            reader = self._duckdb.execute(select_sql).fetch_record_batch(STAGING_BATCH_ROWS)
+            return bulk_insert_arrow(
+                self.conn, table, reader, label=f"{table} [keys local]",
+                queue_depth=STAGING_PIPELINE_DEPTH,
+                chunk_size=COLUMNSTORE_MIN_ROWGROUP_ROWS if self._columnstore_index(table) else 50_000,
+            )
+        finally:
+            if existing:
+                self._duckdb.unregister("_existing_grain")
+
+    def insert_fct_trip_local(
+        self, partition: SilverPartition, target: str = "dw.fct_trip",
+    ) -> tuple[int, int]:
+        """
+        fct_trip con SKs resueltos en DuckDB: mismo dedup, exclusión de efectivo
+        y AS-OF que merge_fct_trip. Devuelve (filas_insertadas, efectivo_excluidas).
+        """
+        cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
+        if cut_sk is None:
+            log.error("No se encontró cut_sk para %s/%s — abortar insert_fct_trip_local", partition.dataset, partition.cut)
+            return 0, 0
+        cash_rows = self._stg_scalar("SELECT COUNT(*) FROM staging.stg_viajes_trip WHERE id_tarjeta IS NULL") or 0
+
+        sql = f"""
+        WITH s AS (
+            SELECT *, {_event_dt_sql("date_start_sk")} AS event_dt
+            FROM staging.stg_viajes_trip
+            WHERE id_tarjeta IS NOT NULL
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY id_tarjeta, id_viaje ORDER BY tiempo_inicio_viaje DESC
+            ) = 1
+        )
+        SELECT
+            s.date_start_sk,
+            CAST(s.time_start_30m_sk AS UTINYINT)       AS time_start_30m_sk,
+            s.date_end_sk,
+            CAST(s.time_end_30m_sk AS UTINYINT)         AS time_end_30m_sk,
+            {_asof_sk("origin_s", "stop_sk")}           AS origin_stop_sk,
+            {_asof_sk("dest_s", "stop_sk")}             AS dest_stop_sk,
+            fp_start.fare_period_sk                     AS fare_period_start_sk,
+            fp_end.fare_period_sk                       AS fare_period_end_sk,
+            opr.operator_sk,
+            pur.purpose_sk,
+            {cut_sk}                                    AS cut_sk,
+            s.id_viaje,
+            s.id_tarjeta,
+            s.tipo_dia,
+            CAST(s.zona_inicio_viaje AS VARCHAR)        AS zone_origin_txt,
+            CAST(s.zona_fin_viaje AS VARCHAR)           AS zone_dest_txt,
+            CAST(s.n_etapas AS UTINYINT)                AS n_etapas,
+            s.tviaje_min,
+            s.distancia_eucl                            AS distancia_eucl_m,
+            s.distancia_ruta                            AS distancia_ruta_m,
+            s.factor_expansion
+        FROM s
+        {_asof_join("dw.dim_stop", "origin_s", "s.paradero_inicio_viaje")}
+        {_asof_join("dw.dim_stop", "dest_s", "s.paradero_fin_viaje")}
+        {_lookup_join("dw.dim_fare_period", "fp_start", "s.periodo_inicio_viaje")}
+        {_lookup_join("dw.dim_fare_period", "fp_end", "s.periodo_fin_viaje")}
+        {_lookup_join("dw.dim_operator_contract", "opr", "s.contrato")}
+        {_lookup_join("dw.dim_purpose", "pur", "s.proposito")}
+        """
+        n = self._insert_fact_local(target, sql, ["id_tarjeta", "id_viaje"], cut_sk)
+        log.info(
+            "insert_fct_trip_local: %d insertadas (cut_sk=%d) | %d efectivo excluidos",
+            n, cut_sk, cash_rows,
+        )
+        return n, cash_rows
+
+    def insert_fct_trip_leg_local(
+        self, partition: SilverPartition, target: str = "dw.fct_trip_leg",
+    ) -> tuple[int, int]:
+        """
+        fct_trip_leg con SKs resueltos en DuckDB. trip_sk (IDENTITY de fct_trip)
+        no existe del lado cliente: se completa después con un UPDATE por grain.
+        Devuelve (filas_insertadas, efectivo_excluidas).
+        """
+        cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
+        if cut_sk is None:
+            return 0, 0
+        cash_leg = self._stg_scalar("SELECT COUNT(*) FROM staging.stg_viajes_leg WHERE id_tarjeta IS NULL") or 0
+
+        sql = f"""
+        WITH s AS (
+            SELECT *, {_event_dt_sql("date_board_sk")} AS event_dt
+            FROM staging.stg_viajes_leg
+            WHERE id_tarjeta IS NOT NULL
+              AND (ts_board IS NOT NULL OR board_stop_code IS NOT NULL OR mode_code IS NOT NULL)
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY id_tarjeta, id_viaje, leg_seq ORDER BY ts_board DESC
+            ) = 1
+        )
+        SELECT
+            s.id_viaje,
+            CAST(s.leg_seq AS UTINYINT)                 AS leg_seq,
+            {cut_sk}                                    AS cut_sk,
+            s.date_board_sk,
+            CAST(s.time_board_30m_sk AS UTINYINT)       AS time_board_30m_sk,
+            s.date_alight_sk,
+            CAST(s.time_alight_30m_sk AS UTINYINT)      AS time_alight_30m_sk,
+            {_asof_sk("board_s", "stop_sk")}            AS board_stop_sk,
+            {_asof_sk("alight_s", "stop_sk")}           AS alight_stop_sk,
+            dm.mode_sk,
+            {_asof_sk("svc", "service_sk")}             AS service_sk,
+            opr.operator_sk,
+            fp.fare_period_sk                           AS fare_period_alight_sk,
+            s.id_tarjeta,
+            CAST(s.zone_board AS VARCHAR)               AS zone_board_txt,
+            CAST(s.zone_alight AS VARCHAR)              AS zone_alight_txt,
+            s.ts_board,
+            s.ts_alight,
+            s.tv_leg_min,
+            s.tc_transfer_min,
+            s.te_wait_min
+        FROM s
+        {_asof_join("dw.dim_stop", "board_s", "s.board_stop_code")}
+        {_asof_join("dw.dim_stop", "alight_s", "s.alight_stop_code")}
+        {_asof_join("dw.dim_service", "svc", "s.service_code")}
+        {_lookup_join("dw.dim_mode", "dm", "s.mode_code")}
+        {_lookup_join("dw.dim_operator_contract", "opr", "s.operator_code")}
+        {_lookup_join("dw.dim_fare_period", "fp", "s.fare_period_alight_code")}
+        """
+        n = self._insert_fact_local(
+            target, sql, ["id_tarjeta", "id_viaje", "leg_seq"], cut_sk,
+        )
+        cursor = execute_sql(
+            self.conn,
+            f"""
+            UPDATE l SET trip_sk = t.trip_sk
+            FROM {target} l
+            JOIN dw.fct_trip t
+              ON t.cut_sk = l.cut_sk AND t.id_tarjeta = l.id_tarjeta AND t.id_viaje = l.id_viaje
+            WHERE l.cut_sk = ? AND l.trip_sk IS NULL
+            """,
+            (cut_sk,),
+            commit=True,
+        )
+        linked = cursor.rowcount
+        cursor.close()
+        log.info(
+            "insert_fct_trip_leg_local: %d insertadas, %d enlazadas a fct_trip (cut_sk=%d) | %d efectivo excluidos",
+            n, linked, cut_sk, cash_leg,
+        )
+        return n, cash_leg
+
+    def insert_fct_validation_local(
+        self, partition: SilverPartition, target: str = "dw.fct_validation",
+    ) -> int:
+        """
+        fct_validation con SKs resueltos en DuckDB (todos los días del cut en
+        una pasada; con --day solo los días seleccionados). Devuelve filas insertadas.
+        """
+        cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
+        if cut_sk is None:
+            return 0
+
+        sql = f"""
+        WITH s AS (
+            SELECT *, {_event_dt_sql("date_board_sk")} AS event_dt
+            FROM staging.stg_etapas_validation
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY id_etapa, tiempo_subida) = 1
+        )
+        SELECT
+            s.id_etapa,
+            s.tiempo_subida                             AS tiempo_boarding,
+            {cut_sk}                                    AS cut_sk,
+            s.date_board_sk,
+            CAST(s.time_board_30m_sk AS UTINYINT)       AS time_board_30m_sk,
+            s.date_alight_sk,
+            CAST(s.time_alight_30m_sk AS UTINYINT)      AS time_alight_30m_sk,
+            {_asof_sk("board_s", "stop_sk")}            AS board_stop_sk,
+            {_asof_sk("alight_s", "stop_sk")}           AS alight_stop_sk,
+            dm.mode_sk,
+            {_asof_sk("svc_b", "service_sk")}           AS service_board_sk,
+            {_asof_sk("svc_a", "service_sk")}           AS service_alight_sk,
+            opr.operator_sk,
+            fp_b.fare_period_sk                         AS fare_period_board_sk,
+            fp_a.fare_period_sk                         AS fare_period_alight_sk,
+            s.tipo_dia,
+            s.tiene_bajada,
+            s.tiempo_bajada,
+            s.tiempo_etapa                              AS tiempo_etapa_sec,
+            s.tEsperaMediaIntervalo                     AS t_espera_media_min,
+            s.dist_ruta_paraderos                       AS dist_ruta_m,
+            s.dist_eucl_paraderos                       AS dist_eucl_m,
+            s.x_subida, s.y_subida, s.x_bajada, s.y_bajada,
+            s.fExpansionServicioPeriodoTS               AS fexp_servicio
+        FROM s
+        {_asof_join("dw.dim_stop", "board_s", "s.parada_subida")}
+        {_asof_join("dw.dim_stop", "alight_s", "s.parada_bajada")}
+        {_asof_join("dw.dim_service", "svc_b", "s.servicio_subida")}
+        {_asof_join("dw.dim_service", "svc_a", "s.servicio_bajada")}
+        {_lookup_join("dw.dim_mode", "dm", "s.tipo_transporte")}
+        {_lookup_join("dw.dim_operator_contract", "opr", "COALESCE(s.contrato, s.operador)")}
+        {_lookup_join("dw.dim_fare_period", "fp_b", "s.periodoSubida")}
+        {_lookup_join("dw.dim_fare_period", "fp_a", "s.periodoBajada")}
+        """
+        n = self._insert_fact_local(
+            target, sql, ["id_etapa", "tiempo_boarding"], cut_sk,
+        )
+        log.info("insert_fct_validation_local: %d filas insertadas (cut_sk=%d)", n, cut_sk)
+        return n
+
+    def insert_facts_local(self, partition: SilverPartition) -> tuple[int, int]:
+        """
+        Paso [f] con --keys local: snapshot de dims → DuckDB y carga directa de
+        las facts keyed. Devuelve (filas_insertadas, efectivo_excluidas).
+        """
+        if self.dry_run:
+            log.info(
+                "[DRY-RUN] facts %s/%s con SKs resueltos en DuckDB (ASOF dim_stop/dim_service)",
+                partition.dataset, partition.cut,
+            )
+            return 0, 0
+        self._snapshot_dims()
+        if partition.dataset == "viajes":
+            n1, cash1 = self._load_fact(
+                "dw.fct_trip", partition, lambda t: self.insert_fct_trip_local(partition, t),
+            )
+            n2, _ = self._load_fact(
+                "dw.fct_trip_leg", partition, lambda t: self.insert_fct_trip_leg_local(partition, t),
+            )
+            return n1 + n2, cash1
+        return self._load_fact(
+            "dw.fct_validation", partition, lambda t: self.insert_fct_validation_local(partition, t),
+        ), 0
+
+    # ── 7d. Particiones por cut: SWITCH y TRUNCATE ───────────
+
+    def _partitioned(self, table: str) -> bool:
+        """True si el índice clustered de `table` está sobre un partition scheme."""
+        if table not in self._partitioned_tables:
+            self._partitioned_tables[table] = bool(execute_sql_scalar(
+                self.conn,
+                """
+                SELECT COUNT(*) FROM sys.indexes i
+                JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+                WHERE i.object_id = OBJECT_ID(?) AND i.index_id = 1
+                """,
+                (table,),
+            ))
+        return self._partitioned_tables[table]
+
+    def _cut_partition(self, cut_sk: int) -> int:
+        """
+        Número de partición de `cut_sk` en pf_cut_sk. Agrega las fronteras
+        (cut_sk, cut_sk + 1) si faltan: los cut_sk nuevos caen en la última
+        partición, vacía → el SPLIT es solo metadata.
+        """
+        for bound in (cut_sk, cut_sk + 1):
+            exists = execute_sql_scalar(
+                self.conn,
+                """
+                SELECT COUNT(*) FROM sys.partition_range_values rv
+                JOIN sys.partition_functions pf ON pf.function_id = rv.function_id
+                WHERE pf.name = ? AND CAST(rv.value AS INT) = ?
+                """,
+                (PARTITION_FUNCTION, bound),
+            )
+            if not exists:
+                execute_sql(
+                    self.conn,
+                    f"ALTER PARTITION SCHEME {PARTITION_SCHEME} NEXT USED [PRIMARY];"
+                    f" ALTER PARTITION FUNCTION {PARTITION_FUNCTION}() SPLIT RANGE ({int(bound)});",
+                ).close()
+                log.info("%s: nueva frontera %d", PARTITION_FUNCTION, bound)
+        return int(execute_sql_scalar(
+            self.conn, f"SELECT $PARTITION.{PARTITION_FUNCTION}(?)", (cut_sk,),
+        ))
+
+    def _partition_rows(self, table: str, partition_number: int) -> int:
+        return int(execute_sql_scalar(
+            self.conn,
+            """
+            SELECT COALESCE(SUM(rows), 0) FROM sys.partitions
+            WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1) AND partition_number = ?
+            """,
+            (table, partition_number),
+        ) or 0)
+
+    def _create_switch_table(self, table: str, cut_sk: int) -> str:
+        """
+        Crea `<table>_switch_<cut_sk>` vacía y con la misma estructura que
+        `table` (columnas, defaults, índices, PK/UQ, FKs) más el CHECK del cut
+        que exige ALTER TABLE ... SWITCH. Un nombre por cut: con --fact-workers
+        varios cuts cargan su tabla de switch a la vez. La IDENTITY arranca
+        después de la de `table` (_reserve_sks) para que los SKs no choquen al
+        conmutar. Devuelve el nombre de la tabla.
+        """
+        suffix = f"_switch_{int(cut_sk)}"
+        switch = f"{table}{suffix}"
+        short = switch.split(".", 1)[1]
+        stmts = [
+            f"DROP TABLE IF EXISTS {switch}",
+            f"SELECT TOP 0 * INTO {switch} FROM {table}",
+        ]
+
+        defaults = fetch_df(
+            self.conn,
+            """
+            SELECT c.name AS col, dc.definition
+            FROM sys.default_constraints dc
+            JOIN sys.columns c
+              ON c.object_id = dc.parent_object_id AND c.column_id = dc.parent_column_id
+            WHERE dc.parent_object_id = OBJECT_ID(?)
+            """,
+            (table,),
+        )
+        stmts += [
+            f"ALTER TABLE {switch} ADD DEFAULT {r.definition} FOR {r.col}"
+            for r in defaults.itertuples(index=False)
+        ]
+
+        index_cols = fetch_df(
+            self.conn,
+            """
+            SELECT i.index_id, i.name, i.type_desc, i.is_unique, i.is_primary_key,
+                   i.is_unique_constraint, i.filter_definition,
+                   c.name AS col, ic.key_ordinal, ic.is_descending_key, ic.is_included_column
+            FROM sys.indexes i
+            LEFT JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            LEFT JOIN sys.columns c        ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = OBJECT_ID(?) AND i.index_id > 0 AND i.is_hypothetical = 0
+            ORDER BY i.index_id, ic.is_included_column, ic.key_ordinal, ic.index_column_id
+            """,
+            (table,),
+        )
+        for _, idx in index_cols.groupby("index_id", sort=True):
+            stmts.append(_switch_index_ddl(switch, idx, suffix))
+
+        fks = fetch_df(
+            self.conn,
+            """
+            SELECT fk.name, fk.is_disabled, pc.name AS col, rc.name AS ref_col,
+                   OBJECT_SCHEMA_NAME(fk.referenced_object_id) + '.'
+                   + OBJECT_NAME(fk.referenced_object_id) AS ref_table
+            FROM sys.foreign_keys fk
+            JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+            JOIN sys.columns pc ON pc.object_id = fkc.parent_object_id     AND pc.column_id = fkc.parent_column_id
+            JOIN sys.columns rc ON rc.object_id = fkc.referenced_object_id AND rc.column_id = fkc.referenced_column_id
+            WHERE fk.parent_object_id = OBJECT_ID(?)
+            ORDER BY fk.name, fkc.constraint_column_id
+            """,
+            (table,),
+        )
+        for name, fk in fks.groupby("name", sort=True):
+            disabled = bool(fk["is_disabled"].iloc[0])  # perfil columnstore: FKs NOCHECK
+            stmts.append(
+                f"ALTER TABLE {switch}{' WITH NOCHECK' if disabled else ''}"
+                f" ADD CONSTRAINT {name}{suffix}"
+                f" FOREIGN KEY ({', '.join(fk['col'])})"
+                f" REFERENCES {fk['ref_table'].iloc[0]} ({', '.join(fk['ref_col'])})"
+            )
+            if disabled:
+                stmts.append(f"ALTER TABLE {switch} NOCHECK CONSTRAINT {name}{suffix}")
+
+        stmts.append(
+            f"ALTER TABLE {switch} WITH CHECK ADD CONSTRAINT CK_{short}_cut"
+            f" CHECK (cut_sk IS NOT NULL AND cut_sk >= {int(cut_sk)} AND cut_sk < {int(cut_sk) + 1})"
+        )
+        stmts.append(
+            f"DBCC CHECKIDENT(N'{switch}', RESEED, {self._reserve_sks(table)}) WITH NO_INFOMSGS"
+        )
+
+        for sql in stmts:
+            execute_sql(self.conn, sql, commit=False).close()
+        self.conn.commit()
+        log.info("%s: creada para cut_sk=%d (%d statements)", switch, cut_sk, len(stmts))
+        return switch
+
+    def _reserve_sks(self, table: str) -> int:
+        """
+        Primer SK de la tabla de switch de `table`: IDENT_CURRENT + 1. En un
+        worker de fase 2 (--fact-workers) además reserva el bloque de SKs del
+        cut (filas de su staging, cota superior de lo que inserta) adelantando
+        la IDENTITY de `table`: los switch de otros cuts y las cargas directas
+        concurrentes toman SKs después del bloque.
+        """
+        with self._sk_lock:
+            next_sk = int(execute_sql_scalar(
+                self.conn, "SELECT CAST(IDENT_CURRENT(?) AS BIGINT)", (table,),
+            ) or 0) + 1
+            if self._concurrent_facts:
+                reserve = int(self._stg_scalar(
+                    f"SELECT COUNT(*) FROM {self._stg(FACT_STAGING[table])}"
+                ) or 0)
+                # +1: RESEED sobre una tabla sin filas entrega el valor exacto, no el siguiente
+                execute_sql(
+                    self.conn,
+                    f"DBCC CHECKIDENT(N'{table}', RESEED, {next_sk + reserve}) WITH NO_INFOMSGS",
+                ).close()
+                log.info("%s: SKs [%d, %d] reservados", table, next_sk, next_sk + reserve)
+        return next_sk
+
+    def _switch_in(self, switch: str, table: str, partition_number: int) -> None:
+        """Conmuta `switch` a la partición vacía de `table` y la elimina."""
+        for sql in (
+            f"ALTER TABLE {switch} SWITCH TO {table} PARTITION {int(partition_number)}",
+            # la IDENTITY de `table` no avanza con el SWITCH → llevarla al máximo
+            f"DBCC CHECKIDENT(N'{table}', RESEED) WITH NO_INFOMSGS",
+            f"DROP TABLE {switch}",
+        ):
+            execute_sql(self.conn, sql, commit=False).close()
+        self.conn.commit()
+
+    def _columnstore_index(self, table: str) -> str | None:
+        """Nombre del CLUSTERED COLUMNSTORE de `table` (perfil columnstore) o None."""
+        if table not in self._columnstore_tables:
+            self._columnstore_tables[table] = execute_sql_scalar(
+                self.conn,
+                "SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID(?) AND type = 5",
+                (table,),
+            )
+        return self._columnstore_tables[table]
+
+    def _compress_columnstore(
+        self,
+        table: str,
+        partition_number: int | None = None,
+        rebuild: bool = False,
+    ) -> None:
+        """
+        Deja comprimidos los rowgroups de `table` tras una carga. Las filas del
+        MERGE / fast_executemany no usan la API de bulk load → caen al delta
+        store. Tabla de switch (solo el cut) → REBUILD completo, rowgroups de
+        hasta 1.048.576 filas. Partición con filas → REBUILD PARTITION = n.
+        Sin particionar → REORGANIZE con COMPRESS_ALL_ROW_GROUPS (online).
+        """
+        cci = self._columnstore_index(table)
+        if cci is None:
+            return
+        if rebuild:
+            sql = f"ALTER INDEX {cci} ON {table} REBUILD"
+        elif partition_number is not None:
+            sql = f"ALTER INDEX {cci} ON {table} REBUILD PARTITION = {int(partition_number)}"
+        else:
+            sql = f"ALTER INDEX {cci} ON {table} REORGANIZE WITH (COMPRESS_ALL_ROW_GROUPS = ON)"
+        t0 = time.monotonic()
+        execute_sql(self.conn, sql).close()
+        stats = fetch_df(
+            self.conn,
+            """
+            SELECT state_desc, COUNT(*) AS rowgroups, SUM(total_rows) AS total_rows
+            FROM sys.dm_db_column_store_row_group_physical_stats
+            WHERE object_id = OBJECT_ID(?)
+              AND (? IS NULL OR partition_number = ?)
+            GROUP BY state_desc
+            """,
+            (table, partition_number, partition_number),
+        )
+        log.info(
+            "%s: %s en %.1fs | rowgroups %s",
+            table, sql.split(f"ON {table} ", 1)[1], time.monotonic() - t0,
+            ", ".join(
+                f"{r.state_desc}={r.rowgroups} ({int(r.total_rows):,} filas)"
+                for r in stats.itertuples(index=False)
+            ) or "-",
+        )
+
+    def _load_fact(
+        self,
+        table: str,
+        partition: SilverPartition,
+        load: Callable[[str], Any],
+    ) -> Any:
+        """
+        Carga la fact `table` del cut con `load(target)`.
+
+        Si `table` está particionada por cut_sk y la partición del cut está
+        vacía, `load` escribe en `<table>_switch_<cut_sk>` (mismos índices: el
+        MERGE/insert no compite con los índices de la fact completa) y el
+        resultado entra con ALTER TABLE ... SWITCH, solo metadata. Si la tabla
+        no está particionada o el cut ya tiene filas (--delta, --day, re-run
+        sin --replace-cut), `load` va directo contra `table`.
+        Con perfil columnstore, después de la carga se comprimen los rowgroups
+        (_compress_columnstore). Step f:<table> con checkpoint (--resume) y
+        detalle `table` del step f:facts (etl_run_step).
+        """
+        with timed_step(self._steps, "f:facts", table) as m:
+            result = self._resumable(f"f:{table}", lambda: self._load_fact_once(table, partition, load))
+            m.rows = result[0] if isinstance(result, tuple) else result
+        return result
+
+    def _load_fact_once(
+        self,
+        table: str,
+        partition: SilverPartition,
+        load: Callable[[str], Any],
+    ) -> Any:
+        if self.dry_run:
+            return load(table)
+        if not self._partitioned(table):
+            result = load(table)
+            self._compress_columnstore(table)
+            return result
+        cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
+        if cut_sk is None:
+            return load(table)
+        partition_number = self._cut_partition(cut_sk)
+        existing = self._partition_rows(table, partition_number)
+        if existing:
+            log.info(
+                "%s: partición %d (cut_sk=%d) con %d filas → carga directa",
+                table, partition_number, cut_sk, existing,
+            )
+            result = load(table)
+            self._compress_columnstore(table, partition_number)
+            return result
+
+        switch = self._create_switch_table(table, cut_sk)
+        # checkpoints por día de un intento anterior describen una tabla de switch ya descartada
+        self._forget_checkpoints(f"f:{table}")
+        try:
+            result = load(switch)
+            self._compress_columnstore(switch, rebuild=True)
+            t0 = time.monotonic()
+            self._switch_in(switch, table, partition_number)
+        except Exception:
+            self.conn.rollback()
+            execute_sql(self.conn, f"DROP TABLE IF EXISTS {switch}").close()
+            raise
+        log.info(
+            "%s: SWITCH → partición %d (cut_sk=%d) en %.2fs",
+            table, partition_number, cut_sk, time.monotonic() - t0,
+        )
+        return result
+
+    def truncate_cut(self, partition: SilverPartition) -> int:
+        """
+        --replace-cut: vacía las facts del cut antes de recargarlo. Con la fact
+        particionada es TRUNCATE ... WITH (PARTITIONS (n)), solo metadata; si no,
+        DELETE por cut_sk. Legs antes que trips. Devuelve filas eliminadas.
+        """
+        if self.dry_run:
+            log.info("[DRY-RUN] truncate_cut %s/%s", partition.dataset, partition.cut)
+            return 0
+        cut_sk = self._get_cut_sk(partition.dataset, partition.cut)
+        if cut_sk is None:
+            return 0
+
+        removed = 0
+        for table in reversed(FACT_TABLES[partition.dataset]):
+            if self._partitioned(table):
+                partition_number = self._cut_partition(cut_sk)
+                n = self._partition_rows(table, partition_number)
+                execute_sql(
+                    self.conn,
+                    f"TRUNCATE TABLE {table} WITH (PARTITIONS ({partition_number}))",
+                ).close()
+                how = f"TRUNCATE partición {partition_number}"
+            else:
+                cursor = execute_sql(self.conn, f"DELETE FROM {table} WHERE cut_sk = ?", (cut_sk,))
+                n = max(cursor.rowcount, 0)
+                cursor.close()
+                how = "DELETE"
+            log.info("truncate_cut %s: %d filas (cut_sk=%d, %s)", table, n, cut_sk, how)
+            removed += n
+        return removed
+
     # ── 8. Colectar date_sks desde staging para dim_date ─────
 
     def _collect_date_sks_from_staging(self, dataset: str) -> list[int]:
@@ -1613,15 +3961,15 @@ class GoldLoader:
                     ("staging.stg_viajes_leg",  ["date_board_sk", "date_alight_sk"]),
                 ]:
                     for col in cols:
-                        r = fetch_df(self.conn,
-                            f"SELECT MIN([{col}]), MAX([{col}]) FROM {tbl} WHERE [{col}] IS NOT NULL")
+                        r = self._stg_fetch(
+                            f"SELECT MIN({col}), MAX({col}) FROM {tbl} WHERE {col} IS NOT NULL")
                         if not r.empty and r.iloc[0, 0] is not None:
                             sks += [int(r.iloc[0, 0]), int(r.iloc[0, 1])]
             elif dataset == "etapas":
                 for col in ("date_board_sk", "date_alight_sk"):
-                    r = fetch_df(self.conn,
-                        f"SELECT MIN([{col}]), MAX([{col}]) "
-                        f"FROM staging.stg_etapas_validation WHERE [{col}] IS NOT NULL")
+                    r = self._stg_fetch(
+                        f"SELECT MIN({col}), MAX({col}) "
+                        f"FROM staging.stg_etapas_validation WHERE {col} IS NOT NULL")
                     if not r.empty and r.iloc[0, 0] is not None:
                         sks += [int(r.iloc[0, 0]), int(r.iloc[0, 1])]
             # subidas_30m: no tiene date_sk con grano diario, se maneja por month_date_sk
@@ -1664,6 +4012,7 @@ class GoldLoader:
         rows_inserted: int,
         error_message: str | None = None,
         ignored_cash_rows: int | None = None,
+        rows_updated: int = 0,
     ) -> None:
         """Actualiza el registro de etl_run_log con resultado final."""
         if run_id is None:
@@ -1677,16 +4026,59 @@ class GoldLoader:
                     status            = ?,
                     rows_staged       = ?,
                     rows_inserted     = ?,
+                    rows_updated      = ?,
                     error_message     = ?,
                     ignored_cash_rows = ?
                 WHERE run_id = ?
                 """,
-                (status, rows_staged, rows_inserted, error_message, ignored_cash_rows, run_id),
+                (status, rows_staged, rows_inserted, rows_updated, error_message,
+                 ignored_cash_rows, run_id),
                 commit=True,
             )
         except Exception as exc:
             log.warning("etl_run_log UPDATE falló (no crítico): %s", exc)
 
+    def _run_log_steps(self, run_id: int | None, steps: list[StepMetric]) -> None:
+        """Inserta los steps del cut en dw.etl_run_step (un executemany)."""
+        if run_id is None or not steps or self.dry_run:
+            return
+        rows = [
+            (run_id, s.step, s.target, s.source[:200], s.started_at.replace(tzinfo=None),
+             round(s.elapsed_s, 3), s.rows, s.bytes_read,
+             round(s.rows_per_s, 1) if s.rows_per_s is not None else None, s.status)
+            for s in steps
+        ]
+        try:
+            cursor = self.conn.cursor()
+            cursor.fast_executemany = True
+            cursor.executemany(
+                """
+                INSERT INTO dw.etl_run_step
+                    (run_id, step, target, source, started_at, elapsed_s,
+                     row_count, bytes_read, rows_per_s, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            self.conn.commit()
+            cursor.close()
+        except Exception as exc:
+            try:
+                self.conn.rollback()
+            except Exception:
+                pass
+            log.warning("etl_run_step INSERT falló (no crítico): %s", exc)
+
+    def write_metrics(self) -> None:
+        """gold_metrics.prom + gold_metrics.json del run en self.metrics_dir (si está fijado)."""
+        if self.metrics_dir is None or self.dry_run or not self._cut_metrics:
+            return
+        try:
+            prom, js = write_snapshots(self.metrics_dir, self._cut_metrics, LOADER_VERSION)
+            log.info("Métricas del run → %s, %s", prom, js)
+        except OSError as exc:
+            log.warning("Métricas del run: no se pudieron escribir en %s — %s", self.metrics_dir, exc)
+
     def _is_already_ok(self, dataset: str, cut: str) -> bool:
         """
         Devuelve True si ya existe un run con status='OK' para (dataset, cut).
@@ -1708,6 +4100,140 @@ class GoldLoader:
             log.warning("_is_already_ok: no se pudo consultar etl_run_log — %s", exc)
             return False
 
+    # ── 9b. Checkpoints por chunk y step (--resume) ──────────
+
+    def _begin_checkpoints(self, part: SilverPartition, run_id: int | None) -> None:
+        """
+        Fija el cut de los checkpoints (dw.etl_run_checkpoint). Con --resume
+        carga los del intento anterior; sin --resume los descarta: el cut se
+        recarga completo.
+        """
+        self._ckpt = (part.dataset, part.run_label)
+        self._ckpt_run_id = run_id
+        self._checkpoints = {}
+        if self.dry_run:
+            return
+        if not self.resume:
+            self._forget_checkpoints()
+            return
+        self._checkpoints = self._read_checkpoints()
+        if self._checkpoints:
+            log.info(
+                "  ↻ RESUME %s/%s: %d checkpoints (%s)",
+                part.dataset, part.run_label, len(self._checkpoints),
+                ", ".join(sorted({step for step, _ in self._checkpoints})),
+            )
+
+    def _read_checkpoints(self) -> dict[tuple[str, str], tuple[int, int | None, bool]]:
+        """{(step, source): (rows_done, ignored_cash_rows, completed)} del cut actual."""
+        df = fetch_df(
+            self.conn,
+            """
+            SELECT step, source, rows_done, ignored_cash_rows, completed
+            FROM dw.etl_run_checkpoint WHERE dataset = ? AND cut = ?
+            """,
+            self._ckpt,
+        )
+        return {
+            (r.step, r.source): (
+                int(r.rows_done),
+                None if pd.isna(r.ignored_cash_rows) else int(r.ignored_cash_rows),
+                bool(r.completed),
+            )
+            for r in df.itertuples(index=False)
+        }
+
+    def _checkpoint(
+        self,
+        step: str,
+        source: str = "",
+        rows: int = 0,
+        completed: bool = False,
+        ignored_cash_rows: int | None = None,
+        conn: pyodbc.Connection | None = None,
+        commit: bool = True,
+    ) -> None:
+        """
+        Upsert del checkpoint (step, source) del cut actual. Con commit=False
+        queda en la transacción abierta de `conn` (la del chunk de staging).
+        """
+        if self._ckpt is None or self.dry_run:
+            return
+        values = (rows, ignored_cash_rows, int(completed), self._ckpt_run_id)
+        execute_sql(
+            conn or self.conn,
+            """
+            MERGE dw.etl_run_checkpoint AS tgt
+            USING (SELECT ? AS dataset, ? AS cut, ? AS step, ? AS source) AS src
+            ON  tgt.dataset = src.dataset AND tgt.cut = src.cut
+            AND tgt.step = src.step AND tgt.source = src.source
+            WHEN MATCHED THEN UPDATE SET
+                rows_done = ?, ignored_cash_rows = ?, completed = ?, run_id = ?,
+                updated_at = SYSUTCDATETIME()
+            WHEN NOT MATCHED THEN
+                INSERT (dataset, cut, step, source, rows_done, ignored_cash_rows, completed, run_id)
+                VALUES (src.dataset, src.cut, src.step, src.source, ?, ?, ?, ?);
+            """,
+            (*self._ckpt, step, source, *values, *values),
+            commit=commit,
+        ).close()
+        self._checkpoints[(step, source)] = (rows, ignored_cash_rows, completed)
+
+    def _refresh_checkpoint(self, step: str, source: str, conn: pyodbc.Connection) -> None:
+        """
+        Relee de dw.etl_run_checkpoint el checkpoint (step, source) antes de
+        reintentar una unidad (ConnectionPool.run): el valor en memoria puede
+        incluir un chunk cuyo commit se perdió con la conexión.
+        """
+        if self._ckpt is None or self.dry_run:
+            return
+        row = conn.cursor().execute(
+            """
+            SELECT rows_done, ignored_cash_rows, completed FROM dw.etl_run_checkpoint
+            WHERE dataset = ? AND cut = ? AND step = ? AND source = ?
+            """,
+            (*self._ckpt, step, source),
+        ).fetchone()
+        conn.commit()
+        if row is None:
+            self._checkpoints.pop((step, source), None)
+        else:
+            self._checkpoints[(step, source)] = (int(row[0]), row[1], bool(row[2]))
+
+    def _checkpoint_done(self, step: str, source: str = "") -> tuple[int, int | None] | None:
+        """(rows_done, ignored_cash_rows) si (step, source) quedó completo en un intento anterior."""
+        ck = self._checkpoints.get((step, source))
+        return (ck[0], ck[1]) if ck and ck[2] else None
+
+    def _forget_checkpoints(self, step_prefix: str | None = None) -> None:
+        """Borra los checkpoints del cut actual: todos, o los de steps que empiezan con `step_prefix`."""
+        if self._ckpt is None or self.dry_run:
+            return
+        sql = "DELETE FROM dw.etl_run_checkpoint WHERE dataset = ? AND cut = ?"
+        params: tuple = self._ckpt
+        if step_prefix is not None:
+            sql += " AND LEFT(step, ?) = ?"
+            params += (len(step_prefix), step_prefix)
+        execute_sql(self.conn, sql, params).close()
+        for key in [k for k in self._checkpoints if step_prefix is None or k[0].startswith(step_prefix)]:
+            del self._checkpoints[key]
+
+    def _resumable(self, step: str, fn: Callable[[], Any]) -> Any:
+        """
+        Ejecuta `fn` salvo que `step` esté completo en un intento anterior
+        (--resume) y al terminar lo marca completo. `fn` devuelve filas o
+        (filas, efectivo_excluidas), igual que lo que devuelve al saltarse.
+        """
+        done = self._checkpoint_done(step)
+        if done is not None:
+            rows, cash = done
+            log.info("  ↻ RESUME %s: completo (%d filas) — skip", step, rows)
+            return rows if cash is None else (rows, cash)
+        result = fn()
+        rows, cash = result if isinstance(result, tuple) else (result, None)
+        self._checkpoint(step, rows=rows, ignored_cash_rows=cash, completed=True)
+        return result
+
     # ── 10. Validaciones pre-run ──────────────────────────────
 
     def _validate_staging_non_empty(self, dataset: str) -> bool:
@@ -1716,14 +4242,9 @@ class GoldLoader:
         Si está vacío muestra WARNING pero NO aborta (podría ser un
         corte válidamente vacío tras filtros Silver).
         """
-        tables = {
-            "viajes":      ["staging.stg_viajes_trip", "staging.stg_viajes_leg"],
-            "etapas":      ["staging.stg_etapas_validation"],
-            "subidas_30m": ["staging.stg_subidas_30m"],
-        }
-        for tbl in tables.get(dataset, []):
+        for tbl in STAGING_TABLES.get(dataset, []):
             try:
-                n = execute_sql_scalar(self.conn, f"SELECT COUNT(*) FROM {tbl}")
+                n = self._stg_scalar(f"SELECT COUNT(*) FROM {tbl}")
                 if not n or n == 0:
                     log.warning(
                         "VALIDACIÓN: %s está vacía tras la carga de staging para dataset=%s. "
@@ -1750,121 +4271,477 @@ class GoldLoader:
           c. dim_date ensure
           d. Dims simples upsert
           e. SCD2 dims (dim_stop, dim_service)
-          f. Facts MERGE (as-of join SCD2)
+          f. Facts MERGE (as-of join SCD2); con --delta antes DELETE de
+             las claves deleted ∪ updated. Con --keys local (viajes/etapas)
+             a. es una vista DuckDB y f. inserta filas keyed (insert_facts_local).
+             Con --replace-cut antes se vacía el cut (truncate_cut); facts
+             particionadas con el cut vacío cargan vía tabla de switch (_load_fact)
           z. etl_run_log UPDATE (status=OK|FAILED)
+
+        Con fact_workers > 1 y más de una partición: a.–e. en serie para todas
+        y f. de varios cuts en paralelo (_run_two_phase). Con --multi-cut, c.–e.
+        de los cuts viajes/etapas se aplican antes, en un lote (upsert_dims_multi).
         """
         self.ensure_schema()
         self.load_static_dims()
+        if self.multi_cut and not self.dry_run:
+            self.upsert_dims_multi(partitions)
+
+        if self.fact_workers > 1 and not self.dry_run and len(partitions) > 1:
+            return self._run_two_phase(partitions)
 
         failed  = 0
         total   = len(partitions)
 
         for i, part in enumerate(partitions, 1):
-            t_total = time.monotonic()
+            run = _CutRun(part)
             log.info(
                 "[%d/%d] ▶ dataset=%s  cut=%s  year=%d  month=%d",
                 i, total, part.dataset, part.cut, part.year, part.month,
             )
-
-            run_id: int | None = None
-            rows_staged       = 0
-            rows_inserted     = 0
-            ignored_cash_rows = 0
-
-            # ── Skip si ya fue cargado exitosamente ────────────
-            if not self.dry_run and not self.force and self._is_already_ok(part.dataset, part.cut):
-                log.info(
-                    "  ⏭ SKIP  dataset=%s  cut=%s — ya existe status=OK en etl_run_log",
-                    part.dataset, part.cut,
-                )
+            if self._skip_partition(part):
                 continue
-            if self.force and self._is_already_ok(part.dataset, part.cut):
-                log.info(
-                    "  ⚠ FORCE  dataset=%s  cut=%s — ignorando status=OK en etl_run_log",
-                    part.dataset, part.cut,
-                )
 
             try:
-                # 0. Determinar event_date para SCD2
-                try:
-                    event_date = date.fromisoformat(part.cut[:10])
-                except ValueError:
-                    event_date = date(part.year, part.month, 1)
-
-                # 0. etl_run_log
-                run_id = self._run_log_start(part.dataset, part.cut)
-
-                # ── a. Staging ──────────────────────────────────────
-                t0 = time.monotonic()
-                rows_staged = self.load_staging(part)
-                log.info("  [a] staging: %d filas en %.1fs", rows_staged, time.monotonic() - t0)
-
-                # Validación post-staging (warning si vacío, no aborta)
-                if not self.dry_run:
-                    self._validate_staging_non_empty(part.dataset)
-
-                # ── b. dim_cut ─────────────────────────────────────
-                t0 = time.monotonic()
-                self.upsert_dim_cut(part)
-                log.info("  [b] dim_cut: %.1fs", time.monotonic() - t0)
-
-                if not self.dry_run:
-                    # ── c. dim_date ────────────────────────────────
-                    t0 = time.monotonic()
-                    if part.dataset == "subidas_30m":
-                        month_sk = part.year * 10000 + part.month * 100 + 1
-                        self._ensure_dim_date([month_sk])
-                    else:
-                        date_sks = self._collect_date_sks_from_staging(part.dataset)
-                        self._ensure_dim_date(date_sks)
-                    log.info("  [c] dim_date: %.1fs", time.monotonic() - t0)
-
-                    # ── d. Dims simples ────────────────────────────
-                    t0 = time.monotonic()
-                    self.upsert_simple_dims(part.dataset)
-                    log.info("  [d] dims simples: %.1fs", time.monotonic() - t0)
-
-                    # ── e. SCD2 dims ───────────────────────────────
-                    t0 = time.monotonic()
-                    self.upsert_dim_stop(part.dataset, event_date)
-                    self.upsert_dim_service(part.dataset, event_date)
-                    log.info("  [e] SCD2 dims: %.1fs", time.monotonic() - t0)
+                self._prepare_cut(run)
 
                 # ── f. Facts ───────────────────────────────────────
-                t0 = time.monotonic()
-                if part.dataset == "viajes":
-                    n1, cash1 = self.merge_fct_trip(part)
-                    n2, _     = self.merge_fct_trip_leg(part)
-                    rows_inserted     = n1 + n2
-                    ignored_cash_rows = cash1
-                elif part.dataset == "etapas":
-                    rows_inserted = self.merge_fct_validation(part)
-                elif part.dataset == "subidas_30m":
-                    rows_inserted = self.merge_fct_boardings_30m(part)
-                log.info("  [f] facts MERGE: %d filas en %.1fs", rows_inserted, time.monotonic() - t0)
-
-                elapsed = time.monotonic() - t_total
-                log.info(
-                    "  ✔ DONE  dataset=%s  cut=%s  staged=%d  inserted=%d  total=%.1fs",
-                    part.dataset, part.cut, rows_staged, rows_inserted, elapsed,
-                )
-                self._run_log_finish(run_id, "OK", rows_staged, rows_inserted, ignored_cash_rows=ignored_cash_rows)
+                with timed_step(run.steps, "f:facts") as m:
+                    run.rows_updated = self._clear_cut_facts(part)
+                    run.rows_inserted, run.ignored_cash_rows = self.load_facts(part)
+                    m.rows = run.rows_inserted
+                log.info("  [f] facts MERGE: %d filas en %.1fs", run.rows_inserted, m.elapsed_s)
+
+                # ── g. Marts agregados ─────────────────────────────
+                self.refresh_aggregates(part)
+                self._finish_cut(run, "OK")
 
             except Exception as exc:  # noqa: BLE001
-                elapsed = time.monotonic() - t_total
-                log.exception(
-                    "  ✘ FAIL  dataset=%s  cut=%s  elapsed=%.1fs — %s",
-                    part.dataset, part.cut, elapsed, exc,
-                )
-                self._run_log_finish(run_id, "FAILED", rows_staged, rows_inserted, str(exc)[:2000], ignored_cash_rows=ignored_cash_rows)
+                self._finish_cut(run, "FAILED", exc)
                 failed += 1
 
         log.info(
             "Gold load finalizado | total=%d  failed=%d  ok=%d",
             total, failed, total - failed,
         )
+        self.write_metrics()
         return failed
 
+    def _skip_partition(self, part: SilverPartition) -> bool:
+        """True si la partición ya tiene status=OK en etl_run_log (sin --force)."""
+        if not self.dry_run and not self.force and self._is_already_ok(part.dataset, part.run_label):
+            log.info(
+                "  ⏭ SKIP  dataset=%s  cut=%s — ya existe status=OK en etl_run_log",
+                part.dataset, part.run_label,
+            )
+            return True
+        if self.force and self._is_already_ok(part.dataset, part.run_label):
+            log.info(
+                "  ⚠ FORCE  dataset=%s  cut=%s — ignorando status=OK en etl_run_log",
+                part.dataset, part.run_label,
+            )
+        return False
+
+    def _prepare_cut(self, run: _CutRun) -> None:
+        """Pasos 0. y a.–e. de run(): etl_run_log, staging, dim_cut, dim_date, dims y SCD2."""
+        part = run.part
+        # 0. event_date para SCD2
+        event_date = part.event_date
+
+        # 0. etl_run_log
+        run.run_id = self._run_log_start(part.dataset, part.run_label)
+        self._begin_checkpoints(part, run.run_id)
+        self._steps = run.steps
+        self._stg_local = (
+            self.key_resolution == "local" and part.dataset in LOCAL_KEY_DATASETS
+        )
+
+        # ── a. Staging ──────────────────────────────────────
+        with timed_step(run.steps, "a:staging", bytes_read=_partition_bytes(part)) as m:
+            if self._stg_local:
+                run.rows_staged = self.stage_local(part)
+            else:
+                if self._checkpoint_done("staging") and not all(
+                    self._staging_intact(t) for t in STAGING_TABLES[part.dataset]
+                ):
+                    # staging pisado por otro cut (o aparcado con --fact-workers): se recarga;
+                    # el prefijo también borra los checkpoints por archivo (step = tabla staging)
+                    self._forget_checkpoints("staging")
+                run.rows_staged = self._resumable("staging", lambda: self.load_staging(part))
+            m.rows = run.rows_staged
+        log.info(
+            "  [a] staging%s: %d filas en %.1fs",
+            " (DuckDB)" if self._stg_local else "", run.rows_staged, m.elapsed_s,
+        )
+
+        # Validación post-staging (warning si vacío, no aborta)
+        if not self.dry_run:
+            self._validate_staging_non_empty(part.dataset)
+
+        # ── b. dim_cut ─────────────────────────────────────
+        with timed_step(run.steps, "b:dim_cut") as m:
+            self.upsert_dim_cut(part)
+        log.info("  [b] dim_cut: %.1fs", m.elapsed_s)
+
+        if self.dry_run:
+            return
+        if self._checkpoint_done("dims"):
+            log.info("  ↻ RESUME dims: dim_date, dims simples y SCD2 completos — skip")
+            return
+        if (part.dataset, part.run_label) in self._dims_batched:
+            log.info("  [c-e] dims: aplicadas en el lote --multi-cut — skip")
+            self._checkpoint("dims", completed=True)
+            return
+
+        # ── c. dim_date ────────────────────────────────────
+        with timed_step(run.steps, "c:dim_date") as m:
+            if part.dataset == "subidas_30m":
+                month_sk = part.year * 10000 + part.month * 100 + 1
+                self._ensure_dim_date([month_sk])
+            else:
+                date_sks = self._collect_date_sks_from_staging(part.dataset)
+                self._ensure_dim_date(date_sks)
+        log.info("  [c] dim_date: %.1fs", m.elapsed_s)
+
+        # ── d. Dims simples ────────────────────────────────
+        with timed_step(run.steps, "d:dims") as m:
+            new_dims = self.upsert_simple_dims(part.dataset)
+            m.rows = sum(new_dims.values())
+        log.info("  [d] dims simples: %.1fs | nuevas=%s", m.elapsed_s, m.rows)
+
+        # ── e. SCD2 dims ───────────────────────────────────
+        with timed_step(run.steps, "e:scd2") as m:
+            m.rows = 0
+            for dim_table, upsert in (
+                ("dw.dim_stop",    self.upsert_dim_stop),
+                ("dw.dim_service", self.upsert_dim_service),
+            ):
+                with timed_step(run.steps, "e:scd2", dim_table) as d:
+                    counts = upsert(part.dataset, event_date)
+                    d.rows = counts.get("inserted", 0) + counts.get("expired", 0)
+                m.rows += d.rows
+        log.info("  [e] SCD2 dims: %.1fs | versiones escritas=%d", m.elapsed_s, m.rows)
+        self._checkpoint("dims", completed=True)
+
+    def upsert_dims_multi(self, partitions: list[SilverPartition]) -> None:
+        """
+        --multi-cut: pasos c.–e. de todos los cuts viajes/etapas pendientes en
+        un solo lote, antes del loop por partición.
+
+          1. Un pase DuckDB por cut sobre sus Parquets (_stage_dims_local)
+             recoge date_sks, candidatos de dims simples y de SCD2 con las
+             mismas consultas que el paso por cut.
+          2. dim_date y dims simples: un upsert por dimensión y dataset.
+          3. dim_stop/dim_service: scd2_upsert_timeline con un evento por cut,
+             en el orden de las particiones (cut ascendente dentro de cada
+             dataset) → misma línea de tiempo que el run secuencial.
+
+        Los cuts del lote se marcan en self._dims_batched y _prepare_cut salta
+        sus c.–e. Quedan fuera subidas_30m, los deltas CDC y los cuts ya OK
+        (sin --force). Si el lote falla, cada cut resuelve sus dims como siempre.
+        """
+        batch = [
+            p for p in partitions
+            if p.dataset in MULTI_CUT_DATASETS and not p.cdc
+            and (self.force or not self._is_already_ok(p.dataset, p.run_label))
+        ]
+        if len(batch) < 2:
+            log.info("--multi-cut: %d cut(s) viajes/etapas pendientes — dims por cut", len(batch))
+            return
+
+        t0 = time.monotonic()
+        log.info("--multi-cut: dims de %d cuts en un lote", len(batch))
+        date_sks: list[int] = []
+        simple: dict[str, dict[str, tuple[str, list[Any], list[str] | None]]] = {}
+        scd2: dict[str, list[tuple[date, pd.DataFrame]]] = {dim: [] for dim in SCD2_DIMS}
+        stg_local, self._stg_local = self._stg_local, True
+        try:
+            # ── 1. Candidatos por cut (DuckDB) ─────────────────
+            for part in batch:
+                rows = self._stage_dims_local(part)
+                date_sks += self._collect_date_sks_from_staging(part.dataset)
+                merged = simple.setdefault(part.dataset, {})
+                for dim_table, (bk_col, values, attr_cols) in self._simple_dim_candidates(part.dataset).items():
+                    merged.setdefault(dim_table, (bk_col, [], attr_cols))[1].extend(values)
+                for dim_table, candidates in (
+                    ("dw.dim_stop",    self._stop_candidates(part.dataset)),
+                    ("dw.dim_service", self._service_candidates(part.dataset)),
+                ):
+                    if candidates is not None:
+                        scd2[dim_table].append((part.event_date, candidates))
+                log.info("  [c-e] %s/%s: %d filas (DuckDB)", part.dataset, part.run_label, rows)
+        except Exception as exc:  # noqa: BLE001
+            log.warning("--multi-cut: pase DuckDB falló, dims por cut — %s", exc)
+            return
+        finally:
+            self._stg_local = stg_local
+            for tables in STAGING_TABLES.values():
+                for table in tables:
+                    self._duckdb.execute(f"DROP TABLE IF EXISTS {table}")
+
+        # ── 2. dim_date + dims simples ────────────────────────
+        self._ensure_dim_date(date_sks)
+        new_dims = sum(
+            sum(self.upsert_simple_dims(dataset, candidates).values())
+            for dataset, candidates in simple.items()
+        )
+
+        # ── 3. SCD2: una línea de tiempo por dimensión ────────
+        for dim_table, events in scd2.items():
+            bk_col, attr_cols = SCD2_DIMS[dim_table]
+            scd2_upsert_timeline(self.conn, dim_table, bk_col, attr_cols, events)
+
+        self._dims_batched.update((p.dataset, p.run_label) for p in batch)
+        log.info(
+            "--multi-cut: dims de %d cuts en %.1fs | dims simples nuevas=%d",
+            len(batch), time.monotonic() - t0, new_dims,
+        )
+
+    def _clear_cut_facts(self, part: SilverPartition) -> int:
+        """
+        Antes de f.: vacía el cut (--replace-cut) o borra las claves del delta
+        CDC. Step con checkpoint: repetirlo tras facts ya cargadas las borraría.
+        """
+        def _clear() -> int:
+            rows_updated = 0
+            if self.replace_cut:
+                rows_updated = self.truncate_cut(part)
+            if part.cdc:
+                rows_updated = self.apply_cdc_deletes(part)
+            return rows_updated
+
+        return self._resumable("clear", _clear)
+
+    def load_facts(self, part: SilverPartition) -> tuple[int, int]:
+        """Paso f. de run(): carga las facts del cut. Devuelve (filas_insertadas, efectivo_excluidas)."""
+        if self._stg_local:
+            return self.insert_facts_local(part)
+        if part.dataset == "viajes":
+            n1, cash1 = self._load_fact(
+                "dw.fct_trip", part, lambda t: self.merge_fct_trip(part, t),
+            )
+            n2, _ = self._load_fact(
+                "dw.fct_trip_leg", part, lambda t: self.merge_fct_trip_leg(part, t),
+            )
+            return n1 + n2, cash1
+        if part.dataset == "etapas":
+            merge = self.merge_fct_validation_days if part.day_files else self.merge_fct_validation
+            return self._load_fact(
+                "dw.fct_validation", part, lambda t: merge(part, target=t),
+            ), 0
+        if part.dataset == "subidas_30m":
+            return self._load_fact(
+                "dw.fct_boardings_30m", part, lambda t: self.merge_fct_boardings_30m(part, t),
+            ), 0
+        return 0, 0
+
+    def refresh_aggregates(self, part: SilverPartition) -> int:
+        """
+        Paso g. de run(): recalcula los marts dw.agg_* del cut desde sus facts
+        (src/gold/aggregates.py, una transacción). Sin checkpoint: es
+        idempotente y se repite entero. Devuelve filas insertadas.
+        """
+        if not self.aggregates:
+            return 0
+        if self.dry_run:
+            log.info("[DRY-RUN] agregados dw.agg_* de %s/%s", part.dataset, part.cut)
+            return 0
+        cut_sk = self._get_cut_sk(part.dataset, part.cut)
+        if cut_sk is None:
+            return 0
+        with timed_step(self._steps, "g:aggregates") as m:
+            counts = refresh_cut_aggregates(self.conn, part.dataset, cut_sk, self._steps)
+            m.rows = sum(counts.values())
+        log.info(
+            "  [g] agregados: %s en %.1fs",
+            ", ".join(f"{t}={n}" for t, n in counts.items()) or "—", m.elapsed_s,
+        )
+        return m.rows
+
+    def _finish_cut(self, run: _CutRun, status: str, exc: Exception | None = None) -> None:
+        """Paso z.: log DONE/FAIL y etl_run_log UPDATE con los contadores de `run`."""
+        part = run.part
+        elapsed = time.monotonic() - run.started
+        if exc is None:
+            log.info(
+                "  ✔ DONE  dataset=%s  cut=%s  staged=%d  inserted=%d  total=%.1fs",
+                part.dataset, part.cut, run.rows_staged, run.rows_inserted, elapsed,
+            )
+        else:
+            log.exception(
+                "  ✘ FAIL  dataset=%s  cut=%s  elapsed=%.1fs — %s",
+                part.dataset, part.cut, elapsed, exc,
+            )
+        self._run_log_finish(
+            run.run_id, status, run.rows_staged, run.rows_inserted,
+            str(exc)[:2000] if exc is not None else None,
+            ignored_cash_rows=run.ignored_cash_rows, rows_updated=run.rows_updated,
+        )
+        self._run_log_steps(run.run_id, run.steps)
+        with self._metrics_lock:
+            self._cut_metrics.append(CutMetrics(
+                part.dataset, part.run_label, run.run_id, status, elapsed,
+                run.rows_staged, run.rows_inserted, run.rows_updated, list(run.steps),
+            ))
+        if status == "OK":
+            self._forget_checkpoints()
+
+    # ── 12. Carga en dos fases (--fact-workers) ──────────────
+
+    def _run_two_phase(self, partitions: list[SilverPartition]) -> int:
+        """
+        Fase 1, en serie sobre self.conn: pasos 0. y a.–e. de cada partición,
+        más los DELETE/TRUNCATE previos a las facts y las fronteras de
+        partición del cut. Las dims y el SCD2 se aplican en el orden de las
+        particiones (como el run secuencial) y el staging de cada cut se
+        aparca en tablas propias (_park_staging).
+
+        Fase 2, en paralelo: las facts de hasta `fact_workers` cuts a la vez,
+        cada uno en su conexión (_load_cut_facts) y con su etl_run_log. Con
+        --keys local el staging es DuckDB: cada worker recrea sus vistas.
+        """
+        failed  = 0
+        total   = len(partitions)
+        pending: list[_CutRun] = []
+
+        log.info("Fase 1/2: staging + dims + SCD2 en serie (%d particiones)", total)
+        for i, part in enumerate(partitions, 1):
+            run = _CutRun(part)
+            log.info(
+                "[%d/%d] ▶ dataset=%s  cut=%s  year=%d  month=%d",
+                i, total, part.dataset, part.cut, part.year, part.month,
+            )
+            if self._skip_partition(part):
+                continue
+            try:
+                self._prepare_cut(run)
+                # stg_cdc_keys es compartido → los DELETE del delta van en esta fase
+                run.rows_updated = self._clear_cut_facts(part)
+                cut_sk = self._get_cut_sk(part.dataset, part.cut)
+                if cut_sk is not None and any(self._partitioned(t) for t in FACT_TABLES[part.dataset]):
+                    # SPLIT toma Sch-M sobre todas las facts del scheme → nunca en fase 2
+                    self._cut_partition(cut_sk)
+                if not self._stg_local and cut_sk is not None:
+                    run.stg_tables = self._park_staging(part.dataset, cut_sk)
+                pending.append(run)
+            except Exception as exc:  # noqa: BLE001
+                self._finish_cut(run, "FAILED", exc)
+                failed += 1
+
+        if pending:
+            workers = min(self.fact_workers, len(pending))
+            log.info("Fase 2/2: facts de %d cuts con %d workers", len(pending), workers)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="facts") as pool:
+                results = list(pool.map(self._load_cut_facts, pending))
+            failed += results.count(False)
+
+        log.info(
+            "Gold load finalizado | total=%d  failed=%d  ok=%d",
+            total, failed, total - failed,
+        )
+        self.write_metrics()
+        return failed
+
+    def _park_staging(self, dataset: str, cut_sk: int) -> dict[str, str]:
+        """
+        Mueve el staging del cut a staging.<tabla>__c<cut_sk> con ALTER TABLE
+        ... SWITCH (solo metadata): la fase 2 lee esa copia mientras la fase 1
+        vuelve a cargar staging.<tabla> con el cut siguiente. Las tablas
+        memory-optimized no admiten SWITCH: se copian a un heap en disco y se
+        vacían. Devuelve el mapa staging lógico → tabla aparcada (GoldLoader._stg).
+        """
+        parked: dict[str, str] = {}
+        for table in STAGING_TABLES[dataset]:
+            target = f"{table}__c{int(cut_sk)}"
+            if self._memory_optimized(table):
+                move = (
+                    f"SELECT * INTO {target} FROM {table}",
+                    f"DELETE FROM {table}",
+                )
+            else:
+                move = (
+                    f"SELECT TOP 0 * INTO {target} FROM {table}",
+                    f"ALTER TABLE {table} SWITCH TO {target}",
+                )
+            for sql in (f"DROP TABLE IF EXISTS {target}", *move):
+                execute_sql(self.conn, sql, commit=False).close()
+            parked[table] = target
+        self.conn.commit()
+        log.info("  [a] staging aparcado: %s", ", ".join(parked.values()))
+        return parked
+
+    def _fork(self, conn: pyodbc.Connection) -> GoldLoader:
+        """
+        GoldLoader de un worker de fase 2: misma configuración sobre otra
+        conexión. Comparte las cachés de catálogo y el lock de reserva de SKs.
+        """
+        worker = GoldLoader(
+            conn=conn,
+            dry_run=self.dry_run,
+            overwrite_staging=self.overwrite_staging,
+            force=self.force,
+            day_workers=self.day_workers,
+            stage_workers=self.stage_workers,
+            scd2_mode=self.scd2_mode,
+            key_resolution=self.key_resolution,
+            partition_facts=self.partition_facts,
+            replace_cut=self.replace_cut,
+            storage=self.storage,
+            resume=self.resume,
+            stage_method=self.stage_method,
+            staging=self.staging,
+            multi_cut=self.multi_cut,
+            force_ddl=self.force_ddl,
+            metrics_dir=self.metrics_dir,
+            aggregates=self.aggregates,
+            pool=self.pool,
+        )
+        worker._partitioned_tables = self._partitioned_tables
+        worker._columnstore_tables = self._columnstore_tables
+        worker._memory_tables      = self._memory_tables
+        worker._sk_lock            = self._sk_lock
+        worker._cut_metrics        = self._cut_metrics
+        worker._metrics_lock       = self._metrics_lock
+        worker._concurrent_facts   = True
+        return worker
+
+    def _load_cut_facts(self, run: _CutRun) -> bool:
+        """Fase 2 de un cut: paso f. y z. en una conexión propia. True si terminó OK."""
+        part = run.part
+        conn = self.pool.acquire()
+        worker = self._fork(conn)
+        try:
+            worker._stg_tables = run.stg_tables
+            worker._steps = run.steps
+            worker._ckpt, worker._ckpt_run_id = (part.dataset, part.run_label), run.run_id
+            worker._checkpoints = worker._read_checkpoints()
+            worker._stg_local = (
+                self.key_resolution == "local" and part.dataset in LOCAL_KEY_DATASETS
+            )
+            with timed_step(run.steps, "f:facts") as m:
+                if worker._stg_local:
+                    worker.stage_local(part)
+                run.rows_inserted, run.ignored_cash_rows = worker.load_facts(part)
+                m.rows = run.rows_inserted
+            log.info(
+                "  [f] %s/%s facts: %d filas en %.1fs",
+                part.dataset, part.cut, run.rows_inserted, m.elapsed_s,
+            )
+            worker.refresh_aggregates(part)
+            worker._finish_cut(run, "OK")
+            return True
+        except Exception as exc:  # noqa: BLE001
+            worker._finish_cut(run, "FAILED", exc)
+            return False
+        finally:
+            for parked in run.stg_tables.values():
+                try:
+                    execute_sql(conn, f"DROP TABLE IF EXISTS {parked}").close()
+                except Exception as exc:  # noqa: BLE001
+                    log.warning("DROP %s falló (no crítico): %s", parked, exc)
+            worker._duckdb.close()
+            self.pool.release(conn)
+
 
 # ─────────────────────────────────────────────────────────────
 # CLI entry point
@@ -1897,6 +4774,201 @@ def _build_parser() -> argparse.ArgumentParser:
             "asumiendo que staging ya está cargado."
         ),
     )
+    p.add_argument(
+        "--day",
+        dest="days",
+        action="append",
+        type=int,
+        default=None,
+        metavar="YYYYMMDD",
+        help=(
+            "Solo los días indicados de cuts con sub-particiones diarias (etapas). "
+            "Repetible; re-ejecuta un día sin recargar la semana."
+        ),
+    )
+    p.add_argument(
+        "--day-workers",
+        dest="day_workers",
+        type=int,
+        default=4,
+        help="Conexiones paralelas para staging/MERGE por día. (default: 4)",
+    )
+    p.add_argument(
+        "--stage-workers",
+        dest="stage_workers",
+        type=int,
+        default=1,
+        help=(
+            "Conexiones paralelas por archivo en el staging de viajes/etapas: "
+            "rangos de filas insertados en concurrencia y reconciliados. (default: 1)"
+        ),
+    )
+    p.add_argument(
+        "--fact-workers",
+        dest="fact_workers",
+        type=int,
+        default=1,
+        help=(
+            "Cuts con facts cargadas en paralelo: staging, dims y SCD2 de todas las "
+            "particiones corren primero en serie y luego las facts de hasta N cuts "
+            "en conexiones propias. (default: 1 = secuencial)"
+        ),
+    )
+    p.add_argument(
+        "--pool-size",
+        dest="pool_size",
+        type=int,
+        default=None,
+        help=(
+            "Máximo de conexiones SQL Server abiertas por el run (pool con validación "
+            "y reintentos de errores transitorios). (default: 1 + fact-workers × "
+            "(1 + max(day-workers, stage-workers)))"
+        ),
+    )
+    p.add_argument(
+        "--stage-method",
+        dest="stage_method",
+        default="executemany",
+        choices=list(STAGE_METHODS),
+        help=(
+            "Staging SQL Server: 'executemany' inserta RecordBatches Arrow con "
+            "fast_executemany; 'bulk' escribe archivos de texto en GOLD_BULK_DIR y los "
+            "carga con BULK INSERT ... WITH (TABLOCK) (GOLD_BULK_SERVER_DIR = misma "
+            "carpeta vista por el servidor); 'bcp' los carga con la utilidad bcp. Si el "
+            "servidor no ve la carpeta o bcp no está, vuelve a executemany. "
+            "(default: executemany)"
+        ),
+    )
+    p.add_argument(
+        "--scd2-mode",
+        dest="scd2_mode",
+        default="set",
+        choices=list(SCD2_MODES),
+        help=(
+            "SCD2 de dim_stop/dim_service: 'set' carga candidatos a una tabla temporal "
+            "y resuelve expiración/enriquecimiento/inserts en un batch T-SQL; "
+            "'row' es el upsert fila a fila anterior. (default: set)"
+        ),
+    )
+    p.add_argument(
+        "--keys",
+        dest="key_resolution",
+        default="server",
+        choices=list(KEY_RESOLUTIONS),
+        help=(
+            "Resolución de SKs de facts viajes/etapas: 'server' sube staging y hace "
+            "MERGE con AS-OF en SQL Server; 'local' copia las dims a DuckDB, resuelve "
+            "los SKs con ASOF/hash joins sobre el Parquet y envía solo filas keyed. "
+            "(default: server)"
+        ),
+    )
+    p.add_argument(
+        "--partition-facts",
+        dest="partition_facts",
+        action="store_true",
+        help=(
+            "Aplica ddl_gold_partitioning.sql: particiona las facts por cut_sk. Con la "
+            "fact particionada cada cut nuevo se carga en una tabla de switch vacía y "
+            "entra con ALTER TABLE ... SWITCH."
+        ),
+    )
+    p.add_argument(
+        "--storage",
+        default="rowstore",
+        choices=list(STORAGE_PROFILES),
+        help=(
+            "Almacenamiento de facts: 'columnstore' aplica ddl_gold_columnstore.sql "
+            "(CLUSTERED COLUMNSTORE, PK nonclustered, FKs NOCHECK), inserta en lotes "
+            "de >= 102.400 filas y comprime los rowgroups tras cada carga. "
+            "(default: rowstore)"
+        ),
+    )
+    p.add_argument(
+        "--staging",
+        default="disk",
+        choices=list(STAGING_PROFILES),
+        help=(
+            "Tablas stg_*: 'memory' aplica ddl_gold_staging_memory.sql (MEMORY_OPTIMIZED, "
+            "DURABILITY = SCHEMA_ONLY, índice por el grain del MERGE). El loader detecta "
+            "las tablas in-memory y usa DELETE en vez de TRUNCATE. (default: disk)"
+        ),
+    )
+    p.add_argument(
+        "--multi-cut",
+        dest="multi_cut",
+        action="store_true",
+        help=(
+            "Dims de todos los cuts viajes/etapas del run en un lote: un pase DuckDB "
+            "por cut recoge los candidatos, dim_date y dims simples se upsertan una vez "
+            "y el SCD2 aplica la línea de tiempo completa (cut ascendente) en un batch. "
+            "Después se cargan staging y facts cut a cut."
+        ),
+    )
+    p.add_argument(
+        "--force-ddl",
+        dest="force_ddl",
+        action="store_true",
+        help=(
+            "Re-ejecutar los archivos DDL aunque dw.schema_version registre la misma "
+            "versión y checksum (p.ej. tras un DROP manual de una tabla staging)."
+        ),
+    )
+    p.add_argument(
+        "--metrics-dir",
+        dest="metrics_dir",
+        type=Path,
+        default=METRICS_DIR,
+        help=(
+            "Directorio de gold_metrics.prom (textfile de Prometheus) y gold_metrics.json "
+            "con duración/filas/bytes por step del run (default: docs/diagnostics)."
+        ),
+    )
+    p.add_argument(
+        "--aggregates",
+        dest="aggregates",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=(
+            "Refrescar los marts dw.agg_* (Power BI) del cut después de las facts "
+            "(default: sí). --no-aggregates los omite; backfill: python -m src.gold.aggregates."
+        ),
+    )
+    p.add_argument(
+        "--replace-cut",
+        dest="replace_cut",
+        action="store_true",
+        help=(
+            "Vacía las facts de cada cut antes de recargarlo (TRUNCATE de la partición "
+            "si la fact está particionada; si no, DELETE por cut_sk). Implica --force."
+        ),
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Retoma los cuts con un intento fallido desde dw.etl_run_checkpoint: el "
+            "staging sigue desde el último chunk confirmado de cada archivo y se "
+            "saltan los steps completos (staging, dims, facts). Sin --resume el cut "
+            "se recarga completo."
+        ),
+    )
+    p.add_argument(
+        "--snapshot",
+        dest="snapshot_version",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Fija la lectura Silver al snapshot N del manifest (default: el último).",
+    )
+    p.add_argument(
+        "--delta",
+        action="store_true",
+        help=(
+            "Aplica solo el delta CDC de cada cut (lake/processed/_cdc/, generado con "
+            "transform_silver --cdc): DELETE de claves deleted/updated + MERGE de "
+            "inserted/updated. Cuts sin cdc.json se cargan completos."
+        ),
+    )
     p.add_argument(
         "--force",
         action="store_true",
@@ -1917,12 +4989,24 @@ def _build_parser() -> argparse.ArgumentParser:
 
 
 def main(argv: list[str] | None = None) -> int:
-    args = _build_parser().parse_args(argv)
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.delta and args.days:
+        parser.error("--delta aplica el delta del cut completo; no combinar con --day")
+    if args.replace_cut and (args.delta or args.days):
+        parser.error("--replace-cut recarga el cut completo; no combinar con --delta ni --day")
+    if args.multi_cut and not args.overwrite_staging:
+        parser.error("--multi-cut lee las dims de cada cut desde Silver; no combinar con --no-overwrite-staging")
+    if args.fact_workers > 1 and not args.overwrite_staging:
+        parser.error("--fact-workers aparca el staging de cada cut; no combinar con --no-overwrite-staging")
     setup_logging(args.log_level)
 
     partitions = discover_partitions(
         cut_filter=args.cut,
         dataset_filter=args.dataset,
+        day_filter=args.days,
+        delta=args.delta,
+        snapshot_version=args.snapshot_version,
     )
 
     if not partitions:
@@ -1937,9 +5021,21 @@ def main(argv: list[str] | None = None) -> int:
     if args.dry_run:
         for p in partitions:
             log.info(
-                "  [PLAN] %s / %s | archivos=%s | overwrite_staging=%s",
-                p.dataset, p.cut, list(p.parquet_files.keys()), args.overwrite_staging,
+                "  [PLAN] %s / %s | archivos=%s | días=%s | overwrite_staging=%s",
+                p.dataset, p.run_label, list(p.parquet_files.keys()),
+                sorted(p.day_files) or "-", args.overwrite_staging,
             )
+            if p.cdc:
+                log.info(
+                    "  [PLAN]   -> DELTA cdc_id=%s inserted=%d updated=%d deleted=%d claves (%s%% filas)",
+                    p.cdc["cdc_id"], p.cdc["inserted_keys"], p.cdc["updated_keys"],
+                    p.cdc["deleted_keys"], p.cdc["delta_fraction_pct"],
+                )
+            if args.replace_cut:
+                log.info(
+                    "  [PLAN]   -> REPLACE-CUT %s (TRUNCATE partición cut_sk | DELETE)",
+                    ", ".join(FACT_TABLES[p.dataset]),
+                )
             # Mostrar queries que se ejecutarían (MERGE summary)
             log.info(
                 "  [PLAN]   -> MERGE dw.fct_%s ON grain (%s, cut_sk) -- AS-OF join dim_stop/dim_service",
@@ -1948,18 +5044,39 @@ def main(argv: list[str] | None = None) -> int:
             )
         return 0
 
-    conn = get_connection()
+    pool = ConnectionPool(
+        size=args.pool_size or _pool_size(args.fact_workers, args.day_workers, args.stage_workers),
+    )
+    conn = pool.acquire()
     try:
         loader = GoldLoader(
             conn=conn,
             dry_run=args.dry_run,
             overwrite_staging=args.overwrite_staging,
-            force=args.force,
+            force=args.force or args.replace_cut,
+            day_workers=args.day_workers,
+            stage_workers=args.stage_workers,
+            scd2_mode=args.scd2_mode,
+            key_resolution=args.key_resolution,
+            partition_facts=args.partition_facts,
+            replace_cut=args.replace_cut,
+            storage=args.storage,
+            fact_workers=args.fact_workers,
+            resume=args.resume,
+            stage_method=args.stage_method,
+            staging=args.staging,
+            multi_cut=args.multi_cut,
+            force_ddl=args.force_ddl,
+            metrics_dir=args.metrics_dir,
+            aggregates=args.aggregates,
+            pool=pool,
         )
         failed = loader.run(partitions)
     finally:
-        conn.close()
-        log.info("Conexión SQL Server cerrada.")
+        pool.release(conn)
+        pool.close()
+        pool.log_stats()
+        log.info("Conexiones SQL Server cerradas.")
 
     return 1 if failed > 0 else 0
 
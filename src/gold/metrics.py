@@ -0,0 +1,225 @@
+"""
+metrics.py  —  Métricas de throughput por step del loader Gold.
+
+GoldLoader mide cada step de un cut como un StepMetric (duración, filas,
+bytes leídos, filas/s):
+
+    a:staging   total del cut + detalle por tabla staging / archivo / día / rango
+    b:dim_cut
+    c:dim_date
+    d:dims      dims simples (filas = BKs nuevas)
+    e:scd2      total + detalle por dim (filas = versiones insertadas + cerradas)
+    f:facts     total + detalle por fact (filas = insertadas)
+    g:aggregates total + detalle por mart dw.agg_* (filas = insertadas)
+
+`target` vacío = total del step. Al cerrar el cut los steps se guardan en
+dw.etl_run_step (GoldLoader._run_log_steps) y al terminar el run se escriben
+dos snapshots del run completo (write_snapshots):
+
+  - gold_metrics.prom  formato textfile de Prometheus (node_exporter
+                       --collector.textfile.directory), escrito atómico.
+  - gold_metrics.json  mismos datos para comparar runs sin Prometheus.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+METRICS_DIR   = _PROJECT_ROOT / "docs" / "diagnostics"
+PROM_FILE     = "gold_metrics.prom"
+JSON_FILE     = "gold_metrics.json"
+PROM_PREFIX   = "dtpm_gold"
+
+
+# ─────────────────────────────────────────────────────────────
+# Steps y cuts
+# ─────────────────────────────────────────────────────────────
+
+@dataclass
+class StepMetric:
+    """Un step (o el detalle de un step) de la carga de un cut."""
+    step:       str
+    target:     str = ""            # '' = total del step; si no, tabla staging / dim / fact
+    source:     str = ""            # archivo, día o rango del staging
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    elapsed_s:  float = 0.0
+    rows:       int | None = None
+    bytes_read: int | None = None   # Parquet Silver leído (tamaño en disco)
+    status:     str = "OK"
+
+    @property
+    def rows_per_s(self) -> float | None:
+        if self.rows is None or self.elapsed_s <= 0:
+            return None
+        return self.rows / self.elapsed_s
+
+    def as_dict(self) -> dict[str, Any]:
+        rps = self.rows_per_s
+        return {
+            "step":       self.step,
+            "target":     self.target,
+            "source":     self.source,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_s":  round(self.elapsed_s, 3),
+            "rows":       self.rows,
+            "bytes_read": self.bytes_read,
+            "rows_per_s": round(rps, 1) if rps is not None else None,
+            "status":     self.status,
+        }
+
+
+@dataclass
+class CutMetrics:
+    """Resumen de un cut (fila de dw.etl_run_log) con sus steps."""
+    dataset:       str
+    cut:           str              # etl_run_log.cut (run_label)
+    run_id:        int | None
+    status:        str
+    elapsed_s:     float
+    rows_staged:   int
+    rows_inserted: int
+    rows_updated:  int
+    steps:         list[StepMetric]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "dataset":       self.dataset,
+            "cut":           self.cut,
+            "run_id":        self.run_id,
+            "status":        self.status,
+            "elapsed_s":     round(self.elapsed_s, 3),
+            "rows_staged":   self.rows_staged,
+            "rows_inserted": self.rows_inserted,
+            "rows_updated":  self.rows_updated,
+            "steps":         [s.as_dict() for s in self.steps],
+        }
+
+
+@contextmanager
+def timed_step(
+    steps: list[StepMetric] | None,
+    step: str,
+    target: str = "",
+    source: str = "",
+    bytes_read: int | None = None,
+) -> Iterator[StepMetric]:
+    """
+    Mide el bloque y agrega el StepMetric a `steps` (None → no registra).
+    El bloque fija `m.rows`; si lanza, el step queda con status FAILED.
+    Workers de staging paralelos agregan a la misma lista (append es atómico).
+    """
+    m = StepMetric(step, target, source, bytes_read=bytes_read)
+    t0 = time.monotonic()
+    try:
+        yield m
+    except BaseException:
+        m.status = "FAILED"
+        raise
+    finally:
+        m.elapsed_s = time.monotonic() - t0
+        if steps is not None:
+            steps.append(m)
+
+
+def parquet_bytes(paths: Path | Iterable[Path]) -> int:
+    """Tamaño en disco de uno o varios Parquet (los que falten cuentan 0)."""
+    if isinstance(paths, Path):
+        paths = [paths]
+    return sum(p.stat().st_size for p in paths if p.exists())
+
+
+# ─────────────────────────────────────────────────────────────
+# Snapshots (Prometheus textfile + JSON)
+# ─────────────────────────────────────────────────────────────
+
+_PROM_STEP_GAUGES = (
+    ("step_duration_seconds",  "Duración de cada step del último run Gold.",       "elapsed_s"),
+    ("step_rows",              "Filas procesadas por step del último run Gold.",    "rows"),
+    ("step_bytes_read",        "Bytes Parquet Silver leídos por step de staging.",  "bytes_read"),
+    ("step_rows_per_second",   "Throughput (filas/s) de cada step del último run.", "rows_per_s"),
+)
+
+
+def _prom_labels(**labels: str) -> str:
+    def esc(v: str) -> str:
+        return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _prom_value(v: float) -> str:
+    return repr(round(float(v), 3))
+
+
+def render_prometheus(cuts: list[CutMetrics], generated_at: datetime) -> str:
+    """Texto en formato de exposición Prometheus (gauges del último run)."""
+    lines: list[str] = []
+
+    def gauge(name: str, help_text: str, samples: list[tuple[str, float]]) -> None:
+        if not samples:
+            return
+        lines.append(f"# HELP {PROM_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROM_PREFIX}_{name} gauge")
+        lines.extend(f"{PROM_PREFIX}_{name}{labels} {_prom_value(v)}" for labels, v in samples)
+
+    # El mismo (step, target, source) puede repetirse en un cut (p.ej. reintentos):
+    # se suman duración, filas y bytes y el throughput se recalcula
+    agg: dict[str, dict[str, float | None]] = {}
+    for c in cuts:
+        for s in c.steps:
+            key = _prom_labels(dataset=c.dataset, cut=c.cut, step=s.step, target=s.target, source=s.source)
+            a = agg.setdefault(key, {"elapsed_s": 0.0, "rows": None, "bytes_read": None})
+            a["elapsed_s"] = (a["elapsed_s"] or 0.0) + s.elapsed_s
+            for attr in ("rows", "bytes_read"):
+                v = getattr(s, attr)
+                if v is not None:
+                    a[attr] = (a[attr] or 0) + v
+    for a in agg.values():
+        rows, elapsed = a["rows"], a["elapsed_s"]
+        a["rows_per_s"] = rows / elapsed if rows is not None and elapsed else None
+
+    for name, help_text, attr in _PROM_STEP_GAUGES:
+        gauge(name, help_text, [(k, a[attr]) for k, a in agg.items() if a[attr] is not None])
+
+    gauge("cut_duration_seconds", "Duración total de cada cut del último run Gold.",
+          [(_prom_labels(dataset=c.dataset, cut=c.cut), c.elapsed_s) for c in cuts])
+    gauge("cut_rows_inserted", "Filas insertadas en facts por cut del último run Gold.",
+          [(_prom_labels(dataset=c.dataset, cut=c.cut), c.rows_inserted) for c in cuts])
+    gauge("cut_success", "1 si el cut terminó con status=OK en el último run Gold.",
+          [(_prom_labels(dataset=c.dataset, cut=c.cut), 1 if c.status == "OK" else 0) for c in cuts])
+    gauge("last_run_timestamp_seconds", "Fin del último run Gold (epoch UTC).",
+          [("", generated_at.timestamp())])
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """tmp + os.replace: el collector de textfile nunca lee un archivo a medias."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_snapshots(
+    out_dir: Path,
+    cuts: list[CutMetrics],
+    loader_version: str,
+) -> tuple[Path, Path]:
+    """Escribe gold_metrics.prom y gold_metrics.json en `out_dir`. Devuelve ambas rutas."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    generated_at = datetime.now(timezone.utc)
+    prom_path = out_dir / PROM_FILE
+    json_path = out_dir / JSON_FILE
+    _write_atomic(prom_path, render_prometheus(cuts, generated_at))
+    _write_atomic(json_path, json.dumps({
+        "generated_at":   generated_at.isoformat(),
+        "loader_version": loader_version,
+        "cuts":           [c.as_dict() for c in cuts],
+    }, indent=2, ensure_ascii=False))
+    return prom_path, json_path
@@ -4,22 +4,38 @@ sql_helpers.py  —  Utilidades de conexión y operaciones SQL Server para Gold.
 Responsabilidades:
   - Leer credenciales desde .env  (python-dotenv)
   - Construir conexión pyodbc con fast_executemany habilitado
+  - Pool de conexiones con validación, reintentos con backoff y métricas
   - Ejecutar archivo DDL (split por ';' statement-safe)
+  - Versión + checksum de cada DDL aplicado (dw.schema_version)
   - Bulk insert de DataFrames con chunks (fast_executemany)
+  - Bulk insert en streaming de Arrow RecordBatches (sin pasar por pandas)
+  - Pipeline lector/escritor con cola acotada (lectura DuckDB ∥ INSERT)
+  - Bulk load por archivo: BULK INSERT (archivo visible por el servidor) o bcp
   - Logging estructurado reutilizable
 """
 
 from __future__ import annotations
 
+import hashlib
+import itertools
 import logging
 import os
+import queue
+import random
+import re
+import subprocess
 import sys
+import threading
 import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import pyodbc
 from dotenv import load_dotenv
 
@@ -29,6 +45,10 @@ from dotenv import load_dotenv
 _PROJECT_ROOT = Path(__file__).resolve().parents[2]
 _ENV_PATH     = _PROJECT_ROOT / ".env"
 DDL_PATH      = _PROJECT_ROOT / "models" / "gold" / "ddl_gold.sql"
+DDL_PARTITIONING_PATH = _PROJECT_ROOT / "models" / "gold" / "ddl_gold_partitioning.sql"
+DDL_COLUMNSTORE_PATH  = _PROJECT_ROOT / "models" / "gold" / "ddl_gold_columnstore.sql"
+DDL_STAGING_MEMORY_PATH = _PROJECT_ROOT / "models" / "gold" / "ddl_gold_staging_memory.sql"
+DDL_AGGREGATES_PATH   = _PROJECT_ROOT / "models" / "gold" / "ddl_gold_aggregates.sql"
 
 # ─────────────────────────────────────────────────────────────
 # Logging estructurado (mismo estilo que Silver)
@@ -51,6 +71,8 @@ def setup_logging(level: str = "INFO") -> None:
 
 log = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 # ─────────────────────────────────────────────────────────────
 # Conexión
@@ -106,21 +128,299 @@ def build_connection_string() -> str:
     )
 
 
-def get_connection() -> pyodbc.Connection:
+# Errores transitorios: se reintenta la unidad de trabajo completa.
+#   SQLSTATE 08xxx / HYT0x: enlace caído, conexión rechazada, timeout
+#   40001 / 1205: víctima de deadlock; 10053/10054/233/64: conexión reseteada
+#   40197/40501/40613/49918-49920: throttling / failover (Azure SQL)
+TRANSIENT_SQLSTATES = ("08S01", "08001", "08003", "08004", "08007", "40001", "HYT00", "HYT01")
+TRANSIENT_ERRORS    = (1205, 10053, 10054, 233, 64, 121, 40197, 40501, 40613, 49918, 49919, 49920)
+# Los que dejan la conexión inservible (se descarta y se abre otra)
+DISCONNECT_SQLSTATES = ("08S01", "08001", "08003", "08004", "08007")
+DISCONNECT_ERRORS    = (10053, 10054, 233, 64, 121)
+
+POOL_MAX_RETRIES  = 3      # reintentos por unidad de trabajo (además del intento inicial)
+POOL_BACKOFF_S    = 0.5    # espera del primer reintento; se duplica en cada uno
+POOL_MAX_BACKOFF_S = 30.0
+POOL_ACQUIRE_TIMEOUT_S = 600.0
+
+_NATIVE_ERROR = re.compile(r"\((\d+)\)")
+
+
+def _error_codes(exc: BaseException) -> tuple[str, set[int]]:
+    """(SQLSTATE, códigos nativos SQL Server del mensaje) de un pyodbc.Error."""
+    if not isinstance(exc, pyodbc.Error) or not exc.args:
+        return "", set()
+    sqlstate = str(exc.args[0])
+    native = {int(n) for n in _NATIVE_ERROR.findall(str(exc.args[-1]))}
+    return sqlstate, native
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True si `exc` es un error de SQL Server que vale la pena reintentar."""
+    sqlstate, native = _error_codes(exc)
+    return sqlstate in TRANSIENT_SQLSTATES or bool(native & set(TRANSIENT_ERRORS))
+
+
+def is_disconnect(exc: BaseException) -> bool:
+    """True si `exc` deja la conexión inservible (reintentar con otra)."""
+    sqlstate, native = _error_codes(exc)
+    return sqlstate in DISCONNECT_SQLSTATES or bool(native & set(DISCONNECT_ERRORS))
+
+
+def _backoff(attempt: int, base_s: float = POOL_BACKOFF_S, max_s: float = POOL_MAX_BACKOFF_S) -> float:
+    """Espera antes del reintento `attempt` (1..): base·2^(n-1), tope max_s, ±25% jitter."""
+    delay = min(max_s, base_s * 2 ** (attempt - 1))
+    return delay * random.uniform(0.75, 1.25)
+
+
+def get_connection(max_retries: int = POOL_MAX_RETRIES) -> pyodbc.Connection:
     """
     Devuelve una conexión pyodbc con fast_executemany habilitado.
 
     fast_executemany = True → usa TVP-style batch para INSERT masivo
     (x10-x100 más rápido que executemany estándar con ODBC Driver 17+).
+    Errores transitorios al conectar se reintentan con backoff exponencial.
     """
     conn_str = build_connection_string()
-    conn = pyodbc.connect(conn_str, autocommit=False)
+    for attempt in range(max_retries + 1):
+        try:
+            conn = pyodbc.connect(conn_str, autocommit=False)
+            break
+        except pyodbc.Error as exc:
+            if not is_transient(exc) or attempt == max_retries:
+                raise
+            delay = _backoff(attempt + 1)
+            log.warning(
+                "Conexión SQL Server falló (%s) — reintento %d/%d en %.1fs",
+                exc.args[0], attempt + 1, max_retries, delay,
+            )
+            time.sleep(delay)
     # fast_executemany is a cursor-level attribute in pyodbc ≥4.0.19
     # We monkey-patch execute_many_fast as a helper; callers use it directly on cursors.
     log.info("Conexion SQL Server establecida -> %s", os.environ.get("SQLSERVER_HOST", "?"))
     return conn
 
 
+@dataclass
+class ConnectionStats:
+    """Contadores de una conexión del pool (ConnectionPool.stats)."""
+    conn_id: int
+    opened_at: float
+    checkouts: int = 0
+    busy_s: float = 0.0            # tiempo prestada (acquire → release)
+    transient_errors: int = 0      # errores transitorios en unidades de ConnectionPool.run
+    failed_validations: int = 0    # SELECT 1 fallido al prestarla
+    closed_at: float | None = None
+    close_reason: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "conn_id":            self.conn_id,
+            "checkouts":          self.checkouts,
+            "busy_s":             round(self.busy_s, 1),
+            "transient_errors":   self.transient_errors,
+            "failed_validations": self.failed_validations,
+            "lifetime_s":         round((self.closed_at or time.monotonic()) - self.opened_at, 1),
+            "close_reason":       self.close_reason,
+        }
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones pyodbc (get_connection) para los pasos
+    concurrentes del loader Gold.
+
+      - Hasta `size` conexiones abiertas; se abren bajo demanda y `acquire`
+        espera (hasta POOL_ACQUIRE_TIMEOUT_S) si todas están prestadas.
+      - Validación al prestar: SELECT 1 sobre conexiones ociosas; si falla,
+        se cierra y se abre otra en su lugar.
+      - `run(fn)` ejecuta una unidad de trabajo con una conexión del pool y la
+        reintenta ante errores transitorios (deadlock, conexión reseteada,
+        failover) con backoff exponencial; rollback antes de reintentar y
+        conexión nueva si el error la dejó inservible. La unidad debe ser
+        idempotente o reanudable (MERGE insert-only, staging con checkpoint).
+      - `stats()` / `log_stats()`: contadores por conexión.
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        max_retries: int = POOL_MAX_RETRIES,
+        backoff_s: float = POOL_BACKOFF_S,
+        acquire_timeout_s: float = POOL_ACQUIRE_TIMEOUT_S,
+        connect: Callable[[], pyodbc.Connection] | None = None,
+    ) -> None:
+        self.size              = max(1, size)
+        self.max_retries       = max(0, max_retries)
+        self.backoff_s         = backoff_s
+        self.acquire_timeout_s = acquire_timeout_s
+        self._connect          = connect or get_connection
+        self._cond             = threading.Condition()
+        self._idle: list[pyodbc.Connection] = []
+        self._open             = 0          # conexiones abiertas o reservadas (≤ size)
+        self._stats: dict[int, ConnectionStats] = {}    # id(conn) → stats (incluye cerradas)
+        self._closed_stats: list[ConnectionStats] = []
+        self._since: dict[int, float] = {}  # id(conn) → inicio del préstamo
+        self._ids              = itertools.count(1)
+
+    # ── préstamo ──────────────────────────────────────────────
+
+    def acquire(self) -> pyodbc.Connection:
+        """Presta una conexión validada (abre una nueva si hay cupo)."""
+        deadline = time.monotonic() + self.acquire_timeout_s
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(
+                        f"ConnectionPool: sin conexiones libres tras {self.acquire_timeout_s:.0f}s "
+                        f"(size={self.size}); subir --pool-size"
+                    )
+                self._cond.wait(remaining)
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                self._open += 1
+
+        if conn is not None and not self._validate(conn):
+            self._close(conn, "validación fallida", keep_slot=True)
+            conn = None
+        if conn is None:
+            try:
+                conn = self._connect()
+            except BaseException:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats[id(conn)] = ConnectionStats(next(self._ids), opened_at=time.monotonic())
+
+        with self._cond:
+            self._stats[id(conn)].checkouts += 1
+            self._since[id(conn)] = time.monotonic()
+        return conn
+
+    def release(self, conn: pyodbc.Connection, discard: bool = False) -> None:
+        """Devuelve `conn` al pool (rollback de lo no confirmado); `discard` la cierra."""
+        with self._cond:
+            st = self._stats.get(id(conn))
+            since = self._since.pop(id(conn), None)
+            if st is not None and since is not None:
+                st.busy_s += time.monotonic() - since
+        if not discard:
+            try:
+                conn.rollback()
+            except pyodbc.Error:
+                discard = True
+        if discard:
+            self._close(conn, "error de conexión")
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[pyodbc.Connection]:
+        """`with pool.connection() as conn:` — acquire/release (descarta si se cortó)."""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except BaseException as exc:
+            broken = is_disconnect(exc)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def run(
+        self,
+        fn: Callable[[pyodbc.Connection], T],
+        label: str = "unidad",
+        on_retry: Callable[[pyodbc.Connection], None] | None = None,
+    ) -> T:
+        """
+        fn(conn) con una conexión del pool, reintentando errores transitorios
+        hasta `max_retries` veces con backoff exponencial. `on_retry(conn)`
+        corre antes de cada reintento con la conexión nueva (p.ej. releer el
+        checkpoint de la unidad).
+        """
+        for attempt in range(self.max_retries + 1):
+            conn = self.acquire()
+            broken = False
+            try:
+                if attempt and on_retry is not None:
+                    on_retry(conn)
+                return fn(conn)
+            except pyodbc.Error as exc:
+                if not is_transient(exc) or attempt == self.max_retries:
+                    raise
+                broken = is_disconnect(exc)
+                with self._cond:
+                    self._stats[id(conn)].transient_errors += 1
+                delay = _backoff(attempt + 1, self.backoff_s)
+                log.warning(
+                    "%s: error transitorio (%s%s) — reintento %d/%d en %.1fs",
+                    label, exc.args[0], ", conexión descartada" if broken else "",
+                    attempt + 1, self.max_retries, delay,
+                )
+            finally:
+                self.release(conn, discard=broken)
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    # ── internos ──────────────────────────────────────────────
+
+    def _validate(self, conn: pyodbc.Connection) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1").fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except pyodbc.Error as exc:
+            log.warning("ConnectionPool: conexión ociosa inválida (%s) — se reemplaza", exc.args[0])
+            with self._cond:
+                self._stats[id(conn)].failed_validations += 1
+            return False
+
+    def _close(self, conn: pyodbc.Connection, reason: str, keep_slot: bool = False) -> None:
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        with self._cond:
+            st = self._stats.pop(id(conn), None)
+            if st is not None:
+                st.closed_at, st.close_reason = time.monotonic(), reason
+                self._closed_stats.append(st)
+            if not keep_slot:
+                self._open -= 1
+                self._cond.notify()
+
+    # ── ciclo de vida / métricas ──────────────────────────────
+
+    def close(self) -> None:
+        """Cierra las conexiones ociosas (las prestadas se cierran al devolverlas)."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn, "pool cerrado")
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Contadores por conexión, abiertas y cerradas, en orden de apertura."""
+        with self._cond:
+            all_stats = list(self._stats.values()) + self._closed_stats
+        return [st.as_dict() for st in sorted(all_stats, key=lambda s: s.conn_id)]
+
+    def log_stats(self) -> None:
+        for st in self.stats():
+            log.info(
+                "pool conn#%d | checkouts=%d  ocupada=%.1fs  transitorios=%d  validaciones_fallidas=%d%s",
+                st["conn_id"], st["checkouts"], st["busy_s"], st["transient_errors"],
+                st["failed_validations"], f"  cerrada: {st['close_reason']}" if st["close_reason"] else "",
+            )
+
+
 # ─────────────────────────────────────────────────────────────
 # Ejecución de SQL
 # ─────────────────────────────────────────────────────────────
@@ -228,6 +528,60 @@ def execute_sql_file(conn: pyodbc.Connection, path: Path) -> None:
     cursor.close()
 
 
+# ─────────────────────────────────────────────────────────────
+# Versión de schema (dw.schema_version)
+# ─────────────────────────────────────────────────────────────
+
+_SCHEMA_VERSION_RE = re.compile(r"^--\s*schema_version:\s*(\d+)", re.MULTILINE)
+
+
+def ddl_version(path: Path) -> tuple[int, str]:
+    """
+    (versión, checksum) de un archivo DDL: la línea `-- schema_version: N` del
+    encabezado (1 si no está) y el SHA-256 del contenido.
+    """
+    data = path.read_bytes()
+    m = _SCHEMA_VERSION_RE.search(data.decode("utf-8"))
+    return (int(m.group(1)) if m else 1), hashlib.sha256(data).hexdigest()
+
+
+def fetch_schema_versions(conn: pyodbc.Connection) -> dict[str, tuple[int, str]]:
+    """
+    {component: (version, checksum)} desplegados, en un SELECT. Vacío si
+    dw.schema_version todavía no existe (base nueva o anterior al versionado).
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT component, version, checksum FROM dw.schema_version")
+        rows = cursor.fetchall()
+    except pyodbc.Error:
+        conn.rollback()
+        return {}
+    finally:
+        cursor.close()
+    conn.commit()
+    return {str(c): (int(v), str(h).strip()) for c, v, h in rows}
+
+
+def record_schema_version(
+    conn: pyodbc.Connection, component: str, version: int, checksum: str,
+) -> None:
+    """Registra (upsert) la versión y el checksum aplicados de `component`."""
+    execute_sql(
+        conn,
+        """
+        MERGE dw.schema_version AS t
+        USING (SELECT ? AS component, ? AS version, ? AS checksum) AS s
+            ON t.component = s.component
+        WHEN MATCHED THEN
+            UPDATE SET version = s.version, checksum = s.checksum, applied_at = SYSUTCDATETIME()
+        WHEN NOT MATCHED THEN
+            INSERT (component, version, checksum) VALUES (s.component, s.version, s.checksum);
+        """,
+        (component, version, checksum),
+    ).close()
+
+
 def execute_sql(
     conn: pyodbc.Connection,
     sql: str,
@@ -347,48 +701,438 @@ def bulk_insert(
     return total
 
 
+# ─────────────────────────────────────────────────────────────
+# Pipeline lector → escritores (cola acotada)
+# ─────────────────────────────────────────────────────────────
+
+_PIPELINE_DONE = object()
+_PIPELINE_POLL_S = 0.1
+
+
+@dataclass
+class PipelineStats:
+    """Tiempos de run_pipeline: ocupado vs bloqueado por etapa (segundos)."""
+    label: str
+    writers: int
+    items: int = 0
+    elapsed: float = 0.0
+    read_busy: float = 0.0    # produciendo ítems (DuckDB + conversión)
+    read_wait: float = 0.0    # bloqueado con la cola llena (backpressure)
+    write_busy: float = 0.0   # sumado entre escritores
+    write_wait: float = 0.0   # escritores esperando ítems
+
+    @property
+    def read_util(self) -> float:
+        return self.read_busy / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def write_util(self) -> float:
+        return self.write_busy / (self.elapsed * self.writers) if self.elapsed else 0.0
+
+    @property
+    def bound(self) -> str:
+        """'lectura' o 'escritura': la etapa que limita el throughput."""
+        return "escritura" if self.write_util >= self.read_util else "lectura"
+
+    def log(self) -> None:
+        log.info(
+            "pipeline %s | items=%d  lector=%.0f%% (espera cola llena %.1fs)"
+            "  escritor%s=%.0f%% (espera cola vacía %.1fs) → limitado por %s",
+            self.label, self.items, 100 * self.read_util, self.read_wait,
+            f"es×{self.writers}" if self.writers > 1 else "", 100 * self.write_util,
+            self.write_wait, self.bound,
+        )
+
+
+def run_pipeline(
+    source: Iterable[T],
+    sinks: list[Callable[[T], None]],
+    depth: int = 2,
+    label: str = "pipeline",
+) -> PipelineStats:
+    """
+    Consume `source` en un hilo lector y entrega cada ítem a uno de los
+    `sinks` (un hilo escritor por sink) a través de una cola de `depth` ítems:
+    la lectura del siguiente ítem se solapa con la escritura del actual, y el
+    lector se bloquea cuando la cola está llena (memoria acotada a depth + 1
+    + len(sinks) ítems).
+
+    Con un solo sink los ítems se escriben en el orden de `source` (los
+    checkpoints por filas acumuladas siguen siendo válidos); con varios, cada
+    sink necesita su propia conexión y el orden no está garantizado.
+
+    El primer error de cualquier etapa detiene a las demás (el generador se
+    cierra en el hilo lector) y se re-lanza aquí. Devuelve los tiempos por
+    etapa (PipelineStats) para ver si la carga está limitada por lectura o
+    por escritura.
+    """
+    if not sinks:
+        raise ValueError("run_pipeline: se necesita al menos un sink")
+    q: queue.Queue[Any] = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+    errors: list[BaseException] = []
+    stats = PipelineStats(label=label, writers=len(sinks))
+    lock = threading.Lock()
+
+    def _fail(exc: BaseException) -> None:
+        with lock:
+            errors.append(exc)
+        stop.set()
+
+    def _put(item: Any) -> bool:
+        t = time.monotonic()
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_PIPELINE_POLL_S)
+            except queue.Full:
+                continue
+            stats.read_wait += time.monotonic() - t
+            return True
+        return False
+
+    def _produce() -> None:
+        it = iter(source)
+        try:
+            while not stop.is_set():
+                t = time.monotonic()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                stats.read_busy += time.monotonic() - t
+                stats.items += 1
+                if not _put(item):
+                    break
+        except BaseException as exc:  # noqa: BLE001
+            _fail(exc)
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+            for _ in sinks:
+                _put(_PIPELINE_DONE)
+
+    def _consume(sink: Callable[[T], None]) -> None:
+        busy = wait = 0.0
+        try:
+            while not stop.is_set():
+                t = time.monotonic()
+                try:
+                    item = q.get(timeout=_PIPELINE_POLL_S)
+                except queue.Empty:
+                    wait += time.monotonic() - t
+                    continue
+                wait += time.monotonic() - t
+                if item is _PIPELINE_DONE:
+                    return
+                t = time.monotonic()
+                sink(item)
+                busy += time.monotonic() - t
+        except BaseException as exc:  # noqa: BLE001
+            _fail(exc)
+        finally:
+            with lock:
+                stats.write_busy += busy
+                stats.write_wait += wait
+
+    t0 = time.monotonic()
+    threads = [threading.Thread(target=_produce, name=f"{label}-reader", daemon=True)] + [
+        threading.Thread(target=_consume, args=(sink,), name=f"{label}-writer{i}", daemon=True)
+        for i, sink in enumerate(sinks)
+    ]
+    for th in threads:
+        th.start()
+    try:
+        for th in threads:
+            th.join()
+    except BaseException:
+        stop.set()
+        raise
+    stats.elapsed = time.monotonic() - t0
+    if errors:
+        raise errors[0]
+    return stats
+
+
+def _arrow_rows(batch: pa.RecordBatch) -> list[tuple]:
+    """
+    Filas de parámetros pyodbc desde un RecordBatch: nulls Arrow → None y
+    NaN de columnas float → None (pyodbc no acepta NaN), columna a columna.
+    """
+    cols = []
+    for col in batch.columns:
+        if pa.types.is_floating(col.type):
+            col = pc.if_else(pc.is_nan(col), pa.scalar(None, col.type), col)
+        cols.append(col.to_pylist())
+    return list(zip(*cols))
+
+
+def bulk_insert_arrow(
+    conn: pyodbc.Connection,
+    table: str,             # 'schema.table'
+    batches: Iterable[pa.RecordBatch],
+    chunk_size: int = 50_000,
+    truncate_first: bool = False,
+    label: str | None = None,
+    on_commit: Callable[[int], None] | None = None,
+    queue_depth: int = 2,
+) -> int:
+    """
+    Inserta un stream de RecordBatches (p.ej. DuckDB `fetch_record_batch`)
+    usando fast_executemany. Cada batch se convierte a tuplas por tramos de
+    `chunk_size` filas: la memoria queda acotada por batch, sin DataFrame.
+
+    Lectura y escritura van en pipeline (run_pipeline): un hilo lee el stream
+    y arma los parámetros del próximo chunk mientras otro hace el executemany
+    del actual, con hasta `queue_depth` chunks listos en cola.
+
+    Las columnas del INSERT son las del schema del primer batch. Con
+    `truncate_first` la tabla se trunca aunque el stream venga vacío.
+    `on_commit(filas_acumuladas)` corre antes de cada commit, en la misma
+    transacción que el chunk (checkpoints de load_gold --resume); los chunks
+    se confirman en el orden del stream.
+
+    Returns:
+        Total de filas insertadas.
+    """
+    label = label or table
+    if truncate_first:
+        execute_sql(conn, f"TRUNCATE TABLE {table}")
+        log.info("TRUNCATE TABLE %s", table)
+
+    # Ítems: (INSERT, n° de batch, filas del batch si es su último chunk, filas, parámetros)
+    def _chunks() -> Iterator[tuple[str, int, int, int, list[tuple]]]:
+        sql: str | None = None
+        for batch_num, batch in enumerate(batches, 1):
+            if batch.num_rows == 0:
+                continue
+            if sql is None:
+                cols = ", ".join(f"[{c}]" for c in batch.schema.names)
+                placeholders = ", ".join("?" * batch.num_columns)
+                sql = f"INSERT INTO {table} ({cols}) VALUES ({placeholders})"
+            for start in range(0, batch.num_rows, chunk_size):
+                chunk = batch.slice(start, chunk_size)
+                last = start + chunk_size >= batch.num_rows
+                yield sql, batch_num, batch.num_rows if last else 0, chunk.num_rows, _arrow_rows(chunk)
+
+    cursor = conn.cursor()
+    cursor.fast_executemany = True
+    total = 0
+    tb = time.monotonic()
+
+    def _write(item: tuple[str, int, int, int, list[tuple]]) -> None:
+        nonlocal total, tb
+        sql, batch_num, batch_rows, n, rows = item
+        cursor.executemany(sql, rows)
+        if on_commit is not None:
+            on_commit(total + n)
+        conn.commit()
+        total += n
+        if batch_rows:
+            elapsed = time.monotonic() - tb
+            log.info(
+                "%s batch %d | +%s filas | acum=%s | %.0f filas/s",
+                label, batch_num, f"{batch_rows:,}", f"{total:,}",
+                batch_rows / elapsed if elapsed else 0,
+            )
+            tb = time.monotonic()
+
+    try:
+        stats = run_pipeline(_chunks(), [_write], depth=queue_depth, label=label)
+    finally:
+        cursor.close()
+
+    log.info(
+        "bulk_insert_arrow %s: %s filas en %.1fs (%.0f filas/s)",
+        table, f"{total:,}", stats.elapsed, total / stats.elapsed if stats.elapsed else 0,
+    )
+    stats.log()
+    return total
+
+
+# ─────────────────────────────────────────────────────────────
+# Bulk load por archivo (BULK INSERT / bcp)
+#   Archivos de texto: campos separados por 0x1F (unit separator),
+#   filas por 0x0A, sin quoting, NULL = campo vacío, UTF-8.
+# ─────────────────────────────────────────────────────────────
+
+BULK_FIELD_TERMINATOR = "0x1f"
+BULK_ROW_TERMINATOR   = "0x0a"
+
+
+def bulk_dirs() -> tuple[Path, str]:
+    """
+    (directorio local donde el loader escribe los archivos, mismo directorio
+    visto desde SQL Server). GOLD_BULK_DIR (default lake/_bulk) y
+    GOLD_BULK_SERVER_DIR (default: GOLD_BULK_DIR, servidor en la misma máquina).
+    Se leen del entorno que cargó get_connection (.env).
+    """
+    local = Path(os.environ.get("GOLD_BULK_DIR", "").strip() or _PROJECT_ROOT / "lake" / "_bulk")
+    server = os.environ.get("GOLD_BULK_SERVER_DIR", "").strip() or str(local)
+    return local, server.rstrip("/\\")
+
+
+def server_path(server_dir: str, name: str) -> str:
+    """Ruta de `name` dentro de `server_dir` con el separador del servidor (\\ en Windows/UNC)."""
+    sep = "\\" if "\\" in server_dir or (len(server_dir) > 1 and server_dir[1] == ":") else "/"
+    return f"{server_dir}{sep}{name}"
+
+
+def bulk_insert_file(
+    conn: pyodbc.Connection,
+    target: str,            # tabla o vista con exactamente las columnas del archivo
+    path: str,              # ruta vista desde SQL Server
+    rows: int,
+    tablock: bool = True,
+) -> int:
+    """
+    BULK INSERT de un archivo en `target` con TABLOCK (carga mínimamente
+    logueada sobre un heap con recovery SIMPLE / BULK_LOGGED) y un único
+    batch de `rows` filas. No hace commit: el caller confirma el archivo en
+    la misma transacción que su checkpoint. `tablock=False` para tablas
+    memory-optimized, que no admiten el hint.
+
+    Returns:
+        Filas insertadas (rowcount de SQL Server).
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        BULK INSERT {target} FROM '{path.replace("'", "''")}'
+        WITH (
+            DATAFILETYPE = 'char', CODEPAGE = '65001',
+            FIELDTERMINATOR = '{BULK_FIELD_TERMINATOR}', ROWTERMINATOR = '{BULK_ROW_TERMINATOR}',
+            KEEPNULLS,{" TABLOCK," if tablock else ""} BATCHSIZE = {max(int(rows), 1)}, MAXERRORS = 0
+        )
+        """
+    )
+    n = cursor.rowcount
+    cursor.close()
+    return n
+
+
+def bcp_file(target: str, path: Path, rows: int, tablock: bool = True) -> int:
+    """
+    Carga un archivo con la utilidad `bcp` (lado cliente: SQL Server no
+    necesita ver el archivo). Corre en su propia conexión y confirma sola
+    con un batch de `rows` filas y hint TABLOCK (salvo `tablock=False`).
+
+    Returns:
+        Filas copiadas (según la salida de bcp).
+    """
+    host = os.environ["SQLSERVER_HOST"]
+    port = os.environ.get("SQLSERVER_PORT", "").strip()
+    user = os.environ.get("SQLSERVER_USER", "").strip()
+    cmd = [
+        "bcp", target, "in", str(path),
+        "-S", f"{host},{port}" if port else host,
+        "-d", os.environ["SQLSERVER_DB"],
+        "-c", "-t", BULK_FIELD_TERMINATOR, "-r", BULK_ROW_TERMINATOR,
+        "-b", str(max(int(rows), 1)), "-k",
+    ]
+    if tablock:
+        cmd += ["-h", "TABLOCK"]
+    if (not user) or ("\\" in user):
+        cmd.append("-T")
+    else:
+        cmd += ["-U", user, "-P", os.environ.get("SQLSERVER_PASSWORD", "")]
+    if os.environ.get("SQLSERVER_TRUST_CERT", "yes").lower() in ("yes", "true", "1"):
+        cmd.append("-u")
+    if os.name == "nt":
+        cmd += ["-C", "65001"]
+    out = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    m = re.search(r"(\d+) rows copied", out.stdout)
+    if out.returncode != 0 or m is None:
+        tail = (out.stderr or out.stdout).strip().splitlines()[-3:]
+        raise RuntimeError(f"bcp {target} falló (rc={out.returncode}): {' | '.join(tail)}")
+    return int(m.group(1))
+
+
 def upsert_lookup_dim(
     conn: pyodbc.Connection,
     dim_table: str,
     bk_col: str,
-    values: list[str | None],
+    values: list[Any],
     extra_cols: dict[str, Any] | None = None,
-) -> None:
+    attr_cols: list[str] | None = None,
+) -> int:
     """
     Inserta filas nuevas en una dimensión simple (sin SCD2) por BK.
     Ignora BKs que ya existen (idempotente).
 
+    Set-based: los valores se cargan a #lookup_src (executemany) y un solo
+    INSERT ... SELECT ... WHERE NOT EXISTS agrega los nuevos. Round-trips
+    constantes sin importar cuántos valores traiga el cut.
+
     Args:
         dim_table:  'dw.dim_fare_period'
         bk_col:     'fare_period_name'
-        values:     Lista de valores únicos del BK (filtrados: sin NULL, sin vacíos).
+        values:     Valores del BK (se descartan NULL/vacíos). Con `attr_cols`,
+                    tuplas (bk, *attrs); ante BK repetido gana la primera.
         extra_cols: Columnas adicionales a insertar con valor fijo (ej. {'record_source': 'DTPM'}).
+        attr_cols:  Columnas de la dimensión que acompañan al BK en cada tupla.
+
+    Returns:
+        Filas insertadas.
     """
-    values_clean = sorted({v for v in values if v and str(v).strip()})
-    if not values_clean:
+    attr_cols = attr_cols or []
+    if attr_cols:
+        firsts: dict[Any, tuple] = {}
+        for v in values:
+            if v[0] and str(v[0]).strip():
+                firsts.setdefault(v[0], tuple(v))
+        rows = list(firsts.values())
+    else:
+        rows = [(v,) for v in sorted({v for v in values if v and str(v).strip()})]
+    if not rows:
         log.debug("upsert_lookup_dim %s: sin valores nuevos.", dim_table)
-        return
+        return 0
 
     extra_cols = extra_cols or {}
-    extra_col_str  = (", " + ", ".join(f"[{c}]" for c in extra_cols)) if extra_cols else ""
-    extra_val_str  = (", " + ", ".join(f"'{v}'" for v in extra_cols.values())) if extra_cols else ""
+    src_cols   = [bk_col] + attr_cols
+    col_str    = ", ".join(f"[{c}]" for c in src_cols)
+    sel_str    = ", ".join(f"s.[{c}]" for c in src_cols)
+    extra_col_str = "".join(f", [{c}]" for c in extra_cols)
+    extra_val_str = ", ?" * len(extra_cols)
 
-    inserted = 0
     cursor = conn.cursor()
-    for val in values_clean:
-        cursor.execute(
-            f"""
-            IF NOT EXISTS (SELECT 1 FROM {dim_table} WHERE [{bk_col}] = ?)
-                INSERT INTO {dim_table} ([{bk_col}]{extra_col_str})
-                VALUES (?{extra_val_str})
-            """,
-            val, val,
-        )
-        if cursor.rowcount and cursor.rowcount > 0:
-            inserted += 1
+    cursor.execute(
+        "IF OBJECT_ID('tempdb..#lookup_src') IS NOT NULL DROP TABLE #lookup_src; "
+        f"SELECT TOP 0 {col_str}, CAST(0 AS INT) AS _ord INTO #lookup_src FROM {dim_table};"
+    )
+    cursor.fast_executemany = True
+    cursor.executemany(
+        f"INSERT INTO #lookup_src ({col_str}, _ord) VALUES ({', '.join('?' * len(src_cols))}, ?)",
+        [(*row, i) for i, row in enumerate(rows)],
+    )
+    cursor.fast_executemany = False
+    # _ord: BKs iguales bajo la collation del DW → se inserta solo el primero
+    cursor.execute(
+        f"""
+        SET NOCOUNT ON;
+        INSERT INTO {dim_table} ({col_str}{extra_col_str})
+        SELECT {sel_str}{extra_val_str}
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY [{bk_col}] ORDER BY _ord) AS _rn
+            FROM #lookup_src
+        ) s
+        WHERE s._rn = 1
+          AND NOT EXISTS (SELECT 1 FROM {dim_table} d WHERE d.[{bk_col}] = s.[{bk_col}]);
+        SELECT @@ROWCOUNT;
+        DROP TABLE #lookup_src;
+        SET NOCOUNT OFF;   -- NOCOUNT es de sesión: si no, rowcount = -1 en adelante
+        """,
+        *extra_cols.values(),
+    )
+    while cursor.description is None and cursor.nextset():
+        pass
+    inserted = int(cursor.fetchone()[0] or 0)
+    while cursor.nextset():
+        pass
     conn.commit()
     cursor.close()
-    log.info("upsert_lookup_dim %s: %d nuevas filas (de %d valores únicos)", dim_table, inserted, len(values_clean))
+    log.info("upsert_lookup_dim %s: %d nuevas filas (de %d valores únicos)", dim_table, inserted, len(rows))
+    return inserted
 
 
 def build_lookup_dict(
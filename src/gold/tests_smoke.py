@@ -0,0 +1,409 @@
+"""
+tests_smoke.py — Smoke tests de la capa Gold (SQL Server) sin servidor.
+
+Ejecutar:
+    python -m src.gold.tests_smoke
+
+No requiere pytest ni una instancia SQL Server: las piezas en Python del
+loader (línea de tiempo SCD2 multi-cut, ConnectionPool, run_pipeline) se
+ejercitan contra conexiones falsas que registran lo que se enviaría al
+servidor.
+Falla con exit code 1 si algún test falla.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import traceback
+from datetime import date
+from typing import Any, Iterator
+from unittest import mock
+
+# ─────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────
+
+_PASSED: list[str] = []
+_FAILED: list[tuple[str, str]] = []
+
+
+def _run(name: str, fn: Any) -> None:
+    try:
+        fn()
+        _PASSED.append(name)
+        print(f"  PASS  {name}")
+    except Exception as exc:  # noqa: BLE001
+        _FAILED.append((name, traceback.format_exc()))
+        print(f"  FAIL  {name}: {exc}")
+
+
+# ─────────────────────────────────────────────────────────────
+# Imports under test
+# ─────────────────────────────────────────────────────────────
+
+import pandas as pd  # noqa: E402
+import pyodbc  # noqa: E402
+
+from src.gold import load_gold  # noqa: E402
+from src.gold.sql_helpers import ConnectionPool, run_pipeline  # noqa: E402
+
+# Errores tal como los arma pyodbc: (SQLSTATE, mensaje con el código nativo)
+_DISCONNECT = pyodbc.OperationalError("08S01", "[08S01] Communication link failure (10054)")
+_DEADLOCK   = pyodbc.Error("40001", "[40001] Transaction was deadlocked (1205)")
+_MISSING    = pyodbc.ProgrammingError("42S02", "[42S02] Invalid object name 'dw.x'. (208)")
+
+
+class _FakeCursor:
+    """Cursor pyodbc mínimo: guarda los executemany por tabla temporal."""
+
+    def __init__(self, conn: "_FakeConn") -> None:
+        self.conn = conn
+        self.fast_executemany = False
+
+    def execute(self, sql: str, params: Any = None) -> "_FakeCursor":
+        if self.conn.broken:
+            raise _DISCONNECT
+        self.conn.executed.append(sql)
+        return self
+
+    def fetchone(self) -> tuple:
+        return (1,)
+
+    def executemany(self, sql: str, params: list[tuple]) -> None:
+        table = sql.split("INSERT INTO", 1)[1].split("(", 1)[0].strip()
+        self.conn.inserted.setdefault(table, []).extend(params)
+
+    def nextset(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class _FakeConn:
+    def __init__(self) -> None:
+        self.executed: list[str] = []
+        self.inserted: dict[str, list[tuple]] = {}
+        self.commits = 0
+        self.rollbacks = 0
+        self.broken = False     # True → toda sentencia falla como enlace caído
+        self.closed = False
+
+    def cursor(self) -> _FakeCursor:
+        return _FakeCursor(self)
+
+    def commit(self) -> None:
+        self.commits += 1
+
+    def rollback(self) -> None:
+        if self.broken:
+            raise _DISCONNECT
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _Connector:
+    """`connect=` del pool: abre _FakeConn y falla las primeras `fail` veces."""
+
+    def __init__(self, fail: int = 0) -> None:
+        self.opened: list[_FakeConn] = []
+        self.fail = fail
+
+    def __call__(self) -> _FakeConn:
+        if self.fail:
+            self.fail -= 1
+            raise _DISCONNECT
+        conn = _FakeConn()
+        self.opened.append(conn)
+        return conn
+
+
+# ─────────────────────────────────────────────────────────────
+# Tests: SCD2 multi-cut
+# ─────────────────────────────────────────────────────────────
+
+def test_scd2_timeline_matches_sequential_cuts() -> None:
+    """
+    scd2_upsert_timeline deja la misma línea de tiempo que scd2_upsert_set
+    cut a cut: enriquecimiento mismo día (vigente previa y versión del lote),
+    evento retroactivo, cambio→cambio→vuelta al valor original.
+    """
+    def h(name: str) -> str:
+        return load_gold._row_hash({"name": name}, ["name"])
+
+    def df(*rows: tuple[str, str]) -> pd.DataFrame:
+        return pd.DataFrame(rows, columns=["code", "name"])
+
+    # Dimensión vigente antes del lote
+    current = pd.DataFrame(
+        [("A", h("X"), date(2025, 4, 1)), ("B", h("Y"), date(2025, 4, 10))],
+        columns=["code", "row_hash", "valid_from"],
+    )
+    events = [
+        (date(2025, 4, 5),  df(("A", "X2"), ("B", "Y2"), ("C", "Z"))),   # A cambia, B retroactivo, C nuevo
+        (date(2025, 4, 10), df(("A", "X3"), ("B", "Y3"), ("C", "Z"))),   # A cambia, B mismo día, C igual
+        (date(2025, 4, 12), df(("A", "X2"), ("C", "Z2"))),               # A vuelve a X2, C cambia
+        (date(2025, 4, 12), df(("C", "Z3"),)),                          # mismo día sobre versión del lote
+    ]
+
+    conn = _FakeConn()
+    with mock.patch.object(load_gold, "fetch_df", return_value=current):
+        counts = load_gold.scd2_upsert_timeline(conn, "dw.dim_test", "code", ["name"], events)
+
+    assert counts == {"inserted": 5, "expired": 4, "unchanged": 4}, counts
+    assert conn.inserted.get("#scd2_exp") == [("A", date(2025, 4, 4))], conn.inserted
+    assert conn.inserted.get("#scd2_enr") == [("B", "Y3", h("Y3"))], conn.inserted
+    assert sorted(conn.inserted.get("#scd2_new", []), key=lambda r: (r[3], r[0])) == [
+        ("A", "X2", h("X2"), date(2025, 4, 5),  date(2025, 4, 9),  0),
+        ("C", "Z",  h("Z"),  date(2025, 4, 5),  date(2025, 4, 11), 0),
+        ("A", "X3", h("X3"), date(2025, 4, 10), date(2025, 4, 11), 0),
+        ("A", "X2", h("X2"), date(2025, 4, 12), None,              1),
+        ("C", "Z3", h("Z3"), date(2025, 4, 12), None,              1),
+    ], conn.inserted.get("#scd2_new")
+    assert conn.commits == 1
+
+
+# ─────────────────────────────────────────────────────────────
+# Tests: ConnectionPool
+# ─────────────────────────────────────────────────────────────
+
+def test_pool_run_retries_and_discards_broken_connection() -> None:
+    """run(): reintenta transitorios; un corte descarta la conexión, un deadlock la devuelve."""
+    connector = _Connector()
+    pool = ConnectionPool(size=2, max_retries=2, backoff_s=0, connect=connector)
+    errors = [_DISCONNECT, _DEADLOCK]
+    used: list[_FakeConn] = []
+    retried: list[_FakeConn] = []
+
+    def unit(conn: _FakeConn) -> str:
+        used.append(conn)
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert pool.run(unit, on_retry=retried.append) == "ok"
+    c1, c2 = connector.opened
+    assert used == [c1, c2, c2] and retried == [c2, c2], (used, retried)
+    assert c1.closed and not c2.closed
+    assert pool._open == 1 and pool._idle == [c2]
+    st = {s["conn_id"]: s for s in pool.stats()}
+    assert (st[1]["transient_errors"], st[1]["close_reason"]) == (1, "error de conexión"), st
+    assert (st[2]["transient_errors"], st[2]["checkouts"], st[2]["close_reason"]) == (1, 2, None), st
+
+    # No transitorio: sin reintento, la conexión vuelve al pool
+    calls: list[int] = []
+
+    def missing(conn: _FakeConn) -> None:
+        calls.append(1)
+        raise _MISSING
+
+    try:
+        pool.run(missing)
+        raise AssertionError("ProgrammingError no propagado")
+    except pyodbc.ProgrammingError:
+        pass
+    assert len(calls) == 1 and pool._idle == [c2]
+
+    # Transitorio persistente: max_retries + 1 intentos y se propaga
+    calls.clear()
+
+    def deadlock(conn: _FakeConn) -> None:
+        calls.append(1)
+        raise _DEADLOCK
+
+    try:
+        pool.run(deadlock)
+        raise AssertionError("deadlock no propagado")
+    except pyodbc.Error:
+        pass
+    assert len(calls) == 3 and pool._open == 1
+
+
+def test_pool_replaces_connection_failing_validation() -> None:
+    """acquire(): una conexión ociosa que falla SELECT 1 se cierra y se abre otra en su cupo."""
+    connector = _Connector()
+    pool = ConnectionPool(size=1, connect=connector)
+    c1 = pool.acquire()
+    pool.release(c1)
+    c1.broken = True
+    c2 = pool.acquire()
+    assert c2 is not c1 and c1.closed and connector.opened == [c1, c2]
+    assert pool._open == 1
+    st = {s["conn_id"]: s for s in pool.stats()}
+    assert (st[1]["failed_validations"], st[1]["close_reason"]) == (1, "validación fallida"), st
+    pool.release(c2)
+
+    # Reemplazo que no logra conectar: el cupo se libera igual
+    c2.broken = True
+    connector.fail = 1
+    try:
+        pool.acquire()
+        raise AssertionError("error de conexión no propagado")
+    except pyodbc.Error:
+        pass
+    assert pool._open == 0 and pool._idle == []
+    pool.release(pool.acquire())
+    assert pool._open == 1
+
+
+def test_pool_acquire_timeout_and_slot_release() -> None:
+    """acquire() espera una conexión devuelta, falla al vencer el timeout y no pierde cupos."""
+    connector = _Connector(fail=1)
+    pool = ConnectionPool(size=1, acquire_timeout_s=0.2, connect=connector)
+
+    # connect fallido: el cupo reservado se devuelve
+    try:
+        pool.acquire()
+        raise AssertionError("error de conexión no propagado")
+    except pyodbc.Error:
+        pass
+    assert pool._open == 0
+
+    c1 = pool.acquire()
+    t0 = time.monotonic()
+    try:
+        pool.acquire()
+        raise AssertionError("acquire sin cupo no falló")
+    except RuntimeError:
+        pass
+    assert time.monotonic() - t0 >= 0.2
+
+    # Una conexión devuelta despierta al que espera
+    pool.acquire_timeout_s = 5.0
+    timer = threading.Timer(0.05, pool.release, args=(c1,))
+    timer.start()
+    assert pool.acquire() is c1
+    timer.join()
+
+    # Descartada: el cupo queda libre para una conexión nueva
+    pool.release(c1, discard=True)
+    assert pool._open == 0
+    c2 = pool.acquire()
+    assert c2 is not c1 and connector.opened == [c1, c2]
+
+
+# ─────────────────────────────────────────────────────────────
+# Tests: run_pipeline
+# ─────────────────────────────────────────────────────────────
+
+def test_pipeline_single_sink_keeps_source_order() -> None:
+    """Un sink recibe los ítems en el orden de source (checkpoints de --resume); varios, cada uno una vez."""
+    seen: list[int] = []
+    stats = run_pipeline(range(500), [seen.append], depth=2, label="smoke")
+    assert seen == list(range(500)) and stats.items == 500, (seen[:10], stats)
+
+    lock = threading.Lock()
+    shared: list[int] = []
+
+    def sink(item: int) -> None:
+        with lock:
+            shared.append(item)
+
+    stats = run_pipeline(range(500), [sink, sink, sink], depth=2, label="smoke")
+    assert sorted(shared) == list(range(500)) and stats.writers == 3
+
+    try:
+        run_pipeline(range(3), [], label="smoke")
+        raise AssertionError("sin sinks no falló")
+    except ValueError:
+        pass
+
+
+def test_pipeline_sink_error_stops_reader() -> None:
+    """Un sink que falla en el ítem N detiene al lector, cierra el generador y re-lanza el error."""
+    produced: list[int] = []
+    closed: list[bool] = []
+
+    def endless() -> Iterator[int]:
+        i = 0
+        try:
+            while True:
+                produced.append(i)
+                yield i
+                i += 1
+        finally:
+            closed.append(True)
+
+    written: list[int] = []
+
+    def sink(item: int) -> None:
+        if item == 5:
+            raise ValueError("sink falló en 5")
+        written.append(item)
+
+    depth = 2
+    try:
+        run_pipeline(endless(), [sink], depth=depth, label="smoke")
+        raise AssertionError("error del sink no propagado")
+    except ValueError as exc:
+        assert "en 5" in str(exc)
+    assert written == [0, 1, 2, 3, 4], written
+    assert closed == [True], "generador sin cerrar"
+    # A lo sumo: ítem en el sink + cola llena + uno en mano del lector
+    assert len(produced) <= 5 + 1 + depth + 1, len(produced)
+
+
+def test_pipeline_reader_error_stops_writers() -> None:
+    """Un error del lector detiene a todos los escritores y se re-lanza."""
+    def failing() -> Iterator[int]:
+        yield from range(3)
+        raise RuntimeError("lector falló")
+
+    lock = threading.Lock()
+    written: list[int] = []
+
+    def sink(item: int) -> None:
+        with lock:
+            written.append(item)
+
+    t0 = time.monotonic()
+    try:
+        run_pipeline(failing(), [sink, sink], depth=4, label="smoke")
+        raise AssertionError("error del lector no propagado")
+    except RuntimeError as exc:
+        assert "lector" in str(exc)
+    assert set(written) <= {0, 1, 2}, written
+    assert time.monotonic() - t0 < 5, "escritores no se detuvieron"
+
+
+# ─────────────────────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────────────────────
+
+_ALL_TESTS = [
+    ("scd2: multi-cut timeline = cut by cut",        test_scd2_timeline_matches_sequential_cuts),
+    ("pool: run retries, discards broken conn",      test_pool_run_retries_and_discards_broken_connection),
+    ("pool: failed validation replaces conn",        test_pool_replaces_connection_failing_validation),
+    ("pool: acquire timeout + slot release",         test_pool_acquire_timeout_and_slot_release),
+    ("pipeline: single sink keeps source order",     test_pipeline_single_sink_keeps_source_order),
+    ("pipeline: sink error stops + closes reader",   test_pipeline_sink_error_stops_reader),
+    ("pipeline: reader error stops writers",         test_pipeline_reader_error_stops_writers),
+]
+
+
+def main() -> None:
+    sys.stdout.reconfigure(encoding="utf-8", errors="replace")  # type: ignore[attr-defined]
+    print("\n" + "=" * 50)
+    print("  Gold SQL Server -- Smoke Tests")
+    print("=" * 50 + "\n")
+
+    for name, fn in _ALL_TESTS:
+        _run(name, fn)
+
+    print(f"\n-- Results: {len(_PASSED)} passed, {len(_FAILED)} failed --")
+    if _FAILED:
+        print("\n-- Failures --")
+        for name, tb in _FAILED:
+            print(f"\nFAIL: {name}")
+            print(tb)
+        sys.exit(1)
+    else:
+        print("\nAll smoke tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,10 @@ from __future__ import annotations
 import json
 import logging
 from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
+from uuid import uuid4
 
 log = logging.getLogger(__name__)
 
@@ -27,6 +29,16 @@ _PROJECT_ROOT = Path(__file__).resolve().parents[2]
 _CATALOG_PATH = _PROJECT_ROOT / "lake" / "lake_catalog.json"
 _LAKE_ROOT    = _PROJECT_ROOT / "lake"
 
+# Clave de las sub-particiones diarias Silver: cut=.../v=<id>/day=YYYYMMDD/*.parquet
+DAY_PARTITION_KEY = "day"
+# Versión de salida de un transform: cut=.../v=<id>/ (nunca se reescribe)
+VERSION_PARTITION_KEY = "v"
+
+
+def new_output_version() -> str:
+    """Id de versión de salida: ordenable por tiempo (UTC) y único entre writers."""
+    return f"{datetime.now(tz=timezone.utc):%Y%m%dT%H%M%S%f}-{uuid4().hex[:6]}"
+
 
 def _filter_columns(cols: list[str]) -> list[str]:
     """Elimina nombres de columna vacíos o puramente blancos (ej: '' en viajes)."""
@@ -49,6 +61,8 @@ class PartitionInfo:
     meta_file:      str           # relativo al lake root
     # Columnas limpias (desde _meta.json, sin '' para viajes)
     raw_columns:    tuple[str, ...] = field(default_factory=tuple)
+    # Versión de salida Silver de esta instancia (ver silver_output_dir)
+    output_version: str = field(default_factory=new_output_version, compare=False)
 
     # ── Rutas RAW ────────────────────────────────────────────────────────────
 
@@ -73,8 +87,8 @@ class PartitionInfo:
 
     # ── Rutas destino ─────────────────────────────────────────────────────────
 
-    def silver_output_dir(self) -> Path:
-        """Directorio de salida Parquet en la capa processed."""
+    def silver_cut_dir(self) -> Path:
+        """Directorio del cut en la capa processed (contiene sus versiones v=<id>/)."""
         return (
             _LAKE_ROOT / "processed" / "dtpm"
             / f"dataset={self.dataset}"
@@ -83,6 +97,18 @@ class PartitionInfo:
             / f"cut={self.cut}"
         )
 
+    def silver_output_dir(self) -> Path:
+        """
+        Directorio de salida Parquet de esta versión (cut=.../v=<output_version>/).
+        Cada transform escribe una versión nueva; los lectores la ven solo
+        cuando el manifest la publica y vacuum borra las reemplazadas.
+        """
+        return self.silver_cut_dir() / f"{VERSION_PARTITION_KEY}={self.output_version}"
+
+    def silver_day_output_dir(self, date_sk: int) -> Path:
+        """Sub-partición diaria (day=YYYYMMDD) dentro de la versión de salida."""
+        return self.silver_output_dir() / f"{DAY_PARTITION_KEY}={int(date_sk)}"
+
     def quality_output_dir(self) -> Path:
         return (
             _LAKE_ROOT / "processed" / "_quality"
@@ -101,6 +127,16 @@ class PartitionInfo:
             / f"cut={self.cut}"
         )
 
+    def cdc_output_dir(self) -> Path:
+        """Delta CDC (inserted/updated/deleted) contra la versión Silver previa."""
+        return (
+            _LAKE_ROOT / "processed" / "_cdc"
+            / f"dataset={self.dataset}"
+            / f"year={self.year}"
+            / f"month={self.month:02d}"
+            / f"cut={self.cut}"
+        )
+
     # ── meta.json helpers ─────────────────────────────────────────────────────
 
     def meta_row_count(self) -> int:
@@ -112,6 +148,18 @@ class PartitionInfo:
             return int(d.get("row_count", self.row_count))
         return self.row_count
 
+    def meta_chunk_index(self) -> list[dict]:
+        """
+        Chunks [{offset, length, rows}] del chunk_index de _meta.json
+        (generado por build_lake.py). Lista vacía si la partición no tiene índice.
+        """
+        mp = self.meta_file_abs
+        if mp.exists():
+            with open(mp, encoding="utf-8") as fh:
+                d = json.load(fh)
+            return list((d.get("chunk_index") or {}).get("chunks", []))
+        return []
+
     def columns_sql_spec(self) -> str:
         """
         Genera el snippet SQL para el parámetro 'columns' de read_csv.
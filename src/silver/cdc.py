@@ -0,0 +1,307 @@
+"""
+cdc.py — Change Data Capture entre dos versiones Silver de un mismo cut.
+
+Cuando DTPM re-publica un cut corregido, `--cdc` compara la nueva salida válida
+contra la versión anterior sobre el grain de cada dataset y emite solo el delta:
+
+  lake/processed/_cdc/dataset=X/year=Y/month=MM/cut=C/
+      cdc.json                         # conteos + cdc_id
+      deleted.parquet                  # claves (grain) que desaparecieron
+      <tabla>/inserted.parquet         # filas completas de claves nuevas
+      <tabla>/updated.parquet          # filas completas de claves modificadas
+
+Detección por hash: cada fila se resume con md5(fila); cada clave con el md5
+de sus hashes ordenados (sobre todas las tablas del dataset). Así los
+duplicados sobre el grain y las legs de un viaje se comparan como un todo.
+
+Los loaders Gold/SQLite (`--delta`) aplican el delta así:
+  1. DELETE de las claves en deleted.parquet ∪ claves de <tabla>/updated.parquet
+  2. carga normal (staging + MERGE / INSERT OR IGNORE) de inserted + updated
+
+Uso (desde transform_silver.run):
+    base = snapshot_previous(partition)     # antes del transform
+    ...transform...
+    stats = write_cdc(partition, base)      # después del transform
+    discard_snapshot(base)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+import duckdb
+
+from src.silver.catalog import DAY_PARTITION_KEY, VERSION_PARTITION_KEY, PartitionInfo
+from src.silver.manifest import current_output_dir, load_snapshot, table_sql
+from src.silver.transforms import _write_parquet_atomic
+
+log = logging.getLogger(__name__)
+
+
+# ── Especificación por dataset ────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class CdcSpec:
+    key_columns: tuple[str, ...]
+    # {tabla: patrón relativo al dir del cut}
+    tables: dict[str, str] = field(default_factory=dict)
+
+
+CDC_SPECS: dict[str, CdcSpec] = {
+    # Las legs se comparan junto a su viaje: un cambio en cualquier leg marca
+    # el viaje completo como updated (Gold re-crea trip + legs por trip_sk).
+    "viajes": CdcSpec(
+        key_columns=("id_tarjeta", "id_viaje"),
+        tables={
+            "viajes_trip": "viajes_trip.parquet",
+            "viajes_leg":  "viajes_leg.parquet",
+        },
+    ),
+    # id_etapa se repite entre pasajeros de una misma etapa: el grain de
+    # fct_validation es (id_etapa, tiempo_subida).
+    "etapas": CdcSpec(
+        key_columns=("id_etapa", "tiempo_subida"),
+        tables={"etapas_validation": "**/etapas_validation.parquet"},
+    ),
+    "subidas_30m": CdcSpec(
+        key_columns=("stop_code", "mode_code", "tipo_dia", "time_30m_sk"),
+        tables={"subidas_30m": "subidas_30m.parquet"},
+    ),
+}
+
+CDC_CHANGES = ("inserted", "updated")  # archivos por tabla; deleted.parquet es por cut
+
+
+# ── Snapshot de la versión previa ─────────────────────────────────────────────
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink (O(1), sobrevive al vacuum de la versión reemplazada); copia si falla."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def snapshot_previous(partition: PartitionInfo) -> Optional[Path]:
+    """
+    Congela la versión publicada del cut antes de re-procesarlo: sus archivos
+    del último snapshot del manifest (o, sin manifest, la salida vigente del
+    filesystem). Devuelve el dir del snapshot o None si no hay versión previa.
+    """
+    dest = partition.silver_cut_dir() / f"._tmp_cdc_base_{uuid4().hex}"
+    snap = load_snapshot()
+    if snap is None:
+        src = current_output_dir(partition.silver_cut_dir())
+        if src is None:
+            return None
+        shutil.copytree(
+            src, dest,
+            copy_function=_link_or_copy,
+            ignore=shutil.ignore_patterns("._tmp_*", f"{VERSION_PARTITION_KEY}=*"),
+        )
+        log.info("CDC base snapshot -> %s", dest)
+        return dest
+
+    files = snap.select(dataset=partition.dataset, cut=partition.cut)
+    if not files:
+        return None
+    con = duckdb.connect(database=":memory:")
+    try:
+        for f in files:
+            out = dest / (f"{DAY_PARTITION_KEY}={f.day}" if f.day is not None else "") / f"{f.type}.parquet"
+            if f.is_compacted:
+                # Cut compactado: sus filas extraídas del archivo multi-cut
+                _write_parquet_atomic(
+                    con, f"SELECT * FROM {table_sql([f])} WHERE cut = '{partition.cut}'", out,
+                )
+            else:
+                out.parent.mkdir(parents=True, exist_ok=True)
+                _link_or_copy(str(f.abs_path), str(out))
+    except Exception:
+        shutil.rmtree(dest, ignore_errors=True)
+        raise
+    finally:
+        con.close()
+    log.info("CDC base snapshot (manifest v%d) -> %s", snap.version, dest)
+    return dest
+
+
+def discard_snapshot(base_dir: Optional[Path]) -> None:
+    if base_dir is not None:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+def discard_cdc(partition: PartitionInfo) -> None:
+    """Elimina un delta previo: ya no describe la salida Silver actual."""
+    d = partition.cdc_output_dir()
+    if d.exists():
+        shutil.rmtree(d)
+        log.info("Removed stale CDC delta %s", d)
+
+
+# ── Diff ──────────────────────────────────────────────────────────────────────
+
+def _source(base: Path, pattern: str) -> Optional[str]:
+    """read_parquet(...) sobre base/pattern o None si no hay archivos."""
+    if not any(p for p in base.glob(pattern) if not p.name.startswith("._tmp_")):
+        return None
+    glob = str(base / pattern).replace("\\", "/")
+    # hive_partitioning=false: cut=/year=/month=/day= del path no deben pisar columnas
+    return f"read_parquet('{glob}', hive_partitioning = false)"
+
+
+def _key_hash_sql(
+    sources: dict[str, str], keys: tuple[str, ...]
+) -> str:
+    """Hash por clave (md5 de los md5 de fila ordenados) sobre todas las tablas."""
+    key_list = ", ".join(keys)
+    parts = [
+        f"SELECT {key_list}, '{tbl}:' || md5(CAST(t AS VARCHAR)) AS _h FROM {src} t"
+        for tbl, src in sources.items()
+    ]
+    return (
+        f"SELECT {key_list}, md5(string_agg(_h, ',' ORDER BY _h)) AS _key_hash "
+        f"FROM ({' UNION ALL '.join(parts)}) GROUP BY {key_list}"
+    )
+
+
+def _write_parquet(con: duckdb.DuckDBPyConnection, query: str, dest: Path) -> int:
+    _write_parquet_atomic(con, query, dest)
+    return con.execute(f"SELECT COUNT(*) FROM ({query})").fetchone()[0]  # type: ignore[index]
+
+
+def compute_cdc(
+    partition: PartitionInfo,
+    base_dir: Optional[Path],
+    dest_dir: Optional[Path] = None,
+    new_dir: Optional[Path] = None,
+) -> dict[str, Any]:
+    """
+    Compara la salida Silver nueva (`new_dir`, default silver_output_dir())
+    contra `base_dir` y escribe el delta en `dest_dir` (default cdc_output_dir()).
+    Sin base (primera versión) todas las claves cuentan como inserted.
+
+    Devuelve el contenido de cdc.json.
+    """
+    spec = CDC_SPECS[partition.dataset]
+    new_dir = new_dir or partition.silver_output_dir()
+    dest_dir = dest_dir or partition.cdc_output_dir()
+    keys = spec.key_columns
+    join_on = " AND ".join(f"n.{k} IS NOT DISTINCT FROM o.{k}" for k in keys)
+    semi_on = " AND ".join(f"t.{k} IS NOT DISTINCT FROM c.{k}" for k in keys)
+    key_list = ", ".join(keys)
+
+    new_src = {t: s for t, pat in spec.tables.items() if (s := _source(new_dir, pat))}
+    old_src = (
+        {t: s for t, pat in spec.tables.items() if (s := _source(base_dir, pat))}
+        if base_dir is not None else {}
+    )
+    if not new_src:
+        raise FileNotFoundError(f"CDC: sin salida Silver en {new_dir}")
+
+    con = duckdb.connect(database=":memory:")
+    try:
+        con.execute(f"CREATE TEMP TABLE new_keys AS {_key_hash_sql(new_src, keys)}")
+        if old_src:
+            con.execute(f"CREATE TEMP TABLE old_keys AS {_key_hash_sql(old_src, keys)}")
+        else:
+            con.execute("CREATE TEMP TABLE old_keys AS SELECT * FROM new_keys LIMIT 0")
+
+        con.execute(f"""
+            CREATE TEMP TABLE cdc_keys AS
+            SELECT
+                {", ".join(f"COALESCE(n.{k}, o.{k}) AS {k}" for k in keys)},
+                CASE
+                    WHEN o._key_hash IS NULL THEN 'inserted'
+                    WHEN n._key_hash IS NULL THEN 'deleted'
+                    ELSE 'updated'
+                END AS _change
+            FROM new_keys n
+            FULL OUTER JOIN old_keys o ON {join_on}
+            WHERE n._key_hash IS DISTINCT FROM o._key_hash
+        """)
+        key_counts = dict(con.execute(
+            "SELECT _change, COUNT(*) FROM cdc_keys GROUP BY _change"
+        ).fetchall())
+        new_key_count = con.execute("SELECT COUNT(*) FROM new_keys").fetchone()[0]  # type: ignore[index]
+        old_key_count = con.execute("SELECT COUNT(*) FROM old_keys").fetchone()[0]  # type: ignore[index]
+
+        # Publicar: el delta anterior deja de ser válido
+        if dest_dir.exists():
+            shutil.rmtree(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+        tables: dict[str, dict[str, int]] = {}
+        for tbl, src in new_src.items():
+            counts: dict[str, int] = {
+                "new_rows": con.execute(f"SELECT COUNT(*) FROM {src}").fetchone()[0],  # type: ignore[index]
+                "base_rows": (
+                    con.execute(f"SELECT COUNT(*) FROM {old_src[tbl]}").fetchone()[0]  # type: ignore[index]
+                    if tbl in old_src else 0
+                ),
+            }
+            for change in CDC_CHANGES:
+                counts[f"{change}_rows"] = _write_parquet(
+                    con,
+                    f"SELECT t.* FROM {src} t SEMI JOIN "
+                    f"(SELECT * FROM cdc_keys WHERE _change = '{change}') c ON {semi_on}",
+                    dest_dir / tbl / f"{change}.parquet",
+                )
+            tables[tbl] = counts
+
+        _write_parquet(
+            con,
+            f"SELECT {key_list} FROM cdc_keys WHERE _change = 'deleted'",
+            dest_dir / "deleted.parquet",
+        )
+    finally:
+        con.close()
+
+    delta_rows = sum(t["inserted_rows"] + t["updated_rows"] for t in tables.values())
+    new_rows = sum(t["new_rows"] for t in tables.values())
+    stats: dict[str, Any] = {
+        "cdc_id": uuid4().hex[:12],
+        "generated_at": datetime.now(tz=timezone.utc).isoformat(),
+        "dataset": partition.dataset,
+        "cut": partition.cut,
+        "has_base": bool(old_src),
+        "key_columns": list(keys),
+        "base_key_count": old_key_count,
+        "new_key_count": new_key_count,
+        "inserted_keys": key_counts.get("inserted", 0),
+        "updated_keys": key_counts.get("updated", 0),
+        "deleted_keys": key_counts.get("deleted", 0),
+        "delta_rows": delta_rows,
+        "delta_fraction_pct": round(delta_rows / new_rows * 100, 4) if new_rows else 0,
+        "tables": tables,
+    }
+    with open(dest_dir / "cdc.json", "w", encoding="utf-8") as fh:
+        json.dump(stats, fh, ensure_ascii=False, indent=2)
+    log.info(
+        "CDC %s cut=%s | inserted=%d updated=%d deleted=%d keys | delta=%.2f%% filas -> %s",
+        partition.dataset, partition.cut,
+        stats["inserted_keys"], stats["updated_keys"], stats["deleted_keys"],
+        stats["delta_fraction_pct"], dest_dir,
+    )
+    return stats
+
+
+def write_cdc(partition: PartitionInfo, base_dir: Optional[Path]) -> dict[str, Any]:
+    """compute_cdc + resumen de conteos en el quality.json del cut."""
+    stats = compute_cdc(partition, base_dir)
+    qpath = partition.quality_output_dir() / "quality.json"
+    if qpath.exists():
+        with open(qpath, encoding="utf-8") as fh:
+            quality = json.load(fh)
+        quality["cdc"] = {k: v for k, v in stats.items() if k != "tables"}
+        with open(qpath, "w", encoding="utf-8") as fh:
+            json.dump(quality, fh, ensure_ascii=False, indent=2)
+    return stats
@@ -0,0 +1,490 @@
+"""
+compaction.py — Compactación y limpieza de lake/processed/dtpm.
+
+Los cuts diarios generan muchos Parquet pequeños (un archivo por tabla y día).
+La compactación los funde en un archivo por semana ISO o por mes, ordenado por
+cut, y lo publica con un único swap del manifest:
+
+  dataset=viajes/year=2025/month=04/
+      cut=2025-04-21/viajes_trip.parquet        ─┐
+      cut=2025-04-22/viajes_trip.parquet         ├─► compacted=2025-W17/viajes_trip-<id>.parquet
+      ...                                       ─┘      (manifest: cuts={cut: filas})
+
+  - La columna `cut` se conserva en cada fila: los lectores filtran por ella
+    (Snapshot.read_sql / logical_files) y Gold/SQLite siguen cargando por cut.
+  - Dentro de un cut se conserva el orden original de filas: los loaders
+    resuelven duplicados sobre el grain por orden de archivo (INSERT OR
+    IGNORE, primer atributo visto en SCD2), y compactar no debe cambiar eso.
+  - Linaje: _quality/.../cut=X/quality.json registra `compaction` (archivo
+    destino, período, versión del manifest); los cuts siguen teniendo su
+    quality.json y su _quarantine/invalid.parquet.
+  - Nunca cruza un directorio month=MM; cuts con sub-particiones day= (etapas)
+    ya están agrupados por día y no se compactan.
+  - Un cut re-procesado después vuelve a tener archivos per-cut y el commit del
+    transform lo retira del compactado (ver manifest.commit).
+
+Vacuum (después del swap, respetando `--retain-minutes` para lectores con un
+snapshot anterior todavía abierto). Es lo único que borra Parquet Silver:
+  - Parquet que algún snapshot referenció y que ya ningún snapshot vigente usa
+    (versiones cut=…/v=<id>/ reemplazadas por otro transform, fuentes compactadas).
+  - Versiones v=<id> que ningún snapshot publicó (transform interrumpido) y
+    que una versión publicada posterior del mismo cut ya dejó atrás.
+  - `._tmp_*` huérfanos de `_write_parquet_atomic` / CDC fallidos.
+  - `_quarantine/.../valid.parquet` cuando su conteo coincide con la salida
+    Silver del cut (copia redundante; queda anotado en quality.json).
+
+CLI:
+    python -m src.silver.compaction --period week
+    python -m src.silver.compaction --period month --dataset viajes --dry-run
+    python -m src.silver.compaction --no-compact --retain-minutes 0   # solo vacuum
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import shutil
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+import duckdb
+
+from src.silver.catalog import VERSION_PARTITION_KEY
+from src.silver.cdc import CDC_SPECS
+from src.silver.manifest import (
+    DTPM_ROOT,
+    PROCESSED_ROOT,
+    ManifestFile,
+    Snapshot,
+    commit,
+    commit_files,
+    list_snapshots,
+    load_snapshot,
+)
+from src.silver.transforms import _write_parquet_atomic
+
+log = logging.getLogger(__name__)
+
+PERIODS = ("week", "month")
+COMPACTED_KEY = "compacted"
+
+
+# ── Plan ──────────────────────────────────────────────────────────────────────
+
+@dataclass
+class CompactionGroup:
+    dataset: str
+    year:    int
+    month:   int
+    label:   str                      # 2025-W17 | 2025-04
+    sources: list[ManifestFile] = field(default_factory=list)
+
+    @property
+    def cuts(self) -> list[str]:
+        return sorted({c for f in self.sources for c in (f.cuts or [f.cut])})
+
+    @property
+    def dest_dir(self) -> Path:
+        return (
+            DTPM_ROOT / f"dataset={self.dataset}" / f"year={self.year}"
+            / f"month={self.month:02d}" / f"{COMPACTED_KEY}={self.label}"
+        )
+
+
+def period_label(cut: str, period: str) -> Optional[str]:
+    """Semana ISO (YYYY-Www) o mes (YYYY-MM) de un cut diario; None si no es diario."""
+    try:
+        d = date.fromisoformat(cut)
+    except ValueError:
+        return None
+    if period == "week":
+        iso = d.isocalendar()
+        return f"{iso[0]}-W{iso[1]:02d}"
+    return f"{d.year}-{d.month:02d}"
+
+
+def _label_period(label: str) -> str:
+    return "week" if "-W" in label else "month"
+
+
+def plan_compaction(
+    snapshot: Snapshot,
+    period: str,
+    datasets: Optional[list[str]] = None,
+    min_cuts: int = 2,
+) -> list[CompactionGroup]:
+    """
+    Agrupa los archivos per-cut del snapshot por (dataset, year, month, período).
+    Un compactado existente del mismo período entra como fuente (se re-escribe
+    con los cuts nuevos). Solo se devuelven grupos con algún cut per-cut y al
+    menos `min_cuts` cuts en total.
+    """
+    day_cuts = {(f.dataset, f.cut) for f in snapshot.files if f.day is not None}
+    groups: dict[tuple[str, int, int, str], CompactionGroup] = {}
+    for f in snapshot.files:
+        if datasets and f.dataset not in datasets:
+            continue
+        if f.is_compacted:
+            label = f.cut
+        elif f.day is None and (f.dataset, f.cut) not in day_cuts:
+            label = period_label(f.cut, period)
+        else:
+            continue
+        if label is None or (f.is_compacted and _label_period(label) != period):
+            continue
+        key = (f.dataset, f.year, f.month, label)
+        groups.setdefault(key, CompactionGroup(*key)).sources.append(f)
+    return [
+        g for _, g in sorted(groups.items())
+        if any(not f.is_compacted for f in g.sources) and len(g.cuts) >= min_cuts
+    ]
+
+
+# ── Compactación ──────────────────────────────────────────────────────────────
+
+def _write_compacted(
+    con: duckdb.DuckDBPyConnection,
+    group: CompactionGroup,
+    type: str,
+    sources: list[ManifestFile],
+) -> ManifestFile:
+    """Escribe el archivo compactado de una tabla y verifica filas por cut."""
+    expected: dict[str, int] = {}
+    for f in sources:
+        for c, n in (f.cuts or {f.cut: f.rows}).items():
+            expected[c] = expected.get(c, 0) + n
+
+    # Orden: cut, luego el orden de filas de su archivo fuente
+    parts = []
+    for i, f in enumerate(sorted(sources, key=lambda f: (min(f.cuts or [f.cut]), f.path))):
+        where = (
+            "WHERE cut IN (" + ", ".join(f"'{c}'" for c in sorted(f.cuts)) + ")"
+            if f.is_compacted else ""
+        )
+        parts.append(
+            f"SELECT *, {i} AS _src FROM read_parquet('{f.abs_path.as_posix()}', "
+            f"hive_partitioning = false, file_row_number = true) {where}"
+        )
+    dest = group.dest_dir / f"{type}-{uuid4().hex[:8]}.parquet"
+    _write_parquet_atomic(
+        con,
+        f"SELECT * EXCLUDE (_src, file_row_number) FROM ({' UNION ALL BY NAME '.join(parts)}) "
+        "ORDER BY cut, _src, file_row_number",
+        dest,
+    )
+
+    dest_str = dest.as_posix()
+    got = dict(con.execute(
+        f"SELECT cut, COUNT(*) FROM read_parquet('{dest_str}', hive_partitioning = false) "
+        "GROUP BY cut"
+    ).fetchall())
+    if any(got.get(c, 0) != n for c, n in expected.items()) or set(got) - set(expected):
+        dest.unlink(missing_ok=True)
+        raise RuntimeError(
+            f"Compactación {group.dataset}/{group.label}/{type}: filas por cut "
+            f"{got} != manifest {expected}"
+        )
+    st = dest.stat()
+    return ManifestFile(
+        dataset=group.dataset,
+        cut=group.label,
+        year=group.year,
+        month=group.month,
+        type=type,
+        day=None,
+        path=dest.relative_to(PROCESSED_ROOT).as_posix(),
+        rows=sum(expected.values()),
+        bytes=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        cuts=dict(sorted(expected.items())),
+    )
+
+
+def _annotate_quality(group: CompactionGroup, added: list[ManifestFile], snap: Snapshot) -> None:
+    """Linaje en el quality.json de cada cut compactado."""
+    for cut in group.cuts:
+        qpath = (
+            PROCESSED_ROOT / "_quality" / f"dataset={group.dataset}" / f"year={group.year}"
+            / f"month={group.month:02d}" / f"cut={cut}" / "quality.json"
+        )
+        if not qpath.exists():
+            continue
+        with open(qpath, encoding="utf-8") as fh:
+            quality = json.load(fh)
+        quality["compaction"] = {
+            "period": group.label,
+            "compacted_into": [f.path for f in added if cut in f.cuts],
+            "manifest_version": snap.version,
+            "compacted_at": snap.committed_at,
+        }
+        with open(qpath, "w", encoding="utf-8") as fh:
+            json.dump(quality, fh, ensure_ascii=False, indent=2)
+
+
+def compact_group(group: CompactionGroup) -> Snapshot:
+    """Escribe los compactados del grupo y los publica en un único commit."""
+    by_type: dict[str, list[ManifestFile]] = {}
+    for f in group.sources:
+        by_type.setdefault(f.type, []).append(f)
+
+    t0 = time.perf_counter()
+    added: list[ManifestFile] = []
+    con = duckdb.connect(database=":memory:")
+    try:
+        for type, sources in sorted(by_type.items()):
+            added.append(_write_compacted(con, group, type, sources))
+        snap = commit_files(
+            remove=group.sources, add=added,
+            operation=f"compact:{group.dataset}:{group.label}",
+        )
+    except Exception:
+        for f in added:
+            f.abs_path.unlink(missing_ok=True)
+        raise
+    finally:
+        con.close()
+
+    _annotate_quality(group, added, snap)
+    log.info(
+        "Compactado %s %s: %d cuts, %d → %d archivos, %s filas (%.1fs)",
+        group.dataset, group.label, len(group.cuts), len(group.sources), len(added),
+        f"{sum(f.rows for f in added):,}", time.perf_counter() - t0,
+    )
+    return snap
+
+
+# ── Vacuum ────────────────────────────────────────────────────────────────────
+
+def _committed_at(snap: Snapshot) -> datetime:
+    return datetime.fromisoformat(snap.committed_at)
+
+
+def _protected_paths(snapshots: list[Snapshot], cutoff: datetime) -> set[str]:
+    """Archivos del último snapshot y de los que fueron el último después de `cutoff`."""
+    protected: set[str] = set()
+    for snap, nxt in zip(snapshots, snapshots[1:] + [None]):
+        if nxt is None or _committed_at(nxt) >= cutoff:
+            protected.update(f.path for f in snap.files)
+    return protected
+
+
+def _old_enough(path: Path, cutoff: datetime) -> bool:
+    try:
+        return datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc) < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def _remove_redundant_valid(latest: Snapshot, dry_run: bool) -> int:
+    """
+    Borra _quarantine/.../valid.parquet cuando su conteo coincide con la tabla
+    principal del cut en el snapshot (la copia ya no aporta a la auditoría).
+    """
+    expected: dict[tuple[str, str], tuple[int, int, int]] = {}
+    for f in latest.logical_files():
+        if f.type != next(iter(CDC_SPECS[f.dataset].tables), None):
+            continue
+        y, m, n = expected.get((f.dataset, f.cut), (f.year, f.month, 0))
+        expected[(f.dataset, f.cut)] = (y, m, n + f.rows)
+
+    removed = 0
+    con = duckdb.connect(database=":memory:")
+    try:
+        for (ds, cut), (y, m, rows) in sorted(expected.items()):
+            rel = f"dataset={ds}/year={y}/month={m:02d}/cut={cut}"
+            valid = PROCESSED_ROOT / "_quarantine" / rel / "valid.parquet"
+            if not valid.exists():
+                continue
+            valid_rows = con.execute(
+                "SELECT COALESCE(SUM(num_rows), 0) FROM parquet_file_metadata(?)",
+                [valid.as_posix()],
+            ).fetchone()[0]  # type: ignore[index]
+            if valid_rows != rows:
+                log.warning("valid.parquet %s: %d filas != %d en Silver; se conserva", rel, valid_rows, rows)
+                continue
+            removed += 1
+            if dry_run:
+                continue
+            valid.unlink()
+            qpath = PROCESSED_ROOT / "_quality" / rel / "quality.json"
+            if qpath.exists():
+                with open(qpath, encoding="utf-8") as fh:
+                    quality = json.load(fh)
+                quality["quarantine_valid_copy"] = {
+                    "removed_at": datetime.now(tz=timezone.utc).isoformat(),
+                    "rows": int(valid_rows),
+                    "manifest_version": latest.version,
+                }
+                with open(qpath, "w", encoding="utf-8") as fh:
+                    json.dump(quality, fh, ensure_ascii=False, indent=2)
+    finally:
+        con.close()
+    return removed
+
+
+def _remove_unpublished_versions(published_paths: set[str], cutoff: datetime, dry_run: bool) -> int:
+    """
+    Borra cut=…/v=<id>/ que ningún snapshot referenció y que son anteriores a
+    la última versión publicada de su cut: su transform ya no puede estar en
+    curso (ids ordenables por tiempo, ver catalog.new_output_version).
+    """
+    published: dict[Path, set[str]] = {}
+    for rel in published_paths:
+        parts = Path(rel).parts
+        for i, part in enumerate(parts):
+            if part.startswith(f"{VERSION_PARTITION_KEY}="):
+                published.setdefault(PROCESSED_ROOT.joinpath(*parts[:i]), set()).add(part)
+                break
+
+    removed = 0
+    for cut_dir, names in sorted(published.items()):
+        for d in sorted(cut_dir.glob(f"{VERSION_PARTITION_KEY}=*")):
+            if d.name in names or d.name > max(names) or not _old_enough(d, cutoff):
+                continue
+            removed += 1
+            if not dry_run:
+                shutil.rmtree(d, ignore_errors=True)
+    return removed
+
+
+def _remove_empty_dirs(root: Path, dry_run: bool) -> int:
+    removed = 0
+    for d in sorted((p for p in root.rglob("*") if p.is_dir()), key=lambda p: len(p.parts), reverse=True):
+        if not any(d.iterdir()):
+            removed += 1
+            if not dry_run:
+                d.rmdir()
+    return removed
+
+
+def vacuum(retain_minutes: float = 60, dry_run: bool = False) -> dict[str, int]:
+    """
+    Limpia lo que ningún lector vigente puede ver. Un archivo solo se borra si
+    algún snapshot lo referenció (nunca salidas fuera del manifest) y lleva más
+    de `retain_minutes` sin estar en el snapshot actual.
+    """
+    cutoff = datetime.now(tz=timezone.utc) - timedelta(minutes=retain_minutes)
+    snapshots = list_snapshots()
+    stats = {
+        "superseded_files": 0, "unpublished_versions": 0, "tmp_orphans": 0,
+        "valid_copies": 0, "empty_dirs": 0,
+    }
+    if not snapshots:
+        log.info("Vacuum: sin manifest, nada que limpiar")
+        return stats
+
+    # Solo la versión exacta que registró un snapshot: un archivo modificado
+    # fuera del manifest tiene otro (bytes, mtime_ns) y no se toca.
+    protected = _protected_paths(snapshots, cutoff)
+    versions: dict[str, set[tuple[int, int]]] = {}
+    for snap in snapshots:
+        for f in snap.files:
+            versions.setdefault(f.path, set()).add((f.bytes, f.mtime_ns))
+    for rel in sorted(set(versions) - protected):
+        p = PROCESSED_ROOT / rel
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            continue
+        if (st.st_size, st.st_mtime_ns) not in versions[rel]:
+            continue
+        stats["superseded_files"] += 1
+        if not dry_run:
+            p.unlink()
+
+    stats["unpublished_versions"] = _remove_unpublished_versions(set(versions), cutoff, dry_run)
+
+    for p in sorted(PROCESSED_ROOT.rglob("._tmp_*")):
+        if not p.exists() or not _old_enough(p, cutoff):
+            continue
+        stats["tmp_orphans"] += 1
+        if dry_run:
+            continue
+        if p.is_dir():
+            shutil.rmtree(p, ignore_errors=True)
+        else:
+            p.unlink(missing_ok=True)
+
+    stats["valid_copies"] = _remove_redundant_valid(snapshots[-1], dry_run)
+    stats["empty_dirs"] = _remove_empty_dirs(DTPM_ROOT, dry_run)
+    log.info(
+        "Vacuum%s: %d archivos reemplazados, %d versiones sin publicar, %d ._tmp_ huérfanos, "
+        "%d valid.parquet, %d dirs vacíos",
+        " (dry-run)" if dry_run else "", stats["superseded_files"], stats["unpublished_versions"],
+        stats["tmp_orphans"], stats["valid_copies"], stats["empty_dirs"],
+    )
+    return stats
+
+
+# ── Orquestación ──────────────────────────────────────────────────────────────
+
+def run(
+    period: Optional[str] = "week",
+    datasets: Optional[list[str]] = None,
+    min_cuts: int = 2,
+    do_vacuum: bool = True,
+    retain_minutes: float = 60,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    snapshot = load_snapshot()
+    if snapshot is None and not dry_run:
+        snapshot = commit(operation="bootstrap")
+    groups = plan_compaction(snapshot, period, datasets, min_cuts) if snapshot and period else []
+
+    summary: dict[str, Any] = {"groups": [], "vacuum": None}
+    for g in groups:
+        summary["groups"].append({
+            "dataset": g.dataset, "label": g.label, "cuts": g.cuts, "files": len(g.sources),
+        })
+        if dry_run:
+            log.info("[dry-run] %s %s: %d cuts, %d archivos", g.dataset, g.label, len(g.cuts), len(g.sources))
+            continue
+        compact_group(g)
+    if not groups:
+        log.info("Compactación: ningún grupo con >= %d cuts", min_cuts)
+    if do_vacuum:
+        summary["vacuum"] = vacuum(retain_minutes, dry_run)
+    return summary
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.silver.compaction",
+        description="Compacta cuts Silver por semana/mes y limpia archivos obsoletos.",
+    )
+    p.add_argument("--period", choices=PERIODS, default="week",
+                   help="Agrupación de los cuts (default: week ISO).")
+    p.add_argument("--dataset", action="append", default=None,
+                   help="Limitar a un dataset (repetible).")
+    p.add_argument("--min-cuts", type=int, default=2,
+                   help="Cuts mínimos por grupo para compactar (default: 2).")
+    p.add_argument("--compact", action=argparse.BooleanOptionalAction, default=True,
+                   help="Compactar (--no-compact: solo vacuum).")
+    p.add_argument("--vacuum", action=argparse.BooleanOptionalAction, default=True,
+                   help="Limpiar archivos reemplazados, ._tmp_* y valid.parquet redundantes.")
+    p.add_argument("--retain-minutes", type=float, default=60,
+                   help="Ventana para lectores con snapshots anteriores (default: 60).")
+    p.add_argument("--dry-run", action="store_true", help="Mostrar el plan sin escribir.")
+    return p
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = _build_parser().parse_args()
+    run(
+        period=args.period if args.compact else None,
+        datasets=args.dataset,
+        min_cuts=args.min_cuts,
+        do_vacuum=args.vacuum,
+        retain_minutes=args.retain_minutes,
+        dry_run=args.dry_run,
+    )
+
+
+if __name__ == "__main__":
+    main()
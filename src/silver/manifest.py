@@ -0,0 +1,513 @@
+"""
+manifest.py — Log de snapshots (transaction log) de la capa processed/dtpm.
+
+Cada commit Silver escribe una versión nueva, inmutable y completa del estado
+del lake; los lectores resuelven archivos desde el manifest en vez de globbing.
+Los Parquet tampoco se reescriben: cada transform escribe su salida en un
+directorio de versión nuevo (cut=C/v=<id>/) y el commit lo publica.
+
+  lake/processed/_manifest/
+      v00000001.json      # snapshot completo: archivos, filas, bytes, stats
+      v00000002.json
+      ...
+      _latest             # puntero al último snapshot ("2\\n")
+
+Garantías:
+  - Atómico: la versión se escribe a un temporal y se publica con os.link
+    (falla si otra escritura ganó esa versión → se reintenta con la siguiente).
+  - Append-only: nunca se reescribe una versión publicada.
+  - Un cut a medio escribir no es visible: solo entra al manifest tras su commit.
+  - `_latest` es un archivo de pocos bytes: "¿cambió algo?" sin listar el lake.
+
+Archivos compactados (src/silver/compaction.py): una entrada con `cuts`
+({cut: filas}) contiene varios cuts ordenados por (cut, grain). Los lectores
+filtran por la columna `cut` (read_sql / logical_files); si un cut se
+re-procesa, su nueva salida per-cut lo retira de `cuts`.
+
+Solo el vacuum de compaction.py borra Parquet Silver (los que ningún snapshot
+reciente usa, tras --retain-minutes). Un snapshot fijado (pin) más antiguo
+que esa ventana puede referir archivos ya borrados; Snapshot.verify() lo
+detecta por (bytes, mtime_ns) y levanta SnapshotExpiredError.
+
+Uso:
+    from src.silver.manifest import load_snapshot
+    snap = load_snapshot()                    # último
+    snap = load_snapshot(version=3)           # fijado
+    paths = snap.paths("viajes", "viajes_trip")
+
+CLI:
+    python -m src.silver.manifest --show
+    python -m src.silver.manifest --show --version 3
+    python -m src.silver.manifest --rebuild      # re-escanea processed/dtpm
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+from uuid import uuid4
+
+from src.silver.catalog import VERSION_PARTITION_KEY
+
+log = logging.getLogger(__name__)
+
+_PROJECT_ROOT  = Path(__file__).resolve().parents[2]
+PROCESSED_ROOT = _PROJECT_ROOT / "lake" / "processed"
+DTPM_ROOT      = PROCESSED_ROOT / "dtpm"
+MANIFEST_DIR   = PROCESSED_ROOT / "_manifest"
+LATEST_POINTER = "_latest"
+
+MANIFEST_FORMAT = 1
+_COMMIT_RETRIES = 20
+
+
+class SnapshotExpiredError(RuntimeError):
+    """Un archivo del snapshot fijado fue eliminado (vacuum) o modificado."""
+
+
+# ── Modelo ────────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ManifestFile:
+    dataset:  str
+    cut:      str
+    year:     int
+    month:    int
+    type:     str             # stem del parquet: viajes_trip, etapas_validation, …
+    day:      Optional[int]   # date_sk de la sub-partición day=YYYYMMDD (o None)
+    path:     str             # relativo a lake/processed/
+    rows:     int
+    bytes:    int
+    mtime_ns: int
+    # Solo archivos compactados: {cut: filas} de los cuts vigentes en el archivo
+    cuts:     dict[str, int] = field(default_factory=dict)
+
+    @property
+    def abs_path(self) -> Path:
+        return PROCESSED_ROOT / self.path
+
+    @property
+    def is_compacted(self) -> bool:
+        return bool(self.cuts)
+
+
+@dataclass
+class Snapshot:
+    version:        int
+    parent_version: Optional[int]
+    committed_at:   str
+    operation:      str
+    changed:        list[dict[str, str]] = field(default_factory=list)
+    files:          list[ManifestFile]   = field(default_factory=list)
+    stats:          dict[str, Any]       = field(default_factory=dict)
+
+    def select(
+        self,
+        dataset: Optional[str] = None,
+        type: Optional[str] = None,
+        cut: Optional[str] = None,
+        days: Optional[Iterable[int]] = None,
+    ) -> list[ManifestFile]:
+        """Archivos del snapshot filtrados (dataset/type/cut exacto/días)."""
+        day_set = set(days) if days else None
+        return [
+            f for f in self.files
+            if (dataset is None or f.dataset == dataset)
+            and (type is None or f.type == type)
+            and (cut is None or f.cut == cut or cut in f.cuts)
+            and (day_set is None or f.day in day_set)
+        ]
+
+    def logical_files(self) -> list[ManifestFile]:
+        """
+        Una entrada por (cut, archivo): los compactados se expanden a cada cut
+        que contienen (cut=<cut>, rows=<filas del cut>, cuts intacto → el lector
+        debe filtrar `WHERE cut = f.cut`).
+        """
+        out: list[ManifestFile] = []
+        for f in self.files:
+            if not f.is_compacted:
+                out.append(f)
+                continue
+            out.extend(replace(f, cut=c, rows=n) for c, n in sorted(f.cuts.items()))
+        return out
+
+    def read_sql(self, dataset: str, type: str) -> str:
+        """Expresión de tabla SQL con exactamente las filas del snapshot (ver table_sql)."""
+        files = self.select(dataset=dataset, type=type)
+        if not files:
+            raise FileNotFoundError(f"snapshot v{self.version}: sin archivos {dataset}/{type}")
+        return table_sql(files)
+
+    def verify(self, files: Optional[Iterable[ManifestFile]] = None) -> None:
+        """Comprueba por stat() que los archivos siguen siendo los del snapshot."""
+        for f in (self.files if files is None else files):
+            try:
+                st = f.abs_path.stat()
+            except FileNotFoundError:
+                raise SnapshotExpiredError(
+                    f"snapshot v{self.version}: {f.path} ya no existe"
+                ) from None
+            if st.st_size != f.bytes or st.st_mtime_ns != f.mtime_ns:
+                raise SnapshotExpiredError(
+                    f"snapshot v{self.version}: {f.path} fue reescrito después del commit"
+                )
+
+    def to_dict(self) -> dict[str, Any]:
+        d = asdict(self)
+        d["format"] = MANIFEST_FORMAT
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "Snapshot":
+        return cls(
+            version=int(d["version"]),
+            parent_version=d.get("parent_version"),
+            committed_at=d.get("committed_at", ""),
+            operation=d.get("operation", ""),
+            changed=list(d.get("changed", [])),
+            files=[ManifestFile(**f) for f in d.get("files", [])],
+            stats=dict(d.get("stats", {})),
+        )
+
+
+def _sql_list(files: list[ManifestFile]) -> str:
+    return "[" + ", ".join("'" + f.abs_path.as_posix() + "'" for f in files) + "]"
+
+
+def table_sql(files: list[ManifestFile]) -> str:
+    """
+    Expresión de tabla SQL (DuckDB) sobre entradas del manifest: los per-cut en
+    un solo read_parquet y cada compactado filtrado a sus `cuts` vigentes.
+    La columna `cut` sale del archivo (hive desactivado).
+    """
+    plain = [f for f in files if not f.is_compacted]
+    parts: list[str] = []
+    if plain:
+        parts.append(
+            f"SELECT * FROM read_parquet({_sql_list(plain)}, "
+            "hive_partitioning = false, union_by_name = true)"
+        )
+    for f in files:
+        if f.is_compacted:
+            cuts = ", ".join(f"'{c}'" for c in sorted(f.cuts))
+            parts.append(
+                f"SELECT * FROM read_parquet({_sql_list([f])}, hive_partitioning = false) "
+                f"WHERE cut IN ({cuts})"
+            )
+    return "(" + " UNION ALL BY NAME ".join(parts) + ")"
+
+
+# ── Lectura ───────────────────────────────────────────────────────────────────
+
+def _version_path(version: int, manifest_dir: Path) -> Path:
+    return manifest_dir / f"v{version:08d}.json"
+
+
+def _listed_versions(manifest_dir: Path) -> list[int]:
+    if not manifest_dir.exists():
+        return []
+    return sorted(
+        int(p.stem[1:]) for p in manifest_dir.glob("v*.json") if p.stem[1:].isdigit()
+    )
+
+
+def latest_version(manifest_dir: Path = MANIFEST_DIR) -> Optional[int]:
+    """Última versión publicada (lee `_latest`; lista el dir solo si falta)."""
+    pointer = manifest_dir / LATEST_POINTER
+    try:
+        version = int(pointer.read_text(encoding="utf-8").strip())
+        if _version_path(version, manifest_dir).exists():
+            return version
+    except (FileNotFoundError, ValueError):
+        pass
+    versions = _listed_versions(manifest_dir)
+    return versions[-1] if versions else None
+
+
+def load_snapshot(
+    version: Optional[int] = None, manifest_dir: Path = MANIFEST_DIR
+) -> Optional[Snapshot]:
+    """
+    Snapshot `version` (default: el último). None si el lake no tiene manifest;
+    FileNotFoundError si la versión pedida no existe.
+    """
+    if version is None:
+        version = latest_version(manifest_dir)
+        if version is None:
+            return None
+    path = _version_path(version, manifest_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"Snapshot v{version} no existe en {manifest_dir}")
+    with open(path, encoding="utf-8") as fh:
+        return Snapshot.from_dict(json.load(fh))
+
+
+def list_snapshots(manifest_dir: Path = MANIFEST_DIR) -> list[Snapshot]:
+    """Todas las versiones publicadas, de la más antigua a la última."""
+    return [s for v in _listed_versions(manifest_dir) if (s := load_snapshot(v, manifest_dir))]
+
+
+# ── Escaneo de cuts ───────────────────────────────────────────────────────────
+
+def _parquet_rows(paths: list[Path]) -> dict[Path, int]:
+    """Filas por archivo desde el footer Parquet (sin leer datos)."""
+    if not paths:
+        return {}
+    import duckdb
+
+    con = duckdb.connect(database=":memory:")
+    try:
+        out: dict[Path, int] = {}
+        for p in paths:
+            row = con.execute(
+                "SELECT COALESCE(SUM(num_rows), 0) FROM parquet_file_metadata(?)",
+                [str(p).replace("\\", "/")],
+            ).fetchone()
+            out[p] = int(row[0]) if row else 0
+        return out
+    finally:
+        con.close()
+
+
+def _is_version_dir(p: Path) -> bool:
+    return p.is_dir() and p.name.startswith(f"{VERSION_PARTITION_KEY}=")
+
+
+def _cut_dir_of(out_dir: Path) -> Path:
+    """cut=C de una salida: cut=C/v=<id> o, en el layout previo, el mismo cut=C."""
+    return out_dir.parent if out_dir.name.startswith(f"{VERSION_PARTITION_KEY}=") else out_dir
+
+
+def current_output_dir(cut_dir: Path) -> Optional[Path]:
+    """
+    Salida vigente de un cut según el filesystem (lakes sin manifest y --rebuild):
+    la versión v=<id> más reciente, o el propio cut=C si tiene Parquet del
+    layout previo sin versiones. None si el cut no tiene salida.
+    """
+    versions = sorted(p for p in cut_dir.glob(f"{VERSION_PARTITION_KEY}=*") if _is_version_dir(p))
+    if versions:
+        return versions[-1]
+    if any(cut_dir.glob("*.parquet")) or any(cut_dir.glob("day=*/*.parquet")):
+        return cut_dir
+    return None
+
+
+def _scan_output_dir(out_dir: Path) -> list[ManifestFile]:
+    """ManifestFile de <salida>/*.parquet y <salida>/day=*/*.parquet (sin ._tmp_*)."""
+    cut_dir = _cut_dir_of(out_dir)
+    ds_dir, year_dir, month_dir = cut_dir.parents[2], cut_dir.parents[1], cut_dir.parent
+    found = [
+        p for p in sorted(out_dir.glob("*.parquet")) + sorted(out_dir.glob("day=*/*.parquet"))
+        if not p.name.startswith("._tmp_")
+    ]
+    rows = _parquet_rows(found)
+    files = []
+    for p in found:
+        st = p.stat()
+        files.append(ManifestFile(
+            dataset=ds_dir.name.split("=", 1)[1],
+            cut=cut_dir.name.split("=", 1)[1],
+            year=int(year_dir.name.split("=", 1)[1]),
+            month=int(month_dir.name.split("=", 1)[1]),
+            type=p.stem,
+            day=int(p.parent.name.split("=", 1)[1]) if p.parent != out_dir else None,
+            path=p.relative_to(PROCESSED_ROOT).as_posix(),
+            rows=rows[p],
+            bytes=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+        ))
+    return files
+
+
+def _cut_key(out_dir: Path) -> tuple[str, str]:
+    cut_dir = _cut_dir_of(out_dir)
+    return cut_dir.parents[2].name.split("=", 1)[1], cut_dir.name.split("=", 1)[1]
+
+
+def _all_output_dirs() -> list[Path]:
+    if not DTPM_ROOT.exists():
+        return []
+    cut_dirs = sorted(DTPM_ROOT.glob("dataset=*/year=*/month=*/cut=*"))
+    return [d for c in cut_dirs if (d := current_output_dir(c)) is not None]
+
+
+def _snapshot_stats(files: list[ManifestFile]) -> dict[str, Any]:
+    stats: dict[str, Any] = {}
+    for f in files:
+        s = stats.setdefault(f.dataset, {"cuts": set(), "files": 0, "rows": 0, "bytes": 0})
+        s["cuts"].update(f.cuts or [f.cut])
+        s["files"] += 1
+        s["rows"]  += f.rows
+        s["bytes"] += f.bytes
+    for s in stats.values():
+        s["cuts"] = len(s["cuts"])
+    return stats
+
+
+# ── Commit ────────────────────────────────────────────────────────────────────
+
+def _publish(
+    build: Callable[[Optional[Snapshot]], list[ManifestFile]],
+    changed: list[dict[str, str]],
+    operation: str,
+    manifest_dir: Path,
+) -> Snapshot:
+    """
+    Publica `build(snapshot_padre)` como versión nueva. Si otro writer gana la
+    versión, se reconstruye sobre el nuevo padre y se reintenta.
+    """
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    for _ in range(_COMMIT_RETRIES):
+        parent = latest_version(manifest_dir)
+        base = load_snapshot(parent, manifest_dir) if parent is not None else None
+        files = sorted(build(base), key=lambda f: (f.dataset, f.cut, f.day or 0, f.type))
+        snap = Snapshot(
+            version=(parent or 0) + 1,
+            parent_version=parent,
+            committed_at=datetime.now(tz=timezone.utc).isoformat(),
+            operation=operation,
+            changed=changed,
+            files=files,
+            stats=_snapshot_stats(files),
+        )
+        dest = _version_path(snap.version, manifest_dir)
+        tmp = manifest_dir / f"._tmp_{uuid4().hex}_{dest.name}"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(snap.to_dict(), fh, ensure_ascii=False, indent=2)
+            fh.flush()
+            os.fsync(fh.fileno())
+        try:
+            os.link(tmp, dest)          # no sobreescribe: falla si la versión ya existe
+        except FileExistsError:
+            continue                    # otro writer publicó esa versión → reintentar
+        finally:
+            tmp.unlink(missing_ok=True)
+        _publish_latest(snap.version, manifest_dir)
+        log.info(
+            "Manifest v%d (%s): %d archivos | cambios=%s",
+            snap.version, operation, len(files),
+            ", ".join(f"{c['dataset']}/{c['cut']}" for c in snap.changed) or "-",
+        )
+        return snap
+    raise RuntimeError(f"Manifest: no se pudo publicar tras {_COMMIT_RETRIES} intentos")
+
+
+def commit(
+    output_dirs: Optional[list[Path]] = None,
+    operation: str = "transform",
+    manifest_dir: Path = MANIFEST_DIR,
+) -> Snapshot:
+    """
+    Publica un snapshot nuevo: el anterior con cada cut de `output_dirs`
+    (cut=C/v=<id>) reemplazado por los archivos de esa versión (una versión
+    sin parquets retira el cut). `output_dirs=None` re-escanea todo dtpm/ con
+    la versión más reciente de cada cut; sin snapshot previo (primer commit
+    sobre un lake existente) también se parte de ese re-escaneo, para no
+    dejar fuera los cuts ya escritos. Un cut publicado con parquets se
+    retira de los archivos compactados. Nunca borra archivos (ver vacuum).
+    """
+    targets = _all_output_dirs() if output_dirs is None else output_dirs
+    rescanned = {_cut_key(d): (_scan_output_dir(d) if d.exists() else []) for d in targets}
+    superseded = {k for k, fs in rescanned.items() if fs}
+
+    def build(base: Optional[Snapshot]) -> list[ManifestFile]:
+        if base is None and output_dirs is not None:
+            # Sin padre: el lake previo (layout cut=C/*.parquet o v=*) es la base
+            return [
+                f for d in _all_output_dirs() if _cut_key(d) not in rescanned
+                for f in _scan_output_dir(d)
+            ] + [f for fs in rescanned.values() for f in fs]
+        keep: list[ManifestFile] = []
+        for f in base.files if base is not None else []:
+            if f.is_compacted:
+                cuts = {c: n for c, n in f.cuts.items() if (f.dataset, c) not in superseded}
+                if cuts:
+                    keep.append(replace(f, cuts=cuts))
+            elif output_dirs is not None and (f.dataset, f.cut) not in rescanned:
+                keep.append(f)
+        return keep + [f for fs in rescanned.values() for f in fs]
+
+    changed = [{"dataset": ds, "cut": cut} for ds, cut in sorted(rescanned)]
+    return _publish(build, changed, operation, manifest_dir)
+
+
+def commit_files(
+    remove: list[ManifestFile],
+    add: list[ManifestFile],
+    operation: str,
+    manifest_dir: Path = MANIFEST_DIR,
+) -> Snapshot:
+    """
+    Reemplaza entradas del snapshot (p.ej. compactación: per-cut → compactado).
+    Falla si alguna entrada a retirar cambió en el padre (re-proceso concurrente).
+    """
+    expected = {f.path: f for f in remove}
+
+    def build(base: Optional[Snapshot]) -> list[ManifestFile]:
+        current = {f.path: f for f in (base.files if base is not None else [])}
+        for path, f in expected.items():
+            if current.get(path) != f:
+                raise RuntimeError(f"Manifest: {path} cambió durante {operation}; re-ejecutar")
+        return [f for p, f in current.items() if p not in expected] + add
+
+    changed = [
+        {"dataset": ds, "cut": cut}
+        for ds, cut in sorted({(f.dataset, c) for f in add for c in (f.cuts or [f.cut])})
+    ]
+    return _publish(build, changed, operation, manifest_dir)
+
+
+def commit_partitions(partitions: list[Any], operation: str = "transform") -> Snapshot:
+    """commit() de las versiones de salida de varias PartitionInfo (silver_output_dir())."""
+    return commit([p.silver_output_dir() for p in partitions], operation=operation)
+
+
+def _publish_latest(version: int, manifest_dir: Path) -> None:
+    """Actualiza `_latest` por os.replace; nunca retrocede a una versión menor."""
+    current = latest_version(manifest_dir)
+    if current is not None and current > version:
+        return
+    tmp = manifest_dir / f"._tmp_{uuid4().hex}_{LATEST_POINTER}"
+    tmp.write_text(f"{version}\n", encoding="utf-8")
+    os.replace(tmp, manifest_dir / LATEST_POINTER)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m src.silver.manifest",
+        description="Snapshots versionados de lake/processed/dtpm.",
+    )
+    p.add_argument("--show", action="store_true", help="Resumen de un snapshot.")
+    p.add_argument("--version", type=int, default=None, help="Versión a mostrar (default: última).")
+    p.add_argument("--rebuild", action="store_true",
+                   help="Publica un snapshot nuevo re-escaneando todo processed/dtpm.")
+    return p
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = _build_parser().parse_args()
+    if args.rebuild:
+        commit(operation="rebuild")
+    snap = load_snapshot(args.version)
+    if snap is None:
+        print("Sin manifest: ejecutar transform_silver o --rebuild.")
+        return
+    if args.show or not args.rebuild:
+        print(f"v{snap.version} (parent={snap.parent_version}) {snap.operation} @ {snap.committed_at}")
+        for ds, s in sorted(snap.stats.items()):
+            print(f"  {ds:12s} cuts={s['cuts']:<4d} files={s['files']:<5d} "
+                  f"rows={s['rows']:>12,d} bytes={s['bytes']:>14,d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -48,7 +48,7 @@ from src.silver.contracts import (  # noqa: E402
     ViajesTripRow,
 )
 from src.silver.transform_silver import run  # noqa: E402
-from src.silver.transforms import TRANSFORM_REGISTRY  # noqa: E402
+from src.silver.transforms import TRANSFORM_REGISTRY, _per_day_quality  # noqa: E402
 
 # ─────────────────────────────────────────────────────────────
 # Test helpers — valid sample data
@@ -325,6 +325,231 @@ def test_registry_has_three_datasets() -> None:
     )
 
 
+def test_per_day_quality_breakdown() -> None:
+    """_per_day_quality desglosa valid/invalid por día y deja sin día al final."""
+    import duckdb
+
+    con = duckdb.connect(":memory:")
+    con.execute("""
+        CREATE VIEW q AS SELECT * FROM (VALUES
+            (20250421, NULL), (20250421, NULL), (20250421, 'BAD_UTM_X'),
+            (20250422, NULL), (NULL, 'MISSING_TIMESTAMP')
+        ) t(date_board_sk, _reason_code)
+    """)
+    days = {20250421: Path("a.parquet"), 20250422: Path("b.parquet")}
+    per_day = _per_day_quality(con, "q", "date_board_sk", days)
+    con.close()
+
+    assert [d["date_board_sk"] for d in per_day] == [20250421, 20250422, None]
+    d0 = per_day[0]
+    assert (d0["valid_row_count"], d0["invalid_row_count"]) == (2, 1), d0
+    assert d0["quarantine_reason_distribution"] == [{"_reason_code": "BAD_UTM_X", "cnt": 1}]
+    assert per_day[2]["output_file"] is None
+    assert sum(d["read_row_count"] for d in per_day) == 5
+
+
+def test_chunk_index_record_boundaries() -> None:
+    """build_chunk_index corta en límites de registro y cubre todas las filas."""
+    import tempfile
+
+    from build_lake import build_chunk_index
+
+    lines = [f"{i}|{'x' * (i % 37)}|{i * 7}" for i in range(2_000)]
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "etapas.csv"
+        csv_path.write_bytes(("id|txt|n\n" + "\n".join(lines)).encode())  # sin '\n' final
+        index = build_chunk_index(csv_path, chunk_mb=0.005)
+        raw = csv_path.read_bytes()
+
+    chunks = index["chunks"]
+    assert len(chunks) > 1, index
+    assert chunks[0]["offset"] == index["header_bytes"]
+    records: list[str] = []
+    for c in chunks:
+        piece = raw[c["offset"]:c["offset"] + c["length"]].decode().splitlines()
+        assert len(piece) == c["rows"], c
+        records.extend(piece)
+    assert records == lines
+
+
+
+def test_cdc_classifies_changes() -> None:
+    """compute_cdc separa claves inserted/updated/deleted por hash de fila."""
+    import tempfile
+
+    import duckdb
+
+    from src.silver.catalog import PartitionInfo
+    from src.silver.cdc import compute_cdc
+
+    part = PartitionInfo(
+        dataset="subidas_30m", cut="2025-04", year=2025, month=4,
+        partition_path="", row_count=0, column_count=0,
+        separator="|", encoding="utf-8", meta_file="",
+    )
+    rows = {
+        "old": "('A','BUS','LABORAL',1,1.0),('B','BUS','LABORAL',1,2.0),('C','BUS','LABORAL',1,3.0)",
+        "new": "('A','BUS','LABORAL',1,1.0),('B','BUS','LABORAL',1,9.0),('D','BUS','LABORAL',1,4.0)",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        con = duckdb.connect()
+        for name, values in rows.items():
+            (Path(tmp) / name).mkdir()
+            con.execute(
+                f"COPY (SELECT * FROM (VALUES {values}) "
+                f"t(stop_code, mode_code, tipo_dia, time_30m_sk, subidas_promedio)) "
+                f"TO '{(Path(tmp) / name / 'subidas_30m.parquet').as_posix()}' (FORMAT PARQUET)"
+            )
+        dest = Path(tmp) / "cdc"
+        stats = compute_cdc(part, Path(tmp) / "old", dest_dir=dest, new_dir=Path(tmp) / "new")
+
+        def _codes(f: Path) -> list[str]:
+            return [r[0] for r in con.execute(
+                f"SELECT stop_code FROM read_parquet('{f.as_posix()}') ORDER BY 1"
+            ).fetchall()]
+
+        assert (stats["inserted_keys"], stats["updated_keys"], stats["deleted_keys"]) == (1, 1, 1), stats
+        assert _codes(dest / "subidas_30m" / "inserted.parquet") == ["D"]
+        assert _codes(dest / "subidas_30m" / "updated.parquet") == ["B"]
+        assert _codes(dest / "deleted.parquet") == ["C"]
+        con.close()
+
+
+def test_cdc_etapas_keyed_by_boarding_time() -> None:
+    """etapas: id_etapa repetido entre pasajeros → la clave incluye tiempo_subida."""
+    import tempfile
+
+    import duckdb
+
+    from src.silver.catalog import PartitionInfo
+    from src.silver.cdc import compute_cdc
+
+    part = PartitionInfo(
+        dataset="etapas", cut="2025-04-21", year=2025, month=4,
+        partition_path="", row_count=0, column_count=0,
+        separator="|", encoding="utf-8", meta_file="",
+    )
+    rows = {
+        "old": "('E1', TIMESTAMP '2025-04-21 08:00:00', 1.0), ('E1', TIMESTAMP '2025-04-21 08:05:00', 1.0)",
+        "new": "('E1', TIMESTAMP '2025-04-21 08:00:00', 1.0), ('E1', TIMESTAMP '2025-04-21 08:05:00', 2.0)",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        con = duckdb.connect()
+        for name, values in rows.items():
+            (Path(tmp) / name).mkdir()
+            con.execute(
+                f"COPY (SELECT * FROM (VALUES {values}) t(id_etapa, tiempo_subida, factor_expansion)) "
+                f"TO '{(Path(tmp) / name / 'etapas_validation.parquet').as_posix()}' (FORMAT PARQUET)"
+            )
+        dest = Path(tmp) / "cdc"
+        stats = compute_cdc(part, Path(tmp) / "old", dest_dir=dest, new_dir=Path(tmp) / "new")
+        assert (stats["inserted_keys"], stats["updated_keys"], stats["deleted_keys"]) == (0, 1, 0), stats
+        updated = con.execute(
+            f"SELECT CAST(tiempo_subida AS VARCHAR) FROM "
+            f"read_parquet('{(dest / 'etapas_validation' / 'updated.parquet').as_posix()}')"
+        ).fetchall()
+        assert updated == [("2025-04-21 08:05:00",)], updated
+        con.close()
+
+
+
+def test_manifest_versions_append_only() -> None:
+    """commit() publica versiones consecutivas con parent y mueve _latest."""
+    import tempfile
+
+    from src.silver.manifest import commit, latest_version, load_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mdir = Path(tmp) / "_manifest"
+        assert load_snapshot(manifest_dir=mdir) is None
+        v1 = commit([], operation="test", manifest_dir=mdir)
+        v2 = commit([], operation="test", manifest_dir=mdir)
+        assert (v1.version, v2.version, v2.parent_version) == (1, 2, 1)
+        assert latest_version(mdir) == 2
+        assert load_snapshot(1, manifest_dir=mdir).operation == "test"
+        assert sorted(p.name for p in mdir.iterdir()) == ["_latest", "v00000001.json", "v00000002.json"]
+
+
+def test_manifest_commit_publishes_new_output_version() -> None:
+    """Cada transform escribe cut=…/v=<id>/ nuevo; el commit lo publica sin tocar la versión previa."""
+    import tempfile
+    from unittest import mock
+
+    import duckdb
+
+    from src.silver import manifest
+    from src.silver.catalog import new_output_version
+
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(manifest, "PROCESSED_ROOT", Path(tmp)):
+        mdir = Path(tmp) / "_manifest"
+        cut_dir = Path(tmp) / "dtpm" / "dataset=subidas_30m" / "year=2025" / "month=04" / "cut=2025-04"
+        con = duckdb.connect()
+        published = []
+        for n in (1, 2):
+            out = cut_dir / f"v={new_output_version()}"
+            out.mkdir(parents=True)
+            con.execute(
+                f"COPY (SELECT range AS x FROM range({n})) "
+                f"TO '{(out / 'subidas_30m.parquet').as_posix()}' (FORMAT PARQUET)"
+            )
+            snap = manifest.commit([out], operation="test", manifest_dir=mdir)
+            published.append(snap.files[0].abs_path)
+        con.close()
+        assert [(f.cut, f.rows) for f in snap.files] == [("2025-04", 2)], snap.files
+        assert published[0] != published[1] and published[0].exists()
+        assert manifest.current_output_dir(cut_dir) == published[1].parent
+
+
+def test_manifest_first_commit_keeps_legacy_cuts() -> None:
+    """El primer commit sobre un lake sin manifest incluye los cuts previos (layout cut=C/*.parquet)."""
+    import tempfile
+    from unittest import mock
+
+    import duckdb
+
+    from src.silver import manifest
+
+    with tempfile.TemporaryDirectory() as tmp, mock.patch.object(manifest, "PROCESSED_ROOT", Path(tmp)), \
+            mock.patch.object(manifest, "DTPM_ROOT", Path(tmp) / "dtpm"):
+        mdir = Path(tmp) / "_manifest"
+        month = Path(tmp) / "dtpm" / "dataset=viajes" / "year=2025" / "month=04"
+        con = duckdb.connect()
+        for out in (month / "cut=2025-04-01", month / "cut=2025-04-08", month / "cut=2025-04-15" / "v=abc"):
+            out.mkdir(parents=True)
+            con.execute(
+                f"COPY (SELECT 1 AS x) TO '{(out / 'viajes_trip.parquet').as_posix()}' (FORMAT PARQUET)"
+            )
+        con.close()
+        snap = manifest.commit([month / "cut=2025-04-15" / "v=abc"], operation="test", manifest_dir=mdir)
+        assert sorted(f.cut for f in snap.files) == ["2025-04-01", "2025-04-08", "2025-04-15"], snap.files
+        assert snap.changed == [{"dataset": "viajes", "cut": "2025-04-15"}]
+
+
+def test_compaction_plan_groups_by_week() -> None:
+    """plan_compaction agrupa cuts diarios por semana ISO; logical_files expande por cut."""
+    from src.silver.compaction import period_label, plan_compaction
+    from src.silver.manifest import ManifestFile, Snapshot
+
+    def mf(cut: str, day: int | None = None, cuts: dict | None = None, ds: str = "viajes") -> ManifestFile:
+        return ManifestFile(ds, cut, 2025, 4, "viajes_trip", day, f"{ds}/{cut}/{day}.parquet",
+                            sum((cuts or {}).values()) or 10, 1, 1, cuts or {})
+
+    assert period_label("2025-04-27", "week") == "2025-W17"
+    assert period_label("2025-04-28", "week") == "2025-W18"
+    assert period_label("2025-04", "week") is None
+    snap = Snapshot(1, None, "", "test", files=[
+        mf("2025-W17", cuts={"2025-04-21": 5, "2025-04-22": 7}),
+        mf("2025-04-23"), mf("2025-04-28"),
+        mf("2025-04-24", day=20250424, ds="etapas"),
+    ])
+    groups = plan_compaction(snap, "week")
+    assert [(g.label, g.cuts) for g in groups] == [("2025-W17", ["2025-04-21", "2025-04-22", "2025-04-23"])]
+    assert plan_compaction(snap, "week", min_cuts=4) == []
+    logical = {(f.cut, f.rows) for f in snap.logical_files() if f.dataset == "viajes"}
+    assert logical == {("2025-04-21", 5), ("2025-04-22", 7), ("2025-04-23", 10), ("2025-04-28", 10)}
+    assert [f.cut for f in snap.select(cut="2025-04-22")] == ["2025-W17"]
+
+
 # ─────────────────────────────────────────────────────────────
 # Tests: CLI dry-run
 # ─────────────────────────────────────────────────────────────
@@ -378,6 +603,14 @@ _ALL_TESTS = [
     ("contracts: PYDANTIC thresholds valid",  test_pydantic_thresholds),
     # Registry
     ("transforms: registry has 3 datasets",  test_registry_has_three_datasets),
+    ("transforms: per-day quality breakdown", test_per_day_quality_breakdown),
+    ("build_lake: chunk_index record boundaries", test_chunk_index_record_boundaries),
+    ("cdc: inserted/updated/deleted classification", test_cdc_classifies_changes),
+    ("cdc: etapas keyed by id_etapa + tiempo_subida", test_cdc_etapas_keyed_by_boarding_time),
+    ("manifest: append-only versions + _latest",     test_manifest_versions_append_only),
+    ("manifest: commit publishes a new output version", test_manifest_commit_publishes_new_output_version),
+    ("manifest: first commit keeps legacy cuts",     test_manifest_first_commit_keeps_legacy_cuts),
+    ("compaction: weekly plan + logical files",      test_compaction_plan_groups_by_week),
     # CLI
     ("cli: dry_run all returns 0 failures",        test_cli_dry_run_all),
     ("cli: dry_run viajes returns 0 failures",     test_cli_dry_run_viajes),
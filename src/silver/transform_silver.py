@@ -4,7 +4,7 @@ decidir que procesa, como se reportan los errores y asegurar que el sistema sea
 
 Algunas consideraciones en los comandos de los casos de uso:
 --dataset all: Permite procesar todo el Lakehouse de una vez.
---overwrite: Activa la idempotencia. Si una partición falló ayer, hoy la borras y la haces de nuevo desde cero sin dejar basura.
+--overwrite: Limpia quality/ y quarantine/ antes de procesar. La salida Silver siempre va a una versión nueva (cut=…/v=<id>/) que el manifest publica solo si el transform termina; las reemplazadas las borra el vacuum.
 --dry-run: Es una red de seguridad. Te dice qué va a pasar sin gastar cómputo ni mover archivos.
 
 transform_silver.py — CLI para ejecutar la capa Silver DTPM. 
@@ -28,6 +28,15 @@ Uso:
     # Ajustar umbrales Pydantic
     python -m src.silver.transform_silver --dataset all --pydantic-warn-rate 0.02 --pydantic-fail-rate 0.10
 
+    # viajes/etapas por chunks del chunk_index de _meta.json, en paralelo
+    python -m src.silver.transform_silver --dataset etapas --chunked --workers 8
+
+    # Re-publicación corregida: emite delta CDC (inserted/updated/deleted) vs la versión previa
+    python -m src.silver.transform_silver --dataset viajes --cut 2025-04-21 --overwrite --cdc
+
+    # Cada partición procesada publica un snapshot en lake/processed/_manifest/
+    # (ver src/silver/manifest.py); --no-manifest lo omite
+
     # Log más detallado
     python -m src.silver.transform_silver --dataset viajes --cut 2025-04-21 --log-level DEBUG
 """
@@ -35,6 +44,7 @@ Uso:
 from __future__ import annotations
 
 import argparse # permite controlar todo desde la terminal, vital para CI/CD (GitHub Actions o AirFlow)
+import shutil
 import sys
 import time
 from typing import Optional
@@ -42,8 +52,10 @@ from typing import Optional
 from loguru import logger
 
 from src.silver.catalog import Catalog, PartitionInfo
+from src.silver.cdc import discard_cdc, discard_snapshot, snapshot_previous, write_cdc
 from src.silver.contracts import PYDANTIC_FAIL_RATE, PYDANTIC_WARN_RATE
-from src.silver.transforms import TRANSFORM_REGISTRY
+from src.silver.manifest import commit_partitions
+from src.silver.transforms import CHUNKED_DATASETS, TRANSFORM_REGISTRY
 
 # ─────────────────────────────────────────────────────────────
 # Logging estructurado (Loguru)
@@ -105,6 +117,10 @@ def run(
     overwrite: bool = False,
     pydantic_warn_rate: float = PYDANTIC_WARN_RATE,
     pydantic_fail_rate: float = PYDANTIC_FAIL_RATE,
+    chunked: bool = False,
+    workers: Optional[int] = None,
+    cdc: bool = False,
+    manifest: bool = True,
 ) -> int:
     """
     Ejecuta el pipeline Silver para las particiones indicadas.
@@ -119,7 +135,10 @@ def run(
         log.warning("Nothing to process.")
         return 0
 
-    log.info(f"Partitions to process: {len(partitions)} | dry_run={dry_run} | overwrite={overwrite}")
+    log.info(
+        f"Partitions to process: {len(partitions)} | dry_run={dry_run} | overwrite={overwrite} | "
+        f"chunked={chunked} | cdc={cdc}"
+    )
 
     failed = 0
     for i, part in enumerate(partitions, 1):
@@ -127,6 +146,8 @@ def run(
         if dry_run:
             log.info(f"  [DRY-RUN] csv={part.abs_partition_dir}")
             log.info(f"  [DRY-RUN] out={part.silver_output_dir()}")
+            if chunked and part.dataset in CHUNKED_DATASETS:
+                log.info(f"  [DRY-RUN] chunks={len(part.meta_chunk_index())}")
             continue
 
         if not _check_csv_exists(part):
@@ -140,8 +161,24 @@ def run(
             continue
 
         t0 = time.monotonic()
+        ok = False
+        # CDC: congelar la versión publicada antes de que el commit la reemplace
+        cdc_base = snapshot_previous(part) if cdc else None
         try:
-            transform_fn(part, overwrite=overwrite)
+            if chunked and part.dataset in CHUNKED_DATASETS:
+                transform_fn(part, overwrite=overwrite, chunked=True, workers=workers)
+            else:
+                transform_fn(part, overwrite=overwrite)
+            if cdc:
+                stats = write_cdc(part, cdc_base)
+                log.info(
+                    f"  CDC inserted={stats['inserted_keys']:,} updated={stats['updated_keys']:,} "
+                    f"deleted={stats['deleted_keys']:,} keys | delta={stats['delta_fraction_pct']}% rows"
+                )
+            else:
+                # Un delta previo ya no describe la salida actual
+                discard_cdc(part)
+            ok = True
             elapsed = time.monotonic() - t0
             log.info(f"✔ DONE  dataset={part.dataset}  cut={part.cut}  elapsed={elapsed:.1f}s")
         except AssertionError as exc:
@@ -157,6 +194,22 @@ def run(
             elapsed = time.monotonic() - t0
             log.exception(f"✘ FAILED  dataset={part.dataset}  cut={part.cut}  elapsed={elapsed:.1f}s")
             failed += 1
+        finally:
+            discard_snapshot(cdc_base)
+
+        if not ok:
+            # Versión de salida nunca publicada: nadie la lee, se descarta entera
+            shutil.rmtree(part.silver_output_dir(), ignore_errors=True)
+            continue
+
+        # Commit del cut al manifest: publica la versión nueva solo si el transform terminó
+        if manifest:
+            try:
+                snap = commit_partitions([part], operation=f"transform:{part.dataset}")
+                log.info(f"  manifest v{snap.version} | files={len(snap.files)}")
+            except Exception:  # noqa: BLE001
+                log.exception(f"✘ MANIFEST COMMIT FAILED  dataset={part.dataset}  cut={part.cut}")
+                failed += 1
 
     return failed
 
@@ -199,8 +252,9 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         default=False,
         help=(
-            "Elimina silver/ quality/ quarantine/ antes de procesar. "
-            "Garantiza idempotencia total."
+            "Elimina quality/ quarantine/ antes de procesar. La salida Silver "
+            "siempre se escribe en una versión nueva (cut=…/v=<id>/); las "
+            "reemplazadas las borra el vacuum de src.silver.compaction."
         ),
     )
     p.add_argument(
@@ -225,6 +279,37 @@ def _build_parser() -> argparse.ArgumentParser:
             "Valor entre 0 y 1."
         ),
     )
+    p.add_argument(
+        "--chunked",
+        action="store_true",
+        default=False,
+        help=(
+            "viajes/etapas: procesa los chunks del chunk_index de _meta.json "
+            "en un pool de procesos y fusiona salidas y quality stats."
+        ),
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Procesos del modo --chunked (default: número de CPUs).",
+    )
+    p.add_argument(
+        "--cdc",
+        action="store_true",
+        default=False,
+        help=(
+            "Compara la nueva salida válida con la versión previa del cut y emite "
+            "el delta inserted/updated/deleted en lake/processed/_cdc/ (para --delta en Gold/SQLite)."
+        ),
+    )
+    p.add_argument(
+        "--manifest",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Publica un snapshot en lake/processed/_manifest/ por partición (default: sí).",
+    )
     p.add_argument(
         "--log-level",
         default="INFO",
@@ -256,6 +341,10 @@ def main() -> None:
             overwrite=args.overwrite,
             pydantic_warn_rate=args.pydantic_warn_rate,
             pydantic_fail_rate=args.pydantic_fail_rate,
+            chunked=args.chunked,
+            workers=args.workers,
+            cdc=args.cdc,
+            manifest=args.manifest,
         )
     except KeyboardInterrupt:
         log.warning("Interrupted by user.")
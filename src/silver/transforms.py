@@ -5,11 +5,12 @@ Responsabilidades:
   - Leer CSV RAW con DuckDB (sin pandas, sin ignore_errors)
   - All-VARCHAR read con columns= explícito derivado de _meta.json
   - Transformar / normalizar / mapear códigos
-  - Exportar Parquet con COPY … ZSTD (escritura atómica tmp→rename)
+  - Exportar Parquet con COPY … ZSTD (escritura atómica tmp→rename) a un
+    directorio de versión nuevo por transform (cut=…/v=<id>/, ver manifest)
   - Generar quality.json con read_row_count, assertion y DuckDB version
   - Generar valid.parquet + invalid.parquet (quarantine) con reason_code
   - Validar muestra con Pydantic v2 (configurable warn/fail rate)
-  - Soporte --overwrite (limpia dirs antes de escribir)
+  - Soporte --overwrite (limpia quality/quarantine antes de escribir)
 
 Todos los "grandes" queries se ejecutan en DuckDB puro.
 """
@@ -18,10 +19,12 @@ from __future__ import annotations
 
 import json
 import logging
+import multiprocessing
 import os
 import shutil
 import subprocess
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -59,6 +62,11 @@ MODE_MAP: dict[int, str] = {
 
 SAMPLE_ROWS = 10_000  # filas para validación Pydantic
 
+# Modo --chunked: datasets con chunk_index en _meta.json (ver build_lake.py)
+CHUNKED_DATASETS = ("viajes", "etapas")
+_CHUNK_COPY_BYTES = 8 * 1024 ** 2   # copia del rango de bytes en bloques de 8 MB
+_CHUNK_MEMORY_MB = 6 * 1024         # presupuesto total repartido entre workers
+
 # ─────────────────────────────────────────────────────────────
 # Helpers SQL reutilizables
 # ─────────────────────────────────────────────────────────────
@@ -111,19 +119,20 @@ def _excel_fraction_to_time(col: str) -> str:
     )
 
 
-def _build_varchar_read(csv_path: Path, col_spec: str) -> str:
+def _build_varchar_read(csv_path: Path, col_spec: str, header: bool = True) -> str:
     """
     Genera cláusula read_csv con all-VARCHAR explícito.
 
     col_spec es la cadena devuelta por PartitionInfo.columns_sql_spec(),
     e.g.: {'col1': 'VARCHAR', 'col2': 'VARCHAR', ...}
 
+    header=False para los trozos del modo chunked (sin línea de encabezado).
     No usamos ignore_errors; cualquier error de parseo lanzará excepción.
     """
     p = str(csv_path).replace("\\", "/")
     return (
         f"read_csv('{p}', "
-        f"delim='|', header=True, encoding='utf-8', "
+        f"delim='|', header={header}, encoding='utf-8', "
         f"nullstr=['-'], "
         f"columns={col_spec})"
     )
@@ -139,6 +148,8 @@ def _write_parquet_atomic(
     """
     Escribe el resultado de `query` como Parquet ZSTD en `dest`.
     Usa patrón atómico: escribe a un temporal, luego shutil.move().
+    Las salidas Silver van a un directorio de versión nuevo, así que `dest`
+    nunca es un archivo ya publicado en el manifest.
     """
     dest.parent.mkdir(parents=True, exist_ok=True)
     tmp = dest.parent / f"._tmp_{uuid4().hex}_{dest.name}"
@@ -154,12 +165,58 @@ def _write_parquet_atomic(
         raise
 
 
-def _duckdb_con() -> duckdb.DuckDBPyConnection:
+def _write_parquet_by_day_atomic(
+    con: duckdb.DuckDBPyConnection,
+    query: str,
+    partition: PartitionInfo,
+    day_col: str,
+    filename: str,
+) -> dict[int, Path]:
+    """
+    Escribe `query` particionado por `day_col` (date_sk YYYYMMDD) en una sola
+    pasada: COPY … PARTITION_BY a un dir temporal y luego shutil.move() de cada
+    archivo a cut=…/v=<id>/day=YYYYMMDD/`filename` (versión de salida nueva).
+
+    Devuelve {date_sk: path} de los días escritos.
+    """
+    out_dir = partition.silver_output_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = out_dir / f"._tmp_{uuid4().hex}_{Path(filename).stem}"
+    tmp_str = str(tmp_dir).replace("\\", "/")
+    sql = (
+        f"COPY ({query}) TO '{tmp_str}' "
+        f"(FORMAT PARQUET, COMPRESSION ZSTD, PARTITION_BY ({day_col}), "
+        f"WRITE_PARTITION_COLUMNS true)"
+    )
+    log.debug("COPY PARTITION_BY %s (tmp) -> %s", day_col, tmp_dir)
+    written: dict[int, Path] = {}
+    try:
+        con.execute(sql)
+        for day_dir in sorted(tmp_dir.glob(f"{day_col}=*")):
+            day_sk = int(day_dir.name.split("=", 1)[1])
+            files = sorted(day_dir.glob("*.parquet"))
+            if len(files) != 1:
+                raise RuntimeError(
+                    f"{day_dir}: se esperaba 1 archivo por día, hay {len(files)}"
+                )
+            dest = partition.silver_day_output_dir(day_sk) / filename
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(files[0]), str(dest))
+            written[day_sk] = dest
+            log.debug("Atomic rename -> %s", dest)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return written
+
+
+def _duckdb_con(
+    threads: int | None = None, memory_limit: str = "6GB"
+) -> duckdb.DuckDBPyConnection:
     """Conexión in-process con configuración óptima."""
     con = duckdb.connect(database=":memory:")
-    threads = os.cpu_count() or 4
+    threads = threads or os.cpu_count() or 4
     con.execute(f"SET threads TO {threads}")
-    con.execute("SET memory_limit = '6GB'")
+    con.execute(f"SET memory_limit = '{memory_limit}'")
     return con
 
 
@@ -168,9 +225,12 @@ def _duckdb_con() -> duckdb.DuckDBPyConnection:
 # ─────────────────────────────────────────────────────────────
 
 def _clear_partition_dirs(partition: PartitionInfo) -> None:
-    """Elimina silver + quality + quarantine dirs si existen (--overwrite)."""
+    """
+    Elimina quality + quarantine dirs si existen (--overwrite). La salida
+    Silver no se toca: el transform escribe una versión nueva y las
+    anteriores solo las borra el vacuum (lectores con snapshots abiertos).
+    """
     for d in [
-        partition.silver_output_dir(),
         partition.quality_output_dir(),
         partition.quarantine_output_dir(),
     ]:
@@ -207,6 +267,50 @@ def _write_quality(stats: dict[str, Any], dest_dir: Path) -> None:
     log.info("Quality report -> %s", path)
 
 
+def _per_day_quality(
+    con: duckdb.DuckDBPyConnection,
+    view: str,
+    day_col: str,
+    day_files: dict[int, Path],
+) -> list[dict[str, Any]]:
+    """
+    Desglose de calidad por día (`day_col`) sobre una vista con _reason_code.
+    Las filas inválidas sin día (ej. MISSING_TIMESTAMP) quedan con day=None.
+    """
+    rows = con.execute(f"""
+        SELECT {day_col} AS day, _reason_code, COUNT(*) AS cnt
+        FROM {view}
+        GROUP BY 1, 2
+    """).fetchall()
+
+    by_day: dict[Any, dict[str, Any]] = {}
+    for day, reason, cnt in rows:
+        entry = by_day.setdefault(day, {"valid": 0, "invalid": 0, "reasons": {}})
+        if reason is None:
+            entry["valid"] += cnt
+        else:
+            entry["invalid"] += cnt
+            entry["reasons"][reason] = entry["reasons"].get(reason, 0) + cnt
+
+    out: list[dict[str, Any]] = []
+    for day in sorted(by_day, key=lambda d: (d is None, d or 0)):
+        e = by_day[day]
+        total = e["valid"] + e["invalid"]
+        out.append({
+            day_col: int(day) if day is not None else None,
+            "read_row_count": total,
+            "valid_row_count": e["valid"],
+            "invalid_row_count": e["invalid"],
+            "quarantine_rate_pct": round(e["invalid"] / total * 100, 4) if total else 0,
+            "quarantine_reason_distribution": [
+                {"_reason_code": r, "cnt": c}
+                for r, c in sorted(e["reasons"].items(), key=lambda kv: -kv[1])
+            ],
+            "output_file": str(day_files[day]) if day in day_files else None,
+        })
+    return out
+
+
 # ─────────────────────────────────────────────────────────────
 # Pydantic sample validation
 # ─────────────────────────────────────────────────────────────
@@ -280,40 +384,152 @@ def _validate_sample(
 
 
 # ─────────────────────────────────────────────────────────────
-# ██  VIAJES  ██
+# Modo chunked: rangos de bytes del CSV en un pool de procesos
 # ─────────────────────────────────────────────────────────────
 
-def transform_viajes(partition: PartitionInfo, overwrite: bool = False) -> dict[str, Any]:
+def _transform_chunk(
+    partition: PartitionInfo,
+    chunk_no: int,
+    offset: int,
+    length: int,
+    chunk_dir: str,
+    threads: int,
+    memory_limit: str,
+) -> dict[str, Any]:
     """
-    Procesa una partición de viajes y genera:
-      - viajes_trip.parquet    (1 fila = 1 viaje)
-      - viajes_leg.parquet     (1 fila = 1 etapa, leg_seq 1..4)
-      - _quality/quality.json
-      - _quarantine/invalid.parquet + valid.parquet (audit)
+    Worker (proceso hijo). Copia CSV[offset:offset+length] a un archivo
+    temporal, aplica las mismas vistas raw → enriched → quality que el modo
+    single-pass y escribe <dataset>_quality completo (con _reason_code) a
+    chunk_NNNNN.parquet. Devuelve el conteo leído del chunk.
     """
-    if overwrite:
-        _clear_partition_dirs(partition)
+    ds = partition.dataset
+    out_dir = Path(chunk_dir)
+    piece = out_dir / f"chunk_{chunk_no:05d}.csv"
+    dest = out_dir / f"chunk_{chunk_no:05d}.parquet"
+
+    with open(partition.csv_file, "rb") as src_fh, open(piece, "wb") as dst_fh:
+        src_fh.seek(offset)
+        remaining = length
+        while remaining > 0:
+            buf = src_fh.read(min(remaining, _CHUNK_COPY_BYTES))
+            if not buf:
+                break
+            dst_fh.write(buf)
+            remaining -= len(buf)
+
+    con = _duckdb_con(threads=threads, memory_limit=memory_limit)
+    try:
+        src = _build_varchar_read(piece, partition.columns_sql_spec(), header=False)
+        con.execute(f"CREATE OR REPLACE VIEW raw_{ds} AS SELECT * FROM {src}")
+        read_row_count: int = con.execute(f"SELECT COUNT(*) FROM raw_{ds}").fetchone()[0]  # type: ignore[index]
+        _QUALITY_VIEW_BUILDERS[ds](con, partition)
+        _write_parquet_atomic(con, f"SELECT * FROM {ds}_quality", dest)
+    finally:
+        con.close()
+        piece.unlink(missing_ok=True)
+
+    return {
+        "chunk": chunk_no,
+        "offset": offset,
+        "length": length,
+        "read_row_count": read_row_count,
+    }
+
+
+def _materialize_quality_chunked(
+    con: duckdb.DuckDBPyConnection,
+    partition: PartitionInfo,
+    workers: int | None = None,
+) -> tuple[Path | None, int, dict[str, Any] | None]:
+    """
+    Procesa los chunks del chunk_index en paralelo (ProcessPoolExecutor, spawn)
+    y registra en `con` la vista <dataset>_quality sobre los Parquet de los
+    chunks, de modo que el resto del transform (salidas, quarantine, Pydantic,
+    conteos) no cambia.
+
+    Devuelve (chunk_dir, read_row_count, chunk_stats). Si la partición no tiene
+    chunk_index devuelve (None, 0, None) y el caller usa el modo single-pass.
+    El caller elimina chunk_dir al terminar.
+    """
+    ds = partition.dataset
+    chunks = partition.meta_chunk_index()
+    if not chunks:
+        log.warning(
+            "%s cut=%s: _meta.json sin chunk_index (python build_lake.py --reindex) "
+            "— usando modo single-pass",
+            ds, partition.cut,
+        )
+        return None, 0, None
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    threads = max(1, (os.cpu_count() or 4) // workers)
+    memory_limit = f"{max(512, _CHUNK_MEMORY_MB // workers)}MB"
+
+    chunk_dir = partition.silver_output_dir() / f"._tmp_chunks_{uuid4().hex}"
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    log.info(
+        "%s cut=%s: chunked | chunks=%d workers=%d threads/worker=%d mem/worker=%s",
+        ds, partition.cut, len(chunks), workers, threads, memory_limit,
+    )
 
-    csv_path = partition.csv_file
-    log.info("=== viajes transform | cut=%s | csv=%s", partition.cut, csv_path)
     t0 = time.monotonic()
+    try:
+        # spawn: el padre ya tiene hilos de DuckDB; fork no es seguro
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(
+                    _transform_chunk, partition, i, int(c["offset"]), int(c["length"]),
+                    str(chunk_dir), threads, memory_limit,
+                )
+                for i, c in enumerate(chunks)
+            ]
+            per_chunk = [f.result() for f in futures]
+    except BaseException:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+        raise
 
-    con = _duckdb_con()
+    for res, c in zip(per_chunk, chunks):
+        if c.get("rows") is not None and res["read_row_count"] != int(c["rows"]):
+            log.warning(
+                "%s cut=%s chunk=%d: read_row_count=%d != chunk_index rows=%d",
+                ds, partition.cut, res["chunk"], res["read_row_count"], int(c["rows"]),
+            )
+
+    # hive_partitioning=false: la ruta contiene cut=/year=/month= y DuckDB
+    # sobrescribiría esas columnas con los valores (VARCHAR) del path
+    pattern = str(chunk_dir / "chunk_*.parquet").replace("\\", "/")
+    con.execute(
+        f"CREATE OR REPLACE VIEW {ds}_quality AS "
+        f"SELECT * FROM read_parquet('{pattern}', hive_partitioning = false)"
+    )
+    read_row_count = sum(r["read_row_count"] for r in per_chunk)
+    elapsed = time.monotonic() - t0
+    log.info(
+        "%s cut=%s: %d chunks -> %d filas en %.1fs",
+        ds, partition.cut, len(per_chunk), read_row_count, elapsed,
+    )
+    chunk_stats: dict[str, Any] = {
+        "chunks": len(per_chunk),
+        "workers": workers,
+        "elapsed_s": round(elapsed, 2),
+        "per_chunk": per_chunk,
+    }
+    return chunk_dir, read_row_count, chunk_stats
 
-    # ── 1. Vista RAW (all-VARCHAR, sin ignore_errors) ──────────
-    src = _build_varchar_read(csv_path, partition.columns_sql_spec())
-    con.execute(f"CREATE OR REPLACE VIEW raw_viajes AS SELECT * FROM {src}")
 
-    # Conteo de filas leídas — DEBE coincidir con meta_row_count
-    read_row_count: int = con.execute("SELECT COUNT(*) FROM raw_viajes").fetchone()[0]  # type: ignore[index]
-    meta_count = partition.meta_row_count()
-    if meta_count and read_row_count != meta_count:
-        log.warning(
-            "viajes cut=%s: read_row_count=%d != meta_row_count=%d",
-            partition.cut, read_row_count, meta_count,
-        )
+# ─────────────────────────────────────────────────────────────
+# ██  VIAJES  ██
+# ─────────────────────────────────────────────────────────────
 
-    # ── 2. Vista enriquecida ──────────────────────────────────
+def _create_viajes_quality_view(
+    con: duckdb.DuckDBPyConnection, partition: PartitionInfo
+) -> None:
+    """
+    Crea enriched_viajes → viajes_quality (con _reason_code) sobre la vista
+    raw_viajes ya registrada en `con`. Compartido por el modo single-pass y
+    por cada chunk del modo --chunked.
+    """
     cut = partition.cut
     year = partition.year
     month = partition.month
@@ -478,196 +694,235 @@ def transform_viajes(partition: PartitionInfo, overwrite: bool = False) -> dict[
     FROM enriched_viajes
     """)
 
-    valid_q = """
-        SELECT * EXCLUDE (_reason_code)
-        FROM viajes_quality
-        WHERE _reason_code IS NULL
-    """
-    invalid_q = """
-        SELECT *, _reason_code AS reason_code
-        FROM viajes_quality
-        WHERE _reason_code IS NOT NULL
-    """
 
-    # Define only the trip columns (excluir columnas de legs)
-    trip_cols = """
-        cut, year, month,
-        id_viaje, id_tarjeta,
-        tipo_dia, proposito, contrato,
-        factor_expansion, n_etapas,
-        distancia_eucl, distancia_ruta,
-        tiempo_inicio_viaje, tiempo_fin_viaje,
-        date_start_sk, time_start_30m_sk,
-        date_end_sk, time_end_30m_sk,
-        paradero_inicio_viaje, paradero_fin_viaje,
-        comuna_inicio_viaje, comuna_fin_viaje,
-        zona_inicio_viaje, zona_fin_viaje,
-        periodo_inicio_viaje, periodo_fin_viaje,
-        tviaje_min
+def transform_viajes(
+    partition: PartitionInfo,
+    overwrite: bool = False,
+    chunked: bool = False,
+    workers: int | None = None,
+) -> dict[str, Any]:
     """
+    Procesa una partición de viajes y genera:
+      - viajes_trip.parquet    (1 fila = 1 viaje)
+      - viajes_leg.parquet     (1 fila = 1 etapa, leg_seq 1..4)
+      - _quality/quality.json
+      - _quarantine/invalid.parquet + valid.parquet (audit)
 
-    trip_valid_query = f"SELECT {trip_cols} FROM viajes_quality WHERE _reason_code IS NULL"
-
-    # ── 4. Escribir viajes_trip.parquet (atómico) ─────────────
-    out_trip = partition.silver_output_dir() / "viajes_trip.parquet"
-    _write_parquet_atomic(con, trip_valid_query, out_trip)
-    log.info("viajes_trip.parquet written -> %s", out_trip)
-
-    # ── 5. Construir viajes_leg (UNPIVOT manual) ───────────────
-    # Generamos UNION de las 4 legs; sólo incluimos si tiene al menos 1 campo útil
-    leg_unions = []
-    for i in range(1, 5):
-        tc = f"tc_transfer_{i}" if i <= 3 else "NULL"
-        te = f"te_wait_{i}" if i <= 3 else "NULL"
-        leg_unions.append(f"""
-        SELECT
-            cut, year, month,
-            id_viaje, id_tarjeta,
-            {i} AS leg_seq,
-            CASE WHEN mode_code_{i} = 'UNKNOWN' THEN NULL ELSE mode_code_{i} END AS mode_code,
-            service_code_{i}  AS service_code,
-            operator_code_{i} AS operator_code,
-            board_stop_{i}    AS board_stop_code,
-            alight_stop_{i}   AS alight_stop_code,
-            ts_board_{i}      AS ts_board,
-            ts_alight_{i}     AS ts_alight,
-            CASE WHEN ts_board_{i} IS NOT NULL
-                 THEN {_ts_to_date_sk(f"ts_board_{i}")} END AS date_board_sk,
-            CASE WHEN ts_board_{i} IS NOT NULL
-                 THEN {_ts_to_time_30m_sk(f"ts_board_{i}")} END AS time_board_30m_sk,
-            CASE WHEN ts_alight_{i} IS NOT NULL
-                 THEN {_ts_to_date_sk(f"ts_alight_{i}")} END AS date_alight_sk,
-            CASE WHEN ts_alight_{i} IS NOT NULL
-                 THEN {_ts_to_time_30m_sk(f"ts_alight_{i}")} END AS time_alight_30m_sk,
-            fare_period_alight_{i} AS fare_period_alight_code,
-            zone_board_{i}    AS zone_board,
-            zone_alight_{i}   AS zone_alight,
-            tv_leg_{i}        AS tv_leg_min,
-            {tc}              AS tc_transfer_min,
-            {te}              AS te_wait_min
-        FROM viajes_quality
-        WHERE _reason_code IS NULL
-          AND (
-              mode_code_{i} IS NOT NULL
-              OR service_code_{i} IS NOT NULL
-              OR board_stop_{i} IS NOT NULL
-              OR ts_board_{i} IS NOT NULL
-          )
-        """)
-
-    leg_query = " UNION ALL ".join(leg_unions)
-
-    out_leg = partition.silver_output_dir() / "viajes_leg.parquet"
-    _write_parquet_atomic(con, leg_query, out_leg)
-    log.info("viajes_leg.parquet written -> %s", out_leg)
-
-    # ── 6. Quarantine ─────────────────────────────────────────
-    invalid_trip_q = f"""
-        SELECT {trip_cols}, _reason_code AS reason_code
-        FROM viajes_quality
-        WHERE _reason_code IS NOT NULL
+    chunked=True procesa los chunks del chunk_index de _meta.json en un pool
+    de procesos (ver _materialize_quality_chunked); las salidas son idénticas.
     """
-    quarantine_dir = partition.quarantine_output_dir()
-    _write_parquet_atomic(con, invalid_trip_q, quarantine_dir / "invalid.parquet")
-    log.info("Quarantine invalid -> %s", quarantine_dir / "invalid.parquet")
-
-    # valid.parquet en quarantine — para auditoría de conteo
-    _write_parquet_atomic(con, trip_valid_query, quarantine_dir / "valid.parquet")
-    log.info("Quarantine valid -> %s", quarantine_dir / "valid.parquet")
-
-    # ── 7. Pydantic sample validation ─────────────────────────
-    con.execute(f"""
-        CREATE OR REPLACE VIEW trip_for_pydantic AS
-        SELECT {trip_cols} FROM viajes_quality WHERE _reason_code IS NULL
-    """)
-    pydantic_stats = _validate_sample(con, "trip_for_pydantic", ViajesTripRow)
-
-    # ── 8. Count assertion & quality report ───────────────────
-    total_valid = con.execute(
-        "SELECT COUNT(*) FROM viajes_quality WHERE _reason_code IS NULL"
-    ).fetchone()[0]  # type: ignore[index]
-    total_invalid = con.execute(
-        "SELECT COUNT(*) FROM viajes_quality WHERE _reason_code IS NOT NULL"
-    ).fetchone()[0]  # type: ignore[index]
+    if overwrite:
+        _clear_partition_dirs(partition)
 
-    assert read_row_count == total_valid + total_invalid, (
-        f"viajes cut={partition.cut}: read_row_count={read_row_count} "
-        f"!= valid({total_valid}) + invalid({total_invalid})"
-    )
+    csv_path = partition.csv_file
+    log.info("=== viajes transform | cut=%s | csv=%s", partition.cut, csv_path)
+    t0 = time.monotonic()
 
-    reason_dist = con.execute("""
-        SELECT _reason_code, COUNT(*) AS cnt
-        FROM viajes_quality
-        WHERE _reason_code IS NOT NULL
-        GROUP BY _reason_code
-        ORDER BY cnt DESC
-    """).fetchdf().to_dict("records")
+    con = _duckdb_con()
 
-    stats: dict[str, Any] = {
-        "generated_at": datetime.now(tz=timezone.utc).isoformat(),
-        "duckdb_version": duckdb.__version__,
-        "git_hash": _git_hash(),
-        "dataset": "viajes",
-        "cut": partition.cut,
-        "year": partition.year,
-        "month": partition.month,
-        "meta_row_count": meta_count,
-        "read_row_count": read_row_count,
-        "valid_row_count": total_valid,
-        "invalid_row_count": total_invalid,
-        "count_assertion": "PASS",
-        "quarantine_rate_pct": round(
-            total_invalid / read_row_count * 100, 4
-        ) if read_row_count else 0,
-        "quarantine_reason_distribution": reason_dist,
-        "pydantic_sample_validation": pydantic_stats,
-        "output_files": [
-            str(out_trip.relative_to(out_trip.parents[6])),
-            str(out_leg.relative_to(out_leg.parents[6])),
-        ],
-    }
-    _write_quality(stats, partition.quality_output_dir())
+    chunk_dir: Path | None = None
+    chunk_stats: dict[str, Any] | None = None
+    try:
+        if chunked:
+            # ── 1-3. viajes_quality desde los Parquet de cada chunk ─
+            chunk_dir, read_row_count, chunk_stats = _materialize_quality_chunked(
+                con, partition, workers
+            )
+        if chunk_dir is None:
+            # ── 1. Vista RAW (all-VARCHAR, sin ignore_errors) ──────────
+            src = _build_varchar_read(csv_path, partition.columns_sql_spec())
+            con.execute(f"CREATE OR REPLACE VIEW raw_viajes AS SELECT * FROM {src}")
+
+            # Conteo de filas leídas — DEBE coincidir con meta_row_count
+            read_row_count = con.execute("SELECT COUNT(*) FROM raw_viajes").fetchone()[0]  # type: ignore[index]
+
+            # ── 2-3. Vista enriquecida + quality rules (quarantine) ───
+            _create_viajes_quality_view(con, partition)
+
+        meta_count = partition.meta_row_count()
+        if meta_count and read_row_count != meta_count:
+            log.warning(
+                "viajes cut=%s: read_row_count=%d != meta_row_count=%d",
+                partition.cut, read_row_count, meta_count,
+            )
+
+        valid_q = """
+            SELECT * EXCLUDE (_reason_code)
+            FROM viajes_quality
+            WHERE _reason_code IS NULL
+        """
+        invalid_q = """
+            SELECT *, _reason_code AS reason_code
+            FROM viajes_quality
+            WHERE _reason_code IS NOT NULL
+        """
+
+        # Define only the trip columns (excluir columnas de legs)
+        trip_cols = """
+            cut, year, month,
+            id_viaje, id_tarjeta,
+            tipo_dia, proposito, contrato,
+            factor_expansion, n_etapas,
+            distancia_eucl, distancia_ruta,
+            tiempo_inicio_viaje, tiempo_fin_viaje,
+            date_start_sk, time_start_30m_sk,
+            date_end_sk, time_end_30m_sk,
+            paradero_inicio_viaje, paradero_fin_viaje,
+            comuna_inicio_viaje, comuna_fin_viaje,
+            zona_inicio_viaje, zona_fin_viaje,
+            periodo_inicio_viaje, periodo_fin_viaje,
+            tviaje_min
+        """
+
+        trip_valid_query = f"SELECT {trip_cols} FROM viajes_quality WHERE _reason_code IS NULL"
+
+        # ── 4. Escribir viajes_trip.parquet (atómico) ─────────────
+        out_trip = partition.silver_output_dir() / "viajes_trip.parquet"
+        _write_parquet_atomic(con, trip_valid_query, out_trip)
+        log.info("viajes_trip.parquet written -> %s", out_trip)
+
+        # ── 5. Construir viajes_leg (UNPIVOT manual) ───────────────
+        # Generamos UNION de las 4 legs; sólo incluimos si tiene al menos 1 campo útil
+        leg_unions = []
+        for i in range(1, 5):
+            tc = f"tc_transfer_{i}" if i <= 3 else "NULL"
+            te = f"te_wait_{i}" if i <= 3 else "NULL"
+            leg_unions.append(f"""
+            SELECT
+                cut, year, month,
+                id_viaje, id_tarjeta,
+                {i} AS leg_seq,
+                CASE WHEN mode_code_{i} = 'UNKNOWN' THEN NULL ELSE mode_code_{i} END AS mode_code,
+                service_code_{i}  AS service_code,
+                operator_code_{i} AS operator_code,
+                board_stop_{i}    AS board_stop_code,
+                alight_stop_{i}   AS alight_stop_code,
+                ts_board_{i}      AS ts_board,
+                ts_alight_{i}     AS ts_alight,
+                CASE WHEN ts_board_{i} IS NOT NULL
+                     THEN {_ts_to_date_sk(f"ts_board_{i}")} END AS date_board_sk,
+                CASE WHEN ts_board_{i} IS NOT NULL
+                     THEN {_ts_to_time_30m_sk(f"ts_board_{i}")} END AS time_board_30m_sk,
+                CASE WHEN ts_alight_{i} IS NOT NULL
+                     THEN {_ts_to_date_sk(f"ts_alight_{i}")} END AS date_alight_sk,
+                CASE WHEN ts_alight_{i} IS NOT NULL
+                     THEN {_ts_to_time_30m_sk(f"ts_alight_{i}")} END AS time_alight_30m_sk,
+                fare_period_alight_{i} AS fare_period_alight_code,
+                zone_board_{i}    AS zone_board,
+                zone_alight_{i}   AS zone_alight,
+                tv_leg_{i}        AS tv_leg_min,
+                {tc}              AS tc_transfer_min,
+                {te}              AS te_wait_min
+            FROM viajes_quality
+            WHERE _reason_code IS NULL
+              AND (
+                  mode_code_{i} IS NOT NULL
+                  OR service_code_{i} IS NOT NULL
+                  OR board_stop_{i} IS NOT NULL
+                  OR ts_board_{i} IS NOT NULL
+              )
+            """)
+
+        leg_query = " UNION ALL ".join(leg_unions)
+
+        out_leg = partition.silver_output_dir() / "viajes_leg.parquet"
+        _write_parquet_atomic(con, leg_query, out_leg)
+        log.info("viajes_leg.parquet written -> %s", out_leg)
+
+        # ── 6. Quarantine ─────────────────────────────────────────
+        invalid_trip_q = f"""
+            SELECT {trip_cols}, _reason_code AS reason_code
+            FROM viajes_quality
+            WHERE _reason_code IS NOT NULL
+        """
+        quarantine_dir = partition.quarantine_output_dir()
+        _write_parquet_atomic(con, invalid_trip_q, quarantine_dir / "invalid.parquet")
+        log.info("Quarantine invalid -> %s", quarantine_dir / "invalid.parquet")
+
+        # valid.parquet en quarantine — para auditoría de conteo
+        _write_parquet_atomic(con, trip_valid_query, quarantine_dir / "valid.parquet")
+        log.info("Quarantine valid -> %s", quarantine_dir / "valid.parquet")
+
+        # ── 7. Pydantic sample validation ─────────────────────────
+        con.execute(f"""
+            CREATE OR REPLACE VIEW trip_for_pydantic AS
+            SELECT {trip_cols} FROM viajes_quality WHERE _reason_code IS NULL
+        """)
+        pydantic_stats = _validate_sample(con, "trip_for_pydantic", ViajesTripRow)
+
+        # ── 8. Count assertion & quality report ───────────────────
+        total_valid = con.execute(
+            "SELECT COUNT(*) FROM viajes_quality WHERE _reason_code IS NULL"
+        ).fetchone()[0]  # type: ignore[index]
+        total_invalid = con.execute(
+            "SELECT COUNT(*) FROM viajes_quality WHERE _reason_code IS NOT NULL"
+        ).fetchone()[0]  # type: ignore[index]
+
+        assert read_row_count == total_valid + total_invalid, (
+            f"viajes cut={partition.cut}: read_row_count={read_row_count} "
+            f"!= valid({total_valid}) + invalid({total_invalid})"
+        )
 
-    elapsed = time.monotonic() - t0
-    log.info("viajes | cut=%s | elapsed=%.1fs", partition.cut, elapsed)
-    con.close()
-    return stats
+        reason_dist = con.execute("""
+            SELECT _reason_code, COUNT(*) AS cnt
+            FROM viajes_quality
+            WHERE _reason_code IS NOT NULL
+            GROUP BY _reason_code
+            ORDER BY cnt DESC
+        """).fetchdf().to_dict("records")
+
+        stats: dict[str, Any] = {
+            "generated_at": datetime.now(tz=timezone.utc).isoformat(),
+            "duckdb_version": duckdb.__version__,
+            "git_hash": _git_hash(),
+            "dataset": "viajes",
+            "cut": partition.cut,
+            "year": partition.year,
+            "month": partition.month,
+            "meta_row_count": meta_count,
+            "read_row_count": read_row_count,
+            "valid_row_count": total_valid,
+            "invalid_row_count": total_invalid,
+            "count_assertion": "PASS",
+            "quarantine_rate_pct": round(
+                total_invalid / read_row_count * 100, 4
+            ) if read_row_count else 0,
+            "quarantine_reason_distribution": reason_dist,
+            "pydantic_sample_validation": pydantic_stats,
+            "output_files": [
+                str(out_trip.relative_to(out_trip.parents[6])),
+                str(out_leg.relative_to(out_leg.parents[6])),
+            ],
+        }
+        if chunk_stats is not None:
+            stats["chunked"] = chunk_stats
+        _write_quality(stats, partition.quality_output_dir())
+
+        elapsed = time.monotonic() - t0
+        log.info("viajes | cut=%s | elapsed=%.1fs", partition.cut, elapsed)
+        return stats
+    finally:
+        # también si falla un worker o el COPY final: los chunks pueden ocupar GB
+        con.close()
+        if chunk_dir is not None:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
 
 
 # ─────────────────────────────────────────────────────────────
 # ██  ETAPAS  ██
 # ─────────────────────────────────────────────────────────────
 
-def transform_etapas(partition: PartitionInfo, overwrite: bool = False) -> dict[str, Any]:
+def _create_etapas_quality_view(
+    con: duckdb.DuckDBPyConnection, partition: PartitionInfo
+) -> None:
     """
-    Procesa una partición de etapas y genera:
-      - etapas_validation.parquet
-      - _quality/quality.json
-      - _quarantine/invalid.parquet + valid.parquet (audit)
+    Crea enriched_etapas → etapas_quality (con _reason_code) sobre la vista
+    raw_etapas ya registrada en `con`.
     """
-    if overwrite:
-        _clear_partition_dirs(partition)
-
-    csv_path = partition.csv_file
-    log.info("=== etapas transform | cut=%s | csv=%s", partition.cut, csv_path)
-    t0 = time.monotonic()
-    con = _duckdb_con()
-
     cut = partition.cut
     year = partition.year
     month = partition.month
 
-    src = _build_varchar_read(csv_path, partition.columns_sql_spec())
-    con.execute(f"CREATE OR REPLACE VIEW raw_etapas AS SELECT * FROM {src}")
-
-    read_row_count: int = con.execute("SELECT COUNT(*) FROM raw_etapas").fetchone()[0]  # type: ignore[index]
-    meta_count = partition.meta_row_count()
-    if meta_count and read_row_count != meta_count:
-        log.warning(
-            "etapas cut=%s: read_row_count=%d != meta_row_count=%d",
-            partition.cut, read_row_count, meta_count,
-        )
-
     # Determinar modo: tipo_transporte puede venir como int o como texto
     # Usamos TRY_CAST a int y después mode_case; si ya es texto uppercase lo conservamos
     mode_sql = f"""
@@ -795,78 +1050,136 @@ def transform_etapas(partition: PartitionInfo, overwrite: bool = False) -> dict[
     FROM enriched_etapas
     """)
 
-    out_valid = partition.silver_output_dir() / "etapas_validation.parquet"
-    _write_parquet_atomic(
-        con,
-        "SELECT * EXCLUDE (_reason_code) FROM etapas_quality WHERE _reason_code IS NULL",
-        out_valid,
-    )
-    log.info("etapas_validation.parquet -> %s", out_valid)
 
-    quarantine_dir = partition.quarantine_output_dir()
-    _write_parquet_atomic(
-        con,
-        "SELECT *, _reason_code AS reason_code FROM etapas_quality WHERE _reason_code IS NOT NULL",
-        quarantine_dir / "invalid.parquet",
-    )
-    _write_parquet_atomic(
-        con,
-        "SELECT * EXCLUDE (_reason_code) FROM etapas_quality WHERE _reason_code IS NULL",
-        quarantine_dir / "valid.parquet",
-    )
+def transform_etapas(
+    partition: PartitionInfo,
+    overwrite: bool = False,
+    chunked: bool = False,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """
+    Procesa una partición de etapas y genera:
+      - day=YYYYMMDD/etapas_validation.parquet (una sub-partición por date_board_sk)
+      - _quality/quality.json (incluye desglose per_day)
+      - _quarantine/invalid.parquet + valid.parquet (audit)
 
-    # Pydantic
-    con.execute("""
-        CREATE OR REPLACE VIEW etapas_for_pydantic AS
-        SELECT * EXCLUDE (_reason_code) FROM etapas_quality WHERE _reason_code IS NULL
-    """)
-    pydantic_stats = _validate_sample(con, "etapas_for_pydantic", EtapasValidationRow)
+    chunked=True: igual que transform_viajes (chunks en pool de procesos).
+    """
+    if overwrite:
+        _clear_partition_dirs(partition)
 
-    # Count assertion
-    total_valid = con.execute(
-        "SELECT COUNT(*) FROM etapas_quality WHERE _reason_code IS NULL"
-    ).fetchone()[0]  # type: ignore[index]
-    total_invalid = con.execute(
-        "SELECT COUNT(*) FROM etapas_quality WHERE _reason_code IS NOT NULL"
-    ).fetchone()[0]  # type: ignore[index]
+    csv_path = partition.csv_file
+    log.info("=== etapas transform | cut=%s | csv=%s", partition.cut, csv_path)
+    t0 = time.monotonic()
+    con = _duckdb_con()
 
-    assert read_row_count == total_valid + total_invalid, (
-        f"etapas cut={partition.cut}: read_row_count={read_row_count} "
-        f"!= valid({total_valid}) + invalid({total_invalid})"
-    )
+    chunk_dir: Path | None = None
+    chunk_stats: dict[str, Any] | None = None
+    try:
+        if chunked:
+            chunk_dir, read_row_count, chunk_stats = _materialize_quality_chunked(
+                con, partition, workers
+            )
+        if chunk_dir is None:
+            src = _build_varchar_read(csv_path, partition.columns_sql_spec())
+            con.execute(f"CREATE OR REPLACE VIEW raw_etapas AS SELECT * FROM {src}")
+
+            read_row_count = con.execute("SELECT COUNT(*) FROM raw_etapas").fetchone()[0]  # type: ignore[index]
+            _create_etapas_quality_view(con, partition)
+
+        meta_count = partition.meta_row_count()
+        if meta_count and read_row_count != meta_count:
+            log.warning(
+                "etapas cut=%s: read_row_count=%d != meta_row_count=%d",
+                partition.cut, read_row_count, meta_count,
+            )
+
+        # Sub-particiones diarias por date_board_sk (una sola pasada sobre el CSV).
+        # Las filas válidas siempre tienen tiempo_subida → date_board_sk NOT NULL.
+        day_files = _write_parquet_by_day_atomic(
+            con,
+            "SELECT * EXCLUDE (_reason_code) FROM etapas_quality WHERE _reason_code IS NULL",
+            partition,
+            day_col="date_board_sk",
+            filename="etapas_validation.parquet",
+        )
+        log.info(
+            "etapas_validation.parquet -> %d sub-particiones diarias en %s",
+            len(day_files), partition.silver_output_dir(),
+        )
 
-    reason_dist = con.execute("""
-        SELECT _reason_code, COUNT(*) AS cnt
-        FROM etapas_quality WHERE _reason_code IS NOT NULL
-        GROUP BY _reason_code ORDER BY cnt DESC
-    """).fetchdf().to_dict("records")
+        quarantine_dir = partition.quarantine_output_dir()
+        _write_parquet_atomic(
+            con,
+            "SELECT *, _reason_code AS reason_code FROM etapas_quality WHERE _reason_code IS NOT NULL",
+            quarantine_dir / "invalid.parquet",
+        )
+        _write_parquet_atomic(
+            con,
+            "SELECT * EXCLUDE (_reason_code) FROM etapas_quality WHERE _reason_code IS NULL",
+            quarantine_dir / "valid.parquet",
+        )
 
-    stats: dict[str, Any] = {
-        "generated_at": datetime.now(tz=timezone.utc).isoformat(),
-        "duckdb_version": duckdb.__version__,
-        "git_hash": _git_hash(),
-        "dataset": "etapas",
-        "cut": partition.cut,
-        "year": partition.year,
-        "month": partition.month,
-        "meta_row_count": meta_count,
-        "read_row_count": read_row_count,
-        "valid_row_count": total_valid,
-        "invalid_row_count": total_invalid,
-        "count_assertion": "PASS",
-        "quarantine_rate_pct": round(
-            total_invalid / read_row_count * 100, 4
-        ) if read_row_count else 0,
-        "quarantine_reason_distribution": reason_dist,
-        "pydantic_sample_validation": pydantic_stats,
-        "output_files": [str(out_valid)],
-    }
-    _write_quality(stats, partition.quality_output_dir())
+        # Pydantic
+        con.execute("""
+            CREATE OR REPLACE VIEW etapas_for_pydantic AS
+            SELECT * EXCLUDE (_reason_code) FROM etapas_quality WHERE _reason_code IS NULL
+        """)
+        pydantic_stats = _validate_sample(con, "etapas_for_pydantic", EtapasValidationRow)
+
+        # Count assertion
+        total_valid = con.execute(
+            "SELECT COUNT(*) FROM etapas_quality WHERE _reason_code IS NULL"
+        ).fetchone()[0]  # type: ignore[index]
+        total_invalid = con.execute(
+            "SELECT COUNT(*) FROM etapas_quality WHERE _reason_code IS NOT NULL"
+        ).fetchone()[0]  # type: ignore[index]
+
+        assert read_row_count == total_valid + total_invalid, (
+            f"etapas cut={partition.cut}: read_row_count={read_row_count} "
+            f"!= valid({total_valid}) + invalid({total_invalid})"
+        )
 
-    elapsed = time.monotonic() - t0
-    log.info("etapas | cut=%s | elapsed=%.1fs", partition.cut, elapsed)
-    con.close()
-    return stats
+        reason_dist = con.execute("""
+            SELECT _reason_code, COUNT(*) AS cnt
+            FROM etapas_quality WHERE _reason_code IS NOT NULL
+            GROUP BY _reason_code ORDER BY cnt DESC
+        """).fetchdf().to_dict("records")
+
+        stats: dict[str, Any] = {
+            "generated_at": datetime.now(tz=timezone.utc).isoformat(),
+            "duckdb_version": duckdb.__version__,
+            "git_hash": _git_hash(),
+            "dataset": "etapas",
+            "cut": partition.cut,
+            "year": partition.year,
+            "month": partition.month,
+            "meta_row_count": meta_count,
+            "read_row_count": read_row_count,
+            "valid_row_count": total_valid,
+            "invalid_row_count": total_invalid,
+            "count_assertion": "PASS",
+            "quarantine_rate_pct": round(
+                total_invalid / read_row_count * 100, 4
+            ) if read_row_count else 0,
+            "quarantine_reason_distribution": reason_dist,
+            "pydantic_sample_validation": pydantic_stats,
+            "output_files": [str(p) for _, p in sorted(day_files.items())],
+            "day_partition_key": "date_board_sk",
+            "per_day": _per_day_quality(con, "etapas_quality", "date_board_sk", day_files),
+        }
+        if chunk_stats is not None:
+            stats["chunked"] = chunk_stats
+        _write_quality(stats, partition.quality_output_dir())
+
+        elapsed = time.monotonic() - t0
+        log.info("etapas | cut=%s | elapsed=%.1fs", partition.cut, elapsed)
+        return stats
+    finally:
+        # también si falla un worker o el COPY final: los chunks pueden ocupar GB
+        con.close()
+        if chunk_dir is not None:
+            shutil.rmtree(chunk_dir, ignore_errors=True)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -1027,4 +1340,10 @@ TRANSFORM_REGISTRY: dict[str, Any] = {
     "viajes": transform_viajes,
     "etapas": transform_etapas,
     "subidas_30m": transform_subidas_30m,
+}
+
+# Vistas raw_<ds> → <ds>_quality usadas por los workers del modo chunked
+_QUALITY_VIEW_BUILDERS: dict[str, Any] = {
+    "viajes": _create_viajes_quality_view,
+    "etapas": _create_etapas_quality_view,
 }
\ No newline at end of file
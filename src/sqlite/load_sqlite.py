@@ -7,6 +7,8 @@ CLI:
   python -m src.sqlite.load_sqlite --db gold_sqlite.db --dataset viajes --cut 2025-04-21
   python -m src.sqlite.load_sqlite --db gold_sqlite.db --dataset subidas_30m --cut 2025-04 --overwrite
   python -m src.sqlite.load_sqlite --db gold_sqlite.db --dry-run
+  python -m src.sqlite.load_sqlite --db gold_sqlite.db --dataset etapas --day 20250423
+  python -m src.sqlite.load_sqlite --db gold_sqlite.db --dataset viajes --cut 2025-04-21 --delta
 
 Requisitos: duckdb, sqlite3 (stdlib).  Sin pandas para cargas completas.
 """
@@ -18,23 +20,31 @@ import datetime
 import hashlib
 import json
 import logging
+import queue
+import shutil
 import sqlite3
 import sys
+import tempfile
+import threading
 import time
 from collections import defaultdict
 from pathlib import Path
 from typing import Any, Optional
 
+from src.silver.manifest import current_output_dir, load_snapshot
+
 # ── Constantes de proyecto ────────────────────────────────────────────────────
 LOADER_VERSION  = "1.0.0"
 _PROJECT_ROOT   = Path(__file__).resolve().parents[2]
 PROCESSED_ROOT  = _PROJECT_ROOT / "lake" / "processed" / "dtpm"
 QUALITY_ROOT    = _PROJECT_ROOT / "lake" / "processed" / "_quality"
 QUARANTINE_ROOT = _PROJECT_ROOT / "lake" / "processed" / "_quarantine"
+CDC_ROOT        = _PROJECT_ROOT / "lake" / "processed" / "_cdc"
 DOCS_DIR        = _PROJECT_ROOT / "docs" / "diagnostics"
 DDL_PATH        = _PROJECT_ROOT / "models" / "sqlite" / "ddl_sqlite.sql"
 
 BATCH_SIZE = 5_000   # filas por executemany
+DAY_WORKERS = 4      # lectores DuckDB paralelos para sub-particiones diarias
 
 log = logging.getLogger(__name__)
 
@@ -58,18 +68,49 @@ _MODE_STATIC = [
 def _scan_silver_partitions(
     dataset_filter: Optional[str] = None,
     cut_filter: Optional[str]     = None,
+    day_filter: Optional[list[int]] = None,
+    snapshot_version: Optional[int] = None,
 ) -> list[dict]:
     """
-    Escanea lake/processed/dtpm/ buscando todos los archivos .parquet silver.
-    Intenta primero importar src.silver.catalog.Catalog para obtener metadatos
-    adicionales; si falla, usa un scanner puro de filesystem.
+    Lista los archivos .parquet silver desde el manifest de snapshots
+    (lake/processed/_manifest/, el último o `snapshot_version`); si el lake
+    aún no tiene manifest, escanea lake/processed/dtpm/.
 
     Devuelve una lista de dicts con:
-      dataset, cut, year, month, parquet_type, path (Path)
+      dataset, cut, year, month, parquet_type, path (Path), day (int | None),
+      compacted (bool: path es un archivo multi-cut, ver _materialize_compacted)
     Un mismo (dataset, cut) puede generar varias entradas (trip + leg, etc.).
+    Las sub-particiones diarias (cut=.../day=YYYYMMDD/) generan una entrada
+    por día; `day_filter` limita a esos días (re-run parcial de un cut).
     """
     partitions = []
 
+    snapshot = load_snapshot(snapshot_version)
+    if snapshot is not None:
+        log.info("Manifest: snapshot v%d (%s)", snapshot.version, snapshot.committed_at)
+        day_set = set(day_filter) if day_filter else None
+        files = [
+            f for f in snapshot.logical_files()
+            if (not dataset_filter or dataset_filter == "all" or f.dataset == dataset_filter)
+            and (not cut_filter or f.cut == cut_filter)
+            and (day_set is None or f.day in day_set)
+        ]
+        if snapshot_version is not None:
+            snapshot.verify(files)
+        return [
+            {
+                "dataset":      f.dataset,
+                "cut":          f.cut,
+                "year":         f.year,
+                "month":        f.month,
+                "parquet_type": f.type,
+                "path":         f.abs_path,
+                "day":          f.day,
+                "compacted":    f.is_compacted,
+            }
+            for f in files
+        ]
+
     for dataset_dir in sorted(PROCESSED_ROOT.iterdir()):
         if not dataset_dir.is_dir():
             continue
@@ -88,13 +129,19 @@ def _scan_silver_partitions(
                 month = int(month_dir.name.replace("month=", ""))
 
                 for cut_dir in sorted(month_dir.iterdir()):
-                    if not cut_dir.is_dir():
+                    if not cut_dir.is_dir() or not cut_dir.name.startswith("cut="):
                         continue
                     cut = cut_dir.name.replace("cut=", "")
                     if cut_filter and cut != cut_filter:
                         continue
+                    # Versión de salida vigente del cut (cut=.../v=<id>/)
+                    out_dir = current_output_dir(cut_dir)
+                    if out_dir is None:
+                        continue
 
-                    for pq in sorted(cut_dir.glob("*.parquet")):
+                    for pq in sorted(out_dir.glob("*.parquet")):
+                        if day_filter or pq.name.startswith("._tmp_"):
+                            continue
                         partitions.append({
                             "dataset":      dataset,
                             "cut":          cut,
@@ -102,11 +149,49 @@ def _scan_silver_partitions(
                             "month":        month,
                             "parquet_type": pq.stem,   # e.g. "viajes_trip"
                             "path":         pq,
+                            "day":          None,
+                        })
+
+                    for pq in sorted(out_dir.glob("day=*/*.parquet")):
+                        day = int(pq.parent.name.replace("day=", ""))
+                        if pq.name.startswith("._tmp_") or (day_filter and day not in day_filter):
+                            continue
+                        partitions.append({
+                            "dataset":      dataset,
+                            "cut":          cut,
+                            "year":         year,
+                            "month":        month,
+                            "parquet_type": pq.stem,   # e.g. "etapas_validation"
+                            "path":         pq,
+                            "day":          day,
                         })
 
     return partitions
 
 
+def _materialize_compacted(duck_con: Any, partitions: list[dict], tmp_dir: Path) -> list[dict]:
+    """
+    Las entradas de archivos compactados (multi-cut, src/silver/compaction.py)
+    se reemplazan por un parquet temporal con solo las filas de su cut, en el
+    orden del archivo: el resto del loader sigue leyendo un archivo por cut.
+    """
+    out = []
+    for p in partitions:
+        if not p.get("compacted"):
+            out.append(p)
+            continue
+        dest = tmp_dir / f"{p['dataset']}_{p['cut']}_{p['parquet_type']}.parquet"
+        duck_con.execute(
+            f"""COPY (
+                    SELECT * FROM read_parquet(?, hive_partitioning = false)
+                    WHERE cut = ?
+                ) TO '{dest.as_posix()}' (FORMAT PARQUET)""",
+            [str(p["path"]).replace("\\", "/"), p["cut"]],
+        )
+        out.append({**p, "path": dest, "compacted": False})
+    return out
+
+
 def _group_by_cut(partitions: list[dict]) -> dict[tuple, list[dict]]:
     """Agrupa particiones por (dataset, cut) para procesar por cut."""
     g: dict[tuple, list[dict]] = defaultdict(list)
@@ -486,6 +571,8 @@ def _collect_stop_candidates(duck_con: Any, partitions: list[dict]) -> dict[str,
     """
     Recolecta candidatos SCD2 para dim_stop de todos los parquets.
     Devuelve {stop_code -> [(event_date, hash, (comuna, zona))]} ordenado por fecha.
+    ORDER BY ALL fija qué fila gana cuando un mismo (stop, día) trae varios
+    comuna/zona (sin él dependía del orden del DISTINCT; ver load_duckdb).
     """
     # (stop_code, comuna, zona, event_date) aggregated
     seen: dict[str, dict] = {}  # {stop_code -> {event_date -> (comuna, zona)}}
@@ -515,7 +602,7 @@ def _collect_stop_candidates(duck_con: Any, partitions: list[dict]) -> dict[str,
                 try:
                     rows = duck_con.execute(
                         f"SELECT DISTINCT {s_col}, {sel_c}, {sel_z} FROM read_parquet(?)"
-                        f" WHERE {s_col} IS NOT NULL",
+                        f" WHERE {s_col} IS NOT NULL ORDER BY ALL",
                         [path],
                     ).fetchall()
                 except Exception as e:
@@ -536,7 +623,8 @@ def _collect_stop_candidates(duck_con: Any, partitions: list[dict]) -> dict[str,
                     rows = duck_con.execute(
                         f"SELECT DISTINCT {s_col}, {sel_c}, {sel_z}, {d_col}"
                         f" FROM read_parquet(?)"
-                        f" WHERE {s_col} IS NOT NULL AND {d_col} IS NOT NULL AND {d_col} > 0",
+                        f" WHERE {s_col} IS NOT NULL AND {d_col} IS NOT NULL AND {d_col} > 0"
+                        f" ORDER BY ALL",
                         [path],
                     ).fetchall()
                 except Exception as e:
@@ -598,7 +686,8 @@ def _collect_service_candidates(duck_con: Any, partitions: list[dict]) -> dict[s
                 rows = duck_con.execute(
                     f"SELECT DISTINCT {svc_col}, {sel_mc}, {d_col}"
                     f" FROM read_parquet(?)"
-                    f" WHERE {svc_col} IS NOT NULL AND {d_col} IS NOT NULL AND {d_col} > 0",
+                    f" WHERE {svc_col} IS NOT NULL AND {d_col} IS NOT NULL AND {d_col} > 0"
+                    f" ORDER BY ALL",
                     [path],
                 ).fetchall()
             except Exception as e:
@@ -721,6 +810,85 @@ def _iter_parquet_batches(duck_con: Any, path: str, select_sql: str, batch: int
         yield rows
 
 
+def _iter_parts_batches(
+    duck_con: Any,
+    parts: list[dict],
+    select_sql: str,
+    workers: int = DAY_WORKERS,
+    batch: int = BATCH_SIZE,
+):
+    """
+    Lee varias partes (ej. días de un cut) en paralelo, cada una con su propio
+    cursor DuckDB, y produce (part, rows) en el orden de `parts`: primero
+    todos los lotes de la primera parte, luego los de la segunda, etc. Al
+    terminar cada parte produce (part, None) para que el consumidor haga
+    flush/commit por parte. El orden fijo hace determinista el resultado de
+    INSERT OR IGNORE cuando una clave se repite entre partes.
+    Cada parte tiene su propia cola acotada: los lectores se bloquean si
+    SQLite va más lento, y a lo sumo `workers` partes se leen por delante.
+    """
+    if workers <= 1 or len(parts) <= 1:
+        for p in parts:
+            for rows in _iter_parquet_batches(duck_con, str(p["path"]), select_sql, batch):
+                yield p, rows
+            yield p, None
+        return
+
+    queues = [queue.Queue(maxsize=2) for _ in parts]
+    stop = threading.Event()
+    pending: queue.Queue = queue.Queue()
+    for i in range(len(parts)):
+        pending.put(i)
+
+    def _put(i: int, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                queues[i].put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _reader() -> None:
+        cur = duck_con.cursor()
+        try:
+            while not stop.is_set():
+                try:
+                    i = pending.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    for rows in _iter_parquet_batches(cur, str(parts[i]["path"]), select_sql, batch):
+                        if not _put(i, rows):
+                            return
+                except Exception as exc:  # noqa: BLE001
+                    _put(i, exc)
+                    return
+                _put(i, None)
+        finally:
+            cur.close()
+
+    # Las partes se toman de `pending` en orden, así que la que el consumidor
+    # espera siempre tiene lector: no hay deadlock con colas llenas
+    n_threads = min(workers, len(parts))
+    threads = [threading.Thread(target=_reader, daemon=True) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    try:
+        for i, p in enumerate(parts):
+            while True:
+                rows = queues[i].get()
+                if isinstance(rows, Exception):
+                    raise rows
+                yield p, rows
+                if rows is None:
+                    break
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(timeout=5)
+
+
 # =============================================================================
 # VIII.  HECHOS
 # =============================================================================
@@ -782,8 +950,8 @@ def _load_fct_trip(
                 d_end_sk = caches.date.get(int(dend)) if dend else None
                 if d_end_sk is None and dend: misses["date_end"]["miss"] += 1
 
-                ts_start = caches.time.get(int(tstart)) if tstart else None
-                ts_end   = caches.time.get(int(tend)) if tend else None
+                ts_start = caches.time.get(int(tstart)) if tstart is not None else None
+                ts_end   = caches.time.get(int(tend)) if tend is not None else None
 
                 misses["origin_stop"]["total"] += 1
                 o_sk = caches.resolve_stop(conn, pini, ed)
@@ -890,8 +1058,8 @@ def _load_fct_trip_leg(
                 da_sk = caches.date.get(int(dalight)) if dalight else None
                 if da_sk is None and dalight: misses["date_alight"]["miss"] += 1
 
-                tb_sk = caches.time.get(int(tboard)) if tboard else None
-                ta_sk = caches.time.get(int(talight)) if talight else None
+                tb_sk = caches.time.get(int(tboard)) if tboard is not None else None
+                ta_sk = caches.time.get(int(talight)) if talight is not None else None
 
                 misses["mode"]["total"] += 1
                 m_sk = caches.mode.get((mode_code or "").strip().upper())
@@ -954,9 +1122,18 @@ def _load_fct_validation(
     dataset: str,
     cut: str,
     diag: dict,
+    day_workers: int = DAY_WORKERS,
 ) -> tuple[int, int]:
-    """Carga fct_validation desde etapas_validation.parquet."""
-    val_parts = [p for p in cut_parts if p["parquet_type"] == "etapas_validation"]
+    """
+    Carga fct_validation desde etapas_validation.parquet.  Con sub-particiones
+    diarias los días se leen en paralelo, pero el único writer SQLite los
+    inserta en orden ascendente de día y commitea al cerrar cada uno: con
+    UNIQUE(cut, id_etapa) el día más temprano gana la clave en todo run.
+    """
+    val_parts = sorted(
+        (p for p in cut_parts if p["parquet_type"] == "etapas_validation"),
+        key=lambda p: p.get("day") or 0,
+    )
     if not val_parts:
         return 0, 0
 
@@ -974,97 +1151,97 @@ def _load_fct_validation(
     VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
     """
 
-    for p in val_parts:
-        path = str(p["path"])
-        q = """SELECT cut, id_etapa, operador, contrato, tipo_dia, tipo_transporte,
-                      fExpansionServicioPeriodoTS, tiene_bajada, tiempo_etapa,
-                      date_board_sk, time_board_30m_sk, date_alight_sk, time_alight_30m_sk,
-                      dist_ruta_paraderos, dist_eucl_paraderos, tEsperaMediaIntervalo,
-                      parada_subida, parada_bajada,
-                      servicio_subida, servicio_bajada,
-                      periodoSubida, periodoBajada
-               FROM read_parquet(?)"""
-        batch_rows = []
-        for chunk in _iter_parquet_batches(duck_con, path, q):
-            for r in chunk:
-                (r_cut, id_etapa, operador, contrato, tipo_dia, tipo_trans,
-                 factor_exp, tiene_baj, tiempo_etapa,
-                 dboard, tboard, dalight, talight,
-                 dist_ruta, dist_eucl, t_espera,
-                 p_subida, p_bajada,
-                 s_subida, s_bajada,
-                 per_subida, per_bajada) = r
-
-                ed = _sk_to_date(dboard)
-
-                misses["date_board"]["total"] += 1
-                db_sk = caches.date.get(int(dboard)) if dboard else None
-                if db_sk is None and dboard: misses["date_board"]["miss"] += 1
-
-                misses["date_alight"]["total"] += 1
-                da_sk = caches.date.get(int(dalight)) if dalight else None
-                if da_sk is None and dalight: misses["date_alight"]["miss"] += 1
-
-                tb_sk = caches.time.get(int(tboard)) if tboard else None
-                ta_sk = caches.time.get(int(talight)) if talight else None
-
-                misses["board_stop"]["total"] += 1
-                bs_sk = caches.resolve_stop(conn, p_subida, ed)
-                if bs_sk is None and p_subida: misses["board_stop"]["miss"] += 1
-
-                misses["alight_stop"]["total"] += 1
-                as_sk = caches.resolve_stop(conn, p_bajada, ed)
-                if as_sk is None and p_bajada: misses["alight_stop"]["miss"] += 1
-
-                misses["board_service"]["total"] += 1
-                bsvc_sk = caches.resolve_service(conn, s_subida, ed)
-                if bsvc_sk is None and s_subida: misses["board_service"]["miss"] += 1
-
-                misses["alight_service"]["total"] += 1
-                asvc_sk = caches.resolve_service(conn, s_bajada, ed)
-                if asvc_sk is None and s_bajada: misses["alight_service"]["miss"] += 1
-
-                misses["fare_board"]["total"] += 1
-                fpb_sk = caches.fare.get((per_subida or "").strip().upper())
-                if fpb_sk is None and per_subida: misses["fare_board"]["miss"] += 1
-
-                misses["fare_alight"]["total"] += 1
-                fpa_sk = caches.fare.get((per_bajada or "").strip().upper())
-                if fpa_sk is None and per_bajada: misses["fare_alight"]["miss"] += 1
-
-                op_n = (operador  or "UNKNOWN").strip().upper()
-                ct_n = (contrato  or "UNKNOWN").strip().upper()
-                oc_sk = caches.op_ct.get((op_n, ct_n))
-                misses["operator_contract"]["total"] += 1
-                if oc_sk is None: misses["operator_contract"]["miss"] += 1
-
-                tiene_baj_int = 1 if tiene_baj else 0
-                cut_str = str(r_cut) if r_cut else cut
-                batch_rows.append((
-                    cut_sk, db_sk, tb_sk, da_sk, ta_sk,
-                    bs_sk, as_sk, bsvc_sk, asvc_sk,
-                    fpb_sk, fpa_sk, oc_sk,
-                    cut_str, id_etapa, tipo_dia, tipo_trans,
-                    factor_exp, tiene_baj_int, tiempo_etapa,
-                    dist_ruta, dist_eucl, t_espera,
-                ))
-
-            if len(batch_rows) >= BATCH_SIZE:
+    q = """SELECT cut, id_etapa, operador, contrato, tipo_dia, tipo_transporte,
+                  fExpansionServicioPeriodoTS, tiene_bajada, tiempo_etapa,
+                  date_board_sk, time_board_30m_sk, date_alight_sk, time_alight_30m_sk,
+                  dist_ruta_paraderos, dist_eucl_paraderos, tEsperaMediaIntervalo,
+                  parada_subida, parada_bajada,
+                  servicio_subida, servicio_bajada,
+                  periodoSubida, periodoBajada
+           FROM read_parquet(?)"""
+    batch_rows = []
+    for p, chunk in _iter_parts_batches(duck_con, val_parts, q, workers=day_workers):
+        if chunk is None:
+            # Fin de la parte (un día con sub-particiones diarias): flush + commit
+            if batch_rows:
                 _before = conn.total_changes
                 conn.executemany(sql_insert, batch_rows)
                 ins = conn.total_changes - _before
                 inserted_total += ins
                 ignored_total  += len(batch_rows) - ins
                 batch_rows = []
-
-        if batch_rows:
+            conn.commit()
+            continue
+        for r in chunk:
+            (r_cut, id_etapa, operador, contrato, tipo_dia, tipo_trans,
+             factor_exp, tiene_baj, tiempo_etapa,
+             dboard, tboard, dalight, talight,
+             dist_ruta, dist_eucl, t_espera,
+             p_subida, p_bajada,
+             s_subida, s_bajada,
+             per_subida, per_bajada) = r
+
+            ed = _sk_to_date(dboard)
+
+            misses["date_board"]["total"] += 1
+            db_sk = caches.date.get(int(dboard)) if dboard else None
+            if db_sk is None and dboard: misses["date_board"]["miss"] += 1
+
+            misses["date_alight"]["total"] += 1
+            da_sk = caches.date.get(int(dalight)) if dalight else None
+            if da_sk is None and dalight: misses["date_alight"]["miss"] += 1
+
+            tb_sk = caches.time.get(int(tboard)) if tboard is not None else None
+            ta_sk = caches.time.get(int(talight)) if talight is not None else None
+
+            misses["board_stop"]["total"] += 1
+            bs_sk = caches.resolve_stop(conn, p_subida, ed)
+            if bs_sk is None and p_subida: misses["board_stop"]["miss"] += 1
+
+            misses["alight_stop"]["total"] += 1
+            as_sk = caches.resolve_stop(conn, p_bajada, ed)
+            if as_sk is None and p_bajada: misses["alight_stop"]["miss"] += 1
+
+            misses["board_service"]["total"] += 1
+            bsvc_sk = caches.resolve_service(conn, s_subida, ed)
+            if bsvc_sk is None and s_subida: misses["board_service"]["miss"] += 1
+
+            misses["alight_service"]["total"] += 1
+            asvc_sk = caches.resolve_service(conn, s_bajada, ed)
+            if asvc_sk is None and s_bajada: misses["alight_service"]["miss"] += 1
+
+            misses["fare_board"]["total"] += 1
+            fpb_sk = caches.fare.get((per_subida or "").strip().upper())
+            if fpb_sk is None and per_subida: misses["fare_board"]["miss"] += 1
+
+            misses["fare_alight"]["total"] += 1
+            fpa_sk = caches.fare.get((per_bajada or "").strip().upper())
+            if fpa_sk is None and per_bajada: misses["fare_alight"]["miss"] += 1
+
+            op_n = (operador  or "UNKNOWN").strip().upper()
+            ct_n = (contrato  or "UNKNOWN").strip().upper()
+            oc_sk = caches.op_ct.get((op_n, ct_n))
+            misses["operator_contract"]["total"] += 1
+            if oc_sk is None: misses["operator_contract"]["miss"] += 1
+
+            tiene_baj_int = 1 if tiene_baj else 0
+            cut_str = str(r_cut) if r_cut else cut
+            batch_rows.append((
+                cut_sk, db_sk, tb_sk, da_sk, ta_sk,
+                bs_sk, as_sk, bsvc_sk, asvc_sk,
+                fpb_sk, fpa_sk, oc_sk,
+                cut_str, id_etapa, tipo_dia, tipo_trans,
+                factor_exp, tiene_baj_int, tiempo_etapa,
+                dist_ruta, dist_eucl, t_espera,
+            ))
+
+        if len(batch_rows) >= BATCH_SIZE:
             _before = conn.total_changes
             conn.executemany(sql_insert, batch_rows)
             ins = conn.total_changes - _before
             inserted_total += ins
             ignored_total  += len(batch_rows) - ins
-
-        conn.commit()
+            batch_rows = []
 
     diag["facts"]["fct_validation"]["miss_rates"] = {
         k: {"total": v["total"], "miss": v["miss"],
@@ -1155,6 +1332,117 @@ def _load_fct_boardings_30m(
     return inserted_total, ignored_total
 
 
+# =============================================================================
+# VIII-b.  DELTA CDC (--delta)
+# =============================================================================
+
+# Grain SQLite (sin cut) y facts afectados por dataset.  El UNIQUE de fct_trip
+# es (cut, id_viaje) — más grueso que la clave CDC (id_tarjeta, id_viaje) — y el
+# de fct_validation (cut, id_etapa) lo es respecto de (id_etapa, tiempo_subida);
+# así que las claves CDC se proyectan a este grain antes de borrar/re-insertar.
+_DELTA_GRAIN: dict[str, tuple[str, ...]] = {
+    "viajes":      ("id_viaje",),
+    "etapas":      ("id_etapa",),
+    "subidas_30m": ("stop_code", "mode_code", "tipo_dia", "time_30m_sk"),
+}
+_DELTA_FACTS: dict[str, list[str]] = {
+    "viajes":      ["fct_trip_leg", "fct_trip"],   # legs primero (FK lógica)
+    "etapas":      ["fct_validation"],
+    "subidas_30m": ["fct_boardings_30m"],
+}
+
+
+def _cdc_dir(part: dict) -> Path:
+    return (
+        CDC_ROOT / f"dataset={part['dataset']}" / f"year={part['year']}"
+        / f"month={part['month']:02d}" / f"cut={part['cut']}"
+    )
+
+
+def _load_cdc_json(part: dict) -> Optional[dict]:
+    """cdc.json del cut (generado por transform_silver --cdc); None si no existe."""
+    path = _cdc_dir(part) / "cdc.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _build_delta_parts(
+    duck_con: Any,
+    cut_parts: list[dict],
+    tmp_dir: Path,
+) -> tuple[list[dict], list[tuple]]:
+    """
+    Reduce las partes de un cut al delta CDC.
+
+    Devuelve (parts, keys): una parte por parquet_type con las filas Silver
+    completas de las claves afectadas (inserted ∪ updated ∪ deleted,
+    proyectadas al grain SQLite) y la lista de esas claves.  Las filas se
+    leen del Silver completo en orden de archivo para que INSERT OR IGNORE
+    elija la misma fila que una recarga completa.
+    """
+    first = cut_parts[0]
+    ds, cut = first["dataset"], first["cut"]
+    cdc_dir = _cdc_dir(first)
+    grain = _DELTA_GRAIN[ds]
+    cols = ", ".join(grain)
+
+    key_files = [str(p).replace("\\", "/") for p in sorted(cdc_dir.glob("*/*.parquet"))]
+    key_files.append(str(cdc_dir / "deleted.parquet").replace("\\", "/"))
+    duck_con.execute(
+        f"CREATE OR REPLACE TEMP TABLE _cdc_keys AS SELECT DISTINCT {cols} "
+        f"FROM read_parquet(?, union_by_name = true, hive_partitioning = false)",
+        [key_files],
+    )
+    keys = duck_con.execute(f"SELECT {cols} FROM _cdc_keys").fetchall()
+    semi_on = " AND ".join(f"t.{k} IS NOT DISTINCT FROM c.{k}" for k in grain)
+
+    by_type: dict[str, list[str]] = defaultdict(list)
+    for p in cut_parts:
+        by_type[p["parquet_type"]].append(str(p["path"]).replace("\\", "/"))
+
+    delta_parts = []
+    for ptype, paths in sorted(by_type.items()):
+        dest = tmp_dir / f"{ds}_{cut}_{ptype}.parquet"
+        duck_con.execute(
+            f"""COPY (
+                    SELECT t.* EXCLUDE (filename, file_row_number)
+                    FROM read_parquet(?, hive_partitioning = false,
+                                      filename = true, file_row_number = true) t
+                    SEMI JOIN _cdc_keys c ON {semi_on}
+                    ORDER BY t.filename, t.file_row_number
+                ) TO '{dest.as_posix()}' (FORMAT PARQUET)""",
+            [sorted(paths)],
+        )
+        delta_parts.append({**first, "parquet_type": ptype, "path": dest, "day": None})
+    return delta_parts, keys
+
+
+def _delete_delta_keys(
+    conn: sqlite3.Connection,
+    dataset: str,
+    cut: str,
+    keys: list[tuple],
+) -> int:
+    """Borra del cut las filas de las claves del delta.  Devuelve filas borradas."""
+    grain = _DELTA_GRAIN[dataset]
+    if dataset == "subidas_30m":
+        # Mismo normalizado que _load_fct_boardings_30m
+        keys = [
+            ((sc or "").strip().upper(), (mc or "").strip().upper(), td or "",
+             int(t) if t is not None else None)
+            for sc, mc, td, t in keys
+        ]
+    where = " AND ".join(f"{k} IS ?" for k in grain)
+    before = conn.total_changes
+    for table in _DELTA_FACTS[dataset]:
+        conn.executemany(
+            f"DELETE FROM {table} WHERE cut = ? AND {where}",
+            [(cut, *k) for k in keys],
+        )
+    return conn.total_changes - before
+
+
 # =============================================================================
 # IX.  DIAGNÓSTICO
 # =============================================================================
@@ -1228,7 +1516,7 @@ def _write_diagnostics(records: list[dict]) -> None:
     json_path.write_text(
         json.dumps({"generated_at": datetime.datetime.utcnow().isoformat() + "Z",
                     "loader_version": LOADER_VERSION,
-                    "partitions": records}, indent=2, ensure_ascii=False),
+                    "partitions": records}, indent=2, ensure_ascii=False, default=str),
         encoding="utf-8",
     )
 
@@ -1291,19 +1579,27 @@ class SqliteLoader:
         cut: Optional[str],
         overwrite: bool,
         dry_run: bool,
+        days: Optional[list[int]] = None,
+        day_workers: int = DAY_WORKERS,
+        delta: bool = False,
+        snapshot_version: Optional[int] = None,
     ):
-        self.db_path   = db_path
-        self.dataset   = dataset
-        self.cut       = cut
-        self.overwrite = overwrite
-        self.dry_run   = dry_run
+        self.db_path     = db_path
+        self.dataset     = dataset
+        self.cut         = cut
+        self.overwrite   = overwrite
+        self.dry_run     = dry_run
+        self.days        = days
+        self.day_workers = day_workers
+        self.delta       = delta
+        self.snapshot_version = snapshot_version
 
     # ── Paso 1: Descubrir particiones ─────────────────────────────────────────
     def _discover(self) -> list[dict]:
-        parts = _scan_silver_partitions(self.dataset, self.cut)
+        parts = _scan_silver_partitions(self.dataset, self.cut, self.days, self.snapshot_version)
         if not parts:
-            log.warning("No se encontraron particiones para dataset=%s cut=%s",
-                        self.dataset, self.cut)
+            log.warning("No se encontraron particiones para dataset=%s cut=%s days=%s",
+                        self.dataset, self.cut, self.days)
         return parts
 
     # ── Paso 2: Dry-run ──────────────────────────────────────────────────────
@@ -1315,7 +1611,15 @@ class SqliteLoader:
         for (ds, cut), ps in sorted(groups.items()):
             print(f"  ├─ dataset={ds}  cut={cut}")
             for p in ps:
-                print(f"  │    {p['parquet_type']:25s}  {p['path'].stat().st_size // 1024:>8d} KB")
+                name = p["parquet_type"] + (f" day={p['day']}" if p.get("day") else "")
+                print(f"  │    {name:25s}  {p['path'].stat().st_size // 1024:>8d} KB")
+            c = _load_cdc_json(ps[0]) if self.delta else None
+            if c:
+                print(f"  │    delta   → cdc_id={c['cdc_id']} inserted={c['inserted_keys']} "
+                      f"updated={c['updated_keys']} deleted={c['deleted_keys']} keys "
+                      f"({c['delta_fraction_pct']}% filas)")
+            elif self.delta:
+                print(f"  │    delta   → sin cdc.json: carga completa")
             q = _load_quality_json(ds, cut)
             if q:
                 print(f"  │    quality → valid={q.get('valid_row_count','?')} "
@@ -1347,8 +1651,36 @@ class SqliteLoader:
         duck_con = _duckdb_conn()
 
         diag_records: list[dict] = []
+        work_tmp = (
+            Path(tempfile.mkdtemp(prefix="sqlite_load_"))
+            if self.delta or any(p.get("compacted") for p in parts) else None
+        )
+        delta_keys: dict[tuple, list[tuple]] = {}
+        cdc_meta: dict[tuple, dict] = {}
 
         try:
+            # ── [0a] Compactados → un parquet temporal por cut ──────────────
+            if any(p.get("compacted") for p in parts):
+                parts = _materialize_compacted(duck_con, parts, work_tmp)
+
+            # ── [0b] Delta CDC: reducir cada cut a sus claves afectadas ─────
+            if self.delta:
+                reduced: list[dict] = []
+                for (ds, cut), cut_parts in sorted(_group_by_cut(parts).items()):
+                    cdc = _load_cdc_json(cut_parts[0])
+                    if cdc is None:
+                        log.warning("--delta: %s/%s sin cdc.json — carga completa del cut",
+                                    ds, cut)
+                        reduced.extend(cut_parts)
+                        continue
+                    dparts, keys = _build_delta_parts(duck_con, cut_parts, work_tmp)
+                    log.info("--delta: %s/%s cdc_id=%s → %d claves afectadas",
+                             ds, cut, cdc["cdc_id"], len(keys))
+                    reduced.extend(dparts)
+                    delta_keys[(ds, cut)] = keys
+                    cdc_meta[(ds, cut)] = cdc
+                parts = reduced
+
             # ── [A] Dims globales (una vez para toda la carga) ──────────────
             log.info("=== [A] Cargando dimensiones globales ===")
             cut_cache    = _load_dim_cut(conn, parts)
@@ -1430,7 +1762,10 @@ class SqliteLoader:
                 }
                 for p in cut_parts:
                     nrows = _count_parquet_rows(duck_con, str(p["path"]))
-                    drec["silver_rows"][p["parquet_type"]] = nrows
+                    # Sub-particiones diarias: se acumulan por parquet_type
+                    drec["silver_rows"][p["parquet_type"]] = (
+                        drec["silver_rows"].get(p["parquet_type"], 0) + nrows
+                    )
                     grain = grain_by_type.get(p["parquet_type"], [])
                     if grain:
                         dup_cnt, dup_keys = _detect_duplicates(duck_con, str(p["path"]), grain)
@@ -1439,9 +1774,9 @@ class SqliteLoader:
                                     "etapas_validation": "fct_validation", "subidas_30m": "fct_boardings_30m"}
                         fn = fact_map.get(p["parquet_type"])
                         if fn:
-                            drec["facts"][fn]["dup_count"] = dup_cnt
+                            drec["facts"][fn]["dup_count"] += max(dup_cnt, 0)
                             if dup_cnt and dup_cnt > 0:
-                                drec["facts"][fn]["dup_keys_top20"] = dup_keys
+                                drec["facts"][fn].setdefault("dup_keys_top20", []).extend(dup_keys)
                                 log.warning("  DUPLICADOS en %s/%s %s: %d grupos",
                                             ds, cut, p["parquet_type"], dup_cnt)
 
@@ -1464,6 +1799,20 @@ class SqliteLoader:
                 # Cargar facts dentro de una transacción por cut
                 try:
                     conn.execute("BEGIN")
+                    if (ds, cut) in delta_keys:
+                        deleted = _delete_delta_keys(conn, ds, cut, delta_keys[(ds, cut)])
+                        cdc = cdc_meta[(ds, cut)]
+                        drec["cdc"] = {
+                            "cdc_id":        cdc["cdc_id"],
+                            "inserted_keys": cdc["inserted_keys"],
+                            "updated_keys":  cdc["updated_keys"],
+                            "deleted_keys":  cdc["deleted_keys"],
+                            "affected_keys": len(delta_keys[(ds, cut)]),
+                            "deleted_rows":  deleted,
+                        }
+                        log.info("  delta: %d filas borradas para %d claves",
+                                 deleted, len(delta_keys[(ds, cut)]))
+
                     ins, ign = _load_fct_trip(conn, duck_con, cut_parts, caches, ds, cut, drec)
                     drec["facts"]["fct_trip"]["inserted"] = ins
                     drec["facts"]["fct_trip"]["ignored"]  = ign
@@ -1472,7 +1821,8 @@ class SqliteLoader:
                     drec["facts"]["fct_trip_leg"]["inserted"] = ins
                     drec["facts"]["fct_trip_leg"]["ignored"]  = ign
 
-                    ins, ign = _load_fct_validation(conn, duck_con, cut_parts, caches, ds, cut, drec)
+                    ins, ign = _load_fct_validation(conn, duck_con, cut_parts, caches, ds, cut, drec,
+                                                    day_workers=self.day_workers)
                     drec["facts"]["fct_validation"]["inserted"] = ins
                     drec["facts"]["fct_validation"]["ignored"]  = ign
 
@@ -1499,6 +1849,8 @@ class SqliteLoader:
             _write_diagnostics(diag_records)
             conn.close()
             duck_con.close()
+            if work_tmp is not None:
+                shutil.rmtree(work_tmp, ignore_errors=True)
 
         elapsed = round(time.perf_counter() - t0, 1)
         any_fail = any(r["status"] == "FAILED" for r in diag_records)
@@ -1525,6 +1877,16 @@ def _build_parser() -> argparse.ArgumentParser:
                    help="Filtro de cut (ej: 2025-04-21). Omitir para todos.")
     p.add_argument("--overwrite", action="store_true",
                    help="Eliminar DB existente antes de cargar (reset total).")
+    p.add_argument("--day", dest="days", action="append", type=int, default=None,
+                   metavar="YYYYMMDD",
+                   help="Solo estos días de cuts con sub-particiones diarias (repetible).")
+    p.add_argument("--day-workers", type=int, default=DAY_WORKERS,
+                   help=f"Lectores paralelos por día (default: {DAY_WORKERS})")
+    p.add_argument("--snapshot", dest="snapshot_version", type=int, default=None, metavar="N",
+                   help="Fijar la lectura Silver al snapshot N del manifest (default: el último).")
+    p.add_argument("--delta", action="store_true",
+                   help="Aplicar solo el delta CDC de cada cut (lake/processed/_cdc/, "
+                        "generado con transform_silver --cdc).")
     p.add_argument("--dry-run", action="store_true",
                    help="Solo imprime el plan; no carga datos.")
     p.add_argument("--log-level", default="INFO",
@@ -1536,6 +1898,8 @@ def _build_parser() -> argparse.ArgumentParser:
 def main() -> None:
     parser = _build_parser()
     args   = parser.parse_args()
+    if args.delta and args.overwrite:
+        parser.error("--delta aplica sobre una DB ya cargada; no combinar con --overwrite")
 
     logging.basicConfig(
         level=getattr(logging, args.log_level),
@@ -1550,6 +1914,10 @@ def main() -> None:
         cut       = args.cut,
         overwrite = args.overwrite,
         dry_run   = args.dry_run,
+        days      = args.days,
+        day_workers = args.day_workers,
+        delta     = args.delta,
+        snapshot_version = args.snapshot_version,
     )
     sys.exit(loader.run())
 
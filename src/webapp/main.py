@@ -16,6 +16,7 @@ from src.webapp.query_service import (
     query_map_points,
     query_overview,
     query_top_boardings,
+    snapshot_version,
 )
 
 
@@ -73,6 +74,7 @@ def health() -> dict:
     return {
         "status": "ok",
         "data_ready": ensure_data_ready(),
+        "snapshot_version": snapshot_version(),
     }
 
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -7,9 +8,14 @@ from typing import Any
 import duckdb
 from pyproj import Transformer
 
+from src.silver.manifest import Snapshot, current_output_dir, latest_version, load_snapshot
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 PROCESSED_ROOT = PROJECT_ROOT / "lake" / "processed" / "dtpm"
 
+# Fija las consultas a un snapshot del manifest (default: el último publicado)
+SNAPSHOT_VERSION = int(os.environ["LAKE_SNAPSHOT_VERSION"]) if os.environ.get("LAKE_SNAPSHOT_VERSION") else None
+
 ALLOWED_DAY_TYPES = {"LABORAL", "SABADO", "DOMINGO"}
 ALLOWED_MODES = {"BUS", "METRO", "METROTREN", "ZP"}
 
@@ -57,9 +63,54 @@ def _normalize_list(values: list[str] | None, allowed: set[str]) -> list[str]:
     return [v for v in normalized if v in allowed]
 
 
-def _parquet_glob(dataset: str, filename: str) -> str:
-    p = PROCESSED_ROOT / f"dataset={dataset}" / "year=*" / "month=*" / "cut=*" / filename
-    return str(p).replace("\\", "/")
+_SNAPSHOT_CACHE: dict[int, Snapshot] = {}
+
+
+def _snapshot() -> Snapshot | None:
+    """Snapshot fijado o el último; se re-parsea solo cuando cambia `_latest`."""
+    version = SNAPSHOT_VERSION if SNAPSHOT_VERSION is not None else latest_version()
+    if version is None:
+        return None
+    if version not in _SNAPSHOT_CACHE:
+        _SNAPSHOT_CACHE.clear()
+        _SNAPSHOT_CACHE[version] = load_snapshot(version)
+    return _SNAPSHOT_CACHE[version]
+
+
+def snapshot_version() -> int | None:
+    """Versión de datos que ven las consultas (None = lake sin manifest)."""
+    snap = _snapshot()
+    return snap.version if snap else None
+
+
+def _parquet_source(dataset: str, filename: str) -> str:
+    """
+    Expresión de tabla SQL: archivos del snapshot del manifest (incluye los
+    compactados, filtrados por cut), o la versión vigente de cada cut en
+    processed/dtpm si el lake aún no tiene manifest.
+    """
+    snap = _snapshot()
+    if snap is not None:
+        return snap.read_sql(dataset, Path(filename).stem)
+    paths = ", ".join(f"'{p.as_posix()}'" for p in _current_files(dataset, filename))
+    return f"read_parquet([{paths}], hive_partitioning = false, union_by_name = true)"
+
+
+def _current_files(dataset: str, filename: str) -> list[Path]:
+    """Sin manifest: `filename` en la versión vigente de cada cut (incluye day=*/)."""
+    return [
+        p
+        for cut_dir in sorted((PROCESSED_ROOT / f"dataset={dataset}").glob("year=*/month=*/cut=*"))
+        if (out_dir := current_output_dir(cut_dir)) is not None
+        for p in sorted(out_dir.glob(f"**/{filename}"))
+    ]
+
+
+def _has_files(dataset: str, filename: str) -> bool:
+    snap = _snapshot()
+    if snap is not None:
+        return bool(snap.select(dataset=dataset, type=Path(filename).stem))
+    return bool(_current_files(dataset, filename))
 
 
 def _build_predicates(
@@ -113,44 +164,22 @@ def _fetch_rows(sql: str, params: list[Any]) -> list[dict[str, Any]]:
 
 
 def ensure_data_ready() -> bool:
-    viajes_glob = _parquet_glob("viajes", "viajes_trip.parquet")
-    etapas_glob = _parquet_glob("etapas", "etapas_validation.parquet")
-    subidas_glob = _parquet_glob("subidas_30m", "subidas_30m.parquet")
-
-    sql = f"""
-    WITH counts AS (
-      SELECT
-        (SELECT COUNT(*) FROM glob('{viajes_glob}')) AS viajes_files,
-        (SELECT COUNT(*) FROM glob('{etapas_glob}')) AS etapas_files,
-        (SELECT COUNT(*) FROM glob('{subidas_glob}')) AS subidas_files
+    return (
+        _has_files("viajes", "viajes_trip.parquet")
+        and _has_files("etapas", "etapas_validation.parquet")
+        and _has_files("subidas_30m", "subidas_30m.parquet")
     )
-    SELECT CASE
-      WHEN viajes_files > 0 AND etapas_files > 0 AND subidas_files > 0 THEN TRUE
-      ELSE FALSE
-    END AS ready
-    FROM counts
-    """
-    rows = _fetch_rows(sql, [])
-    return bool(rows and rows[0].get("ready"))
 
 
 def ensure_map_points_ready() -> bool:
-        subidas_glob = _parquet_glob("subidas_30m", "subidas_30m.parquet")
-        etapas_glob = _parquet_glob("etapas", "etapas_validation.parquet")
-        sql = f"""
-        SELECT CASE
-            WHEN (SELECT COUNT(*) FROM glob('{subidas_glob}')) > 0
-             AND (SELECT COUNT(*) FROM glob('{etapas_glob}')) > 0
-            THEN TRUE ELSE FALSE
-        END AS ready
-        """
-        rows = _fetch_rows(sql, [])
-        return bool(rows and rows[0].get("ready"))
+        return _has_files("subidas_30m", "subidas_30m.parquet") and _has_files(
+                "etapas", "etapas_validation.parquet"
+        )
 
 
 def query_map_points(filters: QueryFilters, limit: int = 400) -> list[dict[str, Any]]:
-        subidas_glob = _parquet_glob("subidas_30m", "subidas_30m.parquet")
-        etapas_glob = _parquet_glob("etapas", "etapas_validation.parquet")
+        subidas_src = _parquet_source("subidas_30m", "subidas_30m.parquet")
+        etapas_src = _parquet_source("etapas", "etapas_validation.parquet")
         subidas_where, subidas_params = _build_predicates(
                 _subidas_filters(filters),
                 cut_col="s.cut",
@@ -177,7 +206,7 @@ def query_map_points(filters: QueryFilters, limit: int = 400) -> list[dict[str,
                         parada_subida AS stop_code,
                         CAST(x_subida AS DOUBLE) AS x_utm,
                         CAST(y_subida AS DOUBLE) AS y_utm
-                    FROM read_parquet('{etapas_glob}')
+                    FROM {etapas_src}
                     WHERE parada_subida IS NOT NULL
                         AND TRIM(parada_subida) <> ''
                         AND x_subida BETWEEN 200000 AND 500000
@@ -189,7 +218,7 @@ def query_map_points(filters: QueryFilters, limit: int = 400) -> list[dict[str,
                         parada_bajada AS stop_code,
                         CAST(x_bajada AS DOUBLE) AS x_utm,
                         CAST(y_bajada AS DOUBLE) AS y_utm
-                    FROM read_parquet('{etapas_glob}')
+                    FROM {etapas_src}
                     WHERE parada_bajada IS NOT NULL
                         AND TRIM(parada_bajada) <> ''
                         AND x_bajada BETWEEN 200000 AND 500000
@@ -209,7 +238,7 @@ def query_map_points(filters: QueryFilters, limit: int = 400) -> list[dict[str,
                 ANY_VALUE(s.comuna) AS comuna,
                 ROUND(SUM(s.subidas_promedio), 2) AS etapas_estimadas,
                 COUNT(*) AS etapas_observadas
-            FROM read_parquet('{subidas_glob}') s
+            FROM {subidas_src} s
             {subidas_where}
             GROUP BY 1,2,3,4,5
         )
@@ -258,9 +287,9 @@ def query_map_points(filters: QueryFilters, limit: int = 400) -> list[dict[str,
 
 
 def query_overview(filters: QueryFilters) -> list[dict[str, Any]]:
-    viajes_glob = _parquet_glob("viajes", "viajes_trip.parquet")
-    etapas_glob = _parquet_glob("etapas", "etapas_validation.parquet")
-    subidas_glob = _parquet_glob("subidas_30m", "subidas_30m.parquet")
+    viajes_src = _parquet_source("viajes", "viajes_trip.parquet")
+    etapas_src = _parquet_source("etapas", "etapas_validation.parquet")
+    subidas_src = _parquet_source("subidas_30m", "subidas_30m.parquet")
 
     viajes_where, viajes_params = _build_predicates(filters, cut_col="cut")
     etapas_where, etapas_params = _build_predicates(
@@ -280,18 +309,18 @@ def query_overview(filters: QueryFilters) -> list[dict[str, Any]]:
 
     sql = f"""
     SELECT
-      (SELECT COUNT(*) FROM read_parquet('{viajes_glob}') {viajes_where}) AS viajes_observados,
-      (SELECT COALESCE(ROUND(SUM(factor_expansion), 2), 0) FROM read_parquet('{viajes_glob}') {viajes_where}) AS viajes_estimados,
-      (SELECT COUNT(*) FROM read_parquet('{etapas_glob}') {etapas_where}) AS etapas_observadas,
-      (SELECT COALESCE(ROUND(SUM(fExpansionServicioPeriodoTS), 2), 0) FROM read_parquet('{etapas_glob}') {etapas_where}) AS etapas_estimadas,
-      (SELECT COALESCE(ROUND(SUM(subidas_promedio), 2), 0) FROM read_parquet('{subidas_glob}') {subidas_where}) AS subidas_promedio_total
+      (SELECT COUNT(*) FROM {viajes_src} {viajes_where}) AS viajes_observados,
+      (SELECT COALESCE(ROUND(SUM(factor_expansion), 2), 0) FROM {viajes_src} {viajes_where}) AS viajes_estimados,
+      (SELECT COUNT(*) FROM {etapas_src} {etapas_where}) AS etapas_observadas,
+      (SELECT COALESCE(ROUND(SUM(fExpansionServicioPeriodoTS), 2), 0) FROM {etapas_src} {etapas_where}) AS etapas_estimadas,
+      (SELECT COALESCE(ROUND(SUM(subidas_promedio), 2), 0) FROM {subidas_src} {subidas_where}) AS subidas_promedio_total
     """
     params = viajes_params + viajes_params + etapas_params + etapas_params + subidas_params
     return _fetch_rows(sql, params)
 
 
 def query_demand_by_day_type(filters: QueryFilters) -> list[dict[str, Any]]:
-    etapas_glob = _parquet_glob("etapas", "etapas_validation.parquet")
+    etapas_src = _parquet_source("etapas", "etapas_validation.parquet")
     where_clause, params = _build_predicates(
         filters,
         cut_col="cut",
@@ -303,7 +332,7 @@ def query_demand_by_day_type(filters: QueryFilters) -> list[dict[str, Any]]:
       tipo_dia,
       COUNT(*) AS etapas_observadas,
       ROUND(SUM(fExpansionServicioPeriodoTS), 2) AS etapas_estimadas
-    FROM read_parquet('{etapas_glob}')
+    FROM {etapas_src}
     {where_clause}
     GROUP BY tipo_dia
     ORDER BY etapas_estimadas DESC
@@ -312,7 +341,7 @@ def query_demand_by_day_type(filters: QueryFilters) -> list[dict[str, Any]]:
 
 
 def query_demand_by_mode(filters: QueryFilters) -> list[dict[str, Any]]:
-    etapas_glob = _parquet_glob("etapas", "etapas_validation.parquet")
+    etapas_src = _parquet_source("etapas", "etapas_validation.parquet")
     where_clause, params = _build_predicates(
         filters,
         cut_col="cut",
@@ -325,7 +354,7 @@ def query_demand_by_mode(filters: QueryFilters) -> list[dict[str, Any]]:
       tipo_transporte AS mode_code,
       COUNT(*) AS etapas_observadas,
       ROUND(SUM(fExpansionServicioPeriodoTS), 2) AS etapas_estimadas
-    FROM read_parquet('{etapas_glob}')
+    FROM {etapas_src}
     {where_clause}
     GROUP BY tipo_transporte
     ORDER BY etapas_estimadas DESC
@@ -334,7 +363,7 @@ def query_demand_by_mode(filters: QueryFilters) -> list[dict[str, Any]]:
 
 
 def query_top_boardings(filters: QueryFilters, limit: int = 20) -> list[dict[str, Any]]:
-    subidas_glob = _parquet_glob("subidas_30m", "subidas_30m.parquet")
+    subidas_src = _parquet_source("subidas_30m", "subidas_30m.parquet")
     where_clause, params = _build_predicates(
         _subidas_filters(filters),
         cut_col="cut",
@@ -348,7 +377,7 @@ def query_top_boardings(filters: QueryFilters, limit: int = 20) -> list[dict[str
       comuna,
       mode_code,
       ROUND(SUM(subidas_promedio), 2) AS subidas_promedio_total
-    FROM read_parquet('{subidas_glob}')
+    FROM {subidas_src}
     {where_clause}
     GROUP BY stop_code, comuna, mode_code
     ORDER BY subidas_promedio_total DESC